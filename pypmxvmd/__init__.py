@@ -23,27 +23,97 @@ Usage:
     pypmxvmd.save_vpd(pose, "modified_pose.vpd")
 """
 
-from pathlib import Path
-from typing import Union
+from __future__ import annotations
 
-# Import parsers
-from .common.parsers.vmd_parser import VmdParser
-from .common.parsers.pmx_parser import PmxParser
-from .common.parsers.vpd_parser import VpdParser
+import importlib
+import os
+from typing import TYPE_CHECKING, Iterable, Optional, Union
 
-# Import models for type hints
-from .common.models.vmd import VmdMotion
-from .common.models.pmx import PmxModel
-from .common.models.vpd import VpdPose
+if TYPE_CHECKING:
+    from pathlib import Path
+    from .common.models.vmd import VmdMotion
+    from .common.models.pmx import PmxModel
+    from .common.models.vpd import VpdPose, VpdPoseTable
+    from .common.io.columnar_io import ColumnarReader
 
 __version__ = "2.7.1"
 __author__ = "PythonImporter"
 __description__ = "Python MikuMikuDance File Parser"
 
-# Core parser instances (reused for efficiency)
-_vmd_parser = VmdParser()
-_pmx_parser = PmxParser()
-_vpd_parser = VpdParser()
+# Parsers, models and their Cython accelerators are imported on first use,
+# so that `import pypmxvmd` stays cheap for short-lived processes.
+_LAZY_ATTRS = {
+    'VmdParser': ('pypmxvmd.common.parsers.vmd_parser', 'VmdParser'),
+    'PmxParser': ('pypmxvmd.common.parsers.pmx_parser', 'PmxParser'),
+    'VpdParser': ('pypmxvmd.common.parsers.vpd_parser', 'VpdParser'),
+    'ColumnarParser': ('pypmxvmd.common.parsers.columnar_parser', 'ColumnarParser'),
+    'ColumnarReader': ('pypmxvmd.common.io.columnar_io', 'ColumnarReader'),
+    'export_glb': ('pypmxvmd.common.io.mesh_export', 'export_glb'),
+    'export_obj': ('pypmxvmd.common.io.mesh_export', 'export_obj'),
+    'VmdMotion': ('pypmxvmd.common.models.vmd', 'VmdMotion'),
+    'PmxModel': ('pypmxvmd.common.models.pmx', 'PmxModel'),
+    'VpdPose': ('pypmxvmd.common.models.vpd', 'VpdPose'),
+    'VpdPoseTable': ('pypmxvmd.common.models.vpd', 'VpdPoseTable'),
+    'poses_to_motion': ('pypmxvmd.common.processing.convert', 'poses_to_motion'),
+    'motion_to_pose_table': ('pypmxvmd.common.processing.convert', 'motion_to_pose_table'),
+    'motion_to_poses': ('pypmxvmd.common.processing.convert', 'motion_to_poses'),
+    'normalize_motion': ('pypmxvmd.common.processing.keyframes', 'normalize_motion'),
+    'merge_motions': ('pypmxvmd.common.processing.combine', 'merge_motions'),
+    'concat_motions': ('pypmxvmd.common.processing.combine', 'concat_motions'),
+    'diff': ('pypmxvmd.common.processing.diff', 'diff'),
+    'mirror': ('pypmxvmd.common.processing.mirror', 'mirror'),
+    'check_compat': ('pypmxvmd.common.processing.compat', 'check_compat'),
+    'retarget': ('pypmxvmd.common.processing.retarget', 'retarget'),
+    'apply_morphs': ('pypmxvmd.common.processing.morph', 'apply_morphs'),
+    'extract_submeshes': ('pypmxvmd.common.processing.submesh', 'extract_submeshes'),
+    'optimize_mesh': ('pypmxvmd.common.processing.optimize', 'optimize_mesh'),
+    'weld_vertices': ('pypmxvmd.common.processing.weld', 'weld_vertices'),
+    'nearest_vertices': ('pypmxvmd.common.processing.spatial', 'nearest_vertices'),
+    'recompute_normals': ('pypmxvmd.common.processing.normals', 'recompute_normals'),
+    'simplify_mesh': ('pypmxvmd.common.processing.simplify', 'simplify_mesh'),
+    'generate_lods': ('pypmxvmd.common.processing.simplify', 'generate_lods'),
+    'bake_ik': ('pypmxvmd.common.processing.ik', 'bake_ik'),
+    'sample_camera': ('pypmxvmd.common.processing.camera', 'sample_camera'),
+}
+
+# Core parser instances (created on first use and reused for efficiency)
+_PARSER_ATTRS = {
+    '_vmd_parser': 'VmdParser',
+    '_pmx_parser': 'PmxParser',
+    '_vpd_parser': 'VpdParser',
+    '_columnar_parser': 'ColumnarParser',
+}
+_parsers = {}
+
+
+def _get_parser(name: str):
+    """Return the shared parser instance for `_vmd_parser`/`_pmx_parser`/`_vpd_parser`."""
+    parser = _parsers.get(name)
+    if parser is None:
+        parser = _load_attr(_PARSER_ATTRS[name])()
+        _parsers[name] = parser
+    return parser
+
+
+def _load_attr(name: str):
+    """Import a lazily loaded attribute and cache it in the module namespace."""
+    module_name, attr = _LAZY_ATTRS[name]
+    value = getattr(importlib.import_module(module_name), attr)
+    globals()[name] = value
+    return value
+
+
+def __getattr__(name: str):
+    """Resolve lazily imported public attributes."""
+    if name in _LAZY_ATTRS:
+        return _load_attr(name)
+    if name in _PARSER_ATTRS:
+        return _get_parser(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
 
 
 def load_vmd(file_path: Union[str, Path], more_info: bool = False) -> VmdMotion:
@@ -61,22 +131,43 @@ def load_vmd(file_path: Union[str, Path], more_info: bool = False) -> VmdMotion:
         FileNotFoundError: If file doesn't exist
         ValueError: If file format is invalid
     """
-    return _vmd_parser.parse_file(file_path, more_info=more_info)
+    return _get_parser('_vmd_parser').parse_file(file_path, more_info=more_info)
 
 
-def save_vmd(motion: VmdMotion, file_path: Union[str, Path]) -> None:
+def save_vmd(motion: VmdMotion, file_path: Union[str, Path], normalize: bool = False) -> None:
     """
     Save VMD motion to file.
     
     Args:
         motion: VmdMotion object to save
         file_path: Output file path
+        normalize: Sort keyframes by (name, frame) and drop duplicates (last wins)
+            before writing; the motion object itself is not modified
         
     Raises:
         ValueError: If motion data is invalid
         IOError: If file cannot be written
     """
-    _vmd_parser.write_file(motion, file_path)
+    _get_parser('_vmd_parser').write_file(motion, file_path, normalize=normalize)
+
+
+def scan_vmd_names(file_path: Union[str, Path]):
+    """
+    Read only the header, keyframe counts and name tables of a VMD file.
+    
+    Keyframe data is skipped and names are kept as raw Shift-JIS bytes.
+    
+    Args:
+        file_path: Path to VMD file
+        
+    Returns:
+        VmdNameTable object
+        
+    Raises:
+        FileNotFoundError: If file doesn't exist
+        ValueError: If file format is invalid
+    """
+    return _get_parser('_vmd_parser').scan_names(file_path)
 
 
 def load_pmx(file_path: Union[str, Path], more_info: bool = False) -> PmxModel:
@@ -94,7 +185,26 @@ def load_pmx(file_path: Union[str, Path], more_info: bool = False) -> PmxModel:
         FileNotFoundError: If file doesn't exist
         ValueError: If file format is invalid
     """
-    return _pmx_parser.parse_file(file_path, more_info=more_info)
+    return _get_parser('_pmx_parser').parse_file(file_path, more_info=more_info)
+
+
+def scan_pmx_names(file_path: Union[str, Path]):
+    """
+    Read only the header, section counts and bone/morph names of a PMX file.
+    
+    Vertex, face, texture and material records are skipped without decoding.
+    
+    Args:
+        file_path: Path to PMX file
+        
+    Returns:
+        PmxNameTable object
+        
+    Raises:
+        FileNotFoundError: If file doesn't exist
+        ValueError: If file format is invalid
+    """
+    return _get_parser('_pmx_parser').scan_names(file_path)
 
 
 def save_pmx(model: PmxModel, file_path: Union[str, Path]) -> None:
@@ -109,7 +219,7 @@ def save_pmx(model: PmxModel, file_path: Union[str, Path]) -> None:
         ValueError: If model data is invalid
         IOError: If file cannot be written
     """
-    _pmx_parser.write_file(model, file_path)
+    _get_parser('_pmx_parser').write_file(model, file_path)
 
 
 def load_vpd(file_path: Union[str, Path], more_info: bool = False) -> VpdPose:
@@ -127,7 +237,29 @@ def load_vpd(file_path: Union[str, Path], more_info: bool = False) -> VpdPose:
         FileNotFoundError: If file doesn't exist
         ValueError: If file format is invalid
     """
-    return _vpd_parser.parse_file(file_path, more_info=more_info)
+    return _get_parser('_vpd_parser').parse_file(file_path, more_info=more_info)
+
+
+def load_vpd_many(file_paths: Iterable[Union[str, Path]], max_workers: Optional[int] = None,
+                  use_processes: bool = True, skip_errors: bool = False) -> VpdPoseTable:
+    """
+    Load many VPD pose files in parallel into one columnar pose table.
+    
+    Args:
+        file_paths: Paths to VPD files
+        max_workers: Maximum number of workers (default: CPU count, 1 = sequential)
+        use_processes: Use a process pool (default) instead of a thread pool
+        skip_errors: Record unreadable files in `table.errors` instead of raising
+        
+    Returns:
+        VpdPoseTable with one row per successfully parsed file, in input order
+        
+    Raises:
+        ValueError: If a file cannot be parsed and skip_errors is False
+    """
+    return _get_parser('_vpd_parser').parse_many(file_paths, max_workers=max_workers,
+                                                 use_processes=use_processes,
+                                                 skip_errors=skip_errors)
 
 
 def save_vpd(pose: VpdPose, file_path: Union[str, Path]) -> None:
@@ -142,7 +274,61 @@ def save_vpd(pose: VpdPose, file_path: Union[str, Path]) -> None:
         ValueError: If pose data is invalid
         IOError: If file cannot be written
     """
-    _vpd_parser.write_file(pose, file_path)
+    _get_parser('_vpd_parser').write_file(pose, file_path)
+
+
+# ===== 列式格式 =====
+
+def load_columnar(file_path: Union[str, Path], more_info: bool = False):
+    """
+    Load a columnar container file (.vmda/.pmxa/.vpda).
+    
+    Args:
+        file_path: Path to columnar file
+        more_info: Whether to include additional parsing information
+        
+    Returns:
+        VmdMotion, PmxModel, VpdPose or VpdPoseTable object, depending on the stored kind
+        
+    Raises:
+        FileNotFoundError: If file doesn't exist
+        ValueError: If file format is invalid
+    """
+    return _get_parser('_columnar_parser').parse_file(file_path, more_info=more_info)
+
+
+def save_columnar(data, file_path: Union[str, Path], compress: bool = False) -> None:
+    """
+    Save a VmdMotion, PmxModel, VpdPose or VpdPoseTable as a columnar container file.
+    
+    Args:
+        data: Object to save
+        file_path: Output file path (conventionally .vmda/.pmxa/.vpda)
+        compress: Compress each column with zlib
+        
+    Raises:
+        ValueError: If data type is unsupported or data is invalid
+    """
+    _get_parser('_columnar_parser').write_file(data, file_path, compress=compress)
+
+
+def open_columnar(file_path: Union[str, Path], use_mmap: bool = True) -> ColumnarReader:
+    """
+    Open a columnar container file for column-level access without building models.
+    
+    Args:
+        file_path: Path to columnar file
+        use_mmap: Memory-map the file so uncompressed columns are zero-copy views;
+            with False only the requested sections are read from disk
+        
+    Returns:
+        ColumnarReader (use as a context manager)
+        
+    Raises:
+        FileNotFoundError: If file doesn't exist
+        ValueError: If file format is invalid
+    """
+    return _load_attr('ColumnarReader')(file_path, use_mmap=use_mmap)
 
 
 # Convenience functions for auto-detection
@@ -160,8 +346,7 @@ def load(file_path: Union[str, Path], more_info: bool = False):
     Raises:
         ValueError: If file type cannot be determined or is unsupported
     """
-    path = Path(file_path)
-    suffix = path.suffix.lower()
+    suffix = os.path.splitext(os.fspath(file_path))[1].lower()
     
     if suffix == '.vmd':
         return load_vmd(file_path, more_info)
@@ -169,6 +354,8 @@ def load(file_path: Union[str, Path], more_info: bool = False):
         return load_pmx(file_path, more_info)
     elif suffix == '.vpd':
         return load_vpd(file_path, more_info)
+    elif suffix in ('.vmda', '.pmxa', '.vpda'):
+        return load_columnar(file_path, more_info)
     else:
         raise ValueError(f"Unsupported file type: {suffix}")
 
@@ -176,6 +363,7 @@ def load(file_path: Union[str, Path], more_info: bool = False):
 def save(data, file_path: Union[str, Path]) -> None:
     """
     Automatically detect data type and save in appropriate format.
+    Paths ending in .vmda/.pmxa/.vpda are saved as columnar containers.
     
     Args:
         data: VmdMotion, PmxModel, or VpdPose object
@@ -184,11 +372,13 @@ def save(data, file_path: Union[str, Path]) -> None:
     Raises:
         ValueError: If data type is unsupported
     """
-    if isinstance(data, VmdMotion):
+    if os.path.splitext(os.fspath(file_path))[1].lower() in ('.vmda', '.pmxa', '.vpda'):
+        save_columnar(data, file_path)
+    elif isinstance(data, _load_attr('VmdMotion')):
         save_vmd(data, file_path)
-    elif isinstance(data, PmxModel):
+    elif isinstance(data, _load_attr('PmxModel')):
         save_pmx(data, file_path)
-    elif isinstance(data, VpdPose):
+    elif isinstance(data, _load_attr('VpdPose')):
         save_vpd(data, file_path)
     else:
         raise ValueError(f"Unsupported data type: {type(data)}")
@@ -211,22 +401,25 @@ def load_vmd_text(file_path: Union[str, Path], more_info: bool = False) -> VmdMo
         FileNotFoundError: If file doesn't exist
         ValueError: If file format is invalid
     """
-    return _vmd_parser.parse_text_file(file_path, more_info=more_info)
+    return _get_parser('_vmd_parser').parse_text_file(file_path, more_info=more_info)
 
 
-def save_vmd_text(motion: VmdMotion, file_path: Union[str, Path]) -> None:
+def save_vmd_text(motion: VmdMotion, file_path: Union[str, Path],
+                  float_precision: Optional[int] = 6) -> None:
     """
     Save VMD motion to text file.
     
     Args:
         motion: VmdMotion object to save
         file_path: Output text file path
+        float_precision: Decimal places for floats (default 6); None writes the
+            shortest text that round-trips to the same float32 value
         
     Raises:
         ValueError: If motion data is invalid
         IOError: If file cannot be written
     """
-    _vmd_parser.write_text_file(motion, file_path)
+    _get_parser('_vmd_parser').write_text_file(motion, file_path, float_precision)
 
 
 def load_pmx_text(file_path: Union[str, Path], more_info: bool = False) -> PmxModel:
@@ -244,22 +437,25 @@ def load_pmx_text(file_path: Union[str, Path], more_info: bool = False) -> PmxMo
         FileNotFoundError: If file doesn't exist
         ValueError: If file format is invalid
     """
-    return _pmx_parser.parse_text_file(file_path, more_info=more_info)
+    return _get_parser('_pmx_parser').parse_text_file(file_path, more_info=more_info)
 
 
-def save_pmx_text(model: PmxModel, file_path: Union[str, Path]) -> None:
+def save_pmx_text(model: PmxModel, file_path: Union[str, Path],
+                  float_precision: Optional[int] = 6) -> None:
     """
     Save PMX model to text file.
     
     Args:
         model: PmxModel object to save
         file_path: Output text file path
+        float_precision: Decimal places for floats (default 6); None writes the
+            shortest text that round-trips to the same float32 value
         
     Raises:
         ValueError: If model data is invalid
         IOError: If file cannot be written
     """
-    _pmx_parser.write_text_file(model, file_path)
+    _get_parser('_pmx_parser').write_text_file(model, file_path, float_precision)
 
 
 def load_vpd_text(file_path: Union[str, Path], more_info: bool = False) -> VpdPose:
@@ -277,22 +473,25 @@ def load_vpd_text(file_path: Union[str, Path], more_info: bool = False) -> VpdPo
         FileNotFoundError: If file doesn't exist
         ValueError: If file format is invalid
     """
-    return _vpd_parser.parse_text_file(file_path, more_info=more_info)
+    return _get_parser('_vpd_parser').parse_text_file(file_path, more_info=more_info)
 
 
-def save_vpd_text(pose: VpdPose, file_path: Union[str, Path]) -> None:
+def save_vpd_text(pose: VpdPose, file_path: Union[str, Path],
+                  float_precision: Optional[int] = 6) -> None:
     """
     Save VPD pose to structured text file.
     
     Args:
         pose: VpdPose object to save
         file_path: Output text file path
+        float_precision: Decimal places for floats (default 6); None writes the
+            shortest text that round-trips to the same float32 value
         
     Raises:
         ValueError: If pose data is invalid
         IOError: If file cannot be written
     """
-    _vpd_parser.write_text_file(pose, file_path)
+    _get_parser('_vpd_parser').write_text_file(pose, file_path, float_precision)
 
 
 def load_text(file_path: Union[str, Path], more_info: bool = False):
@@ -309,7 +508,7 @@ def load_text(file_path: Union[str, Path], more_info: bool = False):
     Raises:
         ValueError: If file type cannot be determined or is unsupported
     """
-    path = Path(file_path)
+    path = os.fspath(file_path)
     
     # Try to detect format by reading first few lines
     try:
@@ -330,7 +529,7 @@ def load_text(file_path: Union[str, Path], more_info: bool = False):
         return load_vpd_text(file_path, more_info)
     
     # Fallback to file extension
-    suffix = path.suffix.lower()
+    suffix = os.path.splitext(path)[1].lower()
     if suffix == '.txt':
         # Try VMD text format first (most common)
         try:
@@ -344,23 +543,25 @@ def load_text(file_path: Union[str, Path], more_info: bool = False):
         raise ValueError(f"Cannot determine text file format for: {file_path}")
 
 
-def save_text(data, file_path: Union[str, Path]) -> None:
+def save_text(data, file_path: Union[str, Path], float_precision: Optional[int] = 6) -> None:
     """
     Automatically detect data type and save in appropriate text format.
     
     Args:
         data: VmdMotion, PmxModel, or VpdPose object
         file_path: Output text file path
+        float_precision: Decimal places for floats (default 6); None writes the
+            shortest text that round-trips to the same float32 value
         
     Raises:
         ValueError: If data type is unsupported
     """
-    if isinstance(data, VmdMotion):
-        save_vmd_text(data, file_path)
-    elif isinstance(data, PmxModel):
-        save_pmx_text(data, file_path)
-    elif isinstance(data, VpdPose):
-        save_vpd_text(data, file_path)
+    if isinstance(data, _load_attr('VmdMotion')):
+        save_vmd_text(data, file_path, float_precision)
+    elif isinstance(data, _load_attr('PmxModel')):
+        save_pmx_text(data, file_path, float_precision)
+    elif isinstance(data, _load_attr('VpdPose')):
+        save_vpd_text(data, file_path, float_precision)
     else:
         raise ValueError(f"Unsupported data type: {type(data)}")
 
@@ -375,11 +576,23 @@ __all__ = [
     # Binary file functions
     'load_vmd',
     'save_vmd',
+    'scan_vmd_names',
     'load_pmx',
     'save_pmx',
+    'scan_pmx_names',
     'load_vpd',
+    'load_vpd_many',
     'save_vpd',
     
+    # Columnar container functions
+    'load_columnar',
+    'save_columnar',
+    'open_columnar',
+    
+    # Mesh export functions
+    'export_glb',
+    'export_obj',
+    
     # Text file functions
     'load_vmd_text',
     'save_vmd_text',
@@ -394,8 +607,33 @@ __all__ = [
     'load_text',
     'save_text',
     
+    # Pose/motion conversion
+    'poses_to_motion',
+    'motion_to_pose_table',
+    'motion_to_poses',
+    
+    # Keyframe processing
+    'normalize_motion',
+    'merge_motions',
+    'concat_motions',
+    'diff',
+    'mirror',
+    'check_compat',
+    'retarget',
+    'apply_morphs',
+    'extract_submeshes',
+    'optimize_mesh',
+    'weld_vertices',
+    'nearest_vertices',
+    'recompute_normals',
+    'simplify_mesh',
+    'generate_lods',
+    'bake_ik',
+    'sample_camera',
+    
     # Model classes (for type hints)
     'VmdMotion',
     'PmxModel',
     'VpdPose',
+    'VpdPoseTable',
 ]
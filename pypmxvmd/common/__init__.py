@@ -3,9 +3,41 @@ PyPMXVMD 数据访问层
 
 负责文件I/O、数据持久化、格式转换等底层操作。
 包含数据模型、解析器、I/O工具和验证器。
+
+子模块在首次访问时才导入，避免导入任一解析器时连带加载全部格式。
 """
 
-from pypmxvmd.common.models import *
-from pypmxvmd.common.parsers import *
-from pypmxvmd.common.io import *
-# validators 模块尚未实现，已移除导入
\ No newline at end of file
+import importlib
+
+# 名称 -> 所在子包
+_LAZY_ATTRS = {
+    "BaseModel": "pypmxvmd.common.models",
+    "PmxModel": "pypmxvmd.common.models",
+    "VmdMotion": "pypmxvmd.common.models",
+    "VpdPose": "pypmxvmd.common.models",
+    "VpdPoseTable": "pypmxvmd.common.models",
+    "PmxParser": "pypmxvmd.common.parsers",
+    "VmdParser": "pypmxvmd.common.parsers",
+    "VpdParser": "pypmxvmd.common.parsers",
+    "ColumnarParser": "pypmxvmd.common.parsers",
+    "BinaryIOHandler": "pypmxvmd.common.io",
+    "TextIOHandler": "pypmxvmd.common.io",
+    "FileUtils": "pypmxvmd.common.io",
+    "ColumnarReader": "pypmxvmd.common.io",
+}
+# validators 模块尚未实现，已移除导入
+
+__all__ = list(_LAZY_ATTRS)
+
+
+def __getattr__(name: str):
+    """按需导入子包中的公共名称"""
+    if name in _LAZY_ATTRS:
+        value = getattr(importlib.import_module(_LAZY_ATTRS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
@@ -0,0 +1,314 @@
+"""
+PyPMXVMD 性能埋点
+
+解析器和写入器在每个数据段边界调用这里的接口，报告段名、字节范围、元素数量、
+耗时（纳秒）和所使用的后端；当Cython/快速解析失败而回退到更慢的实现时报告回退事件。
+
+默认没有安装任何钩子，此时解析器只会拿到一个共享的空追踪器，不产生计时和对象分配开销。
+
+用法:
+    from pypmxvmd.common.instrumentation import StatsCollector, instrumented
+
+    collector = StatsCollector()
+    with instrumented(collector):
+        pypmxvmd.load_vmd("motion.vmd")
+    print(collector.format_report())
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+# 当前安装的钩子，None表示未启用埋点
+_hook = None
+
+
+class SectionEvent:
+    """数据段事件
+
+    Attributes:
+        format: 文件格式 ("vmd" / "pmx" / "vpd")
+        operation: 操作类型 ("parse" / "write" / "parse_text" / "write_text")
+        backend: 使用的后端 ("cython" / "fast" / "python" / "nuthouse")
+        section: 数据段名称，整个文件为 "file"
+        start: 段起始字节偏移，无法确定时为None
+        end: 段结束字节偏移，无法确定时为None
+        count: 段内元素数量
+        elapsed_ns: 耗时（纳秒）
+    """
+
+    __slots__ = ("format", "operation", "backend", "section", "start", "end", "count", "elapsed_ns")
+
+    def __init__(self, format: str, operation: str, backend: str, section: str,
+                 start: Optional[int], end: Optional[int], count: int, elapsed_ns: int):
+        self.format = format
+        self.operation = operation
+        self.backend = backend
+        self.section = section
+        self.start = start
+        self.end = end
+        self.count = count
+        self.elapsed_ns = elapsed_ns
+
+    @property
+    def size(self) -> Optional[int]:
+        """段的字节数"""
+        if self.start is None or self.end is None:
+            return None
+        return self.end - self.start
+
+    def __repr__(self) -> str:
+        return (f"SectionEvent({self.format}/{self.operation}/{self.backend}: {self.section}, "
+                f"bytes={self.start}-{self.end}, count={self.count}, elapsed_ns={self.elapsed_ns})")
+
+
+class FallbackEvent:
+    """后端回退事件
+
+    Attributes:
+        format: 文件格式
+        operation: 操作类型
+        from_backend: 放弃的后端
+        to_backend: 回退到的后端
+        error: 导致回退的异常，后端不可用时为None
+        file_path: 正在处理的文件
+    """
+
+    __slots__ = ("format", "operation", "from_backend", "to_backend", "error", "file_path")
+
+    def __init__(self, format: str, operation: str, from_backend: str, to_backend: str,
+                 error: Optional[BaseException], file_path: Any = None):
+        self.format = format
+        self.operation = operation
+        self.from_backend = from_backend
+        self.to_backend = to_backend
+        self.error = error
+        self.file_path = file_path
+
+    @property
+    def reason(self) -> str:
+        """回退原因的文字描述"""
+        if self.error is None:
+            return "unavailable"
+        return f"{type(self.error).__name__}: {self.error}"
+
+    def __repr__(self) -> str:
+        return (f"FallbackEvent({self.format}/{self.operation}: {self.from_backend} -> "
+                f"{self.to_backend}, {self.reason})")
+
+
+class InstrumentationHook:
+    """埋点钩子基类
+
+    子类覆盖需要的方法即可，未覆盖的事件被忽略。
+    """
+
+    def on_section(self, event: SectionEvent) -> None:
+        """数据段处理完成时调用"""
+
+    def on_fallback(self, event: FallbackEvent) -> None:
+        """发生后端回退时调用"""
+
+
+class StatsCollector(InstrumentationHook):
+    """内置的统计收集器
+
+    跨多次调用按 (格式, 操作, 后端, 段) 聚合调用次数、总耗时、最大耗时、元素数和字节数，
+    并保留回退事件列表。线程安全。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.sections: Dict[tuple, Dict[str, int]] = {}
+        self.fallbacks: List[FallbackEvent] = []
+
+    def on_section(self, event: SectionEvent) -> None:
+        key = (event.format, event.operation, event.backend, event.section)
+        size = event.size or 0
+        with self._lock:
+            stats = self.sections.get(key)
+            if stats is None:
+                stats = {"calls": 0, "total_ns": 0, "max_ns": 0, "count": 0, "bytes": 0}
+                self.sections[key] = stats
+            stats["calls"] += 1
+            stats["total_ns"] += event.elapsed_ns
+            stats["count"] += event.count
+            stats["bytes"] += size
+            if event.elapsed_ns > stats["max_ns"]:
+                stats["max_ns"] = event.elapsed_ns
+
+    def on_fallback(self, event: FallbackEvent) -> None:
+        with self._lock:
+            self.fallbacks.append(event)
+
+    @property
+    def fallback_count(self) -> int:
+        """回退事件总数"""
+        return len(self.fallbacks)
+
+    def backend_calls(self) -> Dict[tuple, int]:
+        """按 (格式, 操作, 后端) 统计整体调用次数
+
+        每次调用都以 "file" 段结束，因此按该段计数。
+        """
+        with self._lock:
+            return {key[:3]: stats["calls"] for key, stats in self.sections.items()
+                    if key[3] == "file"}
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """返回聚合结果列表，按总耗时降序排列"""
+        with self._lock:
+            items = [
+                {"format": k[0], "operation": k[1], "backend": k[2], "section": k[3], **v}
+                for k, v in self.sections.items()
+            ]
+        items.sort(key=lambda item: item["total_ns"], reverse=True)
+        return items
+
+    def reset(self) -> None:
+        """清空统计数据"""
+        with self._lock:
+            self.sections.clear()
+            self.fallbacks.clear()
+
+    def format_report(self) -> str:
+        """生成可读的统计报告"""
+        lines = [f"{'格式/操作/后端':<24} {'段':<16} {'调用':>6} {'总耗时(ms)':>11} {'元素':>10} {'字节':>12}"]
+        for item in self.summary():
+            name = f"{item['format']}/{item['operation']}/{item['backend']}"
+            lines.append(f"{name:<24} {item['section']:<16} {item['calls']:>6} "
+                         f"{item['total_ns'] / 1e6:>11.3f} {item['count']:>10} {item['bytes']:>12}")
+        for event in self.fallbacks:
+            lines.append(f"回退: {event.format}/{event.operation} {event.from_backend} -> "
+                         f"{event.to_backend} ({event.reason}) {event.file_path or ''}")
+        return "\n".join(lines)
+
+
+class SectionTracer:
+    """单次解析/写入调用的段追踪器
+
+    Args:
+        hook: 接收事件的钩子
+        format: 文件格式
+        operation: 操作类型
+        backend: 后端名称
+        position: 返回当前字节偏移的函数；为None时按返回的字节串长度累计偏移
+    """
+
+    __slots__ = ("_hook", "_format", "_operation", "_backend", "_position", "_offset")
+
+    def __init__(self, hook, format: str, operation: str, backend: str,
+                 position: Optional[Callable[[], int]] = None):
+        self._hook = hook
+        self._format = format
+        self._operation = operation
+        self._backend = backend
+        self._position = position
+        self._offset = 0
+
+    def run(self, section: str, func: Callable, *args):
+        """执行一个数据段函数并报告事件
+
+        元素数量取返回列表的长度；写入时取第一个参数（待编码列表）的长度。
+        """
+        start = self._position() if self._position is not None else self._offset
+        t0 = time.perf_counter_ns()
+        result = func(*args)
+        elapsed = time.perf_counter_ns() - t0
+
+        if self._position is not None:
+            end = self._position()
+        elif isinstance(result, (bytes, bytearray)):
+            end = start + len(result)
+            self._offset = end
+        else:
+            end = None
+
+        if isinstance(result, list):
+            count = len(result)
+        elif args and isinstance(args[0], list):
+            count = len(args[0])
+        else:
+            count = 1
+
+        self._hook.on_section(SectionEvent(self._format, self._operation, self._backend,
+                                           section, start, end, count, elapsed))
+        return result
+
+    def file(self, elapsed_ns: int, size: Optional[int], count: int) -> None:
+        """报告整个文件的汇总事件"""
+        self._hook.on_section(SectionEvent(self._format, self._operation, self._backend,
+                                           "file", 0 if size is not None else None, size,
+                                           count, elapsed_ns))
+
+
+class _NullTracer:
+    """未启用埋点时使用的空追踪器"""
+
+    __slots__ = ()
+
+    def run(self, section: str, func: Callable, *args):
+        return func(*args)
+
+    def file(self, elapsed_ns: int, size: Optional[int], count: int) -> None:
+        pass
+
+
+_NULL_TRACER = _NullTracer()
+
+
+def set_hook(hook: Optional[InstrumentationHook]) -> Optional[InstrumentationHook]:
+    """安装全局埋点钩子
+
+    Args:
+        hook: 钩子对象，None表示关闭埋点
+
+    Returns:
+        之前安装的钩子
+    """
+    global _hook
+    previous = _hook
+    _hook = hook
+    return previous
+
+
+def get_hook() -> Optional[InstrumentationHook]:
+    """返回当前安装的钩子"""
+    return _hook
+
+
+@contextmanager
+def instrumented(hook: InstrumentationHook):
+    """在with块内临时安装钩子"""
+    previous = set_hook(hook)
+    try:
+        yield hook
+    finally:
+        set_hook(previous)
+
+
+def tracer(format: str, operation: str, backend: str,
+           position: Optional[Callable[[], int]] = None):
+    """为一次解析/写入调用创建段追踪器
+
+    未安装钩子时返回共享的空追踪器。
+    """
+    hook = _hook
+    if hook is None:
+        return _NULL_TRACER
+    return SectionTracer(hook, format, operation, backend, position)
+
+
+def report_fallback(format: str, operation: str, from_backend: str, to_backend: str,
+                    error: Optional[BaseException], file_path: Any = None) -> None:
+    """报告后端回退事件"""
+    hook = _hook
+    if hook is not None:
+        hook.on_fallback(FallbackEvent(format, operation, from_backend, to_backend,
+                                       error, file_path))
+
+
+def now_ns() -> int:
+    """埋点启用时返回当前计时（纳秒），否则返回0"""
+    return time.perf_counter_ns() if _hook is not None else 0
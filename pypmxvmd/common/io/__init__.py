@@ -3,14 +3,41 @@ PyPMXVMD I/O操作模块
 
 提供文件读写、二进制数据处理等底层I/O功能。
 包含二进制文件操作、文本文件操作和通用文件工具。
+
+各处理器模块在首次访问时才导入。
 """
 
-from pypmxvmd.common.io.binary_io import BinaryIOHandler
-from pypmxvmd.common.io.text_io import TextIOHandler
-from pypmxvmd.common.io.file_utils import FileUtils
+import importlib
+
+_LAZY_ATTRS = {
+    "BinaryIOHandler": "pypmxvmd.common.io.binary_io",
+    "TextIOHandler": "pypmxvmd.common.io.text_io",
+    "FileUtils": "pypmxvmd.common.io.file_utils",
+    "ColumnarReader": "pypmxvmd.common.io.columnar_io",
+    "ColumnarWriter": "pypmxvmd.common.io.columnar_io",
+    "export_glb": "pypmxvmd.common.io.mesh_export",
+    "export_obj": "pypmxvmd.common.io.mesh_export",
+}
 
 __all__ = [
     "BinaryIOHandler",
     "TextIOHandler",
     "FileUtils",
-]
\ No newline at end of file
+    "ColumnarReader",
+    "ColumnarWriter",
+    "export_glb",
+    "export_obj",
+]
+
+
+def __getattr__(name: str):
+    """按需导入I/O处理器类"""
+    if name in _LAZY_ATTRS:
+        value = getattr(importlib.import_module(_LAZY_ATTRS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
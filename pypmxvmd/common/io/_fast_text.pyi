@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+from typing import Iterable, List, Sequence
+
+
+def format_float_column_cython(values: Sequence[float], precision: int) -> List[str]: ...
+
+
+def parse_float_rows_cython(rows: Iterable[Sequence[str]], start: int, stop: int) -> List[float]: ...
+
+
+def parse_int_rows_cython(rows: Iterable[Sequence[str]], start: int, stop: int) -> List[int]: ...
@@ -0,0 +1,152 @@
+# cython: language_level=3
+# cython: boundscheck=False
+# cython: wraparound=False
+# cython: cdivision=True
+# cython: initializedcheck=False
+# cython: nonecheck=False
+"""
+PyPMXVMD 文本数值列编解码模块 (Cython优化)
+
+按列批量格式化浮点数、按行块批量解析数值字段，输出与 text_io 中的纯Python实现逐字节一致。
+
+优化策略:
+- 浮点数用 PyOS_double_to_string 格式化，与 '%.*f' / '%.*g' 是同一实现，不受locale影响
+- 最短往返表示直接在C层面比较float32舍入结果，不经过struct打包和Python float对象
+- 数值字段直接从字符串的UTF-8缓冲区解析，跳过 float() / int() 的Unicode规范化拷贝；
+  无法完整解析的字段（空白、下划线、非ASCII数字、超出64位的整数、非法值）回退到 float() / int()，
+  因此结果和错误信息与纯Python实现相同
+"""
+
+from libc.stdlib cimport strtoll
+from libc.limits cimport LLONG_MAX, LLONG_MIN
+from libc.math cimport isnan, isinf
+from cpython.mem cimport PyMem_Free
+from cpython.ref cimport PyObject
+
+
+cdef extern from "Python.h":
+    char* PyOS_double_to_string(double val, char format_code, int precision,
+                                int flags, int* ptype) except NULL
+    double PyOS_string_to_double(const char* s, char** endptr,
+                                 PyObject* overflow_exception) except? -1.0
+    const char* PyUnicode_AsUTF8AndSize(object unicode, Py_ssize_t* size) except NULL
+
+
+cdef inline str _double_to_str(double value, char code, int precision):
+    """PyOS_double_to_string 的包装，负责释放C字符串"""
+    cdef char* text = PyOS_double_to_string(value, code, precision, 0, NULL)
+    try:
+        return text.decode('ascii')
+    finally:
+        PyMem_Free(text)
+
+
+cdef str _format_shortest(double value):
+    """与 text_io.format_float_shortest 相同的最短往返表示"""
+    cdef float target = <float>value
+    cdef char* text
+    cdef double parsed
+    cdef int digits
+    if isinf(target) and not isinf(value):
+        # 超出float32范围，与struct打包溢出时的处理一致
+        return repr(value)
+    if not isnan(value):
+        for digits in range(6, 9):
+            text = PyOS_double_to_string(value, b'g', digits, 0, NULL)
+            try:
+                parsed = PyOS_string_to_double(text, NULL, NULL)
+                if <float>parsed == target:
+                    return text.decode('ascii')
+            finally:
+                PyMem_Free(text)
+    return _double_to_str(value, b'g', 9)
+
+
+def format_float_column_cython(const double[:] values, int precision):
+    """格式化一列浮点数
+
+    Args:
+        values: 浮点数缓冲区（array('d')）
+        precision: 小数位数；小于0时使用最短往返表示
+
+    Returns:
+        字符串列表
+    """
+    cdef Py_ssize_t i
+    cdef Py_ssize_t count = values.shape[0]
+    cdef list result = []
+    if precision >= 0:
+        for i in range(count):
+            result.append(_double_to_str(values[i], b'f', precision))
+    else:
+        for i in range(count):
+            result.append(_format_shortest(values[i]))
+    return result
+
+
+cdef inline object _parse_float(object field):
+    cdef Py_ssize_t size
+    cdef const char* text
+    cdef char* end = NULL
+    cdef double value
+    if type(field) is not str:
+        return float(field)
+    text = PyUnicode_AsUTF8AndSize(field, &size)
+    try:
+        value = PyOS_string_to_double(text, &end, NULL)
+    except ValueError:
+        return float(field)
+    if end != text + size:
+        return float(field)
+    return value
+
+
+cdef inline object _parse_int(object field):
+    cdef Py_ssize_t size
+    cdef const char* text
+    cdef char* end = NULL
+    cdef long long value
+    if type(field) is not str:
+        return int(field)
+    text = PyUnicode_AsUTF8AndSize(field, &size)
+    if size == 0:
+        return int(field)
+    value = strtoll(text, &end, 10)
+    if end != text + size or value == LLONG_MAX or value == LLONG_MIN:
+        # 未完整解析或可能溢出（strtoll饱和到边界值）
+        return int(field)
+    return value
+
+
+cdef inline _check_range(Py_ssize_t start, Py_ssize_t stop):
+    if start < 0 or stop < start:
+        raise ValueError(f"字段范围无效: [{start}, {stop})")
+
+
+cdef inline _check_row(object row, Py_ssize_t stop):
+    if len(row) < stop:
+        raise ValueError(f"字段数不足，期望至少{stop}个，得到{len(row)}个")
+
+
+def parse_float_rows_cython(rows, Py_ssize_t start, Py_ssize_t stop):
+    """将每行 row[start:stop] 的字段解析为浮点数，按行拼接为一个列表"""
+    cdef Py_ssize_t j
+    cdef list result = []
+    _check_range(start, stop)
+    for row in rows:
+        _check_row(row, stop)
+        for j in range(start, stop):
+            result.append(_parse_float(row[j]))
+    return result
+
+
+def parse_int_rows_cython(rows, Py_ssize_t start, Py_ssize_t stop):
+    """将每行 row[start:stop] 的字段解析为整数，按行拼接为一个列表"""
+    cdef Py_ssize_t j
+    cdef list result = []
+    _check_range(start, stop)
+    for row in rows:
+        _check_row(row, stop)
+        for j in range(start, stop):
+            result.append(_parse_int(row[j]))
+    return result
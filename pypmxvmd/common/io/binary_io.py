@@ -397,6 +397,12 @@ class BinaryIOHandler:
         length_bytes = struct.pack('<I', len(encoded))
         return length_bytes + encoded
 
+    def get_buffer(self) -> bytes:
+        """获取 read_file_fast 读入的完整数据（不复制）"""
+        if self._view is None:
+            raise RuntimeError("未初始化内部缓冲区，请先调用 read_file_fast()")
+        return self._data
+
     def get_position(self) -> int:
         """获取当前读取位置"""
         return self._position
@@ -0,0 +1,380 @@
+"""
+PyPMXVMD 列式容器格式
+
+用于 .pmxa / .vmda / .vpda 文件的通用列式容器，作为解析后数据的紧凑存储形式。
+
+文件布局（全部为小端序）:
+- 文件头（32字节）: 魔数、格式版本、数据类型、节数量、节目录的位置和大小
+- 数据节: 每节按8字节对齐，可以单独用zlib压缩
+- 节目录: 位于文件末尾，记录每节的名称、类型、类型码、列宽、行数、位置和大小
+
+节的类型:
+- 列: 定长数值数组（array类型码），每行 width 个分量
+- 字符串: 去重后的字符串表加每行的u32索引
+- 元数据: UTF-8编码的JSON对象
+
+读取时可使用mmap，未压缩的数值列以 memoryview 形式零拷贝返回；
+也可以不映射整个文件，只按目录读取需要的节。
+"""
+
+import json
+import mmap
+import struct
+import sys
+import zlib
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+COLUMNAR_MAGIC = b"PXVA"
+COLUMNAR_VERSION = 1
+
+# 节类型
+SECTION_COLUMN = 0
+SECTION_STRINGS = 1
+SECTION_METADATA = 2
+
+# 节标志
+FLAG_ZLIB = 0x01
+
+# 支持的类型码及其字节数
+COLUMN_TYPECODES = {'b': 1, 'B': 1, 'h': 2, 'H': 2, 'i': 4, 'I': 4, 'q': 8, 'Q': 8, 'f': 4, 'd': 8}
+
+_HEADER = struct.Struct("<4sH4sHIQI4x")
+_ENTRY = struct.Struct("<BcBHQQQQ")
+_NAME_LENGTH = struct.Struct("<H")
+_STRING_TABLE_HEADER = struct.Struct("<I4x")
+_ALIGNMENT = 8
+_LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+class SectionInfo(NamedTuple):
+    """节目录条目"""
+    name: str
+    section_type: int
+    typecode: str
+    width: int
+    rows: int
+    offset: int
+    stored_size: int
+    raw_size: int
+    flags: int
+
+    @property
+    def compressed(self) -> bool:
+        return bool(self.flags & FLAG_ZLIB)
+
+
+def _to_le_array(values: Iterable, typecode: str) -> array:
+    """转换为指定类型码的小端序数组"""
+    if isinstance(values, array) and values.typecode == typecode:
+        data = values
+    else:
+        data = array(typecode, values)
+    if not _LITTLE_ENDIAN:
+        data = array(typecode, data)
+        data.byteswap()
+    return data
+
+
+class ColumnarWriter:
+    """列式容器写入器
+
+    数据节按添加顺序依次写入，关闭时在文件末尾写入节目录并回填文件头。
+
+    Example:
+        with ColumnarWriter("motion.vmda", "VMD") as writer:
+            writer.add_metadata("header", {"version": 2})
+            writer.add_column("bone_frames.frame_number", frames, 'I')
+    """
+
+    def __init__(self, file_path: Union[str, Path], kind: str,
+                 compress: bool = False, compress_level: int = 6):
+        """初始化写入器并写入占位文件头
+
+        Args:
+            file_path: 输出文件路径
+            kind: 数据类型标识（最多4个ASCII字符，例如 "VMD"）
+            compress: 各节默认是否使用zlib压缩
+            compress_level: zlib压缩级别
+        """
+        kind_bytes = kind.encode('ascii')
+        if len(kind_bytes) > 4:
+            raise ValueError(f"数据类型标识过长: {kind}")
+        self.kind = kind
+        self._kind_bytes = kind_bytes
+        self._compress = compress
+        self._compress_level = compress_level
+        self._sections: List[SectionInfo] = []
+        self._names = set()
+        self._file = open(file_path, 'wb')
+        self._file.write(bytes(_HEADER.size))
+        self._offset = _HEADER.size
+
+    def __enter__(self) -> 'ColumnarWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+
+    def _write_section(self, name: str, section_type: int, typecode: str, width: int,
+                       rows: int, payload: bytes, compress: Optional[bool]) -> None:
+        if name in self._names:
+            raise ValueError(f"节名称重复: {name}")
+        if compress is None:
+            compress = self._compress
+        flags = 0
+        stored = payload
+        if compress and payload:
+            stored = zlib.compress(payload, self._compress_level)
+            flags |= FLAG_ZLIB
+
+        padding = -self._offset % _ALIGNMENT
+        if padding:
+            self._file.write(bytes(padding))
+            self._offset += padding
+        self._file.write(stored)
+        self._sections.append(SectionInfo(name, section_type, typecode, width, rows,
+                                          self._offset, len(stored), len(payload), flags))
+        self._names.add(name)
+        self._offset += len(stored)
+
+    def add_column(self, name: str, values: Iterable, typecode: str, width: int = 1,
+                   compress: Optional[bool] = None) -> None:
+        """添加数值列
+
+        Args:
+            name: 列名称
+            values: 按行展开的数值，长度必须是width的整数倍
+            typecode: array类型码
+            width: 每行的分量数
+            compress: 是否压缩，默认使用写入器的设置
+        """
+        if typecode not in COLUMN_TYPECODES:
+            raise ValueError(f"不支持的列类型码: {typecode}")
+        if width < 1:
+            raise ValueError(f"列宽必须大于0: {width}")
+        data = _to_le_array(values, typecode)
+        if len(data) % width:
+            raise ValueError(f"列 {name} 的元素数({len(data)})不是列宽({width})的整数倍")
+        self._write_section(name, SECTION_COLUMN, typecode, width, len(data) // width,
+                            data.tobytes(), compress)
+
+    def add_strings(self, name: str, values: Iterable[str],
+                    compress: Optional[bool] = None) -> None:
+        """添加字符串列（去重为字符串表 + 每行索引）"""
+        lookup: Dict[str, int] = {}
+        indices = array('I')
+        for value in values:
+            index = lookup.get(value)
+            if index is None:
+                index = lookup[value] = len(lookup)
+            indices.append(index)
+
+        encoded = [value.encode('utf-8') for value in lookup]
+        offsets = array('I', [0])
+        for item in encoded:
+            offsets.append(offsets[-1] + len(item))
+        blob = b''.join(encoded)
+        payload = bytearray(_STRING_TABLE_HEADER.pack(len(encoded)))
+        payload += _to_le_array(offsets, 'I').tobytes()
+        payload += blob
+        payload += bytes(-len(payload) % 4)
+        payload += _to_le_array(indices, 'I').tobytes()
+        self._write_section(name, SECTION_STRINGS, 'I', 1, len(indices), bytes(payload), compress)
+
+    def add_metadata(self, name: str, values: Dict[str, Any]) -> None:
+        """添加元数据（JSON对象，不压缩）"""
+        payload = json.dumps(values, ensure_ascii=False).encode('utf-8')
+        self._write_section(name, SECTION_METADATA, 'B', 1, 1, payload, False)
+
+    def close(self) -> None:
+        """写入节目录和文件头并关闭文件"""
+        if self._file.closed:
+            return
+        directory = bytearray()
+        for info in self._sections:
+            name = info.name.encode('utf-8')
+            directory += _NAME_LENGTH.pack(len(name)) + name
+            directory += _ENTRY.pack(info.section_type, info.typecode.encode('ascii'), info.flags,
+                                     info.width, info.rows, info.offset,
+                                     info.stored_size, info.raw_size)
+        directory_offset = self._offset
+        self._file.write(directory)
+        self._file.seek(0)
+        self._file.write(_HEADER.pack(COLUMNAR_MAGIC, COLUMNAR_VERSION, self._kind_bytes, 0,
+                                      len(self._sections), directory_offset, len(directory)))
+        self._file.close()
+
+
+class ColumnarReader:
+    """列式容器读取器
+
+    默认用mmap映射整个文件，未压缩的数值列以零拷贝的 memoryview 返回；
+    use_mmap=False 时只读取文件头和目录，每次访问再单独读取对应的节。
+
+    返回的 memoryview 引用映射内存，需在 close() 之前释放。
+    """
+
+    def __init__(self, file_path: Union[str, Path], use_mmap: bool = True):
+        """打开列式文件并读取节目录
+
+        Raises:
+            FileNotFoundError: 文件不存在
+            ValueError: 文件头或目录无效
+        """
+        self.file_path = Path(file_path)
+        self._file = open(self.file_path, 'rb')
+        self._mmap = None
+        self._view = None
+        try:
+            header = self._file.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                raise ValueError("文件过小，不是有效的列式文件")
+            magic, version, kind, _, count, directory_offset, directory_size = _HEADER.unpack(header)
+            if magic != COLUMNAR_MAGIC:
+                raise ValueError(f"无效的列式文件头，期望: {COLUMNAR_MAGIC!r}")
+            if version > COLUMNAR_VERSION:
+                raise ValueError(f"不支持的列式文件版本: {version}")
+            self.kind = kind.rstrip(b'\0').decode('ascii')
+            self.version = version
+
+            file_size = self.file_path.stat().st_size
+            if directory_offset + directory_size > file_size:
+                raise ValueError("节目录超出文件范围，文件可能已截断")
+            self._file.seek(directory_offset)
+            self.sections = self._parse_directory(self._file.read(directory_size), count, file_size)
+
+            if use_mmap:
+                self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+                self._view = memoryview(self._mmap)
+        except Exception:
+            self.close()
+            raise
+
+    @staticmethod
+    def _parse_directory(data: bytes, count: int, file_size: int) -> Dict[str, SectionInfo]:
+        sections: Dict[str, SectionInfo] = {}
+        pos = 0
+        try:
+            for _ in range(count):
+                (length,) = _NAME_LENGTH.unpack_from(data, pos)
+                pos += _NAME_LENGTH.size
+                name = data[pos:pos + length].decode('utf-8')
+                pos += length
+                section_type, typecode, flags, width, rows, offset, stored, raw = _ENTRY.unpack_from(data, pos)
+                pos += _ENTRY.size
+                typecode = typecode.decode('ascii')
+                if typecode not in COLUMN_TYPECODES or offset + stored > file_size:
+                    raise ValueError(f"节 {name} 的目录条目无效")
+                sections[name] = SectionInfo(name, section_type, typecode, width, rows,
+                                             offset, stored, raw, flags)
+        except struct.error as e:
+            raise ValueError(f"节目录不完整: {e}") from e
+        return sections
+
+    def __enter__(self) -> 'ColumnarReader':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.sections
+
+    @property
+    def names(self) -> List[str]:
+        """全部节名称（按写入顺序）"""
+        return list(self.sections)
+
+    def info(self, name: str) -> SectionInfo:
+        """返回节目录条目"""
+        info = self.sections.get(name)
+        if info is None:
+            raise ValueError(f"列式文件中不存在节: {name}")
+        return info
+
+    def _payload(self, info: SectionInfo) -> Union[bytes, memoryview]:
+        """读取节的原始内容（已解压）"""
+        if self._view is not None:
+            stored = self._view[info.offset:info.offset + info.stored_size]
+        else:
+            self._file.seek(info.offset)
+            stored = self._file.read(info.stored_size)
+        if info.compressed:
+            payload = zlib.decompress(stored)
+            if len(payload) != info.raw_size:
+                raise ValueError(f"节 {info.name} 解压后大小不符")
+            return payload
+        return stored
+
+    @staticmethod
+    def _typed(payload: Union[bytes, memoryview], typecode: str) -> Union[memoryview, array]:
+        if _LITTLE_ENDIAN:
+            return memoryview(payload).cast(typecode)
+        data = array(typecode, bytes(payload))
+        data.byteswap()
+        return data
+
+    def column(self, name: str) -> Union[memoryview, array]:
+        """读取数值列
+
+        Returns:
+            按行展开的数值序列。使用mmap且未压缩时为零拷贝的 memoryview，
+            否则为 memoryview 或 array；每行 info(name).width 个分量
+        """
+        info = self.info(name)
+        if info.section_type != SECTION_COLUMN:
+            raise ValueError(f"节 {name} 不是数值列")
+        return self._typed(self._payload(info), info.typecode)
+
+    def string_table(self, name: str) -> Tuple[List[str], Union[memoryview, array]]:
+        """读取字符串列的去重表和每行索引"""
+        info = self.info(name)
+        if info.section_type != SECTION_STRINGS:
+            raise ValueError(f"节 {name} 不是字符串列")
+        payload = self._payload(info)
+        (count,) = _STRING_TABLE_HEADER.unpack_from(payload, 0)
+        pos = _STRING_TABLE_HEADER.size
+        offsets = self._typed(payload[pos:pos + 4 * (count + 1)], 'I')
+        pos += 4 * (count + 1)
+        blob = bytes(payload[pos:pos + offsets[count]])
+        table = [blob[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(count)]
+        pos += offsets[count]
+        pos += -pos % 4
+        indices = self._typed(payload[pos:pos + 4 * info.rows], 'I')
+        return table, indices
+
+    def strings(self, name: str) -> List[str]:
+        """读取字符串列，返回每行的字符串"""
+        table, indices = self.string_table(name)
+        return [table[index] for index in indices]
+
+    def metadata(self, name: str) -> Dict[str, Any]:
+        """读取元数据节"""
+        info = self.info(name)
+        if info.section_type != SECTION_METADATA:
+            raise ValueError(f"节 {name} 不是元数据")
+        return json.loads(bytes(self._payload(info)).decode('utf-8'))
+
+    def close(self) -> None:
+        """关闭文件
+
+        如果仍有外部持有的列视图，映射会在这些视图释放后由垃圾回收关闭。
+        """
+        if self._view is not None:
+            try:
+                self._view.release()
+            except BufferError:
+                pass
+            self._view = None
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                pass
+            self._mmap = None
+        self._file.close()
@@ -0,0 +1,290 @@
+"""
+PyPMXVMD 网格导出
+
+把 PmxModel 的几何数据（可以是变形或摆姿势后的顶点）导出为 glTF 二进制（.glb）和 OBJ。
+
+顶点属性和索引先收集为扁平的 array，每个访问器用一次 write 写出其字节；
+指定 chunk_size 时改为流式写出，每次只收集和写出 chunk_size 个顶点（或三角面）的数据。
+OBJ 为文本格式，每块数据用一次 % 格式化生成整段文本，不逐顶点拼接字符串。
+
+PMX 为左手坐标系，glTF 为右手坐标系：默认把 Z 取反并反转三角面的环绕方向。
+"""
+
+import json
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+from pypmxvmd.common.models.pmx import PmxModel, PmxMeshIndex
+
+_LITTLE_ENDIAN = sys.byteorder == "little"
+_GLB_MAGIC = 0x46546C67
+_CHUNK_JSON = 0x4E4F534A
+_CHUNK_BIN = 0x004E4942
+_FLOAT = 5126
+_UNSIGNED_INT = 5125
+_ARRAY_BUFFER = 34962
+_ELEMENT_ARRAY_BUFFER = 34963
+
+
+class _MeshSource:
+    """按块提供导出用的扁平顶点属性和索引"""
+
+    def __init__(self, model: PmxModel, positions: Optional[Sequence[float]],
+                 normals: Optional[Sequence[float]], uvs: Optional[Sequence[float]],
+                 morphs: Optional[Mapping[str, float]], right_handed: bool):
+        vertex_count = len(model.vertices)
+        if morphs is not None:
+            from pypmxvmd.common.processing.morph import MorphEngine
+            result = MorphEngine.of(model).apply(morphs)
+            positions = result.positions if positions is None else positions
+            uvs = result.uvs if uvs is None else uvs
+        for name, values, width in (("positions", positions, 3), ("normals", normals, 3), ("uvs", uvs, 2)):
+            if values is not None and len(values) != vertex_count * width:
+                raise ValueError(f"{name} 的长度({len(values)})与顶点数量({vertex_count})不符")
+        self.model = model
+        self.vertex_count = vertex_count
+        self.positions = positions
+        self.normals = normals
+        self.uvs = uvs
+        self.right_handed = right_handed
+        self._last_positions = None
+        mesh_index = PmxMeshIndex.of(model)
+        self.indices = mesh_index.indices
+        self.ranges = mesh_index.ranges
+
+    def _attribute(self, override: Optional[Sequence[float]], name: str, width: int,
+                   start: int, end: int) -> array:
+        if override is not None:
+            values = override[start * width:end * width]
+            return values if isinstance(values, array) and values.typecode == 'f' else array('f', values)
+        return array('f', [c for vertex in self.model.vertices[start:end] for c in getattr(vertex, name)])
+
+    def _flip(self, values: array) -> array:
+        if self.right_handed:
+            values[2::3] = array('f', [-z for z in values[2::3]])
+        return values
+
+    def positions_chunk(self, start: int, end: int) -> array:
+        # 计算包围盒和写出时各取一次，只有一块时复用
+        cached = self._last_positions
+        if cached is not None and cached[0] == (start, end):
+            return cached[1]
+        values = self._flip(self._attribute(self.positions, "position", 3, start, end))
+        self._last_positions = ((start, end), values)
+        return values
+
+    def normals_chunk(self, start: int, end: int) -> array:
+        return self._flip(self._attribute(self.normals, "normal", 3, start, end))
+
+    def uvs_chunk(self, start: int, end: int) -> array:
+        return self._attribute(self.uvs, "uv", 2, start, end)
+
+    def indices_chunk(self, start: int, end: int) -> array:
+        """第 start 到 end 个三角面的索引（右手坐标系时交换每个三角面的后两个顶点）"""
+        values = array('I', self.indices[start * 3:end * 3])
+        if self.right_handed:
+            second = values[1::3]
+            values[1::3] = values[2::3]
+            values[2::3] = second
+        return values
+
+    def bounds(self, chunk_size: int) -> Tuple[List[float], List[float]]:
+        lower = [float("inf")] * 3
+        upper = [float("-inf")] * 3
+        for start, end in _chunks(self.vertex_count, chunk_size):
+            values = self.positions_chunk(start, end)
+            for axis in range(3):
+                column = values[axis::3]
+                lower[axis] = min(lower[axis], min(column))
+                upper[axis] = max(upper[axis], max(column))
+        return lower, upper
+
+
+def _chunks(count: int, chunk_size: int) -> Iterator[Tuple[int, int]]:
+    for start in range(0, count, chunk_size):
+        yield start, min(start + chunk_size, count)
+
+
+def _write_array(stream: BinaryIO, values: array) -> None:
+    if not _LITTLE_ENDIAN:
+        values = array(values.typecode, values)
+        values.byteswap()
+    stream.write(values.tobytes())
+
+
+def _material_json(material, textures: dict, images: list) -> dict:
+    r, g, b, a = material.diffuse_color
+    pbr = {"baseColorFactor": [r, g, b, a], "metallicFactor": 0.0, "roughnessFactor": 1.0}
+    if material.texture_path:
+        path = material.texture_path.replace("\\", "/")
+        if path not in textures:
+            textures[path] = len(images)
+            images.append({"uri": path})
+        pbr["baseColorTexture"] = {"index": textures[path]}
+    result = {"name": material.name_jp, "pbrMetallicRoughness": pbr,
+              "doubleSided": material.flags.double_sided}
+    if a < 1.0:
+        result["alphaMode"] = "BLEND"
+    return result
+
+
+def export_glb(model: PmxModel, file_path: Union[str, Path],
+               positions: Optional[Sequence[float]] = None, normals: Optional[Sequence[float]] = None,
+               uvs: Optional[Sequence[float]] = None, morphs: Optional[Mapping[str, float]] = None,
+               chunk_size: Optional[int] = None, right_handed: bool = True) -> None:
+    """导出为 glTF 二进制文件（.glb）
+
+    每个材质导出为同一网格中的一个图元，共用顶点属性；纹理以相对路径的外部图片引用。
+
+    Args:
+        model: PMX模型
+        file_path: 输出路径
+        positions: 扁平的顶点坐标（如变形或蒙皮后的结果），None时使用顶点位置
+        normals: 扁平的顶点法线，None时使用顶点法线
+        uvs: 扁平的UV，None时使用顶点UV
+        morphs: {变形名称: 权重}，给定时先计算变形（positions/uvs 未给定时使用变形结果）
+        chunk_size: 流式写出时每块的顶点/三角面数，None时每个访问器一次写出
+        right_handed: 是否转换为右手坐标系（glTF 要求右手坐标系）
+
+    Raises:
+        ValueError: 顶点属性长度与顶点数量不符、chunk_size 不为正数，或变形名称不存在
+    """
+    if chunk_size is not None and chunk_size <= 0:
+        raise ValueError(f"chunk_size 必须为正数: {chunk_size}")
+    source = _MeshSource(model, positions, normals, uvs, morphs, right_handed)
+    vertex_count = source.vertex_count
+    face_total = len(source.indices) // 3
+    chunk = chunk_size or max(vertex_count, face_total, 1)
+
+    textures: dict = {}
+    images: list = []
+    document = {
+        "asset": {"version": "2.0", "generator": "pypmxvmd"},
+        "scene": 0,
+        "scenes": [{"nodes": [0]}],
+        "nodes": [{"name": model.header.name_jp}],
+        "materials": [_material_json(material, textures, images) for material in model.materials],
+    }
+    if images:
+        document["images"] = images
+        document["textures"] = [{"source": index} for index in range(len(images))]
+
+    # 材质中没有三角面时只导出材质，不写出缓冲区
+    byte_length = 0
+    if vertex_count and any(face_count for _offset, face_count in source.ranges):
+        buffer_views = []
+        for length, target in ((vertex_count * 12, _ARRAY_BUFFER), (vertex_count * 12, _ARRAY_BUFFER),
+                               (vertex_count * 8, _ARRAY_BUFFER), (face_total * 12, _ELEMENT_ARRAY_BUFFER)):
+            buffer_views.append({"buffer": 0, "byteOffset": byte_length, "byteLength": length, "target": target})
+            byte_length += length
+        lower, upper = source.bounds(chunk)
+        accessors = [
+            {"bufferView": 0, "componentType": _FLOAT, "count": vertex_count, "type": "VEC3",
+             "min": lower, "max": upper},
+            {"bufferView": 1, "componentType": _FLOAT, "count": vertex_count, "type": "VEC3"},
+            {"bufferView": 2, "componentType": _FLOAT, "count": vertex_count, "type": "VEC2"},
+        ]
+        primitives = []
+        for material_index, (face_offset, face_count) in enumerate(source.ranges):
+            if face_count:
+                primitives.append({"attributes": {"POSITION": 0, "NORMAL": 1, "TEXCOORD_0": 2},
+                                   "indices": len(accessors), "material": material_index, "mode": 4})
+                accessors.append({"bufferView": 3, "byteOffset": face_offset * 12,
+                                  "componentType": _UNSIGNED_INT, "count": face_count * 3, "type": "SCALAR"})
+        document["nodes"][0]["mesh"] = 0
+        document["meshes"] = [{"name": model.header.name_jp, "primitives": primitives}]
+        document["buffers"] = [{"byteLength": byte_length}]
+        document["bufferViews"] = buffer_views
+        document["accessors"] = accessors
+    json_bytes = json.dumps(document, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    json_bytes += b" " * (-len(json_bytes) % 4)
+
+    total = 12 + 8 + len(json_bytes) + (8 + byte_length if byte_length else 0)
+    with open(file_path, "wb") as stream:
+        stream.write(struct.pack("<III", _GLB_MAGIC, 2, total))
+        stream.write(struct.pack("<II", len(json_bytes), _CHUNK_JSON))
+        stream.write(json_bytes)
+        if not byte_length:
+            return
+        stream.write(struct.pack("<II", byte_length, _CHUNK_BIN))
+        for writer in (source.positions_chunk, source.normals_chunk, source.uvs_chunk):
+            for start, end in _chunks(vertex_count, chunk):
+                _write_array(stream, writer(start, end))
+        for start, end in _chunks(face_total, chunk):
+            _write_array(stream, source.indices_chunk(start, end))
+
+
+def export_obj(model: PmxModel, file_path: Union[str, Path],
+               positions: Optional[Sequence[float]] = None, normals: Optional[Sequence[float]] = None,
+               uvs: Optional[Sequence[float]] = None, morphs: Optional[Mapping[str, float]] = None,
+               chunk_size: Optional[int] = None, right_handed: bool = True,
+               write_mtl: bool = True) -> None:
+    """导出为 Wavefront OBJ 文件
+
+    每个材质对应一个 usemtl 分组；write_mtl 为True时在同目录写出同名 .mtl 文件。
+    OBJ 的纹理坐标原点在左下角，导出时V坐标取 1-v。
+
+    Args:
+        model: PMX模型
+        file_path: 输出路径
+        positions: 扁平的顶点坐标（如变形或蒙皮后的结果），None时使用顶点位置
+        normals: 扁平的顶点法线，None时使用顶点法线
+        uvs: 扁平的UV，None时使用顶点UV
+        morphs: {变形名称: 权重}，给定时先计算变形（positions/uvs 未给定时使用变形结果）
+        chunk_size: 流式写出时每块的顶点/三角面数，None时每段数据一次写出
+        right_handed: 是否转换为右手坐标系
+        write_mtl: 是否写出材质文件
+
+    Raises:
+        ValueError: 顶点属性长度与顶点数量不符、chunk_size 不为正数，或变形名称不存在
+    """
+    if chunk_size is not None and chunk_size <= 0:
+        raise ValueError(f"chunk_size 必须为正数: {chunk_size}")
+    source = _MeshSource(model, positions, normals, uvs, morphs, right_handed)
+    vertex_count = source.vertex_count
+    chunk = chunk_size or max(vertex_count, len(source.indices) // 3, 1)
+    path = Path(file_path)
+    names = [f"material{index}_{'_'.join(material.name_en.split())}".rstrip("_")
+             for index, material in enumerate(model.materials)]
+
+    with open(path, "w", encoding="utf-8", newline="\n") as stream:
+        stream.write("# pypmxvmd\n")
+        if write_mtl:
+            stream.write(f"mtllib {path.stem}.mtl\n")
+        for start, end in _chunks(vertex_count, chunk):
+            values = source.positions_chunk(start, end)
+            stream.write(("v %.6f %.6f %.6f\n" * (end - start)) % tuple(values))
+        for start, end in _chunks(vertex_count, chunk):
+            values = source.uvs_chunk(start, end)
+            values[1::2] = array('f', [1.0 - v for v in values[1::2]])
+            stream.write(("vt %.6f %.6f\n" * (end - start)) % tuple(values))
+        for start, end in _chunks(vertex_count, chunk):
+            values = source.normals_chunk(start, end)
+            stream.write(("vn %.6f %.6f %.6f\n" * (end - start)) % tuple(values))
+        covered = 0
+        for material_index, (face_offset, face_count) in enumerate(source.ranges):
+            stream.write(f"usemtl {names[material_index]}\n")
+            _write_obj_faces(stream, source, face_offset, face_offset + face_count, chunk)
+            covered = face_offset + face_count
+        if covered < len(source.indices) // 3:
+            _write_obj_faces(stream, source, covered, len(source.indices) // 3, chunk)
+
+    if write_mtl:
+        with open(path.with_suffix(".mtl"), "w", encoding="utf-8", newline="\n") as stream:
+            for name, material in zip(names, model.materials):
+                r, g, b, a = material.diffuse_color
+                stream.write(f"newmtl {name}\nKd {r:.6f} {g:.6f} {b:.6f}\nd {a:.6f}\n")
+                if material.texture_path:
+                    stream.write(f"map_Kd {material.texture_path.replace(chr(92), '/')}\n")
+                stream.write("\n")
+
+
+def _write_obj_faces(stream, source: _MeshSource, first: int, last: int, chunk: int) -> None:
+    for start in range(first, last, chunk):
+        end = min(start + chunk, last)
+        values = array('I', [index + 1 for index in source.indices_chunk(start, end)])
+        stream.write(("f %d/%d/%d %d/%d/%d %d/%d/%d\n" * (end - start))
+                     % tuple(index for index in values for _ in range(3)))
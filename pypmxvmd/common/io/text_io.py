@@ -6,8 +6,461 @@ PyPMXVMD 文本I/O操作模块
 """
 
 import csv
+import struct
+from array import array
+from itertools import chain, compress, islice
+from operator import itemgetter, ne
 from pathlib import Path
-from typing import Any, List, Dict, Union, TextIO
+from typing import Any, Callable, Iterable, Iterator, List, Dict, Optional, Sequence, Union, TextIO
+
+# 尝试导入Cython优化模块
+try:
+    from pypmxvmd.common.io._fast_text import (
+        format_float_column_cython, parse_float_rows_cython, parse_int_rows_cython
+    )
+    _CYTHON_AVAILABLE = True
+except ImportError:
+    _CYTHON_AVAILABLE = False
+
+
+# 文本格式默认的浮点小数位数
+DEFAULT_FLOAT_PRECISION = 6
+
+# 按列编解码时每块的行数
+TEXT_BLOCK_ROWS = 4096
+
+_FLOAT32 = struct.Struct('<f')
+_INF = float('inf')
+
+
+def format_float_shortest(value: float) -> str:
+    """返回能精确还原为同一float32值的最短十进制表示
+
+    PMX/VMD中的浮点数均为单精度，解析后得到的Python float带有多余的尾数，
+    这里依次尝试6~9位有效数字，取第一个打包为float32后与原值一致的表示。
+
+    Args:
+        value: 浮点数
+
+    Returns:
+        最短往返表示的字符串
+    """
+    try:
+        packed = _FLOAT32.pack(value)
+    except (OverflowError, struct.error):
+        return repr(float(value))
+    for digits in (6, 7, 8):
+        text = '%.*g' % (digits, value)
+        if _FLOAT32.pack(float(text)) == packed:
+            return text
+    return '%.9g' % value
+
+
+def _format_shortest_column(values: Sequence[float]) -> List[str]:
+    """format_float_shortest 的整列版本（纯Python回退实现）
+
+    每一轮对仍未命中的值统一格式化，再一次性转换为array('f')与原值的float32舍入结果比较，
+    比较和筛选都在C层面完成，只有需要更多有效数字的值进入下一轮。
+    """
+    targets = array('f', values)
+    result = list(map('%.6g'.__mod__, values))
+    texts = result
+    pending = range(len(values))
+    for fmt in ('%.7g', '%.8g', '%.9g'):
+        pending = list(compress(pending, map(ne, array('f', map(float, texts)),
+                                             map(targets.__getitem__, pending))))
+        if not pending:
+            break
+        texts = [fmt % values[i] for i in pending]
+        for i, text in zip(pending, texts):
+            result[i] = text
+    if _INF in targets or -_INF in targets:
+        # 超出float32范围的有限值，与struct打包溢出时的处理一致
+        for i, value in enumerate(values):
+            if abs(targets[i]) == _INF and abs(value) != _INF:
+                result[i] = repr(float(value))
+    return result
+
+
+def format_float_column(values: Iterable[float],
+                        precision: Optional[int] = DEFAULT_FLOAT_PRECISION) -> List[str]:
+    """批量格式化一列浮点数
+
+    结果与逐个使用 '%.{precision}f' 或 format_float_shortest 完全一致。
+    Cython模块可用时在C层面完成整列格式化，否则使用按列批量比较的纯Python实现。
+
+    Args:
+        values: 浮点数序列
+        precision: 小数位数；为None时使用最短往返表示
+
+    Returns:
+        字符串列表
+
+    Raises:
+        ValueError: precision为负数
+    """
+    if precision is not None and precision < 0:
+        raise ValueError(f"小数位数不能为负数: {precision}")
+    if _CYTHON_AVAILABLE:
+        if not (isinstance(values, array) and values.typecode == 'd'):
+            values = array('d', values)
+        if not values:
+            return []
+        return format_float_column_cython(values, -1 if precision is None else int(precision))
+    if precision is not None:
+        return list(map(f'%.{int(precision)}f'.__mod__, values))
+    if not isinstance(values, (list, tuple, array)):
+        values = list(values)
+    return _format_shortest_column(values)
+
+
+def _iter_blocks(rows: Iterable, block_rows: int) -> Iterator[list]:
+    """将行迭代器切分为最多block_rows行的列表"""
+    rows = iter(rows)
+    while True:
+        block = list(islice(rows, block_rows))
+        if not block:
+            return
+        yield block
+
+
+class RowFormatter:
+    """预编译的制表符分隔行格式化器
+
+    根据字段类型码一次性构建 % 格式模板，之后每行只需一次 `template % values`，
+    避免逐个数值调用f-string再拼接。
+
+    类型码:
+        s: 字符串
+        d: 整数（布尔值输出为0/1）
+        f: 浮点数
+
+    Args:
+        fields: 类型码字符串，例如 "sdfff"
+        precision: 浮点小数位数；为None时使用最短往返表示（见 format_float_shortest）
+    """
+
+    __slots__ = ('_template', '_float_indices', '_floats_only')
+
+    _CODES = {'s': '%s', 'd': '%d'}
+
+    def __init__(self, fields: str, precision: Optional[int] = DEFAULT_FLOAT_PRECISION):
+        float_code = '%s' if precision is None else f'%.{int(precision)}f'
+        try:
+            self._template = '\t'.join(float_code if c == 'f' else self._CODES[c] for c in fields)
+        except KeyError as e:
+            raise ValueError(f"未知的字段类型码: {e.args[0]}")
+        self._float_indices = None
+        self._floats_only = False
+        if precision is None:
+            self._float_indices = tuple(i for i, c in enumerate(fields) if c == 'f')
+            self._floats_only = bool(fields) and len(self._float_indices) == len(fields)
+
+    def format(self, values) -> str:
+        """格式化一行
+
+        Args:
+            values: 与类型码一一对应的值序列
+
+        Returns:
+            以制表符分隔的行文本
+        """
+        if self._float_indices is not None:
+            values = list(values)
+            for i in self._float_indices:
+                values[i] = format_float_shortest(values[i])
+        return self._template % tuple(values)
+
+    def format_rows(self, rows: Iterable[Sequence], block_rows: int = TEXT_BLOCK_ROWS) -> Iterator[str]:
+        """逐行格式化多行，输出与逐行调用 format 逐字节一致
+
+        固定小数位数时每行只需一次模板格式化；最短往返表示时每block_rows行取出全部浮点字段，
+        通过 format_float_column 整列格式化后再填回各行。
+
+        Args:
+            rows: 与类型码一一对应的值序列的迭代器（可以是生成器）
+            block_rows: 每块的行数
+
+        Returns:
+            行文本的迭代器
+        """
+        template = self._template
+        indices = self._float_indices
+        if not indices:
+            yield from map(template.__mod__, map(tuple, rows))
+            return
+        width = len(indices)
+        pick = itemgetter(*indices)
+        for block in _iter_blocks(rows, block_rows):
+            if width == 1:
+                column = format_float_column(map(pick, block), None)
+            else:
+                column = format_float_column(chain.from_iterable(map(pick, block)), None)
+            if self._floats_only:
+                yield from map('\t'.join, zip(*[iter(column)] * width))
+                continue
+            base = 0
+            for row in block:
+                values = list(row)
+                for i in indices:
+                    values[i] = column[base]
+                    base += 1
+                yield template % tuple(values)
+
+
+def parse_floats(fields: List[str]) -> List[float]:
+    """批量将文本字段转换为浮点数列表"""
+    return list(map(float, fields))
+
+
+def parse_ints(fields: List[str]) -> List[int]:
+    """批量将文本字段转换为整数列表"""
+    return list(map(int, fields))
+
+
+def _column_fields(rows: Sequence[Sequence[str]], start: int, stop: int) -> Iterator[str]:
+    """按行拼接每行 row[start:stop] 的字段（纯Python回退实现）"""
+    if start < 0 or stop < start:
+        raise ValueError(f"字段范围无效: [{start}, {stop})")
+    if rows:
+        shortest = min(map(len, rows))
+        if shortest < stop:
+            raise ValueError(f"字段数不足，期望至少{stop}个，得到{shortest}个")
+    return chain.from_iterable(map(itemgetter(slice(start, stop)), rows))
+
+
+def parse_float_rows(rows: Sequence[Sequence[str]], start: int, stop: int) -> List[float]:
+    """将一块行中每行 row[start:stop] 的字段解析为浮点数，按行拼接为一个列表
+
+    结果与逐个调用 float() 一致。Cython模块可用时直接从字符串缓冲区解析。
+
+    Args:
+        rows: 行列表，每行为字段列表
+        start: 起始字段下标
+        stop: 结束字段下标（不含）
+
+    Returns:
+        长度为 len(rows) * (stop - start) 的浮点数列表
+
+    Raises:
+        ValueError: 字段范围无效、某行字段数不足或字段不是合法数值
+    """
+    if _CYTHON_AVAILABLE:
+        return parse_float_rows_cython(rows, start, stop)
+    return list(map(float, _column_fields(rows, start, stop)))
+
+
+def parse_int_rows(rows: Sequence[Sequence[str]], start: int, stop: int) -> List[int]:
+    """将一块行中每行 row[start:stop] 的字段解析为整数，按行拼接为一个列表
+
+    结果与逐个调用 int() 一致。Cython模块可用时直接从字符串缓冲区解析。
+
+    Args:
+        rows: 行列表，每行为字段列表
+        start: 起始字段下标
+        stop: 结束字段下标（不含）
+
+    Returns:
+        长度为 len(rows) * (stop - start) 的整数列表
+
+    Raises:
+        ValueError: 字段范围无效、某行字段数不足或字段不是合法整数
+    """
+    if _CYTHON_AVAILABLE:
+        return parse_int_rows_cython(rows, start, stop)
+    return list(map(int, _column_fields(rows, start, stop)))
+
+
+class TextRowReader:
+    """流式制表符分隔文本读取器
+
+    逐行读取文件对象，跳过空行，按制表符拆分为字段列表，并提供一行的前瞻。
+    任何时刻只持有当前行和前瞻行，内存占用与文件长度无关。
+    拆分规则与原先的 readlines 实现一致：去除首尾空白后按制表符拆分。
+    """
+
+    def __init__(self, file_obj: TextIO):
+        """初始化读取器
+
+        Args:
+            file_obj: 以文本模式打开的文件对象
+        """
+        self._file = file_obj
+        self._peeked: Optional[List[str]] = None
+        self._line_number = 0
+        self._peeked_line_number = 0
+        self._row_line_number = 0
+
+    @property
+    def line_number(self) -> int:
+        """最近一次 read_row 返回的行在文件中的行号（从1开始）"""
+        return self._row_line_number
+
+    def _next_nonempty(self) -> Optional[List[str]]:
+        for line in self._file:
+            self._line_number += 1
+            stripped = line.strip()
+            if stripped:
+                return stripped.split('\t') if '\t' in line else [stripped]
+        return None
+
+    def peek(self) -> Optional[List[str]]:
+        """返回下一行字段但不消耗，文件结束时返回None"""
+        if self._peeked is None:
+            self._peeked = self._next_nonempty()
+            self._peeked_line_number = self._line_number
+        return self._peeked
+
+    def read_row(self) -> Optional[List[str]]:
+        """读取并消耗下一行字段，文件结束时返回None"""
+        row = self.peek()
+        self._peeked = None
+        if row is not None:
+            self._row_line_number = self._peeked_line_number
+        return row
+
+    def read_rows(self, count: int) -> Iterator[List[str]]:
+        """连续读取最多count行字段
+
+        数据段主体的快速路径：在一个循环内完成读取、跳过空行和拆分，
+        不经过逐行的 peek/read_row 调用。文件提前结束时产出的行数少于count。
+
+        Args:
+            count: 期望读取的行数
+        """
+        if count <= 0:
+            return
+        if self._peeked is not None:
+            row = self._peeked
+            self._peeked = None
+            self._row_line_number = self._peeked_line_number
+            count -= 1
+            yield row
+            if count == 0:
+                return
+        line_number = self._line_number
+        try:
+            for line in self._file:
+                line_number += 1
+                stripped = line.strip()
+                if not stripped:
+                    continue
+                self._line_number = self._row_line_number = line_number
+                yield stripped.split('\t') if '\t' in stripped else [stripped]
+                count -= 1
+                if count == 0:
+                    return
+        finally:
+            self._line_number = line_number
+
+    def convert_blocks(self, rows: Iterable[List[str]], convert: Callable[[List[List[str]]], Any],
+                       block_rows: int = TEXT_BLOCK_ROWS) -> Iterator[Any]:
+        """每block_rows行调用一次convert，产出每块的转换结果
+
+        数据段按列批量转换的入口。rows 必须是本读取器产出的行（如 read_rows 的结果），
+        读取时记录每行的行号；某块转换抛出ValueError时逐行重新转换该块，
+        使 line_number 指向块内第一个出错的行后再抛出异常。
+
+        Args:
+            rows: 本读取器产出的行迭代器
+            convert: 将一块行转换为结果的函数
+            block_rows: 每块的行数
+        """
+        rows = iter(rows)
+        while True:
+            block = []
+            line_numbers = []
+            for row in islice(rows, block_rows):
+                block.append(row)
+                line_numbers.append(self._row_line_number)
+            if not block:
+                return
+            try:
+                converted = convert(block)
+            except ValueError:
+                for row, line_number in zip(block, line_numbers):
+                    self._row_line_number = line_number
+                    convert([row])
+                raise
+            yield converted
+
+    def read_field(self, key: str, error: str) -> str:
+        """读取形如 "key:\tvalue" 的行并返回值
+
+        Args:
+            key: 期望的键名（含冒号）
+            error: 行缺失或格式不符时的错误信息
+
+        Raises:
+            ValueError: 行缺失或格式不符
+        """
+        row = self.read_row()
+        if row is None or len(row) != 2 or row[0] != key:
+            raise ValueError(error)
+        return row[1]
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> List[str]:
+        row = self.read_row()
+        if row is None:
+            raise StopIteration
+        return row
+
+
+class TextChunkWriter:
+    """分块缓冲的文本行写入器
+
+    行之间以换行符分隔（末尾不追加换行），与原先 '\n'.join(lines) 的输出逐字节一致。
+    缓冲行数达到 chunk_lines 时写入文件，内存占用与输出总长度无关。
+    """
+
+    def __init__(self, file_obj: TextIO, chunk_lines: int = 4096):
+        """初始化写入器
+
+        Args:
+            file_obj: 以文本模式打开的文件对象
+            chunk_lines: 每次写入文件的行数
+        """
+        self._file = file_obj
+        self._chunk_lines = chunk_lines
+        self._buffer: List[str] = []
+        self._written = False
+        self.line_count = 0
+
+    def write_line(self, line: str) -> None:
+        """写入一行"""
+        self._buffer.append(line)
+        self.line_count += 1
+        if len(self._buffer) >= self._chunk_lines:
+            self.flush()
+
+    def write_lines(self, lines: Iterable[str]) -> None:
+        """写入多行（可以是生成器）"""
+        buffer = self._buffer
+        chunk_lines = self._chunk_lines
+        for line in lines:
+            buffer.append(line)
+            self.line_count += 1
+            if len(buffer) >= chunk_lines:
+                self.flush()
+
+    def flush(self) -> None:
+        """将缓冲的行写入文件"""
+        if not self._buffer:
+            return
+        if self._written:
+            self._file.write('\n')
+        self._file.write('\n'.join(self._buffer))
+        self._buffer.clear()
+        self._written = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.flush()
 
 
 class TextIOHandler:
@@ -0,0 +1,158 @@
+"""
+PyPMXVMD 三维数学工具
+
+提供四元数、欧拉角和MMD贝塞尔插值曲线的纯Python实现，供列式数据处理使用。
+欧拉角约定与 VmdParser/VpdParser 一致：[x, y, z] 为绕X/Y/Z轴的角度（度），
+由四元数 [w, x, y, z] 按 roll/pitch/yaw 公式互相转换。
+"""
+
+import math
+from functools import lru_cache
+from typing import Sequence, Tuple
+
+# 默认（线性）插值曲线参数 ax, ay, bx, by
+LINEAR_CURVE = (20, 20, 107, 107)
+
+# 骨骼关键帧的默认插值参数（X/Y/Z/旋转 四条曲线）
+DEFAULT_BONE_INTERPOLATION = LINEAR_CURVE * 4
+
+_RAD_TO_DEG = 180.0 / math.pi
+_HALF_DEG_TO_RAD = math.pi / 360.0
+
+
+def euler_to_quaternion(euler: Sequence[float]) -> Tuple[float, float, float, float]:
+    """欧拉角（度）转换为四元数
+
+    Args:
+        euler: 欧拉角 [x_deg, y_deg, z_deg]
+
+    Returns:
+        四元数 (w, x, y, z)
+    """
+    cr = math.cos(euler[0] * _HALF_DEG_TO_RAD)
+    sr = math.sin(euler[0] * _HALF_DEG_TO_RAD)
+    cp = math.cos(euler[1] * _HALF_DEG_TO_RAD)
+    sp = math.sin(euler[1] * _HALF_DEG_TO_RAD)
+    cy = math.cos(euler[2] * _HALF_DEG_TO_RAD)
+    sy = math.sin(euler[2] * _HALF_DEG_TO_RAD)
+
+    return (cr * cp * cy + sr * sp * sy,
+            sr * cp * cy - cr * sp * sy,
+            cr * sp * cy + sr * cp * sy,
+            cr * cp * sy - sr * sp * cy)
+
+
+def quaternion_to_euler(w: float, x: float, y: float, z: float) -> list:
+    """四元数转换为欧拉角（度）
+
+    Args:
+        w, x, y, z: 四元数分量
+
+    Returns:
+        欧拉角 [x_deg, y_deg, z_deg]
+    """
+    roll = math.atan2(2 * (w * x + y * z), 1 - 2 * (x * x + y * y))
+
+    sinp = 2 * (w * y - z * x)
+    if abs(sinp) >= 1:
+        pitch = math.copysign(math.pi / 2, sinp)
+    else:
+        pitch = math.asin(sinp)
+
+    yaw = math.atan2(2 * (w * z + x * y), 1 - 2 * (y * y + z * z))
+
+    return [roll * _RAD_TO_DEG, pitch * _RAD_TO_DEG, yaw * _RAD_TO_DEG]
+
+
+def quaternion_multiply(a: Sequence[float], b: Sequence[float]) -> Tuple[float, float, float, float]:
+    """四元数乘法 a * b（先施加b再施加a）
+
+    Args:
+        a, b: 四元数 (w, x, y, z)
+
+    Returns:
+        四元数 (w, x, y, z)
+    """
+    aw, ax, ay, az = a
+    bw, bx, by, bz = b
+    return (aw * bw - ax * bx - ay * by - az * bz,
+            aw * bx + ax * bw + ay * bz - az * by,
+            aw * by - ax * bz + ay * bw + az * bx,
+            aw * bz + ax * by - ay * bx + az * bw)
+
+
+def slerp(q0: Sequence[float], q1: Sequence[float], t: float) -> Tuple[float, float, float, float]:
+    """四元数球面线性插值（走最短路径）
+
+    只使用点积和线性组合，因此与分量顺序（xyzw或wxyz）无关，
+    返回值与输入的分量顺序相同。
+
+    Args:
+        q0: 起始四元数
+        q1: 结束四元数
+        t: 插值系数 0.0-1.0
+    """
+    a0, a1, a2, a3 = q0
+    b0, b1, b2, b3 = q1
+    dot = a0 * b0 + a1 * b1 + a2 * b2 + a3 * b3
+    if dot < 0.0:
+        b0, b1, b2, b3 = -b0, -b1, -b2, -b3
+        dot = -dot
+
+    if dot > 0.9995:
+        # 夹角很小时退化为归一化线性插值
+        r0 = a0 + (b0 - a0) * t
+        r1 = a1 + (b1 - a1) * t
+        r2 = a2 + (b2 - a2) * t
+        r3 = a3 + (b3 - a3) * t
+        norm = math.sqrt(r0 * r0 + r1 * r1 + r2 * r2 + r3 * r3) or 1.0
+        return (r0 / norm, r1 / norm, r2 / norm, r3 / norm)
+
+    theta = math.acos(min(dot, 1.0))
+    sin_theta = math.sin(theta)
+    w0 = math.sin((1.0 - t) * theta) / sin_theta
+    w1 = math.sin(t * theta) / sin_theta
+    return (a0 * w0 + b0 * w1, a1 * w0 + b1 * w1, a2 * w0 + b2 * w1, a3 * w0 + b3 * w1)
+
+
+@lru_cache(maxsize=8192)
+def _bezier_progress(ax: int, ay: int, bx: int, by: int, t: float) -> float:
+    x1, y1, x2, y2 = ax / 127.0, ay / 127.0, bx / 127.0, by / 127.0
+    lo, hi = 0.0, 1.0
+    s = t
+    # x(s) 单调递增（控制点在[0,1]内），二分求解 x(s) = t
+    for _ in range(30):
+        inv = 1.0 - s
+        x = 3.0 * inv * inv * s * x1 + 3.0 * inv * s * s * x2 + s * s * s
+        if abs(x - t) < 1e-7:
+            break
+        if x < t:
+            lo = s
+        else:
+            hi = s
+        s = (lo + hi) * 0.5
+    inv = 1.0 - s
+    return 3.0 * inv * inv * s * y1 + 3.0 * inv * s * s * y2 + s * s * s
+
+
+def bezier_progress(curve: Sequence[int], t: float) -> float:
+    """计算MMD插值曲线在时间比例t处的进度
+
+    曲线由两个控制点 (ax, ay)、(bx, by) 定义，取值范围0-127，
+    起点(0, 0)和终点(127, 127)固定。
+
+    Args:
+        curve: 曲线参数 (ax, ay, bx, by)
+        t: 时间比例 0.0-1.0
+
+    Returns:
+        插值进度 0.0-1.0
+    """
+    ax, ay, bx, by = curve
+    if ax == ay and bx == by:
+        return t
+    if t <= 0.0:
+        return 0.0
+    if t >= 1.0:
+        return 1.0
+    return _bezier_progress(ax, ay, bx, by, t)
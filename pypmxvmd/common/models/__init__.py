@@ -3,16 +3,49 @@ PyPMXVMD 数据模型
 
 定义PMX、VMD、VPD等文件格式的数据结构模型。
 使用面向对象设计，遵循Google Python规范。
+
+各格式的模型模块在首次访问时才导入。
 """
 
-from pypmxvmd.common.models.base import BaseModel
-from pypmxvmd.common.models.pmx import PmxModel
-from pypmxvmd.common.models.vmd import VmdMotion
-from pypmxvmd.common.models.vpd import VpdPose
+import importlib
+
+_LAZY_ATTRS = {
+    "BaseModel": "pypmxvmd.common.models.base",
+    "PmxModel": "pypmxvmd.common.models.pmx",
+    "PmxNameTable": "pypmxvmd.common.models.pmx",
+    "PmxMeshIndex": "pypmxvmd.common.models.pmx",
+    "PmxBoneTopology": "pypmxvmd.common.models.pmx",
+    "VmdMotion": "pypmxvmd.common.models.vmd",
+    "VmdBoneColumns": "pypmxvmd.common.models.vmd",
+    "VmdMorphColumns": "pypmxvmd.common.models.vmd",
+    "VmdNameTable": "pypmxvmd.common.models.vmd",
+    "VpdPose": "pypmxvmd.common.models.vpd",
+    "VpdPoseTable": "pypmxvmd.common.models.vpd",
+}
 
 __all__ = [
     "BaseModel",
     "PmxModel", 
+    "PmxNameTable",
+    "PmxMeshIndex",
+    "PmxBoneTopology",
     "VmdMotion",
+    "VmdBoneColumns",
+    "VmdMorphColumns",
+    "VmdNameTable",
     "VpdPose",
-]
\ No newline at end of file
+    "VpdPoseTable",
+]
+
+
+def __getattr__(name: str):
+    """按需导入模型类"""
+    if name in _LAZY_ATTRS:
+        value = getattr(importlib.import_module(_LAZY_ATTRS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
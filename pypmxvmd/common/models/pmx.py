@@ -6,7 +6,8 @@ PyPMXVMD PMX数据模型
 """
 
 import enum
-from typing import List, Optional, Set, Union, Any
+from array import array
+from typing import List, Optional, Set, Tuple, Union, Any
 from pypmxvmd.common.models.base import BaseModel, is_valid_vector, is_valid_flag
 
 
@@ -374,6 +375,12 @@ class BoneFlags:
         self.deform_after_phys = deform_after_phys
         self.has_external_parent = has_external_parent
 
+    def to_list(self) -> List[bool]:
+        return [self.tail_usebonelink, self.rotateable, self.translateable,
+                self.visible, self.enabled, self.ik, self.inherit_rot,
+                self.inherit_trans, self.has_fixedaxis, self.has_localaxis,
+                self.deform_after_phys, self.has_external_parent]
+
 
 class PmxBoneIkLink(BaseModel):
     """PMX骨骼IK链接"""
@@ -384,6 +391,16 @@ class PmxBoneIkLink(BaseModel):
         self.limit_min = limit_min
         self.limit_max = limit_max
 
+    def to_list(self) -> List[Any]:
+        return [self.bone_index, self.limit_min, self.limit_max]
+
+    def _validate_data(self, parent_list: Optional[List] = None) -> None:
+        assert isinstance(self.bone_index, int)
+        assert (self.limit_min is None) == (self.limit_max is None)
+        if self.limit_min is not None:
+            assert is_valid_vector(3, self.limit_min)
+            assert is_valid_vector(3, self.limit_max)
+
 
 class PmxBone(BaseModel):
     """PMX骨骼"""
@@ -425,6 +442,28 @@ class PmxBone(BaseModel):
         self.ik_angle_limit = ik_angle_limit
         self.ik_links = ik_links or []
 
+    def to_list(self) -> List[Any]:
+        return [self.name_jp, self.name_en, self.position, self.parent_index,
+                self.deform_layer, self.bone_flags.to_list(), self.tail,
+                self.inherit_parent_index, self.inherit_ratio, self.fixed_axis,
+                self.local_axis_x, self.local_axis_z, self.external_parent_index,
+                self.ik_target_index, self.ik_loop_count, self.ik_angle_limit,
+                [link.to_list() for link in self.ik_links]]
+
+    def _validate_data(self, parent_list: Optional[List] = None) -> None:
+        assert isinstance(self.name_jp, str)
+        assert isinstance(self.name_en, str)
+        assert is_valid_vector(3, self.position)
+        assert isinstance(self.parent_index, int)
+        assert isinstance(self.deform_layer, int)
+        assert isinstance(self.bone_flags, BoneFlags)
+        if self.bone_flags.tail_usebonelink:
+            assert isinstance(self.tail, int)
+        elif self.tail is not None:
+            assert is_valid_vector(3, self.tail)
+        for link in self.ik_links:
+            link.validate()
+
 
 class PmxMorphItemGroup(BaseModel):
     """PMX组变形项目"""
@@ -434,6 +473,13 @@ class PmxMorphItemGroup(BaseModel):
         self.morph_index = morph_index
         self.value = value
 
+    def to_list(self) -> List[Any]:
+        return [self.morph_index, self.value]
+
+    def _validate_data(self, parent_list: Optional[List] = None) -> None:
+        assert isinstance(self.morph_index, int)
+        assert isinstance(self.value, (int, float))
+
 
 class PmxMorphItemVertex(BaseModel):
     """PMX顶点变形项目"""
@@ -443,6 +489,13 @@ class PmxMorphItemVertex(BaseModel):
         self.vertex_index = vertex_index
         self.offset = offset or [0.0, 0.0, 0.0]
 
+    def to_list(self) -> List[Any]:
+        return [self.vertex_index, self.offset]
+
+    def _validate_data(self, parent_list: Optional[List] = None) -> None:
+        assert isinstance(self.vertex_index, int)
+        assert is_valid_vector(3, self.offset)
+
 
 class PmxMorphItemBone(BaseModel):
     """PMX骨骼变形项目"""
@@ -453,6 +506,105 @@ class PmxMorphItemBone(BaseModel):
         self.translation = translation or [0.0, 0.0, 0.0]
         self.rotation = rotation or [0.0, 0.0, 0.0]
 
+    def to_list(self) -> List[Any]:
+        return [self.bone_index, self.translation, self.rotation]
+
+    def _validate_data(self, parent_list: Optional[List] = None) -> None:
+        assert isinstance(self.bone_index, int)
+        assert is_valid_vector(3, self.translation)
+        assert is_valid_vector(3, self.rotation)
+
+
+class PmxMorphItemUV(BaseModel):
+    """PMX UV变形项目（UV和扩展UV1-4变形共用）"""
+
+    def __init__(self, vertex_index: int = 0, offset: List[float] = None):
+        super().__init__()
+        self.vertex_index = vertex_index
+        self.offset = offset or [0.0, 0.0, 0.0, 0.0]
+
+    def to_list(self) -> List[Any]:
+        return [self.vertex_index, self.offset]
+
+    def _validate_data(self, parent_list: Optional[List] = None) -> None:
+        assert isinstance(self.vertex_index, int)
+        assert is_valid_vector(4, self.offset)
+
+
+class PmxMorphItemMaterial(BaseModel):
+    """PMX材质变形项目
+
+    material_index 为-1时作用于所有材质；operation 为0表示乘算，1表示加算。
+    """
+
+    def __init__(self,
+                 material_index: int = -1,
+                 operation: int = 0,
+                 diffuse_color: List[float] = None,
+                 specular_color: List[float] = None,
+                 specular_strength: float = 0.0,
+                 ambient_color: List[float] = None,
+                 edge_color: List[float] = None,
+                 edge_size: float = 0.0,
+                 texture_color: List[float] = None,
+                 sphere_color: List[float] = None,
+                 toon_color: List[float] = None):
+        super().__init__()
+        self.material_index = material_index
+        self.operation = operation
+        self.diffuse_color = diffuse_color or [0.0, 0.0, 0.0, 0.0]
+        self.specular_color = specular_color or [0.0, 0.0, 0.0]
+        self.specular_strength = specular_strength
+        self.ambient_color = ambient_color or [0.0, 0.0, 0.0]
+        self.edge_color = edge_color or [0.0, 0.0, 0.0, 0.0]
+        self.edge_size = edge_size
+        self.texture_color = texture_color or [0.0, 0.0, 0.0, 0.0]
+        self.sphere_color = sphere_color or [0.0, 0.0, 0.0, 0.0]
+        self.toon_color = toon_color or [0.0, 0.0, 0.0, 0.0]
+
+    def to_list(self) -> List[Any]:
+        return [self.material_index, self.operation, self.diffuse_color, self.specular_color,
+                self.specular_strength, self.ambient_color, self.edge_color, self.edge_size,
+                self.texture_color, self.sphere_color, self.toon_color]
+
+    def _validate_data(self, parent_list: Optional[List] = None) -> None:
+        assert isinstance(self.material_index, int)
+        assert self.operation in (0, 1)
+        assert is_valid_vector(4, self.diffuse_color)
+        assert is_valid_vector(3, self.specular_color)
+        assert isinstance(self.specular_strength, (int, float))
+        assert is_valid_vector(3, self.ambient_color)
+        assert is_valid_vector(4, self.edge_color)
+        assert isinstance(self.edge_size, (int, float))
+        assert is_valid_vector(4, self.texture_color)
+        assert is_valid_vector(4, self.sphere_color)
+        assert is_valid_vector(4, self.toon_color)
+
+
+class PmxMorphItemFlip(PmxMorphItemGroup):
+    """PMX翻转变形项目（PMX 2.1），字段与组变形项目相同"""
+
+
+class PmxMorphItemImpulse(BaseModel):
+    """PMX冲击变形项目（PMX 2.1）"""
+
+    def __init__(self, rigidbody_index: int = 0, is_local: bool = False,
+                 velocity: List[float] = None, torque: List[float] = None):
+        super().__init__()
+        self.rigidbody_index = rigidbody_index
+        self.is_local = is_local
+        self.velocity = velocity or [0.0, 0.0, 0.0]
+        self.torque = torque or [0.0, 0.0, 0.0]
+
+    def to_list(self) -> List[Any]:
+        return [self.rigidbody_index, self.is_local, self.velocity, self.torque]
+
+    def _validate_data(self, parent_list: Optional[List] = None) -> None:
+        assert isinstance(self.rigidbody_index, int)
+        assert isinstance(self.is_local, bool)
+        assert is_valid_vector(3, self.velocity)
+        assert is_valid_vector(3, self.torque)
+
 
 class PmxMorph(BaseModel):
     """PMX变形"""
@@ -470,6 +622,18 @@ class PmxMorph(BaseModel):
         self.morph_type = morph_type
         self.items = items or []
 
+    def to_list(self) -> List[Any]:
+        return [self.name_jp, self.name_en, self.panel, self.morph_type,
+                [item.to_list() for item in self.items]]
+
+    def _validate_data(self, parent_list: Optional[List] = None) -> None:
+        assert isinstance(self.name_jp, str)
+        assert isinstance(self.name_en, str)
+        assert isinstance(self.panel, MorphPanel)
+        assert isinstance(self.morph_type, MorphType)
+        for item in self.items:
+            item.validate()
+
 
 class PmxFrameItem(BaseModel):
     """PMX框架项目"""
@@ -479,6 +643,13 @@ class PmxFrameItem(BaseModel):
         self.is_morph = is_morph
         self.index = index
 
+    def to_list(self) -> List[Any]:
+        return [self.is_morph, self.index]
+
+    def _validate_data(self, parent_list: Optional[List] = None) -> None:
+        assert is_valid_flag(self.is_morph)
+        assert isinstance(self.index, int)
+
 
 class PmxFrame(BaseModel):
     """PMX显示框架"""
@@ -494,6 +665,16 @@ class PmxFrame(BaseModel):
         self.is_special = is_special
         self.items = items or []
 
+    def to_list(self) -> List[Any]:
+        return [self.name_jp, self.name_en, self.is_special, [item.to_list() for item in self.items]]
+
+    def _validate_data(self, parent_list: Optional[List] = None) -> None:
+        assert isinstance(self.name_jp, str)
+        assert isinstance(self.name_en, str)
+        assert is_valid_flag(self.is_special)
+        for item in self.items:
+            item.validate()
+
 
 class PmxRigidBody(BaseModel):
     """PMX刚体"""
@@ -531,6 +712,21 @@ class PmxRigidBody(BaseModel):
         self.repulsion = repulsion
         self.friction = friction
 
+    def to_list(self) -> List[Any]:
+        return [self.name_jp, self.name_en, self.bone_index, self.group, self.nocollide_groups,
+                self.shape, self.size, self.position, self.rotation, self.physics_mode,
+                self.mass, self.move_damping, self.rotation_damping, self.repulsion, self.friction]
+
+    def _validate_data(self, parent_list: Optional[List] = None) -> None:
+        assert isinstance(self.name_jp, str)
+        assert isinstance(self.name_en, str)
+        assert isinstance(self.bone_index, int)
+        assert isinstance(self.group, int)
+        assert all(isinstance(group, int) for group in self.nocollide_groups)
+        assert is_valid_vector(3, self.size)
+        assert is_valid_vector(3, self.position)
+        assert is_valid_vector(3, self.rotation)
+
 
 class PmxJoint(BaseModel):
     """PMX关节"""
@@ -564,6 +760,22 @@ class PmxJoint(BaseModel):
         self.position_spring = position_spring or [0.0, 0.0, 0.0]
         self.rotation_spring = rotation_spring or [0.0, 0.0, 0.0]
 
+    def to_list(self) -> List[Any]:
+        return [self.name_jp, self.name_en, self.joint_type, self.rigidbody1_index,
+                self.rigidbody2_index, self.position, self.rotation, self.position_min,
+                self.position_max, self.rotation_min, self.rotation_max,
+                self.position_spring, self.rotation_spring]
+
+    def _validate_data(self, parent_list: Optional[List] = None) -> None:
+        assert isinstance(self.name_jp, str)
+        assert isinstance(self.name_en, str)
+        assert isinstance(self.rigidbody1_index, int)
+        assert isinstance(self.rigidbody2_index, int)
+        for vector in (self.position, self.rotation, self.position_min, self.position_max,
+                       self.rotation_min, self.rotation_max, self.position_spring,
+                       self.rotation_spring):
+            assert is_valid_vector(3, vector)
+
 
 class PmxSoftBody(BaseModel):
     """PMX软体"""
@@ -571,6 +783,11 @@ class PmxSoftBody(BaseModel):
     def __init__(self):
         super().__init__()
         # 简化实现，PMX v2.1功能较少使用
+
+    def to_list(self) -> List[Any]:
+        return []
+
+    def _validate_data(self, parent_list: Optional[List] = None) -> None:
         pass
 
 
@@ -594,6 +811,11 @@ class PmxModel(BaseModel):
         self.rigidbodies: List[PmxRigidBody] = []
         self.joints: List[PmxJoint] = []
         self.softbodies: List[PmxSoftBody] = []
+        self._name_index = None  # check_compat 使用的名称索引缓存
+        self._morph_engine = None  # MorphEngine 编译结果缓存
+        self._mesh_index = None  # PmxMeshIndex 缓存，解析时直接填入
+        self._spatial_index = None  # VertexSpatialIndex 缓存
+        self._bone_topology = None  # PmxBoneTopology 缓存
     
     def to_list(self) -> List[Any]:
         return [self.header.to_list(), len(self.vertices), len(self.faces),
@@ -630,4 +852,271 @@ class PmxModel(BaseModel):
     
     def get_material_count(self) -> int:
         """获取材质数量"""
-        return len(self.materials)
\ No newline at end of file
+        return len(self.materials)
+
+
+class PmxMeshIndex:
+    """扁平的面索引缓冲区和各材质的面范围
+
+    材质的 face_count 按PMX规范为顶点索引数，这里的范围以三角面为单位。
+
+    Attributes:
+        indices: 顶点索引 array('I')，每3个为一个三角面
+        ranges: 各材质的 (起始面, 面数)，按材质顺序
+    """
+
+    def __init__(self, indices: array, ranges: List[Tuple[int, int]]):
+        self.indices = indices
+        self.ranges = ranges
+        self._signature: Optional[tuple] = None
+
+    @staticmethod
+    def material_ranges(materials: List['PmxMaterial'], face_count: int) -> List[Tuple[int, int]]:
+        """按材质顺序累加 face_count 得到各材质的 (起始面, 面数)
+
+        Raises:
+            ValueError: 材质面数之和超过模型面数
+        """
+        ranges = []
+        offset = 0
+        for material in materials:
+            count = material.face_count // 3
+            ranges.append((offset, count))
+            offset += count
+        if offset > face_count:
+            raise ValueError(f"材质面数之和({offset})超过模型面数({face_count})")
+        return ranges
+
+    def material_faces(self, material_index: int) -> memoryview:
+        """返回某个材质的顶点索引切片（不复制，每3个为一个三角面）"""
+        start, count = self.ranges[material_index]
+        return memoryview(self.indices)[start * 3:(start + count) * 3]
+
+    @staticmethod
+    def signature(model: 'PmxModel') -> tuple:
+        """用于判断缓存是否失效的模型签名（面列表的身份和长度、各材质面数）"""
+        return (id(model.faces), len(model.faces), id(model.materials),
+                tuple(material.face_count for material in model.materials))
+
+    @classmethod
+    def from_model(cls, model: 'PmxModel') -> 'PmxMeshIndex':
+        """由模型的面列表构建索引缓冲区"""
+        indices = array('I', [index for face in model.faces for index in face])
+        mesh_index = cls(indices, cls.material_ranges(model.materials, len(model.faces)))
+        mesh_index._signature = cls.signature(model)
+        return mesh_index
+
+    @classmethod
+    def of(cls, model: 'PmxModel', refresh: bool = False) -> 'PmxMeshIndex':
+        """获取模型的面索引缓冲区
+
+        解析器在读取面数据时直接填入；替换或增删面列表、修改材质面数后自动重建，
+        原地修改面的顶点索引后需传入 refresh=True。
+        """
+        mesh_index = getattr(model, "_mesh_index", None)
+        if refresh or mesh_index is None or mesh_index._signature != cls.signature(model):
+            mesh_index = cls.from_model(model)
+            model._mesh_index = mesh_index
+        return mesh_index
+
+
+class PmxBoneTopology:
+    """骨骼层级的拓扑索引
+
+    由各骨骼的 parent_index 一次线性遍历得到，全部以 array('i') 保存。
+    子树查询使用深度优先先序的区间：骨骼 i 的子树（含自身）为 preorder[enter[i]:exit[i]]。
+
+    Attributes:
+        parents: 各骨骼的父骨骼索引，根骨骼为 -1
+        child_offsets: 长度为骨骼数+1，骨骼 i 的子骨骼为
+            children_flat[child_offsets[i]:child_offsets[i + 1]]
+        children_flat: 按父骨骼排列的子骨骼索引，同一父骨骼下按索引升序
+        depths: 各骨骼的深度，根骨骼为0
+        roots: 根骨骼索引（升序）
+        preorder: 深度优先先序的骨骼索引
+        enter: 各骨骼在 preorder 中的位置
+        exit: 各骨骼子树在 preorder 中的结束位置（不含）
+        order: MMD的变形顺序，物理前变形的骨骼在前，其次按变形阶层、骨骼索引排序
+        after_physics: order 中第一个物理后变形骨骼的位置
+        ik_bones: 带IK标志的骨骼索引（升序）
+        ik_offsets: 长度为骨骼数+1，骨骼 i 作为IK链接所属的IK骨骼为
+            ik_owners_flat[ik_offsets[i]:ik_offsets[i + 1]]
+        ik_owners_flat: 按链接骨骼排列的IK骨骼索引
+    """
+
+    def __init__(self, parents: array, layers: List[int], after_physics: List[bool],
+                 ik_links: List[Optional[List[int]]]):
+        bone_count = len(parents)
+        counts = [0] * (bone_count + 1)
+        roots = array('i')
+        for bone, parent in enumerate(parents):
+            if parent == -1:
+                roots.append(bone)
+            elif 0 <= parent < bone_count:
+                counts[parent + 1] += 1
+            else:
+                raise ValueError(f"骨骼 {bone} 的父骨骼索引越界: {parent}")
+        for bone in range(bone_count):
+            counts[bone + 1] += counts[bone]
+        child_offsets = array('i', counts)
+        children_flat = array('i', bytes(4 * bone_count - 4 * len(roots)))
+        cursor = counts[:-1]
+        for bone, parent in enumerate(parents):
+            if parent >= 0:
+                children_flat[cursor[parent]] = bone
+                cursor[parent] += 1
+
+        preorder = array('i')
+        depths = array('i', bytes(4 * bone_count))
+        stack = list(reversed(roots))
+        while stack:
+            bone = stack.pop()
+            preorder.append(bone)
+            start, end = child_offsets[bone], child_offsets[bone + 1]
+            if start < end:
+                depth = depths[bone] + 1
+                for position in range(end - 1, start - 1, -1):
+                    child = children_flat[position]
+                    depths[child] = depth
+                    stack.append(child)
+        if len(preorder) != bone_count:
+            raise ValueError("骨骼的父子关系存在循环")
+        enter = array('i', bytes(4 * bone_count))
+        for position, bone in enumerate(preorder):
+            enter[bone] = position
+        # 逆先序累加子树大小，子骨骼总在父骨骼之后
+        sizes = [1] * bone_count
+        for bone in reversed(preorder):
+            if parents[bone] >= 0:
+                sizes[parents[bone]] += sizes[bone]
+        exit_ = array('i', [enter[bone] + sizes[bone] for bone in range(bone_count)])
+
+        self.parents = parents
+        self.child_offsets = child_offsets
+        self.children_flat = children_flat
+        self.depths = depths
+        self.roots = roots
+        self.preorder = preorder
+        self.enter = enter
+        self.exit = exit_
+        self.order = array('i', sorted(range(bone_count),
+                                       key=lambda bone: (after_physics[bone], layers[bone], bone)))
+        self.after_physics = bone_count - sum(1 for flag in after_physics if flag)
+
+        owners: List[List[int]] = [[] for _ in range(bone_count)]
+        self.ik_bones = array('i')
+        for bone, links in enumerate(ik_links):
+            if links is None:
+                continue
+            self.ik_bones.append(bone)
+            for link in links:
+                if not 0 <= link < bone_count:
+                    raise ValueError(f"IK骨骼 {bone} 的链接骨骼索引越界: {link}")
+                if not owners[link] or owners[link][-1] != bone:
+                    owners[link].append(bone)
+        self.ik_offsets = array('i', [0])
+        self.ik_owners_flat = array('i')
+        for bone_owners in owners:
+            self.ik_owners_flat.extend(bone_owners)
+            self.ik_offsets.append(len(self.ik_owners_flat))
+        self._signature: Optional[tuple] = None
+
+    def children(self, bone_index: int) -> memoryview:
+        """子骨骼索引（不复制）"""
+        offsets = self.child_offsets
+        return memoryview(self.children_flat)[offsets[bone_index]:offsets[bone_index + 1]]
+
+    def subtree(self, bone_index: int) -> memoryview:
+        """以该骨骼为根的子树（含自身，深度优先先序，不复制）"""
+        return memoryview(self.preorder)[self.enter[bone_index]:self.exit[bone_index]]
+
+    def is_ancestor(self, ancestor: int, bone_index: int) -> bool:
+        """ancestor 是否为 bone_index 的祖先（骨骼自身也视为自己的祖先）"""
+        return self.enter[ancestor] <= self.enter[bone_index] < self.exit[ancestor]
+
+    def ancestors(self, bone_index: int) -> List[int]:
+        """从父骨骼到根骨骼的祖先索引"""
+        result = []
+        parent = self.parents[bone_index]
+        while parent >= 0:
+            result.append(parent)
+            parent = self.parents[parent]
+        return result
+
+    def ik_owners(self, bone_index: int) -> memoryview:
+        """以该骨骼为IK链接的IK骨骼索引（不复制），不在任何IK链中时为空"""
+        offsets = self.ik_offsets
+        return memoryview(self.ik_owners_flat)[offsets[bone_index]:offsets[bone_index + 1]]
+
+    @staticmethod
+    def signature(model: 'PmxModel') -> tuple:
+        """用于判断缓存是否失效的模型签名（骨骼列表的身份和长度、各骨骼的父骨骼、变形阶层、
+        物理后变形标志和IK链接）"""
+        return (id(model.bones), len(model.bones),
+                tuple((bone.parent_index, bone.deform_layer, bone.bone_flags.deform_after_phys,
+                       bone.bone_flags.ik and tuple(link.bone_index for link in bone.ik_links))
+                      for bone in model.bones))
+
+    @classmethod
+    def from_model(cls, model: 'PmxModel') -> 'PmxBoneTopology':
+        """由模型的骨骼列表构建拓扑索引
+
+        Raises:
+            ValueError: 父骨骼或IK链接索引越界，或父子关系存在循环
+        """
+        bones = model.bones
+        topology = cls(array('i', [bone.parent_index for bone in bones]),
+                       [bone.deform_layer for bone in bones],
+                       [bone.bone_flags.deform_after_phys for bone in bones],
+                       [[link.bone_index for link in bone.ik_links] if bone.bone_flags.ik else None
+                        for bone in bones])
+        topology._signature = cls.signature(model)
+        return topology
+
+    @classmethod
+    def of(cls, model: 'PmxModel', refresh: bool = False) -> 'PmxBoneTopology':
+        """获取模型的骨骼拓扑索引
+
+        替换或增删骨骼列表、修改骨骼的父骨骼、变形阶层、物理后变形标志或IK链接后自动重建。
+        """
+        topology = getattr(model, "_bone_topology", None)
+        if refresh or topology is None or topology._signature != cls.signature(model):
+            topology = cls.from_model(model)
+            model._bone_topology = topology
+        return topology
+
+
+class PmxNameTable:
+    """PMX文件的头信息、各数据段数量和骨骼/变形名称（不含其余数据）
+
+    Attributes:
+        header: 文件头
+        vertex_count: 顶点数量
+        face_count: 三角面数量
+        texture_count: 纹理数量
+        material_count: 材质数量
+        bone_names: 骨骼日文名称（按骨骼顺序）
+        morph_names: 变形日文名称（按变形顺序）
+    """
+
+    def __init__(self, header: Optional[PmxHeader] = None):
+        self.header = header or PmxHeader()
+        self.vertex_count = 0
+        self.face_count = 0
+        self.texture_count = 0
+        self.material_count = 0
+        self.bone_names: List[str] = []
+        self.morph_names: List[str] = []
+        self._name_index = None  # check_compat 使用的名称索引缓存
+
+    @classmethod
+    def from_model(cls, model: PmxModel) -> 'PmxNameTable':
+        """由已解析的模型构建名称表"""
+        table = cls(model.header)
+        table.vertex_count = len(model.vertices)
+        table.face_count = len(model.faces)
+        table.texture_count = len(model.textures)
+        table.material_count = len(model.materials)
+        table.bone_names = [bone.name_jp for bone in model.bones]
+        table.morph_names = [morph.name_jp for morph in model.morphs]
+        return table
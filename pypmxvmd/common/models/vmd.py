@@ -6,8 +6,12 @@ PyPMXVMD VMD数据模型
 """
 
 import enum
-from typing import List, Optional, Any
+from array import array
+from typing import Dict, Iterable, List, Optional, Any, Tuple
 from pypmxvmd.common.models.base import BaseModel, is_valid_vector
+from pypmxvmd.common.math3d import (
+    DEFAULT_BONE_INTERPOLATION, euler_to_quaternion, quaternion_to_euler
+)
 
 
 class ShadowMode(enum.IntEnum):
@@ -138,7 +142,7 @@ class VmdCameraFrame(BaseModel):
             distance: 到目标的距离
             position: 目标位置 [x, y, z]
             rotation: 相机旋转 [x, y, z] (弧度)
-            interpolation: 插值曲线数据 (24字节)
+            interpolation: 插值曲线数据，X/Y/Z/旋转/距离/视角各4个 (ax, ay, bx, by)
             fov: 视野角度
             perspective: 是否透视投影
         """
@@ -147,7 +151,7 @@ class VmdCameraFrame(BaseModel):
         self.distance = distance
         self.position = position or [0.0, 0.0, 0.0]
         self.rotation = rotation or [0.0, 0.0, 0.0]
-        self.interpolation = interpolation or ([20, 107, 20, 107] * 6)
+        self.interpolation = interpolation or ([20, 20, 107, 107] * 6)
         self.fov = fov
         self.perspective = perspective
     
@@ -347,4 +351,304 @@ class VmdMotion(BaseModel):
     def is_camera_motion(self) -> bool:
         """判断是否为相机动作"""
         return (self.header.model_name == "カメラ・照明" or 
-                len(self.camera_frames) > 0 or len(self.light_frames) > 0)
\ No newline at end of file
+                len(self.camera_frames) > 0 or len(self.light_frames) > 0)
+
+
+def _group_tracks(frames: list, name_attr: str) -> Tuple[List[str], List[List[int]]]:
+    """按名称分组关键帧索引，组内按帧号稳定排序，组按首次出现的顺序排列"""
+    groups: Dict[str, List[int]] = {}
+    for index, frame in enumerate(frames):
+        name = getattr(frame, name_attr)
+        group = groups.get(name)
+        if group is None:
+            groups[name] = [index]
+        else:
+            group.append(index)
+    names = list(groups)
+    tracks = []
+    for name in names:
+        group = groups[name]
+        group.sort(key=lambda i: frames[i].frame_number)
+        tracks.append(group)
+    return names, tracks
+
+
+class VmdBoneColumns:
+    """VMD骨骼关键帧的列式表示
+
+    关键帧按骨骼分轨，轨道内按帧号升序（同帧保持原有顺序），采用CSR布局：
+    第i条轨道的关键帧位于 track_offsets[i] 到 track_offsets[i + 1] 之间。
+    旋转与VMD文件一致以四元数 [x, y, z, w] 存储，插值参数每帧16个。
+
+    Attributes:
+        bone_names: 每条轨道的骨骼名称
+        track_offsets: 轨道偏移，长度为轨道数+1
+        frame_numbers: 帧号
+        positions: 位置，每帧3个float
+        rotations: 旋转四元数，每帧4个float
+        interpolation: 插值参数，每帧16个（X/Y/Z/旋转 各 ax, ay, bx, by）
+        physics_disabled: 物理开关，每帧1字节
+    """
+
+    def __init__(self):
+        self.bone_names: List[str] = []
+        self.track_offsets = array('q', [0])
+        self.frame_numbers = array('I')
+        self.positions = array('f')
+        self.rotations = array('f')
+        self.interpolation = array('b')
+        self.physics_disabled = bytearray()
+        self._lookup: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.frame_numbers)
+
+    @property
+    def track_count(self) -> int:
+        """轨道数量"""
+        return len(self.bone_names)
+
+    def track_index(self, bone_name: str) -> int:
+        """返回骨骼对应的轨道索引，不存在时返回-1"""
+        return self._lookup.get(bone_name, -1)
+
+    def track_range(self, index: int) -> Tuple[int, int]:
+        """返回第index条轨道的关键帧范围 (起始, 结束)"""
+        return self.track_offsets[index], self.track_offsets[index + 1]
+
+    def append_track(self, bone_name: str, frame_numbers: Iterable[int],
+                     positions: Iterable[float], rotations: Iterable[float],
+                     interpolation: Optional[Iterable[int]] = None,
+                     physics_disabled: Optional[Iterable[int]] = None) -> int:
+        """追加一条轨道
+
+        Args:
+            bone_name: 骨骼名称，不能与已有轨道重复
+            frame_numbers: 升序帧号
+            positions: 位置，每帧3个
+            rotations: 四元数 [x, y, z, w]，每帧4个
+            interpolation: 插值参数，每帧16个；省略时使用线性插值
+            physics_disabled: 物理开关，每帧1个；省略时为0
+
+        Returns:
+            新轨道的索引
+        """
+        if bone_name in self._lookup:
+            raise ValueError(f"骨骼轨道已存在: {bone_name}")
+        start = len(self.frame_numbers)
+        self.frame_numbers.extend(frame_numbers)
+        count = len(self.frame_numbers) - start
+        self.positions.extend(positions)
+        self.rotations.extend(rotations)
+        if interpolation is None:
+            self.interpolation.extend(DEFAULT_BONE_INTERPOLATION * count)
+        else:
+            self.interpolation.extend(interpolation)
+        if physics_disabled is None:
+            self.physics_disabled.extend(bytes(count))
+        else:
+            self.physics_disabled.extend(physics_disabled)
+        if (len(self.positions) != 3 * len(self.frame_numbers)
+                or len(self.rotations) != 4 * len(self.frame_numbers)
+                or len(self.interpolation) != 16 * len(self.frame_numbers)
+                or len(self.physics_disabled) != len(self.frame_numbers)):
+            raise ValueError(f"骨骼轨道数据长度不一致: {bone_name}")
+
+        self._lookup[bone_name] = len(self.bone_names)
+        self.bone_names.append(bone_name)
+        self.track_offsets.append(len(self.frame_numbers))
+        return len(self.bone_names) - 1
+
+    @classmethod
+    def from_frames(cls, bone_frames: List[VmdBoneFrame]) -> 'VmdBoneColumns':
+        """由骨骼关键帧列表构建（欧拉角转换为四元数）"""
+        columns = cls()
+        names, tracks = _group_tracks(bone_frames, 'bone_name')
+        frame_numbers, positions, rotations = columns.frame_numbers, columns.positions, columns.rotations
+        interpolation, physics = columns.interpolation, columns.physics_disabled
+        for name, track in zip(names, tracks):
+            for index in track:
+                frame = bone_frames[index]
+                frame_numbers.append(frame.frame_number)
+                positions.extend(frame.position[:3])
+                w, x, y, z = euler_to_quaternion(frame.rotation)
+                rotations.extend((x, y, z, w))
+                interp = frame.interpolation
+                interpolation.extend(interp if len(interp) == 16 else DEFAULT_BONE_INTERPOLATION)
+                physics.append(1 if frame.physics_disabled else 0)
+            columns._lookup[name] = len(columns.bone_names)
+            columns.bone_names.append(name)
+            columns.track_offsets.append(len(frame_numbers))
+        return columns
+
+    def to_frames(self) -> List[VmdBoneFrame]:
+        """还原为骨骼关键帧列表（四元数转换为欧拉角），按轨道顺序排列"""
+        frames = []
+        positions, rotations, interpolation = self.positions, self.rotations, self.interpolation
+        for track, name in enumerate(self.bone_names):
+            for i in range(self.track_offsets[track], self.track_offsets[track + 1]):
+                x, y, z, w = rotations[i * 4:i * 4 + 4]
+                frames.append(VmdBoneFrame(
+                    bone_name=name,
+                    frame_number=self.frame_numbers[i],
+                    position=list(positions[i * 3:i * 3 + 3]),
+                    rotation=quaternion_to_euler(w, x, y, z),
+                    interpolation=list(interpolation[i * 16:i * 16 + 16]),
+                    physics_disabled=bool(self.physics_disabled[i])
+                ))
+        return frames
+
+
+class VmdMorphColumns:
+    """VMD变形关键帧的列式表示
+
+    布局与 VmdBoneColumns 相同：按变形分轨，轨道内按帧号升序。
+
+    Attributes:
+        morph_names: 每条轨道的变形名称
+        track_offsets: 轨道偏移，长度为轨道数+1
+        frame_numbers: 帧号
+        weights: 权重
+    """
+
+    def __init__(self):
+        self.morph_names: List[str] = []
+        self.track_offsets = array('q', [0])
+        self.frame_numbers = array('I')
+        self.weights = array('f')
+        self._lookup: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.frame_numbers)
+
+    @property
+    def track_count(self) -> int:
+        """轨道数量"""
+        return len(self.morph_names)
+
+    def track_index(self, morph_name: str) -> int:
+        """返回变形对应的轨道索引，不存在时返回-1"""
+        return self._lookup.get(morph_name, -1)
+
+    def track_range(self, index: int) -> Tuple[int, int]:
+        """返回第index条轨道的关键帧范围 (起始, 结束)"""
+        return self.track_offsets[index], self.track_offsets[index + 1]
+
+    def append_track(self, morph_name: str, frame_numbers: Iterable[int],
+                     weights: Iterable[float]) -> int:
+        """追加一条轨道
+
+        Returns:
+            新轨道的索引
+        """
+        if morph_name in self._lookup:
+            raise ValueError(f"变形轨道已存在: {morph_name}")
+        self.frame_numbers.extend(frame_numbers)
+        self.weights.extend(weights)
+        if len(self.weights) != len(self.frame_numbers):
+            raise ValueError(f"变形轨道数据长度不一致: {morph_name}")
+        self._lookup[morph_name] = len(self.morph_names)
+        self.morph_names.append(morph_name)
+        self.track_offsets.append(len(self.frame_numbers))
+        return len(self.morph_names) - 1
+
+    @classmethod
+    def from_frames(cls, morph_frames: List[VmdMorphFrame]) -> 'VmdMorphColumns':
+        """由变形关键帧列表构建"""
+        columns = cls()
+        names, tracks = _group_tracks(morph_frames, 'morph_name')
+        for name, track in zip(names, tracks):
+            columns.frame_numbers.extend(morph_frames[i].frame_number for i in track)
+            columns.weights.extend(morph_frames[i].weight for i in track)
+            columns._lookup[name] = len(columns.morph_names)
+            columns.morph_names.append(name)
+            columns.track_offsets.append(len(columns.frame_numbers))
+        return columns
+
+    def to_frames(self) -> List[VmdMorphFrame]:
+        """还原为变形关键帧列表，按轨道顺序排列"""
+        frames = []
+        for track, name in enumerate(self.morph_names):
+            for i in range(self.track_offsets[track], self.track_offsets[track + 1]):
+                frames.append(VmdMorphFrame(morph_name=name, frame_number=self.frame_numbers[i],
+                                            weight=self.weights[i]))
+        return frames
+
+
+VMD_NAME_LENGTH = 15
+VMD_IK_NAME_LENGTH = 20
+
+
+def encode_vmd_name(name: str, encoding: str = "shift_jis", length: int = VMD_NAME_LENGTH) -> bytes:
+    """把名称编码为VMD中保存的原始字节（编码后截断至length字节）"""
+    try:
+        raw = name.encode(encoding)
+    except UnicodeEncodeError:
+        raw = name.encode(encoding, errors='ignore')
+    return raw[:length]
+
+
+class VmdNameTable:
+    """VMD文件的头信息、各类关键帧数量和名称表（不含关键帧数据）
+
+    名称保存为文件中的原始Shift-JIS字节（截断至第一个NUL），
+    用于与模型名称直接比较而无需解码。
+
+    Attributes:
+        version: VMD版本
+        model_name: 模型名称
+        bone_names: 骨骼名称原始字节 -> 关键帧数量
+        morph_names: 变形名称原始字节 -> 关键帧数量
+        ik_bone_names: IK关键帧中出现的骨骼名称原始字节 -> 出现次数
+        camera_frame_count: 相机关键帧数量
+        light_frame_count: 光照关键帧数量
+        shadow_frame_count: 阴影关键帧数量
+        ik_frame_count: IK关键帧数量
+    """
+
+    def __init__(self, version: int = 2, model_name: str = ""):
+        self.version = version
+        self.model_name = model_name
+        self.bone_names: Dict[bytes, int] = {}
+        self.morph_names: Dict[bytes, int] = {}
+        self.ik_bone_names: Dict[bytes, int] = {}
+        self.camera_frame_count = 0
+        self.light_frame_count = 0
+        self.shadow_frame_count = 0
+        self.ik_frame_count = 0
+
+    @property
+    def bone_frame_count(self) -> int:
+        """骨骼关键帧数量"""
+        return sum(self.bone_names.values())
+
+    @property
+    def morph_frame_count(self) -> int:
+        """变形关键帧数量"""
+        return sum(self.morph_names.values())
+
+    @classmethod
+    def from_motion(cls, motion: VmdMotion, encoding: str = "shift_jis") -> 'VmdNameTable':
+        """由已解析的动作构建名称表，名称按写入VMD时的规则编码和截断"""
+        table = cls(motion.header.version, motion.header.model_name)
+        encoded: Dict[Tuple[str, int], bytes] = {}
+
+        def count(names: Dict[bytes, int], name: str, length: int = VMD_NAME_LENGTH) -> None:
+            raw = encoded.get((name, length))
+            if raw is None:
+                raw = encoded[(name, length)] = encode_vmd_name(name, encoding, length)
+            names[raw] = names.get(raw, 0) + 1
+
+        for frame in motion.bone_frames:
+            count(table.bone_names, frame.bone_name)
+        for frame in motion.morph_frames:
+            count(table.morph_names, frame.morph_name)
+        for frame in motion.ik_frames:
+            for bone in frame.ik_bones:
+                count(table.ik_bone_names, bone.bone_name, VMD_IK_NAME_LENGTH)
+        table.camera_frame_count = len(motion.camera_frames)
+        table.light_frame_count = len(motion.light_frames)
+        table.shadow_frame_count = len(motion.shadow_frames)
+        table.ik_frame_count = len(motion.ik_frames)
+        return table
+
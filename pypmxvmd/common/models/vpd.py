@@ -5,7 +5,8 @@ PyPMXVMD VPD数据模型
 VPD是纯文本格式，用于存储单帧姿势数据。
 """
 
-from typing import List, Optional, Any
+from array import array
+from typing import Dict, Iterable, List, Optional, Any, Sequence, Tuple
 from pypmxvmd.common.models.base import BaseModel, is_valid_vector
 
 
@@ -108,4 +109,247 @@ class VpdPose(BaseModel):
     
     def get_morph_count(self) -> int:
         """获取变形姿势数量"""
-        return len(self.morph_poses)
\ No newline at end of file
+        return len(self.morph_poses)
+
+
+class VpdPoseTable:
+    """列式姿势表
+
+    把大量VPD姿势存放在少数几个连续数组中，便于批量检索和构建索引。
+    骨骼和变形按名称去重为全局索引，每个姿势占用一段连续的条目范围（CSR布局）:
+    第i个姿势的骨骼条目位于 bone_offsets[i] 到 bone_offsets[i + 1] 之间，
+    对应 bone_indices 中的骨骼索引、positions 中的3个分量和 rotations 中的4个分量。
+    数值以float32存储，旋转为四元数 [x, y, z, w]。
+
+    Attributes:
+        file_paths: 每个姿势的来源文件
+        model_names: 每个姿势的模型名称
+        bone_names: 全局骨骼名称表
+        morph_names: 全局变形名称表
+        bone_offsets: 骨骼条目偏移，长度为姿势数+1
+        bone_indices: 骨骼条目对应的骨骼名称索引
+        positions: 骨骼位置，每条目3个float
+        rotations: 骨骼旋转四元数，每条目4个float
+        morph_offsets: 变形条目偏移，长度为姿势数+1
+        morph_indices: 变形条目对应的变形名称索引
+        morph_weights: 变形权重
+        errors: 解析失败的文件及错误信息
+    """
+
+    def __init__(self):
+        self.file_paths: List[str] = []
+        self.model_names: List[str] = []
+        self.bone_names: List[str] = []
+        self.morph_names: List[str] = []
+        self.bone_offsets = array('q', [0])
+        self.bone_indices = array('i')
+        self.positions = array('f')
+        self.rotations = array('f')
+        self.morph_offsets = array('q', [0])
+        self.morph_indices = array('i')
+        self.morph_weights = array('f')
+        self.errors: Dict[str, str] = {}
+        self._bone_lookup: Dict[str, int] = {}
+        self._morph_lookup: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.file_paths)
+
+    @property
+    def pose_count(self) -> int:
+        """姿势数量"""
+        return len(self.file_paths)
+
+    def _intern(self, name: str, names: List[str], lookup: Dict[str, int]) -> int:
+        index = lookup.get(name)
+        if index is None:
+            index = len(names)
+            names.append(name)
+            lookup[name] = index
+        return index
+
+    def add_pose(self, model_name: str,
+                 bones: Iterable[Tuple[str, Sequence[float], Sequence[float]]],
+                 morphs: Iterable[Tuple[str, float]],
+                 file_path: str = "") -> int:
+        """追加一个姿势
+
+        Args:
+            model_name: 模型名称
+            bones: (骨骼名称, 位置[x, y, z], 四元数[x, y, z, w]) 序列
+            morphs: (变形名称, 权重) 序列
+            file_path: 来源文件
+
+        Returns:
+            新姿势的索引
+        """
+        bone_names, bone_lookup = self.bone_names, self._bone_lookup
+        bone_indices, positions, rotations = self.bone_indices, self.positions, self.rotations
+        for name, position, rotation in bones:
+            bone_indices.append(self._intern(name, bone_names, bone_lookup))
+            positions.extend(position)
+            rotations.extend(rotation)
+
+        morph_names, morph_lookup = self.morph_names, self._morph_lookup
+        for name, weight in morphs:
+            self.morph_indices.append(self._intern(name, morph_names, morph_lookup))
+            self.morph_weights.append(weight)
+
+        self.bone_offsets.append(len(bone_indices))
+        self.morph_offsets.append(len(self.morph_indices))
+        self.file_paths.append(str(file_path))
+        self.model_names.append(model_name)
+        return len(self.file_paths) - 1
+
+    def add_vpd_pose(self, pose: VpdPose, file_path: str = "") -> int:
+        """追加一个VpdPose对象
+
+        旋转必须是四元数 [x, y, z, w]。
+
+        Returns:
+            新姿势的索引
+        """
+        return self.add_pose(
+            pose.model_name,
+            ((b.bone_name, b.position, b.rotation) for b in pose.bone_poses),
+            ((m.morph_name, m.weight) for m in pose.morph_poses),
+            file_path
+        )
+
+    @classmethod
+    def from_dense(cls, pose_count: int, bone_names: Sequence[str],
+                   positions: Sequence[float], rotations: Sequence[float],
+                   morph_names: Sequence[str] = (),
+                   morph_weights: Optional[Sequence[float]] = None,
+                   model_name: str = "") -> 'VpdPoseTable':
+        """由稠密矩阵（姿势 × 骨骼）构建，每个姿势包含全部骨骼和变形
+
+        Args:
+            pose_count: 姿势数量
+            bone_names: 骨骼列名称
+            positions: 位置，每行 len(bone_names)*3 个值
+            rotations: 四元数 [x, y, z, w]，每行 len(bone_names)*4 个值
+            morph_names: 变形列名称
+            morph_weights: 权重，每行 len(morph_names) 个值，省略时为0
+            model_name: 所有姿势的模型名称
+
+        Returns:
+            新的VpdPoseTable对象
+        """
+        bone_count, morph_count = len(bone_names), len(morph_names)
+        table = cls()
+        table.positions = array('f', positions)
+        table.rotations = array('f', rotations)
+        if morph_weights is None:
+            table.morph_weights = array('f', bytes(4 * morph_count * pose_count))
+        else:
+            table.morph_weights = array('f', morph_weights)
+        if (len(table.positions) != 3 * bone_count * pose_count
+                or len(table.rotations) != 4 * bone_count * pose_count
+                or len(table.morph_weights) != morph_count * pose_count):
+            raise ValueError("稠密姿势数据的长度与骨骼/变形数量不一致")
+
+        for name in bone_names:
+            table._intern(name, table.bone_names, table._bone_lookup)
+        for name in morph_names:
+            table._intern(name, table.morph_names, table._morph_lookup)
+        if len(table.bone_names) != bone_count or len(table.morph_names) != morph_count:
+            raise ValueError("骨骼或变形名称重复")
+
+        table.bone_indices = array('i', range(bone_count)) * pose_count
+        table.bone_offsets = array('q', (pose * bone_count for pose in range(pose_count + 1)))
+        table.morph_indices = array('i', range(morph_count)) * pose_count
+        table.morph_offsets = array('q', (pose * morph_count for pose in range(pose_count + 1)))
+        table.file_paths = [""] * pose_count
+        table.model_names = [model_name] * pose_count
+        return table
+
+    def bone_index(self, name: str) -> int:
+        """返回骨骼名称的全局索引，不存在时返回-1"""
+        return self._bone_lookup.get(name, -1)
+
+    def morph_index(self, name: str) -> int:
+        """返回变形名称的全局索引，不存在时返回-1"""
+        return self._morph_lookup.get(name, -1)
+
+    def get_pose(self, index: int) -> VpdPose:
+        """把第index个姿势还原为VpdPose对象"""
+        if not 0 <= index < len(self.file_paths):
+            raise IndexError(f"姿势索引越界: {index}")
+        bone_names, positions, rotations = self.bone_names, self.positions, self.rotations
+        bone_poses = []
+        for entry in range(self.bone_offsets[index], self.bone_offsets[index + 1]):
+            bone_poses.append(VpdBonePose(
+                bone_name=bone_names[self.bone_indices[entry]],
+                position=list(positions[entry * 3:entry * 3 + 3]),
+                rotation=list(rotations[entry * 4:entry * 4 + 4])
+            ))
+        morph_poses = [
+            VpdMorphPose(morph_name=self.morph_names[self.morph_indices[entry]],
+                         weight=self.morph_weights[entry])
+            for entry in range(self.morph_offsets[index], self.morph_offsets[index + 1])
+        ]
+        return VpdPose(model_name=self.model_names[index], bone_poses=bone_poses,
+                       morph_poses=morph_poses)
+
+    def bone_column(self, name: str) -> Tuple[array, array, array]:
+        """提取某个骨骼在所有姿势中的数据
+
+        Args:
+            name: 骨骼名称
+
+        Returns:
+            (姿势索引array('i'), 位置array('f'), 旋转array('f'))，不含该骨骼的姿势被跳过
+        """
+        pose_indices, positions, rotations = array('i'), array('f'), array('f')
+        target = self.bone_index(name)
+        if target < 0:
+            return pose_indices, positions, rotations
+        offsets, bone_indices = self.bone_offsets, self.bone_indices
+        pose = 0
+        for entry, bone in enumerate(bone_indices):
+            if bone != target:
+                continue
+            while offsets[pose + 1] <= entry:
+                pose += 1
+            pose_indices.append(pose)
+            positions.extend(self.positions[entry * 3:entry * 3 + 3])
+            rotations.extend(self.rotations[entry * 4:entry * 4 + 4])
+        return pose_indices, positions, rotations
+
+    def to_dense(self, bone_names: Optional[List[str]] = None) -> Tuple[array, array, bytearray]:
+        """展开为稠密矩阵（姿势 × 骨骼）
+
+        缺失的骨骼位置为零、旋转为单位四元数，并在掩码中记为0。
+
+        Args:
+            bone_names: 需要的骨骼列及顺序，默认全部骨骼
+
+        Returns:
+            (位置array('f')，每行 len(bone_names)*3 个值；
+             旋转array('f')，每行 len(bone_names)*4 个值；
+             掩码bytearray，每行 len(bone_names) 个字节)
+        """
+        if bone_names is None:
+            bone_names = self.bone_names
+        column_count = len(bone_names)
+        column_of = {self._bone_lookup[name]: col for col, name in enumerate(bone_names)
+                     if name in self._bone_lookup}
+        pose_count = len(self.file_paths)
+
+        positions = array('f', bytes(4 * 3 * column_count * pose_count))
+        rotations = array('f', [0.0, 0.0, 0.0, 1.0]) * (column_count * pose_count)
+        mask = bytearray(column_count * pose_count)
+
+        offsets, bone_indices = self.bone_offsets, self.bone_indices
+        for pose in range(pose_count):
+            row = pose * column_count
+            for entry in range(offsets[pose], offsets[pose + 1]):
+                col = column_of.get(bone_indices[entry])
+                if col is None:
+                    continue
+                cell = row + col
+                positions[cell * 3:cell * 3 + 3] = self.positions[entry * 3:entry * 3 + 3]
+                rotations[cell * 4:cell * 4 + 4] = self.rotations[entry * 4:entry * 4 + 4]
+                mask[cell] = 1
+        return positions, rotations, mask
@@ -3,14 +3,35 @@ PyPMXVMD 文件解析器
 
 负责解析各种MMD文件格式的二进制或文本数据。
 包含PMX、VMD、VPD等格式的专用解析器。
+
+解析器及其Cython加速模块在首次访问时才导入。
 """
 
-from pypmxvmd.common.parsers.pmx_parser import PmxParser
-from pypmxvmd.common.parsers.vmd_parser import VmdParser
-from pypmxvmd.common.parsers.vpd_parser import VpdParser
+import importlib
+
+_LAZY_ATTRS = {
+    "PmxParser": "pypmxvmd.common.parsers.pmx_parser",
+    "VmdParser": "pypmxvmd.common.parsers.vmd_parser",
+    "VpdParser": "pypmxvmd.common.parsers.vpd_parser",
+    "ColumnarParser": "pypmxvmd.common.parsers.columnar_parser",
+}
 
 __all__ = [
     "PmxParser",
     "VmdParser", 
     "VpdParser",
-]
\ No newline at end of file
+    "ColumnarParser",
+]
+
+
+def __getattr__(name: str):
+    """按需导入解析器类"""
+    if name in _LAZY_ATTRS:
+        value = getattr(importlib.import_module(_LAZY_ATTRS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
@@ -27,6 +27,7 @@ from cpython.unicode cimport PyUnicode_Decode
 from pypmxvmd.common.models.pmx import (
     PmxModel, PmxHeader, PmxVertex, PmxMaterial, WeightMode, SphMode, MaterialFlags
 )
+from pypmxvmd.common.parsers.pmx_sections import parse_bones_and_morphs
 
 
 cdef class FastPmxReader:
@@ -274,9 +275,17 @@ cpdef parse_pmx_cython(bytes data, bint more_info=False):
     pmx.textures = textures
     pmx.materials = _parse_materials_cython(reader, textures, more_info)
 
+    # 骨骼/变形段使用与快速解析共用的纯Python实现（按类型整段解包变形项目）
+    pmx.bones, pmx.morphs = parse_bones_and_morphs(
+        data, reader._pos, reader._encoding,
+        (reader._vertex_index_size, reader._texture_index_size,
+         reader._material_index_size, reader._bone_index_size,
+         reader._morph_index_size, reader._rigidbody_index_size))
+
     if more_info:
         print(f"PMX Cython解析完成: {len(pmx.vertices)}个顶点, "
-              f"{len(pmx.faces)}个面, {len(pmx.materials)}个材质")
+              f"{len(pmx.faces)}个面, {len(pmx.materials)}个材质, "
+              f"{len(pmx.bones)}个骨骼, {len(pmx.morphs)}个变形")
 
     return pmx
 
@@ -367,14 +367,14 @@ cdef list _parse_camera_frames_cython(FastVmdReader reader, bint more_info):
         memcpy(interp_arr, ptr + reader._pos, 24)
         reader._pos += 24
 
-        # 转换为Python列表
+        # 转换为Python列表：文件中为 (ax, bx, ay, by)，与Python解析器一致转为 (ax, ay, bx, by)
         interpolation = [
-            interp_arr[0], interp_arr[1], interp_arr[2], interp_arr[3],
-            interp_arr[4], interp_arr[5], interp_arr[6], interp_arr[7],
-            interp_arr[8], interp_arr[9], interp_arr[10], interp_arr[11],
-            interp_arr[12], interp_arr[13], interp_arr[14], interp_arr[15],
-            interp_arr[16], interp_arr[17], interp_arr[18], interp_arr[19],
-            interp_arr[20], interp_arr[21], interp_arr[22], interp_arr[23]
+            interp_arr[0], interp_arr[2], interp_arr[1], interp_arr[3],
+            interp_arr[4], interp_arr[6], interp_arr[5], interp_arr[7],
+            interp_arr[8], interp_arr[10], interp_arr[9], interp_arr[11],
+            interp_arr[12], interp_arr[14], interp_arr[13], interp_arr[15],
+            interp_arr[16], interp_arr[18], interp_arr[17], interp_arr[19],
+            interp_arr[20], interp_arr[22], interp_arr[21], interp_arr[23]
         ]
 
         # FOV和透视
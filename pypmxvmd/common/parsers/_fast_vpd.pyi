@@ -0,0 +1,8 @@
+from __future__ import annotations
+
+from typing import List, Tuple
+
+
+def tokenize_vpd_cython(
+    data: bytes, encoding: str
+) -> Tuple[str, List[Tuple[str, List[float], List[float]]], List[Tuple[str, float]]]: ...
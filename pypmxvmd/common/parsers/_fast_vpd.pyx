@@ -0,0 +1,224 @@
+# cython: language_level=3
+# cython: boundscheck=False
+# cython: wraparound=False
+# cython: cdivision=True
+# cython: initializedcheck=False
+# cython: nonecheck=False
+"""
+PyPMXVMD VPD快速分词模块 (Cython优化)
+
+在字节层面单遍扫描VPD文本，返回与纯Python分词器相同的结构。
+
+优化策略:
+- 不解码整个文件，只对模型名、骨骼名和变形名的字节切片解码
+- 数值直接用 strtod 从字节缓冲区解析
+- 不使用正则表达式，不创建中间行列表
+
+Shift-JIS的第二字节范围为0x40-0xFC，不会与 '/' ',' ';' '.' 以及行首的 '}' 混淆，
+条目头中的 '{' 紧跟在编号数字之后检查，因此可以安全地按ASCII字节切分。
+"""
+
+from libc.stdlib cimport strtod
+from libc.string cimport memchr
+from cpython.bytes cimport PyBytes_AS_STRING
+
+cdef bytes VPD_MAGIC = b"Vocaloid Pose Data file"
+
+
+cdef inline bint _is_space(char c) nogil:
+    return c == b' ' or c == b'\t' or c == b'\r' or c == b'\n' or c == b'\v' or c == b'\f'
+
+
+cdef class _VpdCursor:
+    """按行扫描VPD字节缓冲区的游标"""
+    cdef bytes _data
+    cdef const char* _ptr
+    cdef Py_ssize_t _pos
+    cdef Py_ssize_t _size
+    cdef Py_ssize_t line_number
+    cdef Py_ssize_t start
+    cdef Py_ssize_t end
+    cdef str _encoding
+
+    def __init__(self, bytes data, str encoding):
+        self._data = data
+        self._ptr = PyBytes_AS_STRING(data)
+        self._pos = 0
+        self._size = len(data)
+        self.line_number = 0
+        self.start = 0
+        self.end = 0
+        self._encoding = encoding
+
+    cdef bint next_line(self):
+        """前进到下一行（含空行），去除行尾的\\r，文件结束时返回False"""
+        cdef const char* nl
+        cdef Py_ssize_t end
+        if self._pos >= self._size:
+            return False
+        self.start = self._pos
+        nl = <const char*>memchr(self._ptr + self._pos, b'\n', self._size - self._pos)
+        if nl == NULL:
+            end = self._size
+            self._pos = self._size
+        else:
+            end = nl - self._ptr
+            self._pos = end + 1
+        while end > self.start and self._ptr[end - 1] == b'\r':
+            end -= 1
+        self.end = end
+        self.line_number += 1
+        return True
+
+    cdef bint next_content_line(self):
+        """前进到下一个非空白行，文件结束时返回False"""
+        cdef Py_ssize_t i
+        while self.next_line():
+            i = self.start
+            while i < self.end and _is_space(self._ptr[i]):
+                i += 1
+            if i < self.end:
+                return True
+        return False
+
+    cdef str decode(self, Py_ssize_t start, Py_ssize_t end):
+        return self._data[start:end].decode(self._encoding)
+
+    cdef str read_title(self):
+        """解析 "名称.osm;" 行，返回名称"""
+        cdef Py_ssize_t i = self.end - 5
+        while i >= self.start:
+            if (self._ptr[i] == b'.' and self._ptr[i + 1] == b'o' and self._ptr[i + 2] == b's'
+                    and self._ptr[i + 3] == b'm' and self._ptr[i + 4] == b';'):
+                return self.decode(self.start, i)
+            i -= 1
+        raise ValueError("找不到模型标题")
+
+    cdef int read_numbers(self, double* out, int count, str what) except -1:
+        """解析形如 "  a,b,c;  // 注释" 的数值行"""
+        cdef const char* p = self._ptr + self.start
+        cdef const char* e = self._ptr + self.end
+        cdef char* endp
+        cdef int k
+        cdef char sep
+        for k in range(count):
+            while p < e and _is_space(p[0]):
+                p += 1
+            if p >= e:
+                raise ValueError(f"找不到{what}")
+            out[k] = strtod(p, &endp)
+            if endp == p or endp > e:
+                raise ValueError(f"找不到{what}")
+            p = endp
+            while p < e and _is_space(p[0]):
+                p += 1
+            sep = b',' if k < count - 1 else b';'
+            if p >= e or p[0] != sep:
+                raise ValueError(f"找不到{what}")
+            p += 1
+        return 0
+
+    cdef str read_item_name(self, bytes prefix, str what):
+        """解析形如 "Bone0{名称  // 注释" 的条目头，返回名称"""
+        cdef Py_ssize_t plen = len(prefix)
+        cdef const char* pp = PyBytes_AS_STRING(prefix)
+        cdef Py_ssize_t i
+        cdef Py_ssize_t name_start
+        cdef Py_ssize_t name_end
+        if self.end - self.start < plen + 2:
+            raise ValueError(f"找不到{what}")
+        for i in range(plen):
+            if self._ptr[self.start + i] != pp[i]:
+                raise ValueError(f"找不到{what}")
+        i = self.start + plen
+        while i < self.end and b'0' <= self._ptr[i] <= b'9':
+            i += 1
+        if i == self.start + plen or i >= self.end or self._ptr[i] != b'{':
+            raise ValueError(f"找不到{what}")
+        name_start = i + 1
+        name_end = name_start
+        while name_end < self.end:
+            if (self._ptr[name_end] == b'/' and name_end + 1 < self.end
+                    and self._ptr[name_end + 1] == b'/'):
+                break
+            name_end += 1
+        while name_end > name_start and _is_space(self._ptr[name_end - 1]):
+            name_end -= 1
+        return self.decode(name_start, name_end)
+
+    cdef bint is_close(self):
+        cdef Py_ssize_t i = self.start
+        while i < self.end and _is_space(self._ptr[i]):
+            i += 1
+        return i < self.end and self._ptr[i] == b'}'
+
+
+cdef inline int _require_line(_VpdCursor cursor, str message) except -1:
+    if not cursor.next_content_line():
+        raise ValueError(message)
+    return 0
+
+
+cpdef tuple tokenize_vpd_cython(bytes data, str encoding):
+    """单遍扫描VPD字节数据
+
+    Args:
+        data: VPD文件字节（不含BOM）
+        encoding: 名称使用的编码
+
+    Returns:
+        (模型名称, [(骨骼名, [x, y, z], [qx, qy, qz, qw]), ...], [(变形名, 权重), ...])
+
+    Raises:
+        ValueError: 格式错误，信息中包含行号
+        UnicodeDecodeError: 名称无法按指定编码解码
+    """
+    cdef _VpdCursor cursor = _VpdCursor(data, encoding)
+    cdef double values[4]
+    cdef Py_ssize_t bone_count
+    cdef Py_ssize_t b
+    cdef list bones = []
+    cdef list morphs = []
+    cdef str model_name
+    cdef str name
+
+    if not cursor.next_line() or data[cursor.start:cursor.end] != VPD_MAGIC:
+        raise ValueError(f"无效的VPD文件头，期望: '{VPD_MAGIC.decode()}'")
+
+    try:
+        _require_line(cursor, "找不到模型标题")
+        model_name = cursor.read_title()
+
+        _require_line(cursor, "找不到骨骼数量")
+        cursor.read_numbers(values, 1, "骨骼数量")
+        bone_count = <Py_ssize_t>values[0]
+
+        for b in range(bone_count):
+            _require_line(cursor, "文件意外结束，骨骼数据不完整")
+            name = cursor.read_item_name(b"Bone", "骨骼名称")
+            _require_line(cursor, "文件意外结束，骨骼数据不完整")
+            cursor.read_numbers(values, 3, "骨骼位置")
+            position = [values[0], values[1], values[2]]
+            _require_line(cursor, "文件意外结束，骨骼数据不完整")
+            cursor.read_numbers(values, 4, "骨骼旋转")
+            rotation = [values[0], values[1], values[2], values[3]]
+            _require_line(cursor, "文件意外结束，骨骼数据不完整")
+            if not cursor.is_close():
+                raise ValueError("骨骼项未正确关闭")
+            bones.append((name, position, rotation))
+
+        while cursor.next_content_line():
+            name = cursor.read_item_name(b"Morph", "变形名称")
+            _require_line(cursor, "文件意外结束，变形数据不完整")
+            cursor.read_numbers(values, 1, "变形值")
+            weight = values[0]
+            _require_line(cursor, "文件意外结束，变形数据不完整")
+            if not cursor.is_close():
+                raise ValueError("变形项未正确关闭")
+            morphs.append((name, weight))
+    except ValueError as e:
+        if isinstance(e, UnicodeDecodeError):
+            raise
+        raise ValueError(f"第{cursor.line_number}行: {e}") from None
+
+    return model_name, bones, morphs
@@ -0,0 +1,707 @@
+"""
+PyPMXVMD 列式格式解析器
+
+在VMD/PMX/VPD数据模型与列式容器（.vmda / .pmxa / .vpda）之间转换。
+每个列表属性拆分为若干列，例如 "bone_frames.position"（每行3个float），
+名称类字段存为去重字符串列，头信息存为元数据，分析工具可以只读取需要的列。
+
+可变长度的子列表（骨骼的IK链接、变形项目、显示框项目等）存为一个偏移列加扁平的子元素列；
+可为None的骨骼字段用 bones.present 位掩码记录是否存在。变形项目按类型编码为定长的值，
+与角度类字段（由弧度换算为度）一样存为double，以便无损往返。
+"""
+
+from array import array
+from pathlib import Path
+from typing import List, Tuple, Union
+
+from pypmxvmd.common.io.columnar_io import ColumnarReader, ColumnarWriter
+from pypmxvmd.common.models.vmd import (
+    VmdMotion, VmdHeader, VmdBoneFrame, VmdMorphFrame, VmdCameraFrame,
+    VmdLightFrame, VmdShadowFrame, VmdIkFrame, VmdIkBone, ShadowMode
+)
+from pypmxvmd.common.models.pmx import (
+    PmxModel, PmxHeader, PmxVertex, PmxMaterial, MaterialFlags, WeightMode, SphMode,
+    PmxBone, PmxBoneIkLink, BoneFlags, PmxMorph, MorphType, MorphPanel, PmxMorphItemGroup,
+    PmxMorphItemVertex, PmxMorphItemBone, PmxMorphItemUV, PmxMorphItemMaterial,
+    PmxMorphItemFlip, PmxMorphItemImpulse, PmxFrame, PmxFrameItem, PmxRigidBody,
+    RigidBodyShape, RigidBodyPhysMode, PmxJoint, JointType
+)
+from pypmxvmd.common.models.vpd import VpdPose, VpdBonePose, VpdMorphPose, VpdPoseTable
+
+KIND_VMD = "VMD"
+KIND_PMX = "PMX"
+KIND_VPD = "VPD"
+KIND_VPD_TABLE = "VPDT"
+
+# 数据类型 -> 默认扩展名
+COLUMNAR_SUFFIXES = {
+    KIND_VMD: ".vmda",
+    KIND_PMX: ".pmxa",
+    KIND_VPD: ".vpda",
+    KIND_VPD_TABLE: ".vpda",
+}
+
+ColumnarData = Union[VmdMotion, PmxModel, VpdPose, VpdPoseTable]
+
+
+def _flatten(items: list, attr: str, width: int, typecode: str, what: str) -> array:
+    """把对象的定长列表属性展开为一维数组，并检查每个对象的分量数"""
+    data = array(typecode)
+    for item in items:
+        data.extend(getattr(item, attr))
+    if len(data) != width * len(items):
+        raise ValueError(f"{what}的{attr}分量数必须为{width}")
+    return data
+
+
+def _rows(values, width: int) -> List[list]:
+    """把按行展开的列切分为每行一个列表"""
+    flat = values.tolist()
+    return [flat[i:i + width] for i in range(0, len(flat), width)]
+
+
+def _flag_bits(flags: Union[MaterialFlags, BoneFlags]) -> int:
+    value = 0
+    for bit, enabled in enumerate(flags.to_list()):
+        if enabled:
+            value |= 1 << bit
+    return value
+
+
+def _offsets(groups: list, attr: str) -> array:
+    """各元素子列表的起始偏移（CSR），长度为元素数+1"""
+    offsets = array('I', [0])
+    for group in groups:
+        offsets.append(offsets[-1] + len(getattr(group, attr)))
+    return offsets
+
+
+# 可为None的骨骼字段: (属性, 分量数, 类型码)，bones.present 的第i位表示第i个字段存在
+_BONE_OPTIONAL_FIELDS = (
+    ("inherit_parent_index", 1, 'i'), ("inherit_ratio", 1, 'f'), ("fixed_axis", 3, 'f'),
+    ("local_axis_x", 3, 'f'), ("local_axis_z", 3, 'f'), ("external_parent_index", 1, 'i'),
+    ("ik_target_index", 1, 'i'), ("ik_loop_count", 1, 'i'), ("ik_angle_limit", 1, 'd'),
+)
+_TAIL_INDEX_BIT = 1 << len(_BONE_OPTIONAL_FIELDS)
+_TAIL_OFFSET_BIT = _TAIL_INDEX_BIT << 1
+
+
+_UV_ITEM_CODEC = ("vertex_index", 4, lambda item: item.offset,
+                  lambda index, v: PmxMorphItemUV(index, v))
+
+# 变形项目按类型编码为 (下标, 定长float值): 类型 -> (下标属性, 值个数, 编码, 解码)
+_MORPH_ITEM_CODECS = {
+    MorphType.GROUP: ("morph_index", 1, lambda item: [item.value],
+                      lambda index, v: PmxMorphItemGroup(index, v[0])),
+    MorphType.FLIP: ("morph_index", 1, lambda item: [item.value],
+                     lambda index, v: PmxMorphItemFlip(index, v[0])),
+    MorphType.VERTEX: ("vertex_index", 3, lambda item: item.offset,
+                       lambda index, v: PmxMorphItemVertex(index, v)),
+    MorphType.BONE: ("bone_index", 6, lambda item: item.translation + item.rotation,
+                     lambda index, v: PmxMorphItemBone(index, v[:3], v[3:])),
+    MorphType.MATERIAL: (
+        "material_index", 29,
+        lambda item: ([item.operation] + item.diffuse_color + item.specular_color
+                      + [item.specular_strength] + item.ambient_color + item.edge_color
+                      + [item.edge_size] + item.texture_color + item.sphere_color + item.toon_color),
+        lambda index, v: PmxMorphItemMaterial(index, int(v[0]), v[1:5], v[5:8], v[8], v[9:12],
+                                              v[12:16], v[16], v[17:21], v[21:25], v[25:29])),
+    MorphType.IMPULSE: ("rigidbody_index", 7,
+                        lambda item: [float(item.is_local)] + item.velocity + item.torque,
+                        lambda index, v: PmxMorphItemImpulse(index, bool(v[0]), v[1:4], v[4:7])),
+    MorphType.UV: _UV_ITEM_CODEC,
+    MorphType.EXTENDED_UV1: _UV_ITEM_CODEC,
+    MorphType.EXTENDED_UV2: _UV_ITEM_CODEC,
+    MorphType.EXTENDED_UV3: _UV_ITEM_CODEC,
+    MorphType.EXTENDED_UV4: _UV_ITEM_CODEC,
+}
+
+# 关节的向量字段，顺序与 PmxJoint 构造参数一致
+_JOINT_VECTORS = (("position", 'f'), ("rotation", 'd'), ("position_min", 'f'), ("position_max", 'f'),
+                  ("rotation_min", 'd'), ("rotation_max", 'd'), ("position_spring", 'f'),
+                  ("rotation_spring", 'f'))
+
+
+class ColumnarParser:
+    """列式格式解析器"""
+
+    def parse_file(self, file_path: Union[str, Path], more_info: bool = False) -> ColumnarData:
+        """读取列式文件并还原为数据模型
+
+        Args:
+            file_path: 列式文件路径
+            more_info: 是否显示更多解析信息
+
+        Returns:
+            VmdMotion、PmxModel、VpdPose 或 VpdPoseTable 对象
+
+        Raises:
+            FileNotFoundError: 文件不存在
+            ValueError: 文件格式错误
+        """
+        with ColumnarReader(file_path, use_mmap=False) as reader:
+            if more_info:
+                print(f"列式文件: {file_path}，类型: {reader.kind}，节数量: {len(reader.sections)}")
+            readers = {
+                KIND_VMD: self._read_vmd,
+                KIND_PMX: self._read_pmx,
+                KIND_VPD: self._read_vpd,
+                KIND_VPD_TABLE: self._read_vpd_table,
+            }
+            read = readers.get(reader.kind)
+            if read is None:
+                raise ValueError(f"不支持的列式数据类型: {reader.kind}")
+            try:
+                return read(reader)
+            except (ValueError, IndexError, KeyError) as e:
+                raise ValueError(f"列式文件解析失败: {e}") from e
+
+    def write_file(self, data: ColumnarData, file_path: Union[str, Path],
+                   compress: bool = False) -> None:
+        """把数据模型写入列式文件
+
+        Args:
+            data: VmdMotion、PmxModel、VpdPose 或 VpdPoseTable 对象
+            file_path: 输出文件路径
+            compress: 是否对各列使用zlib压缩
+
+        Raises:
+            ValueError: 数据类型不支持或数据无效
+        """
+        if isinstance(data, VmdMotion):
+            kind, write = KIND_VMD, self._write_vmd
+        elif isinstance(data, PmxModel):
+            kind, write = KIND_PMX, self._write_pmx
+        elif isinstance(data, VpdPose):
+            kind, write = KIND_VPD, self._write_vpd
+        elif isinstance(data, VpdPoseTable):
+            kind, write = KIND_VPD_TABLE, self._write_vpd_table
+        else:
+            raise ValueError(f"不支持的数据类型: {type(data)}")
+
+        try:
+            with ColumnarWriter(file_path, kind, compress=compress) as writer:
+                write(writer, data)
+        except (TypeError, OverflowError, AttributeError) as e:
+            raise ValueError(f"列式文件写入失败: {e}") from e
+
+    # ===== VMD =====
+
+    def _write_vmd(self, writer: ColumnarWriter, motion: VmdMotion) -> None:
+        writer.add_metadata("header", {"version": motion.header.version,
+                                       "model_name": motion.header.model_name})
+
+        frames = motion.bone_frames
+        writer.add_strings("bone_frames.bone_name", (f.bone_name for f in frames))
+        writer.add_column("bone_frames.frame_number", (f.frame_number for f in frames), 'I')
+        writer.add_column("bone_frames.position", _flatten(frames, "position", 3, 'f', "骨骼关键帧"), 'f', 3)
+        writer.add_column("bone_frames.rotation", _flatten(frames, "rotation", 3, 'd', "骨骼关键帧"), 'd', 3)
+        writer.add_column("bone_frames.interpolation",
+                          _flatten(frames, "interpolation", 16, 'b', "骨骼关键帧"), 'b', 16)
+        writer.add_column("bone_frames.physics_disabled", (f.physics_disabled for f in frames), 'B')
+
+        frames = motion.morph_frames
+        writer.add_strings("morph_frames.morph_name", (f.morph_name for f in frames))
+        writer.add_column("morph_frames.frame_number", (f.frame_number for f in frames), 'I')
+        writer.add_column("morph_frames.weight", (f.weight for f in frames), 'f')
+
+        frames = motion.camera_frames
+        writer.add_column("camera_frames.frame_number", (f.frame_number for f in frames), 'I')
+        writer.add_column("camera_frames.distance", (f.distance for f in frames), 'f')
+        writer.add_column("camera_frames.position", _flatten(frames, "position", 3, 'f', "相机关键帧"), 'f', 3)
+        writer.add_column("camera_frames.rotation", _flatten(frames, "rotation", 3, 'd', "相机关键帧"), 'd', 3)
+        writer.add_column("camera_frames.interpolation",
+                          _flatten(frames, "interpolation", 24, 'b', "相机关键帧"), 'b', 24)
+        writer.add_column("camera_frames.fov", (f.fov for f in frames), 'I')
+        writer.add_column("camera_frames.perspective", (f.perspective for f in frames), 'B')
+
+        frames = motion.light_frames
+        writer.add_column("light_frames.frame_number", (f.frame_number for f in frames), 'I')
+        writer.add_column("light_frames.color", _flatten(frames, "color", 3, 'f', "光照关键帧"), 'f', 3)
+        writer.add_column("light_frames.position", _flatten(frames, "position", 3, 'f', "光照关键帧"), 'f', 3)
+
+        frames = motion.shadow_frames
+        writer.add_column("shadow_frames.frame_number", (f.frame_number for f in frames), 'I')
+        writer.add_column("shadow_frames.shadow_mode", (int(f.shadow_mode) for f in frames), 'b')
+        writer.add_column("shadow_frames.distance", (f.distance for f in frames), 'f')
+
+        frames = motion.ik_frames
+        offsets = array('I', [0])
+        for frame in frames:
+            offsets.append(offsets[-1] + len(frame.ik_bones))
+        ik_bones = [bone for frame in frames for bone in frame.ik_bones]
+        writer.add_column("ik_frames.frame_number", (f.frame_number for f in frames), 'I')
+        writer.add_column("ik_frames.display", (f.display for f in frames), 'B')
+        writer.add_column("ik_frames.bone_offsets", offsets, 'I')
+        writer.add_strings("ik_bones.bone_name", (b.bone_name for b in ik_bones))
+        writer.add_column("ik_bones.ik_enabled", (b.ik_enabled for b in ik_bones), 'B')
+
+    def _read_vmd(self, reader: ColumnarReader) -> VmdMotion:
+        motion = VmdMotion()
+        header = reader.metadata("header")
+        motion.header = VmdHeader(version=header["version"], model_name=header["model_name"])
+
+        names = reader.strings("bone_frames.bone_name")
+        positions = _rows(reader.column("bone_frames.position"), 3)
+        rotations = _rows(reader.column("bone_frames.rotation"), 3)
+        interpolations = _rows(reader.column("bone_frames.interpolation"), 16)
+        motion.bone_frames = [
+            VmdBoneFrame(bone_name=name, frame_number=frame, position=position, rotation=rotation,
+                         interpolation=interpolation, physics_disabled=bool(physics))
+            for name, frame, position, rotation, interpolation, physics in zip(
+                names, reader.column("bone_frames.frame_number").tolist(), positions, rotations,
+                interpolations, reader.column("bone_frames.physics_disabled").tolist())
+        ]
+
+        motion.morph_frames = [
+            VmdMorphFrame(morph_name=name, frame_number=frame, weight=weight)
+            for name, frame, weight in zip(reader.strings("morph_frames.morph_name"),
+                                           reader.column("morph_frames.frame_number").tolist(),
+                                           reader.column("morph_frames.weight").tolist())
+        ]
+
+        motion.camera_frames = [
+            VmdCameraFrame(frame_number=frame, distance=distance, position=position,
+                           rotation=rotation, interpolation=interpolation, fov=fov,
+                           perspective=bool(perspective))
+            for frame, distance, position, rotation, interpolation, fov, perspective in zip(
+                reader.column("camera_frames.frame_number").tolist(),
+                reader.column("camera_frames.distance").tolist(),
+                _rows(reader.column("camera_frames.position"), 3),
+                _rows(reader.column("camera_frames.rotation"), 3),
+                _rows(reader.column("camera_frames.interpolation"), 24),
+                reader.column("camera_frames.fov").tolist(),
+                reader.column("camera_frames.perspective").tolist())
+        ]
+
+        motion.light_frames = [
+            VmdLightFrame(frame_number=frame, color=color, position=position)
+            for frame, color, position in zip(reader.column("light_frames.frame_number").tolist(),
+                                              _rows(reader.column("light_frames.color"), 3),
+                                              _rows(reader.column("light_frames.position"), 3))
+        ]
+
+        motion.shadow_frames = [
+            VmdShadowFrame(frame_number=frame, shadow_mode=ShadowMode(mode), distance=distance)
+            for frame, mode, distance in zip(reader.column("shadow_frames.frame_number").tolist(),
+                                             reader.column("shadow_frames.shadow_mode").tolist(),
+                                             reader.column("shadow_frames.distance").tolist())
+        ]
+
+        offsets = reader.column("ik_frames.bone_offsets").tolist()
+        ik_bones = [VmdIkBone(bone_name=name, ik_enabled=bool(enabled))
+                    for name, enabled in zip(reader.strings("ik_bones.bone_name"),
+                                             reader.column("ik_bones.ik_enabled").tolist())]
+        motion.ik_frames = [
+            VmdIkFrame(frame_number=frame, display=bool(display),
+                       ik_bones=ik_bones[offsets[i]:offsets[i + 1]])
+            for i, (frame, display) in enumerate(zip(reader.column("ik_frames.frame_number").tolist(),
+                                                     reader.column("ik_frames.display").tolist()))
+        ]
+        return motion
+
+    # ===== PMX =====
+
+    def _write_pmx(self, writer: ColumnarWriter, model: PmxModel) -> None:
+        header = model.header
+        writer.add_metadata("header", {"version": header.version, "name_jp": header.name_jp,
+                                       "name_en": header.name_en, "comment_jp": header.comment_jp,
+                                       "comment_en": header.comment_en})
+
+        vertices = model.vertices
+        writer.add_column("vertices.position", _flatten(vertices, "position", 3, 'f', "顶点"), 'f', 3)
+        writer.add_column("vertices.normal", _flatten(vertices, "normal", 3, 'f', "顶点"), 'f', 3)
+        writer.add_column("vertices.uv", _flatten(vertices, "uv", 2, 'f', "顶点"), 'f', 2)
+        uv_offsets, extra_uvs = array('I', [0]), array('f')
+        weight_offsets, weight_bones, weight_values = array('I', [0]), array('i'), array('f')
+        for vertex in vertices:
+            for uv in vertex.additional_uvs:
+                if len(uv) != 4:
+                    raise ValueError("顶点的附加UV分量数必须为4")
+                extra_uvs.extend(uv)
+            uv_offsets.append(len(extra_uvs) // 4)
+            for bone, weight in vertex.weight:
+                weight_bones.append(bone)
+                weight_values.append(weight)
+            weight_offsets.append(len(weight_bones))
+        writer.add_column("vertices.additional_uv_offsets", uv_offsets, 'I')
+        writer.add_column("vertices.additional_uvs", extra_uvs, 'f', 4)
+        writer.add_column("vertices.weight_mode", (int(v.weight_mode) for v in vertices), 'B')
+        writer.add_column("vertices.weight_offsets", weight_offsets, 'I')
+        writer.add_column("vertices.weight_bones", weight_bones, 'i')
+        writer.add_column("vertices.weight_values", weight_values, 'f')
+        writer.add_column("vertices.edge_scale", (v.edge_scale for v in vertices), 'f')
+
+        faces = array('I')
+        for face in model.faces:
+            faces.extend(face)
+        if len(faces) != 3 * len(model.faces):
+            raise ValueError("每个面必须包含3个顶点索引")
+        writer.add_column("faces.indices", faces, 'I', 3)
+        writer.add_strings("textures.path", model.textures)
+
+        materials = model.materials
+        writer.add_strings("materials.name_jp", (m.name_jp for m in materials))
+        writer.add_strings("materials.name_en", (m.name_en for m in materials))
+        writer.add_column("materials.diffuse_color", _flatten(materials, "diffuse_color", 4, 'f', "材质"), 'f', 4)
+        writer.add_column("materials.specular_color", _flatten(materials, "specular_color", 3, 'f', "材质"), 'f', 3)
+        writer.add_column("materials.specular_strength", (m.specular_strength for m in materials), 'f')
+        writer.add_column("materials.ambient_color", _flatten(materials, "ambient_color", 3, 'f', "材质"), 'f', 3)
+        writer.add_column("materials.flags", (_flag_bits(m.flags) for m in materials), 'B')
+        writer.add_column("materials.edge_color", _flatten(materials, "edge_color", 4, 'f', "材质"), 'f', 4)
+        writer.add_column("materials.edge_size", (m.edge_size for m in materials), 'f')
+        writer.add_strings("materials.texture_path", (m.texture_path for m in materials))
+        writer.add_strings("materials.sphere_path", (m.sphere_path for m in materials))
+        writer.add_column("materials.sphere_mode", (int(m.sphere_mode) for m in materials), 'B')
+        writer.add_strings("materials.toon_path", (m.toon_path for m in materials))
+        writer.add_strings("materials.comment", (m.comment for m in materials))
+        writer.add_column("materials.face_count", (m.face_count for m in materials), 'I')
+
+        if model.softbodies:
+            raise ValueError("列式格式不支持软体")
+        self._write_bones(writer, model.bones)
+        self._write_morphs(writer, model.morphs)
+        self._write_frames(writer, model.frames)
+        self._write_physics(writer, model.rigidbodies, model.joints)
+
+    def _write_bones(self, writer: ColumnarWriter, bones: list) -> None:
+        writer.add_strings("bones.name_jp", (b.name_jp for b in bones))
+        writer.add_strings("bones.name_en", (b.name_en for b in bones))
+        writer.add_column("bones.position", _flatten(bones, "position", 3, 'f', "骨骼"), 'f', 3)
+        writer.add_column("bones.parent_index", (b.parent_index for b in bones), 'i')
+        writer.add_column("bones.deform_layer", (b.deform_layer for b in bones), 'i')
+        writer.add_column("bones.flags", (_flag_bits(b.bone_flags) for b in bones), 'H')
+
+        present = array('H')
+        tail_index, tail_offset = array('i'), array('f')
+        for bone in bones:
+            bits = 0
+            for bit, (attr, _width, _typecode) in enumerate(_BONE_OPTIONAL_FIELDS):
+                if getattr(bone, attr) is not None:
+                    bits |= 1 << bit
+            tail = bone.tail
+            if isinstance(tail, int):
+                bits |= _TAIL_INDEX_BIT
+                tail_index.append(tail)
+                tail_offset.extend((0.0, 0.0, 0.0))
+            else:
+                if tail is not None:
+                    bits |= _TAIL_OFFSET_BIT
+                    if len(tail) != 3:
+                        raise ValueError("骨骼的tail分量数必须为3")
+                tail_index.append(0)
+                tail_offset.extend(tail if tail is not None else (0.0, 0.0, 0.0))
+            present.append(bits)
+        writer.add_column("bones.present", present, 'H')
+        writer.add_column("bones.tail_index", tail_index, 'i')
+        writer.add_column("bones.tail_offset", tail_offset, 'f', 3)
+        for attr, width, typecode in _BONE_OPTIONAL_FIELDS:
+            values = array(typecode)
+            for bone in bones:
+                value = getattr(bone, attr)
+                if value is None:
+                    values.extend([0] * width)
+                elif width == 1:
+                    values.append(value)
+                elif len(value) == width:
+                    values.extend(value)
+                else:
+                    raise ValueError(f"骨骼的{attr}分量数必须为{width}")
+            writer.add_column(f"bones.{attr}", values, typecode, width)
+
+        links = [link for bone in bones for link in bone.ik_links]
+        writer.add_column("bones.ik_link_offsets", _offsets(bones, "ik_links"), 'I')
+        writer.add_column("ik_links.bone_index", (link.bone_index for link in links), 'i')
+        writer.add_column("ik_links.limited", (link.limit_min is not None for link in links), 'B')
+        limits = array('d')
+        for link in links:
+            if link.limit_min is None:
+                limits.extend((0.0,) * 6)
+            elif len(link.limit_min) == 3 and len(link.limit_max) == 3:
+                limits.extend(link.limit_min)
+                limits.extend(link.limit_max)
+            else:
+                raise ValueError("IK链接的角度限制分量数必须为3")
+        writer.add_column("ik_links.limits", limits, 'd', 6)
+
+    def _write_morphs(self, writer: ColumnarWriter, morphs: list) -> None:
+        writer.add_strings("morphs.name_jp", (m.name_jp for m in morphs))
+        writer.add_strings("morphs.name_en", (m.name_en for m in morphs))
+        writer.add_column("morphs.panel", (int(m.panel) for m in morphs), 'B')
+        writer.add_column("morphs.morph_type", (int(m.morph_type) for m in morphs), 'B')
+        writer.add_column("morphs.item_offsets", _offsets(morphs, "items"), 'I')
+        indices, values = array('i'), array('d')
+        for morph in morphs:
+            codec = _MORPH_ITEM_CODECS.get(morph.morph_type)
+            if codec is None:
+                raise ValueError(f"不支持的变形类型: {morph.morph_type}")
+            index_attr, width, encode, _decode = codec
+            for item in morph.items:
+                row = encode(item)
+                if len(row) != width:
+                    raise ValueError(f"变形 {morph.name_jp} 的项目分量数必须为{width}")
+                indices.append(getattr(item, index_attr))
+                values.extend(row)
+        writer.add_column("morph_items.index", indices, 'i')
+        writer.add_column("morph_items.values", values, 'd')
+
+    def _write_frames(self, writer: ColumnarWriter, frames: list) -> None:
+        items = [item for frame in frames for item in frame.items]
+        writer.add_strings("frames.name_jp", (f.name_jp for f in frames))
+        writer.add_strings("frames.name_en", (f.name_en for f in frames))
+        writer.add_column("frames.is_special", (f.is_special for f in frames), 'B')
+        writer.add_column("frames.item_offsets", _offsets(frames, "items"), 'I')
+        writer.add_column("frame_items.is_morph", (item.is_morph for item in items), 'B')
+        writer.add_column("frame_items.index", (item.index for item in items), 'i')
+
+    def _write_physics(self, writer: ColumnarWriter, bodies: list, joints: list) -> None:
+        writer.add_strings("rigidbodies.name_jp", (b.name_jp for b in bodies))
+        writer.add_strings("rigidbodies.name_en", (b.name_en for b in bodies))
+        writer.add_column("rigidbodies.bone_index", (b.bone_index for b in bodies), 'i')
+        writer.add_column("rigidbodies.group", (b.group for b in bodies), 'i')
+        writer.add_column("rigidbodies.nocollide_offsets", _offsets(bodies, "nocollide_groups"), 'I')
+        writer.add_column("rigidbodies.nocollide_groups",
+                          (group for b in bodies for group in b.nocollide_groups), 'i')
+        writer.add_column("rigidbodies.shape", (int(b.shape) for b in bodies), 'B')
+        writer.add_column("rigidbodies.size", _flatten(bodies, "size", 3, 'f', "刚体"), 'f', 3)
+        writer.add_column("rigidbodies.position", _flatten(bodies, "position", 3, 'f', "刚体"), 'f', 3)
+        writer.add_column("rigidbodies.rotation", _flatten(bodies, "rotation", 3, 'd', "刚体"), 'd', 3)
+        writer.add_column("rigidbodies.physics_mode", (int(b.physics_mode) for b in bodies), 'B')
+        for attr in ("mass", "move_damping", "rotation_damping", "repulsion", "friction"):
+            writer.add_column(f"rigidbodies.{attr}", (getattr(b, attr) for b in bodies), 'f')
+
+        writer.add_strings("joints.name_jp", (j.name_jp for j in joints))
+        writer.add_strings("joints.name_en", (j.name_en for j in joints))
+        writer.add_column("joints.joint_type", (int(j.joint_type) for j in joints), 'B')
+        writer.add_column("joints.rigidbody1_index", (j.rigidbody1_index for j in joints), 'i')
+        writer.add_column("joints.rigidbody2_index", (j.rigidbody2_index for j in joints), 'i')
+        for attr, typecode in _JOINT_VECTORS:
+            writer.add_column(f"joints.{attr}", _flatten(joints, attr, 3, typecode, "关节"), typecode, 3)
+
+    def _read_pmx(self, reader: ColumnarReader) -> PmxModel:
+        model = PmxModel()
+        header = reader.metadata("header")
+        model.header = PmxHeader(version=header["version"], name_jp=header["name_jp"],
+                                 name_en=header["name_en"], comment_jp=header["comment_jp"],
+                                 comment_en=header["comment_en"])
+
+        uv_offsets = reader.column("vertices.additional_uv_offsets").tolist()
+        extra_uvs = _rows(reader.column("vertices.additional_uvs"), 4)
+        weight_offsets = reader.column("vertices.weight_offsets").tolist()
+        weight_pairs = [list(pair) for pair in zip(reader.column("vertices.weight_bones").tolist(),
+                                                   reader.column("vertices.weight_values").tolist())]
+        model.vertices = [
+            PmxVertex(position=position, normal=normal, uv=uv,
+                      additional_uvs=extra_uvs[uv_offsets[i]:uv_offsets[i + 1]],
+                      weight_mode=WeightMode(mode),
+                      weight=weight_pairs[weight_offsets[i]:weight_offsets[i + 1]],
+                      edge_scale=edge_scale)
+            for i, (position, normal, uv, mode, edge_scale) in enumerate(zip(
+                _rows(reader.column("vertices.position"), 3),
+                _rows(reader.column("vertices.normal"), 3),
+                _rows(reader.column("vertices.uv"), 2),
+                reader.column("vertices.weight_mode").tolist(),
+                reader.column("vertices.edge_scale").tolist()))
+        ]
+
+        model.faces = _rows(reader.column("faces.indices"), 3)
+        model.textures = reader.strings("textures.path")
+
+        model.materials = [
+            PmxMaterial(name_jp=name_jp, name_en=name_en, diffuse_color=diffuse,
+                        specular_color=specular, specular_strength=strength, ambient_color=ambient,
+                        flags=MaterialFlags(flags), edge_color=edge_color, edge_size=edge_size,
+                        texture_path=texture, sphere_path=sphere, sphere_mode=SphMode(sphere_mode),
+                        toon_path=toon, comment=comment, face_count=face_count)
+            for (name_jp, name_en, diffuse, specular, strength, ambient, flags, edge_color,
+                 edge_size, texture, sphere, sphere_mode, toon, comment, face_count) in zip(
+                reader.strings("materials.name_jp"),
+                reader.strings("materials.name_en"),
+                _rows(reader.column("materials.diffuse_color"), 4),
+                _rows(reader.column("materials.specular_color"), 3),
+                reader.column("materials.specular_strength").tolist(),
+                _rows(reader.column("materials.ambient_color"), 3),
+                reader.column("materials.flags").tolist(),
+                _rows(reader.column("materials.edge_color"), 4),
+                reader.column("materials.edge_size").tolist(),
+                reader.strings("materials.texture_path"),
+                reader.strings("materials.sphere_path"),
+                reader.column("materials.sphere_mode").tolist(),
+                reader.strings("materials.toon_path"),
+                reader.strings("materials.comment"),
+                reader.column("materials.face_count").tolist())
+        ]
+
+        # 早期写入的文件没有以下节
+        if "bones.name_jp" in reader:
+            model.bones = self._read_bones(reader)
+            model.morphs = self._read_morphs(reader)
+            model.frames = self._read_frames(reader)
+            model.rigidbodies, model.joints = self._read_physics(reader)
+        return model
+
+    def _read_bones(self, reader: ColumnarReader) -> List[PmxBone]:
+        optional = [_rows(reader.column(f"bones.{attr}"), width) if width > 1
+                    else reader.column(f"bones.{attr}").tolist()
+                    for attr, width, _typecode in _BONE_OPTIONAL_FIELDS]
+        link_offsets = reader.column("bones.ik_link_offsets").tolist()
+        links = [PmxBoneIkLink(bone_index, limits[:3], limits[3:]) if limited
+                 else PmxBoneIkLink(bone_index)
+                 for bone_index, limited, limits in zip(reader.column("ik_links.bone_index").tolist(),
+                                                        reader.column("ik_links.limited").tolist(),
+                                                        _rows(reader.column("ik_links.limits"), 6))]
+        tail_indices = reader.column("bones.tail_index").tolist()
+        tail_offsets = _rows(reader.column("bones.tail_offset"), 3)
+
+        bones = []
+        for i, (name_jp, name_en, position, parent, layer, flags, present) in enumerate(zip(
+                reader.strings("bones.name_jp"), reader.strings("bones.name_en"),
+                _rows(reader.column("bones.position"), 3),
+                reader.column("bones.parent_index").tolist(),
+                reader.column("bones.deform_layer").tolist(),
+                reader.column("bones.flags").tolist(),
+                reader.column("bones.present").tolist())):
+            fields = {attr: optional[k][i] if present >> k & 1 else None
+                      for k, (attr, _width, _typecode) in enumerate(_BONE_OPTIONAL_FIELDS)}
+            if present & _TAIL_INDEX_BIT:
+                tail = tail_indices[i]
+            elif present & _TAIL_OFFSET_BIT:
+                tail = tail_offsets[i]
+            else:
+                tail = None
+            bones.append(PmxBone(
+                name_jp=name_jp, name_en=name_en, position=position, parent_index=parent,
+                deform_layer=layer, bone_flags=BoneFlags(*(bool(flags >> bit & 1) for bit in range(12))),
+                tail=tail, ik_links=links[link_offsets[i]:link_offsets[i + 1]], **fields))
+        return bones
+
+    def _read_morphs(self, reader: ColumnarReader) -> List[PmxMorph]:
+        offsets = reader.column("morphs.item_offsets").tolist()
+        indices = reader.column("morph_items.index").tolist()
+        values = reader.column("morph_items.values").tolist()
+        morphs = []
+        pos = 0
+        for i, (name_jp, name_en, panel, morph_type) in enumerate(zip(
+                reader.strings("morphs.name_jp"), reader.strings("morphs.name_en"),
+                reader.column("morphs.panel").tolist(),
+                reader.column("morphs.morph_type").tolist())):
+            morph_type = MorphType(morph_type)
+            _index_attr, width, _encode, decode = _MORPH_ITEM_CODECS[morph_type]
+            items = []
+            for index in indices[offsets[i]:offsets[i + 1]]:
+                items.append(decode(index, values[pos:pos + width]))
+                pos += width
+            morphs.append(PmxMorph(name_jp=name_jp, name_en=name_en, panel=MorphPanel(panel),
+                                   morph_type=morph_type, items=items))
+        if pos != len(values):
+            raise ValueError("变形项目数据长度与变形类型不一致")
+        return morphs
+
+    def _read_frames(self, reader: ColumnarReader) -> List[PmxFrame]:
+        offsets = reader.column("frames.item_offsets").tolist()
+        items = [PmxFrameItem(is_morph=bool(is_morph), index=index)
+                 for is_morph, index in zip(reader.column("frame_items.is_morph").tolist(),
+                                            reader.column("frame_items.index").tolist())]
+        return [
+            PmxFrame(name_jp=name_jp, name_en=name_en, is_special=bool(is_special),
+                     items=items[offsets[i]:offsets[i + 1]])
+            for i, (name_jp, name_en, is_special) in enumerate(zip(
+                reader.strings("frames.name_jp"), reader.strings("frames.name_en"),
+                reader.column("frames.is_special").tolist()))
+        ]
+
+    def _read_physics(self, reader: ColumnarReader) -> Tuple[List[PmxRigidBody], List[PmxJoint]]:
+        offsets = reader.column("rigidbodies.nocollide_offsets").tolist()
+        groups = reader.column("rigidbodies.nocollide_groups").tolist()
+        scalars = [reader.column(f"rigidbodies.{attr}").tolist()
+                   for attr in ("mass", "move_damping", "rotation_damping", "repulsion", "friction")]
+        bodies = [
+            PmxRigidBody(name_jp=name_jp, name_en=name_en, bone_index=bone_index, group=group,
+                         nocollide_groups=groups[offsets[i]:offsets[i + 1]],
+                         shape=RigidBodyShape(shape), size=size, position=position,
+                         rotation=rotation, physics_mode=RigidBodyPhysMode(mode),
+                         mass=scalars[0][i], move_damping=scalars[1][i],
+                         rotation_damping=scalars[2][i], repulsion=scalars[3][i],
+                         friction=scalars[4][i])
+            for i, (name_jp, name_en, bone_index, group, shape, size, position, rotation, mode)
+            in enumerate(zip(reader.strings("rigidbodies.name_jp"),
+                             reader.strings("rigidbodies.name_en"),
+                             reader.column("rigidbodies.bone_index").tolist(),
+                             reader.column("rigidbodies.group").tolist(),
+                             reader.column("rigidbodies.shape").tolist(),
+                             _rows(reader.column("rigidbodies.size"), 3),
+                             _rows(reader.column("rigidbodies.position"), 3),
+                             _rows(reader.column("rigidbodies.rotation"), 3),
+                             reader.column("rigidbodies.physics_mode").tolist()))
+        ]
+        vectors = [_rows(reader.column(f"joints.{attr}"), 3) for attr, _typecode in _JOINT_VECTORS]
+        joints = [
+            PmxJoint(name_jp, name_en, JointType(joint_type), body1, body2,
+                     *(column[i] for column in vectors))
+            for i, (name_jp, name_en, joint_type, body1, body2) in enumerate(zip(
+                reader.strings("joints.name_jp"), reader.strings("joints.name_en"),
+                reader.column("joints.joint_type").tolist(),
+                reader.column("joints.rigidbody1_index").tolist(),
+                reader.column("joints.rigidbody2_index").tolist()))
+        ]
+        return bodies, joints
+
+    # ===== VPD =====
+
+    def _write_vpd(self, writer: ColumnarWriter, pose: VpdPose) -> None:
+        writer.add_metadata("header", {"model_name": pose.model_name})
+        bones = pose.bone_poses
+        writer.add_strings("bone_poses.bone_name", (b.bone_name for b in bones))
+        writer.add_column("bone_poses.position", _flatten(bones, "position", 3, 'f', "骨骼姿势"), 'f', 3)
+        writer.add_column("bone_poses.rotation", _flatten(bones, "rotation", 4, 'f', "骨骼姿势"), 'f', 4)
+        morphs = pose.morph_poses
+        writer.add_strings("morph_poses.morph_name", (m.morph_name for m in morphs))
+        writer.add_column("morph_poses.weight", (m.weight for m in morphs), 'f')
+
+    def _read_vpd(self, reader: ColumnarReader) -> VpdPose:
+        bone_poses = [
+            VpdBonePose(bone_name=name, position=position, rotation=rotation)
+            for name, position, rotation in zip(reader.strings("bone_poses.bone_name"),
+                                                _rows(reader.column("bone_poses.position"), 3),
+                                                _rows(reader.column("bone_poses.rotation"), 4))
+        ]
+        morph_poses = [
+            VpdMorphPose(morph_name=name, weight=weight)
+            for name, weight in zip(reader.strings("morph_poses.morph_name"),
+                                    reader.column("morph_poses.weight").tolist())
+        ]
+        return VpdPose(model_name=reader.metadata("header")["model_name"],
+                       bone_poses=bone_poses, morph_poses=morph_poses)
+
+    def _write_vpd_table(self, writer: ColumnarWriter, table: VpdPoseTable) -> None:
+        writer.add_metadata("header", {"bone_names": table.bone_names,
+                                       "morph_names": table.morph_names,
+                                       "errors": table.errors})
+        writer.add_strings("poses.file_path", table.file_paths)
+        writer.add_strings("poses.model_name", table.model_names)
+        writer.add_column("poses.bone_offsets", table.bone_offsets, 'q')
+        writer.add_column("poses.morph_offsets", table.morph_offsets, 'q')
+        writer.add_column("bones.index", table.bone_indices, 'i')
+        writer.add_column("bones.position", table.positions, 'f', 3)
+        writer.add_column("bones.rotation", table.rotations, 'f', 4)
+        writer.add_column("morphs.index", table.morph_indices, 'i')
+        writer.add_column("morphs.weight", table.morph_weights, 'f')
+
+    def _read_vpd_table(self, reader: ColumnarReader) -> VpdPoseTable:
+        header = reader.metadata("header")
+        table = VpdPoseTable()
+        for name in header["bone_names"]:
+            table._intern(name, table.bone_names, table._bone_lookup)
+        for name in header["morph_names"]:
+            table._intern(name, table.morph_names, table._morph_lookup)
+        table.errors = dict(header["errors"])
+        table.file_paths = reader.strings("poses.file_path")
+        table.model_names = reader.strings("poses.model_name")
+        table.bone_offsets = array('q', reader.column("poses.bone_offsets"))
+        table.morph_offsets = array('q', reader.column("poses.morph_offsets"))
+        table.bone_indices = array('i', reader.column("bones.index"))
+        table.positions = array('f', reader.column("bones.position"))
+        table.rotations = array('f', reader.column("bones.rotation"))
+        table.morph_indices = array('i', reader.column("morphs.index"))
+        table.morph_weights = array('f', reader.column("morphs.weight"))
+        return table
@@ -6,14 +6,22 @@ PyPMXVMD PMX解析器
 """
 
 import struct
+import sys
+from array import array
 from pathlib import Path
-from typing import List, Optional, Union
+from typing import Iterator, List, Optional, Tuple, Union
 
 from pypmxvmd.common.models.pmx import (
-    PmxModel, PmxHeader, PmxVertex, PmxMaterial, WeightMode, SphMode, MaterialFlags
+    PmxModel, PmxHeader, PmxVertex, PmxMaterial, PmxBone, PmxMorph, PmxNameTable, PmxMeshIndex,
+    WeightMode, SphMode, MaterialFlags
 )
 from pypmxvmd.common.io.binary_io import BinaryIOHandler
-from pypmxvmd.common.parsers.pmx_parser_nuthouse import PmxParserNuthouse
+from pypmxvmd.common.parsers.pmx_sections import parse_bones_and_morphs
+from pypmxvmd.common.io.text_io import (
+    TextRowReader, TextChunkWriter, RowFormatter, DEFAULT_FLOAT_PRECISION, parse_floats,
+    parse_float_rows, parse_int_rows
+)
+from pypmxvmd.common import instrumentation
 
 # 尝试导入Cython优化模块
 try:
@@ -34,6 +42,7 @@ class PmxParser:
         """初始化PMX解析器"""
         self._io_handler = BinaryIOHandler("utf-16le")  # PMX默认使用UTF-16LE
         self._use_utf8 = False  # 编码标志
+        self._face_indices = None  # 快速解析读入的扁平面索引
         self._progress_callback = None
         
         # 索引类型格式字符串
@@ -151,22 +160,30 @@ class PmxParser:
 
         # 创建PMX模型对象
         pmx_model = PmxModel()
+        trace = instrumentation.tracer("pmx", "parse", "fast", self._io_handler.get_position)
+        start_ns = instrumentation.now_ns()
 
         try:
             # 解析文件头
-            pmx_model.header = self._parse_header_fast()
+            pmx_model.header = trace.run("header", self._parse_header_fast)
 
             # 根据头信息设置解析参数（使用快速版本）
             self._setup_parsing_parameters_fast()
 
             # 解析各个数据段
-            pmx_model.vertices = self._parse_vertices_fast(more_info)
-            pmx_model.faces = self._parse_faces_fast(more_info)
-            pmx_model.materials = self._parse_materials_fast(more_info)
+            pmx_model.vertices = trace.run("vertices", self._parse_vertices_fast, more_info)
+            pmx_model.faces = trace.run("faces", self._parse_faces_fast, more_info)
+            pmx_model.materials = trace.run("materials", self._parse_materials_fast, more_info)
+            pmx_model.bones, pmx_model.morphs = trace.run("bones_morphs", self._parse_bones_and_morphs_fast,
+                                                          more_info)
+            self._attach_mesh_index(pmx_model, self._face_indices)
+            trace.file(instrumentation.now_ns() - start_ns, self._io_handler.get_total_size(),
+                       self._count_elements(pmx_model))
 
             if more_info:
                 print(f"PMX快速解析完成: {len(pmx_model.vertices)}个顶点, "
-                      f"{len(pmx_model.faces)}个面, {len(pmx_model.materials)}个材质")
+                      f"{len(pmx_model.faces)}个面, {len(pmx_model.materials)}个材质, "
+                      f"{len(pmx_model.bones)}个骨骼, {len(pmx_model.morphs)}个变形")
 
             return pmx_model
 
@@ -201,16 +218,24 @@ class PmxParser:
 
             try:
                 # 使用Cython模块解析
+                start_ns = instrumentation.now_ns()
                 pmx_model = parse_pmx_cython(data, more_info)
+                self._attach_mesh_index(pmx_model)
+                instrumentation.tracer("pmx", "parse", "cython").file(
+                    instrumentation.now_ns() - start_ns, len(data), self._count_elements(pmx_model))
                 return pmx_model
             except Exception as e:
+                instrumentation.report_fallback("pmx", "parse", "cython", "fast", e, file_path)
                 if more_info:
                     print(f"Cython解析失败，回退到快速解析: {e}")
+        else:
+            instrumentation.report_fallback("pmx", "parse", "cython", "fast", None, file_path)
 
         # 回退到快速解析
         try:
             return self.parse_file_fast(file_path, more_info)
         except Exception as e:
+            instrumentation.report_fallback("pmx", "parse", "fast", "nuthouse", e, file_path)
             if more_info:
                 print(f"快速解析失败，回退到Nuthouse解析: {e}")
 
@@ -219,8 +244,153 @@ class PmxParser:
     def _parse_file_nuthouse(self, file_path: Union[str, Path],
                             more_info: bool = False) -> PmxModel:
         """使用Nuthouse实现解析PMX文件（保守回退）"""
+        # Nuthouse实现仅在回退时使用，按需导入
+        from pypmxvmd.common.parsers.pmx_parser_nuthouse import PmxParserNuthouse
+
         parser = PmxParserNuthouse(self._progress_callback)
-        return parser.parse_file(file_path, more_info=more_info)
+        start_ns = instrumentation.now_ns()
+        pmx_model = parser.parse_file(file_path, more_info=more_info)
+        instrumentation.tracer("pmx", "parse", "nuthouse").file(
+            instrumentation.now_ns() - start_ns, None, self._count_elements(pmx_model))
+        return pmx_model
+
+    @staticmethod
+    def _count_elements(pmx_model: PmxModel) -> int:
+        """统计模型中顶点、面和材质的总数"""
+        return len(pmx_model.vertices) + len(pmx_model.faces) + len(pmx_model.materials)
+
+    # 各权重模式下骨骼索引的个数和权重数据的字节数
+    _WEIGHT_LAYOUT = {0: (1, 0), 1: (2, 4), 2: (4, 16), 3: (2, 40), 4: (4, 16)}
+    # 各变形类型的项目大小：(索引类型, 其余字节数)
+    _MORPH_ITEM_LAYOUT = {0: ("morph", 4), 1: ("vertex", 12), 2: ("bone", 28),
+                          3: ("vertex", 16), 4: ("vertex", 16), 5: ("vertex", 16),
+                          6: ("vertex", 16), 7: ("vertex", 16), 8: ("material", 113),
+                          9: ("morph", 4), 10: ("rigidbody", 25)}
+
+    def scan_names(self, file_path: Union[str, Path], more_info: bool = False) -> PmxNameTable:
+        """只读取PMX的文件头、各数据段数量和骨骼/变形名称
+
+        顶点、面、纹理和材质按记录大小直接跳过，骨骼和变形只解码名称，不创建模型对象。
+
+        Args:
+            file_path: PMX文件路径
+            more_info: 是否显示详细信息
+
+        Returns:
+            PmxNameTable
+
+        Raises:
+            FileNotFoundError: 文件不存在
+            ValueError: 文件格式错误
+        """
+        data = Path(file_path).read_bytes()
+        try:
+            table = self._scan_names(data)
+        except (struct.error, IndexError, KeyError, UnicodeDecodeError) as e:
+            raise ValueError(f"PMX名称扫描失败: {e}") from e
+        if more_info:
+            print(f"PMX名称扫描完成: {len(table.bone_names)}个骨骼, {len(table.morph_names)}个变形")
+        return table
+
+    def _scan_names(self, data: bytes) -> PmxNameTable:
+        if data[:4] != b"PMX ":
+            raise ValueError(f"无效的PMX魔数: {data[:4]!r}")
+        version = round(struct.unpack_from("<f", data, 4)[0], 5)
+        flag_count = data[8]
+        flags = data[9:9 + flag_count]
+        encoding = "utf-8" if flags[0] else "utf-16le"
+        additional_uvs = flags[1]
+        sizes = {"vertex": flags[2], "texture": flags[3], "material": flags[4],
+                 "bone": flags[5], "morph": flags[6], "rigidbody": flags[7]}
+        bone_size = sizes["bone"]
+        pos = 9 + flag_count
+        unpack_int = struct.Struct("<i").unpack_from
+
+        def read_text() -> str:
+            nonlocal pos
+            length = unpack_int(data, pos)[0]
+            start = pos + 4
+            pos = start + length
+            if pos > len(data):
+                raise ValueError("文本数据不完整")
+            return data[start:pos].decode(encoding, errors='ignore')
+
+        def skip_texts(count: int) -> None:
+            nonlocal pos
+            for _ in range(count):
+                pos += 4 + unpack_int(data, pos)[0]
+
+        header = PmxHeader(version=version, name_jp=read_text(), name_en=read_text(),
+                           comment_jp=read_text(), comment_en=read_text())
+        table = PmxNameTable(header)
+
+        # 顶点：8f + 附加UV + 权重类型 + 权重数据 + 边缘倍率
+        table.vertex_count = unpack_int(data, pos)[0]
+        pos += 4
+        vertex_base = 32 + 16 * additional_uvs
+        layout = self._WEIGHT_LAYOUT
+        for _ in range(table.vertex_count):
+            bone_count, extra = layout[data[pos + vertex_base]]
+            pos += vertex_base + 1 + bone_count * bone_size + extra + 4
+
+        index_count = unpack_int(data, pos)[0]
+        table.face_count = index_count // 3
+        pos += 4 + index_count * sizes["vertex"]
+
+        table.texture_count = unpack_int(data, pos)[0]
+        pos += 4
+        skip_texts(table.texture_count)
+
+        # 材质：名称x2 + 颜色等44字节 + 标志1 + 边缘20 + 纹理/球面索引 + 模式2 + toon + 备注 + 面数
+        table.material_count = unpack_int(data, pos)[0]
+        pos += 4
+        for _ in range(table.material_count):
+            skip_texts(2)
+            pos += 65 + 2 * sizes["texture"] + 2
+            shared_toon = data[pos - 1]
+            pos += 1 if shared_toon else sizes["texture"]
+            skip_texts(1)
+            pos += 4
+
+        bone_count = unpack_int(data, pos)[0]
+        pos += 4
+        for _ in range(bone_count):
+            table.bone_names.append(read_text())
+            skip_texts(1)
+            pos += 12 + bone_size + 4
+            flags1, flags2 = data[pos], data[pos + 1]
+            pos += 2
+            pos += bone_size if flags1 & 0x01 else 12
+            if flags2 & 0x03:
+                pos += bone_size + 4
+            if flags2 & 0x04:
+                pos += 12
+            if flags2 & 0x08:
+                pos += 24
+            if flags2 & 0x20:
+                pos += 4
+            if flags1 & 0x20:
+                pos += bone_size + 8
+                link_count = unpack_int(data, pos)[0]
+                pos += 4
+                for _ in range(link_count):
+                    pos += bone_size
+                    has_limits = data[pos]
+                    pos += 1 + (24 if has_limits else 0)
+
+        morph_count = unpack_int(data, pos)[0]
+        pos += 4
+        for _ in range(morph_count):
+            table.morph_names.append(read_text())
+            skip_texts(1)
+            morph_type = data[pos + 1]
+            item_count = unpack_int(data, pos + 2)[0]
+            pos += 6
+            index_kind, extra = self._MORPH_ITEM_LAYOUT[morph_type]
+            pos += item_count * (sizes[index_kind] + extra)
+        if pos > len(data):
+            raise ValueError("PMX数据不完整")
+        return table
     
     def _parse_header(self, data: bytearray) -> PmxHeader:
         """解析PMX文件头
@@ -401,8 +571,9 @@ class PmxParser:
             4: "i"   # signed int
         }
 
-        # 存储附加UV数量
+        # 存储附加UV数量和各索引字节数
         self._additional_uv_count = global_flags[1]
+        self._index_sizes = tuple(global_flags[2:8])
 
         # 顶点索引（无符号）
         vertex_size = global_flags[2]
@@ -503,27 +674,63 @@ class PmxParser:
         return vertices
 
     def _parse_faces_fast(self, more_info: bool) -> List[List[int]]:
-        """快速解析面数据（使用内部缓冲区）"""
+        """快速解析面数据（使用内部缓冲区）
+
+        索引段整段读入 array 后按3个一组切分为面列表；
+        扁平索引保留在 self._face_indices 中，用于构建 PmxMeshIndex。
+        """
         # 读取面数量（实际是索引数量）
         index_count = self._io_handler.unpack_from_buffer("I")[0]
         face_count = index_count // 3
 
         if more_info:
             print(f"解析 {face_count} 个面...")
-
-        faces = []
-        format_string = f"3{self._vertex_index_format}"
-
-        for i in range(face_count):
-            if i % 1000 == 0:
-                self._report_progress(i, face_count)
-
-            indices = list(self._io_handler.unpack_from_buffer(format_string))
-            faces.append(indices)
+        self._report_progress(0, face_count)
+
+        indices = array(self._vertex_index_format)
+        start = self._io_handler.get_position()
+        size = indices.itemsize * index_count
+        if start + size > self._io_handler.get_total_size():
+            raise ValueError(f"面数据不完整，需要{size}字节")
+        end = start + face_count * 3 * indices.itemsize
+        indices.frombytes(memoryview(self._io_handler.get_buffer())[start:end])
+        self._io_handler.skip_bytes(size)
+        if sys.byteorder != "little":
+            indices.byteswap()
+        if indices.typecode != 'I':
+            indices = array('I', indices)
+
+        values = iter(indices.tolist())
+        faces = [list(face) for face in zip(values, values, values)]
+        self._face_indices = indices
 
         self._report_progress(face_count, face_count)
         return faces
 
+    @staticmethod
+    def _attach_mesh_index(pmx_model: PmxModel, indices: Optional[array] = None) -> None:
+        """解析时预先计算面索引缓冲区和各材质的面范围
+
+        材质面数之和与面数不一致时不填入，留到调用 PmxMeshIndex.of 时报错。
+        """
+        try:
+            ranges = PmxMeshIndex.material_ranges(pmx_model.materials, len(pmx_model.faces))
+        except ValueError:
+            return
+        if indices is None:
+            indices = array('I', [index for face in pmx_model.faces for index in face])
+        mesh_index = PmxMeshIndex(indices, ranges)
+        mesh_index._signature = PmxMeshIndex.signature(pmx_model)
+        pmx_model._mesh_index = mesh_index
+
+    def _parse_bones_and_morphs_fast(self, more_info: bool) -> Tuple[List[PmxBone], List[PmxMorph]]:
+        """解析骨骼段和变形段（与Cython解析共用 pmx_sections 的实现）"""
+        bones, morphs = parse_bones_and_morphs(self._io_handler.get_buffer(), self._io_handler.get_position(),
+                                               "utf-8" if self._use_utf8 else "utf-16le", self._index_sizes)
+        if more_info:
+            print(f"解析 {len(bones)} 个骨骼, {len(morphs)} 个变形...")
+        return bones, morphs
+
     def _parse_textures_fast(self, more_info: bool) -> List[str]:
         """快速解析纹理列表（使用内部缓冲区）"""
         texture_count = self._io_handler.unpack_from_buffer("I")[0]
@@ -856,24 +1063,30 @@ class PmxParser:
             self._vertex_index_size = lookahead_data['vertex_index_size']
             self._material_index_size = lookahead_data['material_index_size']
             
+            trace = instrumentation.tracer("pmx", "write", "python")
+            start_ns = instrumentation.now_ns()
+
             # 编码各个部分
             print("编码PMX头部...")
-            binary_data.extend(self._encode_header(pmx_model.header, lookahead_data))
+            binary_data.extend(trace.run("header", self._encode_header, pmx_model.header, lookahead_data))
             
             print("编码顶点数据...")
-            binary_data.extend(self._encode_vertices(pmx_model.vertices))
+            binary_data.extend(trace.run("vertices", self._encode_vertices, pmx_model.vertices))
             
             print("编码面数据...")
-            binary_data.extend(self._encode_faces(pmx_model.faces))
+            binary_data.extend(trace.run("faces", self._encode_faces, pmx_model.faces))
             
             print("编码纹理列表...")
-            binary_data.extend(self._encode_textures(texture_list))
+            binary_data.extend(trace.run("textures", self._encode_textures, texture_list))
             
             print("编码材质数据...")
-            binary_data.extend(self._encode_materials(pmx_model.materials, texture_list))
+            binary_data.extend(trace.run("materials", self._encode_materials,
+                                         pmx_model.materials, texture_list))
             
             # 写入文件
             self._io_handler.write_file(file_path, bytes(binary_data))
+            trace.file(instrumentation.now_ns() - start_ns, len(binary_data),
+                       self._count_elements(pmx_model))
             
             print(f"PMX文件写入完成，总大小: {len(binary_data)}字节")
             
@@ -1093,6 +1306,8 @@ class PmxParser:
     
     def parse_text_file(self, file_path: Union[str, Path], more_info: bool = False) -> PmxModel:
         """解析PMX文本文件
+
+        逐行流式读取，不会把整个文件载入内存。
         
         Args:
             file_path: 文本文件路径
@@ -1108,31 +1323,26 @@ class PmxParser:
         file_path = Path(file_path)
         if more_info:
             print(f"开始解析PMX文本文件: {file_path}")
+        start_ns = instrumentation.now_ns()
             
         with open(file_path, 'r', encoding='utf-8') as f:
-            lines = [line.strip().split('\t') if '\t' in line else [line.strip()] 
-                    for line in f.readlines() if line.strip()]
-        
-        if more_info:
-            print(f"文本文件总行数: {len(lines)}")
-            
-        line_idx = 0
-        
-        try:
-            # 解析头部
-            header, line_idx = self._parse_text_header(lines, line_idx)
-            
-            # 解析顶点
-            vertices, line_idx = self._parse_text_vertices(lines, line_idx, more_info)
-            
-            # 解析面
-            faces, line_idx = self._parse_text_faces(lines, line_idx, more_info)
-            
-            # 解析材质
-            materials, line_idx = self._parse_text_materials(lines, line_idx, more_info)
+            reader = TextRowReader(f)
             
-        except (ValueError, IndexError) as e:
-            raise ValueError(f"PMX文本文件解析失败在第{line_idx + 1}行: {e}")
+            try:
+                # 解析头部
+                header = self._parse_text_header(reader)
+                
+                # 解析顶点
+                vertices = self._parse_text_vertices(reader, more_info)
+                
+                # 解析面
+                faces = self._parse_text_faces(reader, more_info)
+                
+                # 解析材质
+                materials = self._parse_text_materials(reader, more_info)
+                
+            except (ValueError, IndexError) as e:
+                raise ValueError(f"PMX文本文件解析失败在第{reader.line_number}行: {e}")
         
         if more_info:
             print(f"PMX文本解析完成")
@@ -1143,60 +1353,50 @@ class PmxParser:
         model.vertices = vertices
         model.faces = faces
         model.materials = materials
+        instrumentation.tracer("pmx", "parse_text", "python").file(
+            instrumentation.now_ns() - start_ns, None, self._count_elements(model))
         
         return model
     
-    def write_text_file(self, model: PmxModel, file_path: Union[str, Path]) -> None:
+    def write_text_file(self, model: PmxModel, file_path: Union[str, Path],
+                        float_precision: Optional[int] = DEFAULT_FLOAT_PRECISION) -> None:
         """将PMX模型数据导出为文本文件
+
+        各数据段逐行生成并分块写入文件，不会在内存中构建完整的输出。
         
         Args:
             model: PMX模型对象
             file_path: 输出文件路径
+            float_precision: 浮点小数位数，默认6位；为None时输出能精确还原float32的最短表示
         """
         file_path = Path(file_path)
         print(f"开始写入PMX文本文件: {file_path}")
+        start_ns = instrumentation.now_ns()
         
-        lines = []
-        
-        # 写入头部
-        lines.extend(self._format_text_header(model.header))
-        
-        # 写入顶点
-        lines.extend(self._format_text_vertices(model.vertices))
-        
-        # 写入面
-        lines.extend(self._format_text_faces(model.faces))
-        
-        # 写入材质
-        lines.extend(self._format_text_materials(model.materials))
-        
-        # 写入文件
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(lines))
+        with open(file_path, 'w', encoding='utf-8') as f, TextChunkWriter(f) as writer:
+            # 写入头部
+            writer.write_lines(self._format_text_header(model.header))
+            
+            # 写入顶点
+            writer.write_lines(self._format_text_vertices(model.vertices, float_precision))
+            
+            # 写入面
+            writer.write_lines(self._format_text_faces(model.faces))
+            
+            # 写入材质
+            writer.write_lines(self._format_text_materials(model.materials, float_precision))
+        instrumentation.tracer("pmx", "write_text", "python").file(
+            instrumentation.now_ns() - start_ns, None, self._count_elements(model))
         
-        print(f"PMX文本文件写入完成，总行数: {len(lines)}")
+        print(f"PMX文本文件写入完成，总行数: {writer.line_count}")
     
-    def _parse_text_header(self, lines: List[List[str]], start_idx: int) -> tuple:
+    def _parse_text_header(self, reader: TextRowReader) -> PmxHeader:
         """解析PMX文本头部"""
-        if start_idx >= len(lines) or len(lines[start_idx]) != 2 or lines[start_idx][0] != "version:":
-            raise ValueError("缺少版本信息")
-        version = float(lines[start_idx][1])
-        
-        if start_idx + 1 >= len(lines) or len(lines[start_idx + 1]) != 2 or lines[start_idx + 1][0] != "name_jp:":
-            raise ValueError("缺少日语名称")
-        name_jp = lines[start_idx + 1][1]
-        
-        if start_idx + 2 >= len(lines) or len(lines[start_idx + 2]) != 2 or lines[start_idx + 2][0] != "name_en:":
-            raise ValueError("缺少英语名称")
-        name_en = lines[start_idx + 2][1]
-        
-        if start_idx + 3 >= len(lines) or len(lines[start_idx + 3]) != 2 or lines[start_idx + 3][0] != "comment_jp:":
-            raise ValueError("缺少日语备注")
-        comment_jp = lines[start_idx + 3][1]
-        
-        if start_idx + 4 >= len(lines) or len(lines[start_idx + 4]) != 2 or lines[start_idx + 4][0] != "comment_en:":
-            raise ValueError("缺少英语备注")
-        comment_en = lines[start_idx + 4][1]
+        version = float(reader.read_field("version:", "缺少版本信息"))
+        name_jp = reader.read_field("name_jp:", "缺少日语名称")
+        name_en = reader.read_field("name_en:", "缺少英语名称")
+        comment_jp = reader.read_field("comment_jp:", "缺少日语备注")
+        comment_en = reader.read_field("comment_en:", "缺少英语备注")
         
         header = PmxHeader(
             version=version,
@@ -1206,192 +1406,154 @@ class PmxParser:
             comment_en=comment_en
         )
         
-        return header, start_idx + 5
+        return header
     
-    def _parse_text_vertices(self, lines: List[List[str]], start_idx: int, more_info: bool) -> tuple:
-        """解析顶点数据"""
-        if start_idx >= len(lines) or len(lines[start_idx]) != 2 or lines[start_idx][0] != "vertex_count:":
-            raise ValueError("缺少顶点计数")
-        
-        vertex_count = int(lines[start_idx][1])
-        line_idx = start_idx + 1
+    def _read_text_section(self, reader: TextRowReader, marker: str, missing: str,
+                           label: str, more_info: bool):
+        """读取一个文本数据段的计数行和键名行，逐行产出数据行
+
+        Args:
+            reader: 文本行读取器
+            marker: 计数行的键名，如 "vertex_count:"
+            missing: 计数行缺失时的错误信息
+            label: 数据段名称，用于提示和错误信息
+            more_info: 是否显示详细信息
+        """
+        count = int(reader.read_field(marker, missing))
         
         if more_info:
-            print(f"顶点数量: {vertex_count}")
+            print(f"{label}数量: {count}")
         
-        vertices = []
-        if vertex_count > 0:
+        if count > 0:
             # 跳过键名行
-            if line_idx >= len(lines):
-                raise ValueError("顶点数据不完整")
-            line_idx += 1
+            if reader.read_row() is None:
+                raise ValueError(f"{label}数据不完整")
             
-            for i in range(vertex_count):
-                if line_idx >= len(lines):
-                    raise ValueError(f"顶点数据不完整，期望{vertex_count}个顶点，只找到{i}个")
-                
-                row = lines[line_idx]
-                if len(row) < 8:  # 至少需要位置、法线和UV数据
-                    raise ValueError(f"顶点格式错误，期望至少8个字段，得到{len(row)}个")
-                
-                vertex = PmxVertex(
-                    position=[float(row[0]), float(row[1]), float(row[2])],
-                    normal=[float(row[3]), float(row[4]), float(row[5])],
-                    uv=[float(row[6]), float(row[7])]
-                )
-                vertices.append(vertex)
-                line_idx += 1
-        
-        return vertices, line_idx
+            i = 0
+            for i, row in enumerate(reader.read_rows(count), 1):
+                yield row
+            if i < count:
+                raise ValueError(f"{label}数据不完整，期望{count}个{label}，只找到{i}个")
     
-    def _parse_text_faces(self, lines: List[List[str]], start_idx: int, more_info: bool) -> tuple:
-        """解析面数据"""
-        if start_idx >= len(lines) or len(lines[start_idx]) != 2 or lines[start_idx][0] != "face_count:":
-            raise ValueError("缺少面计数")
-        
-        face_count = int(lines[start_idx][1])
-        line_idx = start_idx + 1
-        
-        if more_info:
-            print(f"面数量: {face_count}")
+    def _parse_text_vertices(self, reader: TextRowReader, more_info: bool) -> List[PmxVertex]:
+        """解析顶点数据"""
+        vertices = []
+        rows = self._read_text_section(reader, "vertex_count:", "缺少顶点计数", "顶点", more_info)
+        for block in reader.convert_blocks(rows, self._vertices_from_rows):
+            vertices.extend(block)
         
+        return vertices
+    
+    @staticmethod
+    def _vertices_from_rows(rows: List[List[str]]) -> List[PmxVertex]:
+        """将一块顶点行转换为顶点列表"""
+        shortest = min(map(len, rows))
+        if shortest < 8:  # 至少需要位置、法线和UV数据
+            raise ValueError(f"顶点格式错误，期望至少8个字段，得到{shortest}个")
+        
+        # 整块的位置、法线和UV一次性转换
+        values = parse_float_rows(rows, 0, 8)
+        return [
+            PmxVertex(
+                position=values[base:base + 3],
+                normal=values[base + 3:base + 6],
+                uv=values[base + 6:base + 8]
+            )
+            for base in range(0, len(values), 8)
+        ]
+    
+    def _parse_text_faces(self, reader: TextRowReader, more_info: bool) -> List[List[int]]:
+        """解析面数据"""
         faces = []
-        if face_count > 0:
-            # 跳过键名行
-            if line_idx >= len(lines):
-                raise ValueError("面数据不完整")
-            line_idx += 1
-            
-            for i in range(face_count):
-                if line_idx >= len(lines):
-                    raise ValueError(f"面数据不完整，期望{face_count}个面，只找到{i}个")
-                
-                row = lines[line_idx]
-                if len(row) != 3:
-                    raise ValueError(f"面格式错误，期望3个顶点索引，得到{len(row)}个")
-                
-                face = [int(row[0]), int(row[1]), int(row[2])]
-                faces.append(face)
-                line_idx += 1
+        rows = self._read_text_section(reader, "face_count:", "缺少面计数", "面", more_info)
+        for block in reader.convert_blocks(rows, self._faces_from_rows):
+            faces.extend(block)
         
-        return faces, line_idx
+        return faces
     
-    def _parse_text_materials(self, lines: List[List[str]], start_idx: int, more_info: bool) -> tuple:
+    @staticmethod
+    def _faces_from_rows(rows: List[List[str]]) -> List[List[int]]:
+        """将一块面行转换为顶点索引列表"""
+        lengths = set(map(len, rows))
+        if lengths != {3}:
+            raise ValueError(f"面格式错误，期望3个顶点索引，得到{min(lengths - {3})}个")
+        
+        indices = parse_int_rows(rows, 0, 3)
+        return [indices[base:base + 3] for base in range(0, len(indices), 3)]
+    
+    def _parse_text_materials(self, reader: TextRowReader, more_info: bool) -> List[PmxMaterial]:
         """解析材质数据"""
-        if start_idx >= len(lines) or len(lines[start_idx]) != 2 or lines[start_idx][0] != "material_count:":
-            raise ValueError("缺少材质计数")
-        
-        material_count = int(lines[start_idx][1])
-        line_idx = start_idx + 1
-        
-        if more_info:
-            print(f"材质数量: {material_count}")
-        
         materials = []
-        if material_count > 0:
-            # 跳过键名行
-            if line_idx >= len(lines):
-                raise ValueError("材质数据不完整")
-            line_idx += 1
+        for row in self._read_text_section(reader, "material_count:", "缺少材质计数", "材质", more_info):
+            if len(row) < 15:  # 基本材质信息
+                raise ValueError(f"材质格式错误，期望至少15个字段，得到{len(row)}个")
             
-            for i in range(material_count):
-                if line_idx >= len(lines):
-                    raise ValueError(f"材质数据不完整，期望{material_count}个材质，只找到{i}个")
-                
-                row = lines[line_idx]
-                if len(row) < 15:  # 基本材质信息
-                    raise ValueError(f"材质格式错误，期望至少15个字段，得到{len(row)}个")
-                
-                material = PmxMaterial(
-                    name_jp=row[0],
-                    name_en=row[1],
-                    diffuse_color=[float(row[2]), float(row[3]), float(row[4]), float(row[5])],
-                    specular_color=[float(row[6]), float(row[7]), float(row[8])],
-                    specular_strength=float(row[9]),
-                    ambient_color=[float(row[10]), float(row[11]), float(row[12])],
-                    texture_path=row[13] if row[13] != "null" else "",
-                    face_count=int(row[14])
-                )
-                materials.append(material)
-                line_idx += 1
-        
-        return materials, line_idx
+            values = parse_floats(row[2:13])
+            material = PmxMaterial(
+                name_jp=row[0],
+                name_en=row[1],
+                diffuse_color=values[0:4],
+                specular_color=values[4:7],
+                specular_strength=values[7],
+                ambient_color=values[8:11],
+                texture_path=row[13] if row[13] != "null" else "",
+                face_count=int(row[14])
+            )
+            materials.append(material)
+        
+        return materials
     
-    def _format_text_header(self, header: PmxHeader) -> List[str]:
+    def _format_text_header(self, header: PmxHeader) -> Iterator[str]:
         """格式化头部为文本"""
-        return [
-            f"version:\t{header.version}",
-            f"name_jp:\t{header.name_jp}",
-            f"name_en:\t{header.name_en}",
-            f"comment_jp:\t{header.comment_jp}",
-            f"comment_en:\t{header.comment_en}"
-        ]
+        yield f"version:\t{header.version}"
+        yield f"name_jp:\t{header.name_jp}"
+        yield f"name_en:\t{header.name_en}"
+        yield f"comment_jp:\t{header.comment_jp}"
+        yield f"comment_en:\t{header.comment_en}"
     
-    def _format_text_vertices(self, vertices: List[PmxVertex]) -> List[str]:
+    def _format_text_vertices(self, vertices: List[PmxVertex],
+                              float_precision: Optional[int] = DEFAULT_FLOAT_PRECISION) -> Iterator[str]:
         """格式化顶点为文本"""
-        lines = [f"vertex_count:\t{len(vertices)}"]
+        yield f"vertex_count:\t{len(vertices)}"
         
         if vertices:
             # 键名行
             keys = ["pos_x", "pos_y", "pos_z", "norm_x", "norm_y", "norm_z", "uv_u", "uv_v"]
-            lines.append('\t'.join(keys))
+            yield '\t'.join(keys)
             
-            for vertex in vertices:
-                row = [
-                    f"{vertex.position[0]:.6f}",
-                    f"{vertex.position[1]:.6f}",
-                    f"{vertex.position[2]:.6f}",
-                    f"{vertex.normal[0]:.6f}",
-                    f"{vertex.normal[1]:.6f}",
-                    f"{vertex.normal[2]:.6f}",
-                    f"{vertex.uv[0]:.6f}",
-                    f"{vertex.uv[1]:.6f}"
-                ]
-                lines.append('\t'.join(row))
-        
-        return lines
+            formatter = RowFormatter("ffffffff", float_precision)
+            yield from formatter.format_rows((*vertex.position[:3], *vertex.normal[:3], *vertex.uv[:2])
+                                             for vertex in vertices)
     
-    def _format_text_faces(self, faces: List[List[int]]) -> List[str]:
+    def _format_text_faces(self, faces: List[List[int]]) -> Iterator[str]:
         """格式化面为文本"""
-        lines = [f"face_count:\t{len(faces)}"]
+        yield f"face_count:\t{len(faces)}"
         
         if faces:
-            lines.append('\t'.join(["vertex_0", "vertex_1", "vertex_2"]))
+            yield '\t'.join(["vertex_0", "vertex_1", "vertex_2"])
             
-            for face in faces:
-                row = [str(face[0]), str(face[1]), str(face[2])]
-                lines.append('\t'.join(row))
-        
-        return lines
+            formatter = RowFormatter("ddd")
+            yield from formatter.format_rows(face[:3] for face in faces)
     
-    def _format_text_materials(self, materials: List[PmxMaterial]) -> List[str]:
+    def _format_text_materials(self, materials: List[PmxMaterial],
+                               float_precision: Optional[int] = DEFAULT_FLOAT_PRECISION) -> Iterator[str]:
         """格式化材质为文本"""
-        lines = [f"material_count:\t{len(materials)}"]
+        yield f"material_count:\t{len(materials)}"
         
         if materials:
             keys = ["name_jp", "name_en", "diff_r", "diff_g", "diff_b", "diff_a",
                    "spec_r", "spec_g", "spec_b", "spec_strength", 
                    "amb_r", "amb_g", "amb_b", "texture", "face_count"]
-            lines.append('\t'.join(keys))
+            yield '\t'.join(keys)
             
-            for material in materials:
-                row = [
-                    material.name_jp,
-                    material.name_en,
-                    f"{material.diffuse_color[0]:.6f}",
-                    f"{material.diffuse_color[1]:.6f}",
-                    f"{material.diffuse_color[2]:.6f}",
-                    f"{material.diffuse_color[3]:.6f}",
-                    f"{material.specular_color[0]:.6f}",
-                    f"{material.specular_color[1]:.6f}",
-                    f"{material.specular_color[2]:.6f}",
-                    f"{material.specular_strength:.6f}",
-                    f"{material.ambient_color[0]:.6f}",
-                    f"{material.ambient_color[1]:.6f}",
-                    f"{material.ambient_color[2]:.6f}",
-                    material.texture_path if material.texture_path else "null",
-                    str(material.face_count)
-                ]
-                lines.append('\t'.join(row))
-        
-        return lines
+            formatter = RowFormatter("ssfffffffffffsd", float_precision)
+            yield from formatter.format_rows((
+                material.name_jp,
+                material.name_en,
+                *material.diffuse_color[:4],
+                *material.specular_color[:3],
+                material.specular_strength,
+                *material.ambient_color[:3],
+                material.texture_path if material.texture_path else "null",
+                material.face_count
+            ) for material in materials)
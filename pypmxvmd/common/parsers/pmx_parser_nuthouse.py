@@ -11,7 +11,7 @@ from typing import List, Optional, Union, Callable, Tuple
 from pypmxvmd.common.models.pmx import (
     PmxModel, PmxHeader, PmxVertex, PmxMaterial, PmxBone, PmxMorph,
     PmxFrame, PmxRigidBody, PmxJoint, PmxSoftBody,
-    WeightMode, MaterialFlags, SphMode, MorphType, MorphPanel,
+    WeightMode, MaterialFlags, BoneFlags, SphMode, MorphType, MorphPanel,
     RigidBodyShape, RigidBodyPhysMode, JointType
 )
 from pypmxvmd.common.io.binary_io import BinaryIOHandler
@@ -477,7 +477,7 @@ class PmxParserNuthouse:
         for i in range(morph_count):
             name_jp = self._io_handler.read_variable_string(data)
             name_en = self._io_handler.read_variable_string(data)
-            (panel_int, morphtype_int, itemcount) = self._io_handler.unpack_data("b b i", data)
+            (panel_int, morphtype_int, itemcount) = self._io_handler.unpack_data("<b b i", data)
             
             morphtype = MorphType(morphtype_int)
             panel = MorphPanel(panel_int)
@@ -486,22 +486,43 @@ class PmxParserNuthouse:
             items = []
             for j in range(itemcount):
                 if morphtype == MorphType.GROUP:
-                    (morph_idx, influence) = self._io_handler.unpack_data(f"{self.idx_morph}f", data)
+                    (morph_idx, influence) = self._io_handler.unpack_data(f"<{self.idx_morph}f", data)
                     from pypmxvmd.common.models.pmx import PmxMorphItemGroup
                     item = PmxMorphItemGroup(morph_index=morph_idx, value=influence)
                 elif morphtype == MorphType.VERTEX:
-                    (vert_idx, transX, transY, transZ) = self._io_handler.unpack_data(f"{self.idx_vert}3f", data)
+                    (vert_idx, transX, transY, transZ) = self._io_handler.unpack_data(f"<{self.idx_vert}3f", data)
                     from pypmxvmd.common.models.pmx import PmxMorphItemVertex
                     item = PmxMorphItemVertex(vertex_index=vert_idx, offset=[transX, transY, transZ])
                 elif morphtype == MorphType.BONE:
-                    (bone_idx, transX, transY, transZ, rotqX, rotqY, rotqZ, rotqW) = self._io_handler.unpack_data(f"{self.idx_bone}3f 4f", data)
+                    (bone_idx, transX, transY, transZ, rotqX, rotqY, rotqZ, rotqW) = self._io_handler.unpack_data(f"<{self.idx_bone}3f 4f", data)
                     # 四元数转欧拉角
                     rotX, rotY, rotZ = self._quaternion_to_euler([rotqW, rotqX, rotqY, rotqZ])
                     from pypmxvmd.common.models.pmx import PmxMorphItemBone
                     item = PmxMorphItemBone(bone_index=bone_idx, translation=[transX, transY, transZ], rotation=[rotX, rotY, rotZ])
+                elif morphtype in (MorphType.UV, MorphType.EXTENDED_UV1, MorphType.EXTENDED_UV2,
+                                   MorphType.EXTENDED_UV3, MorphType.EXTENDED_UV4):
+                    (vert_idx, *offset) = self._io_handler.unpack_data(f"<{self.idx_vert}4f", data)
+                    from pypmxvmd.common.models.pmx import PmxMorphItemUV
+                    item = PmxMorphItemUV(vertex_index=vert_idx, offset=offset)
+                elif morphtype == MorphType.MATERIAL:
+                    (mat_idx, operation, *values) = self._io_handler.unpack_data(f"<{self.idx_mat}B28f", data)
+                    from pypmxvmd.common.models.pmx import PmxMorphItemMaterial
+                    item = PmxMorphItemMaterial(
+                        material_index=mat_idx, operation=operation,
+                        diffuse_color=values[0:4], specular_color=values[4:7],
+                        specular_strength=values[7], ambient_color=values[8:11],
+                        edge_color=values[11:15], edge_size=values[15],
+                        texture_color=values[16:20], sphere_color=values[20:24],
+                        toon_color=values[24:28])
+                elif morphtype == MorphType.FLIP:
+                    (morph_idx, influence) = self._io_handler.unpack_data(f"<{self.idx_morph}f", data)
+                    from pypmxvmd.common.models.pmx import PmxMorphItemFlip
+                    item = PmxMorphItemFlip(morph_index=morph_idx, value=influence)
                 else:
-                    # 其他类型暂时跳过或简单处理
-                    continue
+                    (rb_idx, is_local, *values) = self._io_handler.unpack_data(f"<{self.idx_rb}B6f", data)
+                    from pypmxvmd.common.models.pmx import PmxMorphItemImpulse
+                    item = PmxMorphItemImpulse(rigidbody_index=rb_idx, is_local=bool(is_local),
+                                               velocity=values[0:3], torque=values[3:6])
                 
                 items.append(item)
             
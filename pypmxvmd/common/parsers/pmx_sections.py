@@ -0,0 +1,270 @@
+"""
+PyPMXVMD PMX骨骼/变形数据段解析
+
+材质之后的数据段由快速解析和Cython解析共用这里的纯Python实现。
+骨骼记录的定长部分按骨骼索引大小预编译 struct.Struct，可选字段按标志位读取；
+变形项目按类型预编译 struct.Struct，每个变形的项目整段用 iter_unpack 解包，不逐项移动读取位置。
+"""
+
+import math
+import struct
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from pypmxvmd.common.math3d import quaternion_to_euler
+from pypmxvmd.common.models.pmx import (
+    PmxBone, PmxBoneIkLink, BoneFlags,
+    PmxMorph, PmxMorphItemGroup, PmxMorphItemVertex, PmxMorphItemBone, PmxMorphItemUV,
+    PmxMorphItemMaterial, PmxMorphItemFlip, PmxMorphItemImpulse, MorphType, MorphPanel
+)
+
+_UNSIGNED_INDEX = {1: "B", 2: "H", 4: "i"}
+_SIGNED_INDEX = {1: "b", 2: "h", 4: "i"}
+_UNPACK_INT = struct.Struct("<i").unpack_from
+_UNPACK_MORPH_HEAD = struct.Struct("<bbi").unpack_from
+_UNPACK_VECTOR = struct.Struct("<3f").unpack_from
+_UNPACK_AXES = struct.Struct("<6f").unpack_from
+
+
+def _group_item(values: tuple) -> PmxMorphItemGroup:
+    return PmxMorphItemGroup(morph_index=values[0], value=values[1])
+
+
+def _vertex_item(values: tuple) -> PmxMorphItemVertex:
+    return PmxMorphItemVertex(vertex_index=values[0], offset=list(values[1:4]))
+
+
+def _bone_item(values: tuple) -> PmxMorphItemBone:
+    # 文件中为四元数 [x, y, z, w]，模型中与Nuthouse实现一致保存为欧拉角（度）
+    x, y, z, w = values[4:8]
+    return PmxMorphItemBone(bone_index=values[0], translation=list(values[1:4]),
+                            rotation=quaternion_to_euler(w, x, y, z))
+
+
+def _uv_item(values: tuple) -> PmxMorphItemUV:
+    return PmxMorphItemUV(vertex_index=values[0], offset=list(values[1:5]))
+
+
+def _material_item(values: tuple) -> PmxMorphItemMaterial:
+    return PmxMorphItemMaterial(
+        material_index=values[0], operation=values[1],
+        diffuse_color=list(values[2:6]), specular_color=list(values[6:9]),
+        specular_strength=values[9], ambient_color=list(values[10:13]),
+        edge_color=list(values[13:17]), edge_size=values[17],
+        texture_color=list(values[18:22]), sphere_color=list(values[22:26]),
+        toon_color=list(values[26:30]))
+
+
+def _flip_item(values: tuple) -> PmxMorphItemFlip:
+    return PmxMorphItemFlip(morph_index=values[0], value=values[1])
+
+
+def _impulse_item(values: tuple) -> PmxMorphItemImpulse:
+    return PmxMorphItemImpulse(rigidbody_index=values[0], is_local=bool(values[1]),
+                               velocity=list(values[2:5]), torque=list(values[5:8]))
+
+
+class PmxSectionReader:
+    """从材质段之后开始读取PMX的骨骼和变形数据段
+
+    Args:
+        data: 整个PMX文件的字节数据
+        pos: 骨骼段的起始偏移
+        encoding: 文本编码（"utf-16le" 或 "utf-8"）
+        index_sizes: 全局标志中的索引字节数 (顶点, 纹理, 材质, 骨骼, 变形, 刚体)
+    """
+
+    def __init__(self, data: bytes, pos: int, encoding: str, index_sizes: Sequence[int]):
+        self.data = data
+        self.pos = pos
+        self.encoding = encoding
+        vertex, _texture, material, bone, morph, rigidbody = index_sizes
+        self._bone_size = bone
+        bone_format = _SIGNED_INDEX[bone]
+        self._bone_index = struct.Struct("<" + bone_format).unpack_from
+        self._bone_head = struct.Struct("<3f" + bone_format + "iBB")
+        self._bone_inherit = struct.Struct("<" + bone_format + "f")
+        self._bone_ik_head = struct.Struct("<" + bone_format + "ifi")
+        self._bone_ik_link = struct.Struct("<" + bone_format + "B")
+        vertex_format = _UNSIGNED_INDEX[vertex]
+        uv = (struct.Struct("<" + vertex_format + "4f"), _uv_item)
+        self._morph_items: Dict[int, Tuple[struct.Struct, Callable]] = {
+            MorphType.GROUP: (struct.Struct("<" + _SIGNED_INDEX[morph] + "f"), _group_item),
+            MorphType.VERTEX: (struct.Struct("<" + vertex_format + "3f"), _vertex_item),
+            MorphType.BONE: (struct.Struct("<" + _SIGNED_INDEX[bone] + "7f"), _bone_item),
+            MorphType.UV: uv,
+            MorphType.EXTENDED_UV1: uv,
+            MorphType.EXTENDED_UV2: uv,
+            MorphType.EXTENDED_UV3: uv,
+            MorphType.EXTENDED_UV4: uv,
+            MorphType.MATERIAL: (struct.Struct("<" + _SIGNED_INDEX[material] + "B28f"), _material_item),
+            MorphType.FLIP: (struct.Struct("<" + _SIGNED_INDEX[morph] + "f"), _flip_item),
+            MorphType.IMPULSE: (struct.Struct("<" + _SIGNED_INDEX[rigidbody] + "B6f"), _impulse_item),
+        }
+
+    def _read_int(self) -> int:
+        value = _UNPACK_INT(self.data, self.pos)[0]
+        self.pos += 4
+        return value
+
+    def read_text(self) -> str:
+        """读取带长度前缀的文本"""
+        length = self._read_int()
+        start = self.pos
+        self.pos += length
+        return self.data[start:self.pos].decode(self.encoding, errors='ignore')
+
+    def skip_text(self) -> None:
+        """跳过带长度前缀的文本"""
+        self.pos += 4 + _UNPACK_INT(self.data, self.pos)[0]
+
+    def skip_bones(self) -> int:
+        """按记录大小跳过骨骼段
+
+        Returns:
+            骨骼数量
+        """
+        data = self.data
+        bone_size = self._bone_size
+        bone_count = self._read_int()
+        for _ in range(bone_count):
+            self.skip_text()
+            self.skip_text()
+            pos = self.pos + 12 + bone_size + 4
+            flags1, flags2 = data[pos], data[pos + 1]
+            pos += 2
+            pos += bone_size if flags1 & 0x01 else 12
+            if flags2 & 0x03:
+                pos += bone_size + 4
+            if flags2 & 0x04:
+                pos += 12
+            if flags2 & 0x08:
+                pos += 24
+            if flags2 & 0x20:
+                pos += 4
+            if flags1 & 0x20:
+                pos += bone_size + 8
+                link_count = _UNPACK_INT(data, pos)[0]
+                pos += 4
+                for _ in range(link_count):
+                    pos += bone_size
+                    has_limits = data[pos]
+                    pos += 1 + (24 if has_limits else 0)
+            self.pos = pos
+        return bone_count
+
+    def read_bones(self) -> List[PmxBone]:
+        """读取骨骼段
+
+        IK角度限制与Nuthouse实现一致由弧度转换为度。
+        """
+        data = self.data
+        bone_head = self._bone_head
+        bone_index = self._bone_index
+        inherit = self._bone_inherit
+        ik_head = self._bone_ik_head
+        ik_link = self._bone_ik_link
+        bone_count = self._read_int()
+        bones = []
+        for _ in range(bone_count):
+            name_jp = self.read_text()
+            name_en = self.read_text()
+            x, y, z, parent, layer, flags1, flags2 = bone_head.unpack_from(data, self.pos)
+            pos = self.pos + bone_head.size
+            flags = BoneFlags(
+                tail_usebonelink=bool(flags1 & 0x01), rotateable=bool(flags1 & 0x02),
+                translateable=bool(flags1 & 0x04), visible=bool(flags1 & 0x08),
+                enabled=bool(flags1 & 0x10), ik=bool(flags1 & 0x20),
+                inherit_rot=bool(flags2 & 0x01), inherit_trans=bool(flags2 & 0x02),
+                has_fixedaxis=bool(flags2 & 0x04), has_localaxis=bool(flags2 & 0x08),
+                deform_after_phys=bool(flags2 & 0x10), has_external_parent=bool(flags2 & 0x20))
+            bone = PmxBone(name_jp=name_jp, name_en=name_en, position=[x, y, z], parent_index=parent,
+                           deform_layer=layer, bone_flags=flags)
+            if flags1 & 0x01:
+                bone.tail = bone_index(data, pos)[0]
+                pos += self._bone_size
+            else:
+                bone.tail = list(_UNPACK_VECTOR(data, pos))
+                pos += 12
+            if flags2 & 0x03:
+                bone.inherit_parent_index, bone.inherit_ratio = inherit.unpack_from(data, pos)
+                pos += inherit.size
+            if flags2 & 0x04:
+                bone.fixed_axis = list(_UNPACK_VECTOR(data, pos))
+                pos += 12
+            if flags2 & 0x08:
+                axes = _UNPACK_AXES(data, pos)
+                bone.local_axis_x = list(axes[:3])
+                bone.local_axis_z = list(axes[3:])
+                pos += 24
+            if flags2 & 0x20:
+                bone.external_parent_index = _UNPACK_INT(data, pos)[0]
+                pos += 4
+            if flags1 & 0x20:
+                target, loops, limit, link_count = ik_head.unpack_from(data, pos)
+                pos += ik_head.size
+                bone.ik_target_index = target
+                bone.ik_loop_count = loops
+                bone.ik_angle_limit = math.degrees(limit)
+                for _ in range(link_count):
+                    link_bone, has_limits = ik_link.unpack_from(data, pos)
+                    pos += ik_link.size
+                    link = PmxBoneIkLink(bone_index=link_bone)
+                    if has_limits:
+                        axes = _UNPACK_AXES(data, pos)
+                        link.limit_min = [math.degrees(value) for value in axes[:3]]
+                        link.limit_max = [math.degrees(value) for value in axes[3:]]
+                        pos += 24
+                    bone.ik_links.append(link)
+            self.pos = pos
+            bones.append(bone)
+        return bones
+
+    def read_morphs(self) -> List[PmxMorph]:
+        """读取变形段（全部11种变形类型）
+
+        Raises:
+            ValueError: 变形类型未知或数据不完整
+        """
+        data = self.data
+        morph_count = self._read_int()
+        morphs = []
+        for _ in range(morph_count):
+            name_jp = self.read_text()
+            name_en = self.read_text()
+            panel, morph_type, item_count = _UNPACK_MORPH_HEAD(data, self.pos)
+            self.pos += 6
+            try:
+                item_struct, build = self._morph_items[morph_type]
+            except KeyError:
+                raise ValueError(f"未知的变形类型: {morph_type}") from None
+            end = self.pos + item_count * item_struct.size
+            if end > len(data):
+                raise ValueError(f"变形数据不完整: {name_jp}")
+            items = [build(values) for values in
+                     item_struct.iter_unpack(memoryview(data)[self.pos:end])]
+            self.pos = end
+            morphs.append(PmxMorph(name_jp=name_jp, name_en=name_en, panel=MorphPanel(panel),
+                                   morph_type=MorphType(morph_type), items=items))
+        return morphs
+
+
+def parse_bones_and_morphs(data: bytes, pos: int, encoding: str,
+                           index_sizes: Sequence[int]) -> Tuple[List[PmxBone], List[PmxMorph]]:
+    """读取骨骼段和变形段
+
+    只包含顶点、面、纹理和材质的文件（材质段后没有数据）返回两个空列表。
+
+    Args:
+        data: 整个PMX文件的字节数据
+        pos: 骨骼段的起始偏移
+        encoding: 文本编码
+        index_sizes: 全局标志中的索引字节数 (顶点, 纹理, 材质, 骨骼, 变形, 刚体)
+
+    Returns:
+        (骨骼列表, 变形列表)
+    """
+    if pos >= len(data):
+        return [], []
+    reader = PmxSectionReader(data, pos, encoding, index_sizes)
+    bones = reader.read_bones()
+    return bones, reader.read_morphs()
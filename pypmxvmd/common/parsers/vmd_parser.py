@@ -8,14 +8,20 @@
 import math
 import struct
 from pathlib import Path
-from typing import List, Optional, Union, Callable
+from typing import Iterator, List, Optional, Union, Callable
 
 from pypmxvmd.common.models.vmd import (
     VmdMotion, VmdHeader, VmdBoneFrame, VmdMorphFrame, VmdCameraFrame,
-    VmdLightFrame, VmdShadowFrame, VmdIkFrame, VmdIkBone
+    VmdLightFrame, VmdShadowFrame, VmdIkFrame, VmdIkBone, VmdNameTable,
+    VMD_NAME_LENGTH, VMD_IK_NAME_LENGTH
 )
 from pypmxvmd.common.io.binary_io import BinaryIOHandler
-from pypmxvmd.common.parsers.vmd_parser_nuthouse import VmdParserNuthouse
+from pypmxvmd.common.io.text_io import (
+    TextRowReader, TextChunkWriter, RowFormatter, DEFAULT_FLOAT_PRECISION, parse_floats, parse_ints,
+    parse_float_rows, parse_int_rows
+)
+from pypmxvmd.common import instrumentation
+from pypmxvmd.common.processing.keyframes import normalize_motion
 
 # 尝试导入Cython优化模块
 try:
@@ -215,18 +221,22 @@ class VmdParser:
         self._current_pos = 0
 
         vmd_motion = VmdMotion()
+        trace = instrumentation.tracer("vmd", "parse", "fast", self._io_handler.get_position)
+        start_ns = instrumentation.now_ns()
 
         try:
             # 解析文件头
-            vmd_motion.header = self._parse_header_fast(more_info)
+            vmd_motion.header = trace.run("header", self._parse_header_fast, more_info)
 
             # 解析各个数据段
-            vmd_motion.bone_frames = self._parse_bone_frames_fast(more_info)
-            vmd_motion.morph_frames = self._parse_morph_frames_fast(more_info)
-            vmd_motion.camera_frames = self._parse_camera_frames_fast(more_info)
-            vmd_motion.light_frames = self._parse_light_frames_fast(more_info)
-            vmd_motion.shadow_frames = self._parse_shadow_frames_fast(more_info)
-            vmd_motion.ik_frames = self._parse_ik_frames_fast(more_info)
+            vmd_motion.bone_frames = trace.run("bone_frames", self._parse_bone_frames_fast, more_info)
+            vmd_motion.morph_frames = trace.run("morph_frames", self._parse_morph_frames_fast, more_info)
+            vmd_motion.camera_frames = trace.run("camera_frames", self._parse_camera_frames_fast, more_info)
+            vmd_motion.light_frames = trace.run("light_frames", self._parse_light_frames_fast, more_info)
+            vmd_motion.shadow_frames = trace.run("shadow_frames", self._parse_shadow_frames_fast, more_info)
+            vmd_motion.ik_frames = trace.run("ik_frames", self._parse_ik_frames_fast, more_info)
+            trace.file(instrumentation.now_ns() - start_ns, self._total_size,
+                       self._count_frames(vmd_motion))
 
             if more_info:
                 print(f"VMD快速解析完成: {len(vmd_motion.bone_frames)}个骨骼帧, "
@@ -267,16 +277,23 @@ class VmdParser:
 
             try:
                 # 使用Cython模块解析
+                start_ns = instrumentation.now_ns()
                 vmd_motion = parse_vmd_cython(data, more_info)
+                instrumentation.tracer("vmd", "parse", "cython").file(
+                    instrumentation.now_ns() - start_ns, len(data), self._count_frames(vmd_motion))
                 return vmd_motion
             except Exception as e:
+                instrumentation.report_fallback("vmd", "parse", "cython", "fast", e, file_path)
                 if more_info:
                     print(f"Cython解析失败，回退到快速解析: {e}")
+        else:
+            instrumentation.report_fallback("vmd", "parse", "cython", "fast", None, file_path)
 
         # 回退到快速解析
         try:
             return self.parse_file_fast(file_path, more_info)
         except Exception as e:
+            instrumentation.report_fallback("vmd", "parse", "fast", "nuthouse", e, file_path)
             if more_info:
                 print(f"快速解析失败，回退到Nuthouse解析: {e}")
 
@@ -285,8 +302,123 @@ class VmdParser:
     def _parse_file_nuthouse(self, file_path: Union[str, Path],
                             more_info: bool = False) -> VmdMotion:
         """使用Nuthouse实现解析VMD文件（保守回退）"""
+        # Nuthouse实现仅在回退时使用，按需导入
+        from pypmxvmd.common.parsers.vmd_parser_nuthouse import VmdParserNuthouse
+
         parser = VmdParserNuthouse(self._progress_callback)
-        return parser.parse_file(file_path, more_info=more_info)
+        start_ns = instrumentation.now_ns()
+        vmd_motion = parser.parse_file(file_path, more_info=more_info)
+        instrumentation.tracer("vmd", "parse", "nuthouse").file(
+            instrumentation.now_ns() - start_ns, None, self._count_frames(vmd_motion))
+        return vmd_motion
+
+    @staticmethod
+    def _count_frames(vmd_motion: VmdMotion) -> int:
+        """统计动作中的关键帧总数"""
+        return (len(vmd_motion.bone_frames) + len(vmd_motion.morph_frames)
+                + len(vmd_motion.camera_frames) + len(vmd_motion.light_frames)
+                + len(vmd_motion.shadow_frames) + len(vmd_motion.ik_frames))
+
+    # 各类关键帧记录的字节数（不含名称以外的可变部分）
+    _BONE_RECORD_SIZE = 111
+    _MORPH_RECORD_SIZE = 23
+    _CAMERA_RECORD_SIZE = 61
+    _LIGHT_RECORD_SIZE = 28
+    _SHADOW_RECORD_SIZE = 9
+
+    def scan_names(self, file_path: Union[str, Path], more_info: bool = False) -> VmdNameTable:
+        """只读取VMD的文件头、各类关键帧数量和名称表
+
+        跳过所有关键帧数据，名称保留为原始字节，不创建关键帧对象。
+        文件在某个数据段之前结束时（旧版VMD），之后的数量视为0。
+
+        Args:
+            file_path: VMD文件路径
+            more_info: 是否显示详细信息
+
+        Returns:
+            VmdNameTable
+
+        Raises:
+            FileNotFoundError: 文件不存在
+            ValueError: 文件格式错误
+        """
+        file_path = Path(file_path)
+        data = file_path.read_bytes()
+        try:
+            if data[:21] != b"Vocaloid Motion Data ":
+                raise ValueError(f"无效的VMD魔术字符串: {data[:21]!r}")
+            version_tag = data[21:25]
+            if version_tag == b"0002":
+                version, name_length = 2, 20
+            elif version_tag == b"file":
+                version, name_length = 1, 10
+            else:
+                raise ValueError(f"不支持的VMD版本标识: {version_tag!r}")
+            pos = 30 + name_length
+            model_name = data[30:pos].split(b"\x00", 1)[0].decode("shift_jis", errors="ignore")
+            table = VmdNameTable(version, model_name)
+
+            pos = self._scan_named_records(data, pos, self._BONE_RECORD_SIZE, table.bone_names)
+            pos = self._scan_named_records(data, pos, self._MORPH_RECORD_SIZE, table.morph_names)
+            table.camera_frame_count, pos = self._scan_count(data, pos, self._CAMERA_RECORD_SIZE)
+            table.light_frame_count, pos = self._scan_count(data, pos, self._LIGHT_RECORD_SIZE)
+            table.shadow_frame_count, pos = self._scan_count(data, pos, self._SHADOW_RECORD_SIZE)
+            table.ik_frame_count, pos = self._scan_ik_names(data, pos, table.ik_bone_names)
+        except (ValueError, struct.error) as e:
+            raise ValueError(f"VMD名称扫描失败: {e}") from e
+
+        if more_info:
+            print(f"VMD名称扫描完成: {len(table.bone_names)}个骨骼, {len(table.morph_names)}个变形")
+        return table
+
+    @staticmethod
+    def _scan_named_records(data: bytes, pos: int, record_size: int, names: dict) -> int:
+        """统计定长记录开头的名称，返回数据段结束位置"""
+        if pos + 4 > len(data):
+            return pos
+        count = struct.unpack_from("<I", data, pos)[0]
+        pos += 4
+        end = pos + count * record_size
+        if end > len(data):
+            raise ValueError(f"关键帧数据不完整: 需要{count}条记录")
+        get = names.get
+        for start in range(pos, end, record_size):
+            raw = data[start:start + VMD_NAME_LENGTH]
+            null_pos = raw.find(b"\x00")
+            if null_pos != -1:
+                raw = raw[:null_pos]
+            names[raw] = get(raw, 0) + 1
+        return end
+
+    @staticmethod
+    def _scan_count(data: bytes, pos: int, record_size: int):
+        """读取定长数据段的记录数并跳过该段"""
+        if pos + 4 > len(data):
+            return 0, pos
+        count = struct.unpack_from("<I", data, pos)[0]
+        end = pos + 4 + count * record_size
+        if end > len(data):
+            raise ValueError(f"关键帧数据不完整: 需要{count}条记录")
+        return count, end
+
+    @staticmethod
+    def _scan_ik_names(data: bytes, pos: int, names: dict):
+        """读取IK关键帧中的骨骼名称"""
+        if pos + 4 > len(data):
+            return 0, pos
+        count = struct.unpack_from("<I", data, pos)[0]
+        pos += 4
+        for _ in range(count):
+            bone_count = struct.unpack_from("<I", data, pos + 5)[0]
+            pos += 9
+            for _ in range(bone_count):
+                raw = data[pos:pos + VMD_IK_NAME_LENGTH].split(b"\x00", 1)[0]
+                names[raw] = names.get(raw, 0) + 1
+                pos += VMD_IK_NAME_LENGTH + 1
+        if pos > len(data):
+            raise ValueError("IK关键帧数据不完整")
+        return count, pos
     
     def _parse_header(self, data: bytearray, more_info: bool) -> VmdHeader:
         """解析VMD文件头"""
@@ -877,12 +1009,14 @@ class VmdParser:
         return ik_frames
 
     def write_file(self, vmd_motion: VmdMotion, 
-                  file_path: Union[str, Path]) -> None:
+                  file_path: Union[str, Path], normalize: bool = False) -> None:
         """写入VMD文件
         
         Args:
             vmd_motion: VMD动作对象
             file_path: 输出文件路径
+            normalize: 是否先按 (名称, 帧号) 排序并去除重复关键帧（保留最后一个），
+                不修改传入的动作
         """
         file_path = Path(file_path)
         print(f"开始写入VMD文件: {file_path}")
@@ -892,20 +1026,26 @@ class VmdParser:
         
         # 构建二进制数据
         binary_data = bytearray()
+        trace = instrumentation.tracer("vmd", "write", "python")
+        start_ns = instrumentation.now_ns()
+
+        if normalize:
+            vmd_motion = trace.run("normalize", normalize_motion, vmd_motion)
         
         # 编码文件头
-        binary_data.extend(self._encode_header(vmd_motion.header))
+        binary_data.extend(trace.run("header", self._encode_header, vmd_motion.header))
         
         # 编码各数据段
-        binary_data.extend(self._encode_bone_frames(vmd_motion.bone_frames))
-        binary_data.extend(self._encode_morph_frames(vmd_motion.morph_frames))
-        binary_data.extend(self._encode_camera_frames(vmd_motion.camera_frames))
-        binary_data.extend(self._encode_light_frames(vmd_motion.light_frames))
-        binary_data.extend(self._encode_shadow_frames(vmd_motion.shadow_frames))
-        binary_data.extend(self._encode_ik_frames(vmd_motion.ik_frames))
+        binary_data.extend(trace.run("bone_frames", self._encode_bone_frames, vmd_motion.bone_frames))
+        binary_data.extend(trace.run("morph_frames", self._encode_morph_frames, vmd_motion.morph_frames))
+        binary_data.extend(trace.run("camera_frames", self._encode_camera_frames, vmd_motion.camera_frames))
+        binary_data.extend(trace.run("light_frames", self._encode_light_frames, vmd_motion.light_frames))
+        binary_data.extend(trace.run("shadow_frames", self._encode_shadow_frames, vmd_motion.shadow_frames))
+        binary_data.extend(trace.run("ik_frames", self._encode_ik_frames, vmd_motion.ik_frames))
         
         # 写入文件
         self._io_handler.write_file(file_path, bytes(binary_data))
+        trace.file(instrumentation.now_ns() - start_ns, len(binary_data), self._count_frames(vmd_motion))
         
         print("VMD文件写入完成")
     
@@ -1007,14 +1147,18 @@ class VmdParser:
             ry = math.radians(frame.rotation[1])
             rz = math.radians(frame.rotation[2])
             
-            # 插值数据（简化处理）
-            interp = frame.interpolation if frame.interpolation else [20, 107, 20, 107] * 6
+            # 插值数据：内存中为 (ax, ay, bx, by)，文件中为 (ax, bx, ay, by)
+            interp = frame.interpolation if frame.interpolation else [20, 20, 107, 107] * 6
+            interp_ordered = []
+            for channel in range(0, 24, 4):
+                ax, ay, bx, by = interp[channel:channel + 4]
+                interp_ordered += (ax, bx, ay, by)
             
             cam_data = (
                 frame.frame_number, frame.distance,
                 frame.position[0], frame.position[1], frame.position[2],
                 rx, ry, rz,
-                *interp,  # 24个插值参数
+                *interp_ordered,  # 24个插值参数
                 frame.fov, int(frame.perspective)
             )
             
@@ -1073,6 +1217,8 @@ class VmdParser:
     
     def parse_text_file(self, file_path: Union[str, Path], more_info: bool = False) -> VmdMotion:
         """解析VMD文本文件
+
+        逐行流式读取，不会把整个文件载入内存。
         
         Args:
             file_path: 文本文件路径
@@ -1088,41 +1234,35 @@ class VmdParser:
         file_path = Path(file_path)
         if more_info:
             print(f"开始解析VMD文本文件: {file_path}")
+        start_ns = instrumentation.now_ns()
             
         with open(file_path, 'r', encoding='utf-8') as f:
-            lines = [line.strip().split('\t') if '\t' in line else [line.strip()] 
-                    for line in f.readlines() if line.strip()]
-        
-        if more_info:
-            print(f"文本文件总行数: {len(lines)}")
-            
-        line_idx = 0
-        
-        try:
-            # 解析头部
-            header = self._parse_text_header(lines, line_idx)
-            line_idx += 2
-            
-            # 解析骨骼帧
-            bone_frames, line_idx = self._parse_text_bone_frames(lines, line_idx, more_info)
-            
-            # 解析变形帧
-            morph_frames, line_idx = self._parse_text_morph_frames(lines, line_idx, more_info)
-            
-            # 解析相机帧
-            camera_frames, line_idx = self._parse_text_camera_frames(lines, line_idx, more_info)
-            
-            # 解析光源帧
-            light_frames, line_idx = self._parse_text_light_frames(lines, line_idx, more_info)
-            
-            # 解析阴影帧
-            shadow_frames, line_idx = self._parse_text_shadow_frames(lines, line_idx, more_info)
+            reader = TextRowReader(f)
             
-            # 解析IK帧
-            ik_frames, line_idx = self._parse_text_ik_frames(lines, line_idx, more_info)
-            
-        except (ValueError, IndexError) as e:
-            raise ValueError(f"VMD文本文件解析失败在第{line_idx + 1}行: {e}")
+            try:
+                # 解析头部
+                header = self._parse_text_header(reader)
+                
+                # 解析骨骼帧
+                bone_frames = self._parse_text_bone_frames(reader, more_info)
+                
+                # 解析变形帧
+                morph_frames = self._parse_text_morph_frames(reader, more_info)
+                
+                # 解析相机帧
+                camera_frames = self._parse_text_camera_frames(reader, more_info)
+                
+                # 解析光源帧
+                light_frames = self._parse_text_light_frames(reader, more_info)
+                
+                # 解析阴影帧
+                shadow_frames = self._parse_text_shadow_frames(reader, more_info)
+                
+                # 解析IK帧
+                ik_frames = self._parse_text_ik_frames(reader, more_info)
+                
+            except (ValueError, IndexError) as e:
+                raise ValueError(f"VMD文本文件解析失败在第{reader.line_number}行: {e}")
         
         if more_info:
             print(f"VMD文本解析完成")
@@ -1136,299 +1276,242 @@ class VmdParser:
         motion.light_frames = light_frames
         motion.shadow_frames = shadow_frames
         motion.ik_frames = ik_frames
+        instrumentation.tracer("vmd", "parse_text", "python").file(
+            instrumentation.now_ns() - start_ns, None, self._count_frames(motion))
         
         return motion
     
-    def write_text_file(self, motion: VmdMotion, file_path: Union[str, Path]) -> None:
+    def write_text_file(self, motion: VmdMotion, file_path: Union[str, Path],
+                        float_precision: Optional[int] = DEFAULT_FLOAT_PRECISION) -> None:
         """将VMD运动数据导出为文本文件
+
+        各数据段逐行生成并分块写入文件，不会在内存中构建完整的输出。
         
         Args:
             motion: VMD运动对象
             file_path: 输出文件路径
+            float_precision: 浮点小数位数，默认6位；为None时输出能精确还原float32的最短表示
         """
         file_path = Path(file_path)
         print(f"开始写入VMD文本文件: {file_path}")
+        start_ns = instrumentation.now_ns()
         
-        lines = []
-        
-        # 写入头部
-        lines.extend(self._format_text_header(motion.header))
-        
-        # 写入骨骼帧
-        lines.extend(self._format_text_bone_frames(motion.bone_frames))
-        
-        # 写入变形帧
-        lines.extend(self._format_text_morph_frames(motion.morph_frames))
-        
-        # 写入相机帧
-        lines.extend(self._format_text_camera_frames(motion.camera_frames))
-        
-        # 写入光源帧
-        lines.extend(self._format_text_light_frames(motion.light_frames))
-        
-        # 写入阴影帧
-        lines.extend(self._format_text_shadow_frames(motion.shadow_frames))
-        
-        # 写入IK帧
-        lines.extend(self._format_text_ik_frames(motion.ik_frames))
-        
-        # 写入文件
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(lines))
+        with open(file_path, 'w', encoding='utf-8') as f, TextChunkWriter(f) as writer:
+            # 写入头部
+            writer.write_lines(self._format_text_header(motion.header))
+            
+            # 写入骨骼帧
+            writer.write_lines(self._format_text_bone_frames(motion.bone_frames, float_precision))
+            
+            # 写入变形帧
+            writer.write_lines(self._format_text_morph_frames(motion.morph_frames, float_precision))
+            
+            # 写入相机帧
+            writer.write_lines(self._format_text_camera_frames(motion.camera_frames, float_precision))
+            
+            # 写入光源帧
+            writer.write_lines(self._format_text_light_frames(motion.light_frames, float_precision))
+            
+            # 写入阴影帧
+            writer.write_lines(self._format_text_shadow_frames(motion.shadow_frames, float_precision))
+            
+            # 写入IK帧
+            writer.write_lines(self._format_text_ik_frames(motion.ik_frames))
+        instrumentation.tracer("vmd", "write_text", "python").file(
+            instrumentation.now_ns() - start_ns, None, self._count_frames(motion))
         
-        print(f"VMD文本文件写入完成，总行数: {len(lines)}")
+        print(f"VMD文本文件写入完成，总行数: {writer.line_count}")
     
-    def _parse_text_header(self, lines: List[List[str]], start_idx: int) -> VmdHeader:
+    def _parse_text_header(self, reader: TextRowReader) -> VmdHeader:
         """解析文本文件头部"""
-        if start_idx >= len(lines) or len(lines[start_idx]) != 2 or lines[start_idx][0] != "version:":
-            raise ValueError("缺少版本信息")
-        version = lines[start_idx][1]
-        
-        if start_idx + 1 >= len(lines) or len(lines[start_idx + 1]) != 2 or lines[start_idx + 1][0] != "modelname:":
-            raise ValueError("缺少模型名称")
-        model_name = lines[start_idx + 1][1]
+        version = int(reader.read_field("version:", "缺少版本信息"))
+        model_name = reader.read_field("modelname:", "缺少模型名称")
         
         return VmdHeader(version=version, model_name=model_name)
     
-    def _parse_text_bone_frames(self, lines: List[List[str]], start_idx: int, more_info: bool) -> tuple:
-        """解析骨骼帧数据"""
-        if start_idx >= len(lines) or len(lines[start_idx]) != 2 or lines[start_idx][0] != "boneframe_ct:":
-            raise ValueError("缺少骨骼帧计数")
-        
-        frame_count = int(lines[start_idx][1])
-        line_idx = start_idx + 1
+    def _read_text_section(self, reader: TextRowReader, marker: str, missing: str,
+                           label: str, more_info: bool):
+        """读取一个文本数据段的计数行和键名行，逐行产出数据行
+
+        Args:
+            reader: 文本行读取器
+            marker: 计数行的键名，如 "boneframe_ct:"
+            missing: 计数行缺失时的错误信息
+            label: 数据段名称，用于提示和错误信息
+            more_info: 是否显示详细信息
+        """
+        frame_count = int(reader.read_field(marker, missing))
         
         if more_info:
-            print(f"骨骼帧数量: {frame_count}")
+            print(f"{label}数量: {frame_count}")
         
-        bone_frames = []
         if frame_count > 0:
             # 跳过键名行
-            if line_idx >= len(lines):
-                raise ValueError("骨骼帧数据不完整")
-            line_idx += 1
+            if reader.read_row() is None:
+                raise ValueError(f"{label}数据不完整")
             
-            for i in range(frame_count):
-                if line_idx >= len(lines):
-                    raise ValueError(f"骨骼帧数据不完整，期望{frame_count}帧，只找到{i}帧")
-                
-                row = lines[line_idx]
-                if len(row) < 25:  # 最少25个字段
-                    raise ValueError(f"骨骼帧格式错误，期望至少25个字段，得到{len(row)}个")
-                
-                # 文本格式使用欧拉角（度数），直接使用
-                euler_angles = [float(row[5]), float(row[6]), float(row[7])]
-                
-                frame = VmdBoneFrame(
-                    bone_name=row[0],
-                    frame_number=int(row[1]),
-                    position=[float(row[2]), float(row[3]), float(row[4])],
-                    rotation=euler_angles,
-                    physics_disabled=bool(int(row[8])),
-                    interpolation=[
-                        int(row[9]), int(row[10]), int(row[11]), int(row[12]),   # x
-                        int(row[13]), int(row[14]), int(row[15]), int(row[16]),  # y
-                        int(row[17]), int(row[18]), int(row[19]), int(row[20]),  # z
-                        int(row[21]), int(row[22]), int(row[23]), int(row[24])   # r
-                    ]
-                )
-                bone_frames.append(frame)
-                line_idx += 1
-        
-        return bone_frames, line_idx
+            i = 0
+            for i, row in enumerate(reader.read_rows(frame_count), 1):
+                yield row
+            if i < frame_count:
+                raise ValueError(f"{label}数据不完整，期望{frame_count}帧，只找到{i}帧")
     
-    def _parse_text_morph_frames(self, lines: List[List[str]], start_idx: int, more_info: bool) -> tuple:
-        """解析变形帧数据"""
-        if start_idx >= len(lines) or len(lines[start_idx]) != 2 or lines[start_idx][0] != "morphframe_ct:":
-            raise ValueError("缺少变形帧计数")
-        
-        frame_count = int(lines[start_idx][1])
-        line_idx = start_idx + 1
+    def _parse_text_bone_frames(self, reader: TextRowReader, more_info: bool) -> List[VmdBoneFrame]:
+        """解析骨骼帧数据"""
+        bone_frames = []
+        rows = self._read_text_section(reader, "boneframe_ct:", "缺少骨骼帧计数", "骨骼帧", more_info)
+        for block in reader.convert_blocks(rows, self._bone_frames_from_rows):
+            bone_frames.extend(block)
         
-        if more_info:
-            print(f"变形帧数量: {frame_count}")
+        return bone_frames
+    
+    @staticmethod
+    def _bone_frames_from_rows(rows: List[List[str]]) -> List[VmdBoneFrame]:
+        """将一块骨骼帧行转换为骨骼帧列表"""
+        shortest = min(map(len, rows))
+        if shortest < 25:  # 最少25个字段
+            raise ValueError(f"骨骼帧格式错误，期望至少25个字段，得到{shortest}个")
+        
+        # 整块的位置和旋转一次性转换，文本格式使用欧拉角（度数），直接使用
+        values = parse_float_rows(rows, 2, 8)
+        frame_numbers = parse_int_rows(rows, 1, 2)
+        # 物理开关和插值参数（x, y, z, r 各4个）
+        flags = parse_int_rows(rows, 8, 25)
         
+        bone_frames = []
+        for k, row in enumerate(rows):
+            base = k * 6
+            flag_base = k * 17
+            frame = VmdBoneFrame(
+                bone_name=row[0],
+                frame_number=frame_numbers[k],
+                position=values[base:base + 3],
+                rotation=values[base + 3:base + 6],
+                physics_disabled=bool(flags[flag_base]),
+                interpolation=flags[flag_base + 1:flag_base + 17]
+            )
+            bone_frames.append(frame)
+        return bone_frames
+    
+    def _parse_text_morph_frames(self, reader: TextRowReader, more_info: bool) -> List[VmdMorphFrame]:
+        """解析变形帧数据"""
         morph_frames = []
-        if frame_count > 0:
-            # 跳过键名行
-            line_idx += 1
-            
-            for i in range(frame_count):
-                if line_idx >= len(lines):
-                    raise ValueError(f"变形帧数据不完整")
-                
-                row = lines[line_idx]
-                if len(row) != 3:
-                    raise ValueError(f"变形帧格式错误，期望3个字段，得到{len(row)}个")
-                
-                frame = VmdMorphFrame(
-                    morph_name=row[0],
-                    frame_number=int(row[1]),
-                    weight=float(row[2])
-                )
-                morph_frames.append(frame)
-                line_idx += 1
+        rows = self._read_text_section(reader, "morphframe_ct:", "缺少变形帧计数", "变形帧", more_info)
+        for block in reader.convert_blocks(rows, self._morph_frames_from_rows):
+            morph_frames.extend(block)
         
-        return morph_frames, line_idx
+        return morph_frames
     
-    def _parse_text_camera_frames(self, lines: List[List[str]], start_idx: int, more_info: bool) -> tuple:
+    @staticmethod
+    def _morph_frames_from_rows(rows: List[List[str]]) -> List[VmdMorphFrame]:
+        """将一块变形帧行转换为变形帧列表"""
+        lengths = set(map(len, rows))
+        if lengths != {3}:
+            raise ValueError(f"变形帧格式错误，期望3个字段，得到{min(lengths - {3})}个")
+        
+        frame_numbers = parse_int_rows(rows, 1, 2)
+        weights = parse_float_rows(rows, 2, 3)
+        return [
+            VmdMorphFrame(morph_name=row[0], frame_number=frame_number, weight=weight)
+            for row, frame_number, weight in zip(rows, frame_numbers, weights)
+        ]
+    
+    def _parse_text_camera_frames(self, reader: TextRowReader, more_info: bool) -> List[VmdCameraFrame]:
         """解析相机帧数据"""
-        if start_idx >= len(lines) or len(lines[start_idx]) != 2 or lines[start_idx][0] != "camframe_ct:":
-            raise ValueError("缺少相机帧计数")
-        
-        frame_count = int(lines[start_idx][1])
-        line_idx = start_idx + 1
-        
-        if more_info:
-            print(f"相机帧数量: {frame_count}")
-        
         camera_frames = []
-        if frame_count > 0:
-            # 跳过键名行
-            line_idx += 1
+        for row in self._read_text_section(reader, "camframe_ct:", "缺少相机帧计数", "相机帧", more_info):
+            if len(row) < 34:
+                raise ValueError(f"相机帧格式错误，期望至少34个字段，得到{len(row)}个")
             
-            for i in range(frame_count):
-                if line_idx >= len(lines):
-                    raise ValueError(f"相机帧数据不完整")
-                
-                row = lines[line_idx]
-                if len(row) < 34:
-                    raise ValueError(f"相机帧格式错误，期望至少34个字段，得到{len(row)}个")
-                
-                frame = VmdCameraFrame(
-                    frame_number=int(row[0]),
-                    distance=float(row[1]),
-                    position=[float(row[2]), float(row[3]), float(row[4])],
-                    rotation=[float(row[5]), float(row[6]), float(row[7])],
-                    fov=float(row[8]),
-                    perspective=bool(int(row[9])),
-                    interpolation=[int(r) for r in row[10:34]]
-                )
-                camera_frames.append(frame)
-                line_idx += 1
+            values = parse_floats(row[1:9])
+            
+            frame = VmdCameraFrame(
+                frame_number=int(row[0]),
+                distance=values[0],
+                position=values[1:4],
+                rotation=values[4:7],
+                fov=int(values[7]),
+                perspective=bool(int(row[9])),
+                interpolation=parse_ints(row[10:34])
+            )
+            camera_frames.append(frame)
         
-        return camera_frames, line_idx
+        return camera_frames
     
-    def _parse_text_light_frames(self, lines: List[List[str]], start_idx: int, more_info: bool) -> tuple:
+    def _parse_text_light_frames(self, reader: TextRowReader, more_info: bool) -> List[VmdLightFrame]:
         """解析光源帧数据"""
-        if start_idx >= len(lines) or len(lines[start_idx]) != 2 or lines[start_idx][0] != "lightframe_ct:":
-            raise ValueError("缺少光源帧计数")
-        
-        frame_count = int(lines[start_idx][1])
-        line_idx = start_idx + 1
-        
-        if more_info:
-            print(f"光源帧数量: {frame_count}")
-        
         light_frames = []
-        if frame_count > 0:
-            # 跳过键名行
-            line_idx += 1
+        for row in self._read_text_section(reader, "lightframe_ct:", "缺少光源帧计数", "光源帧", more_info):
+            if len(row) != 7:
+                raise ValueError(f"光源帧格式错误，期望7个字段，得到{len(row)}个")
             
-            for i in range(frame_count):
-                if line_idx >= len(lines):
-                    raise ValueError(f"光源帧数据不完整")
-                
-                row = lines[line_idx]
-                if len(row) != 7:
-                    raise ValueError(f"光源帧格式错误，期望7个字段，得到{len(row)}个")
-                
-                frame = VmdLightFrame(
-                    frame_number=int(row[0]),
-                    color=[float(row[1]), float(row[2]), float(row[3])],
-                    position=[float(row[4]), float(row[5]), float(row[6])]
-                )
-                light_frames.append(frame)
-                line_idx += 1
+            values = parse_floats(row[1:7])
+            
+            frame = VmdLightFrame(
+                frame_number=int(row[0]),
+                color=values[0:3],
+                position=values[3:6]
+            )
+            light_frames.append(frame)
         
-        return light_frames, line_idx
+        return light_frames
     
-    def _parse_text_shadow_frames(self, lines: List[List[str]], start_idx: int, more_info: bool) -> tuple:
+    def _parse_text_shadow_frames(self, reader: TextRowReader, more_info: bool) -> List[VmdShadowFrame]:
         """解析阴影帧数据"""
-        if start_idx >= len(lines) or len(lines[start_idx]) != 2 or lines[start_idx][0] != "shadowframe_ct:":
-            raise ValueError("缺少阴影帧计数")
-        
-        frame_count = int(lines[start_idx][1])
-        line_idx = start_idx + 1
-        
-        if more_info:
-            print(f"阴影帧数量: {frame_count}")
-        
         shadow_frames = []
-        if frame_count > 0:
-            # 跳过键名行
-            line_idx += 1
+        for row in self._read_text_section(reader, "shadowframe_ct:", "缺少阴影帧计数", "阴影帧", more_info):
+            if len(row) != 3:
+                raise ValueError(f"阴影帧格式错误，期望3个字段，得到{len(row)}个")
             
-            for i in range(frame_count):
-                if line_idx >= len(lines):
-                    raise ValueError(f"阴影帧数据不完整")
-                
-                row = lines[line_idx]
-                if len(row) != 3:
-                    raise ValueError(f"阴影帧格式错误，期望3个字段，得到{len(row)}个")
-                
-                frame = VmdShadowFrame(
-                    frame_number=int(row[0]),
-                    shadow_mode=int(row[1]),
-                    distance=float(row[2])
-                )
-                shadow_frames.append(frame)
-                line_idx += 1
+            frame = VmdShadowFrame(
+                frame_number=int(row[0]),
+                shadow_mode=int(row[1]),
+                distance=float(row[2])
+            )
+            shadow_frames.append(frame)
         
-        return shadow_frames, line_idx
+        return shadow_frames
     
-    def _parse_text_ik_frames(self, lines: List[List[str]], start_idx: int, more_info: bool) -> tuple:
+    def _parse_text_ik_frames(self, reader: TextRowReader, more_info: bool) -> List[VmdIkFrame]:
         """解析IK帧数据"""
-        if start_idx >= len(lines) or len(lines[start_idx]) != 2 or lines[start_idx][0] != "ik/dispframe_ct:":
-            raise ValueError("缺少IK帧计数")
-        
-        frame_count = int(lines[start_idx][1])
-        line_idx = start_idx + 1
-        
-        if more_info:
-            print(f"IK帧数量: {frame_count}")
-        
         ik_frames = []
-        if frame_count > 0:
-            # 跳过键名行
-            line_idx += 1
+        for row in self._read_text_section(reader, "ik/dispframe_ct:", "缺少IK帧计数", "IK帧", more_info):
+            if len(row) < 2 or len(row) % 2 != 0:
+                raise ValueError(f"IK帧格式错误，需要偶数个字段且至少2个字段")
             
-            for i in range(frame_count):
-                if line_idx >= len(lines):
-                    raise ValueError(f"IK帧数据不完整")
-                
-                row = lines[line_idx]
-                if len(row) < 2 or len(row) % 2 != 0:
-                    raise ValueError(f"IK帧格式错误，需要偶数个字段且至少2个字段")
-                
-                ik_bones = []
-                for j in range(2, len(row), 2):
-                    ik_bone = VmdIkBone(
-                        bone_name=row[j],
-                        ik_enabled=bool(int(row[j + 1]))
-                    )
-                    ik_bones.append(ik_bone)
-                
-                frame = VmdIkFrame(
-                    frame_number=int(row[0]),
-                    display=bool(int(row[1])),
-                    ik_bones=ik_bones
+            ik_bones = []
+            for j in range(2, len(row), 2):
+                ik_bone = VmdIkBone(
+                    bone_name=row[j],
+                    ik_enabled=bool(int(row[j + 1]))
                 )
-                ik_frames.append(frame)
-                line_idx += 1
+                ik_bones.append(ik_bone)
+            
+            frame = VmdIkFrame(
+                frame_number=int(row[0]),
+                display=bool(int(row[1])),
+                ik_bones=ik_bones
+            )
+            ik_frames.append(frame)
         
-        return ik_frames, line_idx
+        return ik_frames
     
-    def _format_text_header(self, header: VmdHeader) -> List[str]:
+    def _format_text_header(self, header: VmdHeader) -> Iterator[str]:
         """格式化头部为文本"""
-        return [
-            f"version:\t{header.version}",
-            f"modelname:\t{header.model_name}"
-        ]
+        yield f"version:\t{header.version}"
+        yield f"modelname:\t{header.model_name}"
+    
+    @staticmethod
+    def _with_interpolation(line: str, interpolation: list) -> str:
+        """在行尾追加插值参数"""
+        if interpolation:
+            return line + '\t' + '\t'.join(map(str, interpolation))
+        return line
     
-    def _format_text_bone_frames(self, bone_frames: List[VmdBoneFrame]) -> List[str]:
+    def _format_text_bone_frames(self, bone_frames: List[VmdBoneFrame],
+                                 float_precision: Optional[int] = DEFAULT_FLOAT_PRECISION) -> Iterator[str]:
         """格式化骨骼帧为文本"""
-        lines = [f"boneframe_ct:\t{len(bone_frames)}"]
+        yield f"boneframe_ct:\t{len(bone_frames)}"
         
         if bone_frames:
             # 键名行
@@ -1437,52 +1520,46 @@ class VmdParser:
                    "interp_y_ax", "interp_y_ay", "interp_y_bx", "interp_y_by", 
                    "interp_z_ax", "interp_z_ay", "interp_z_bx", "interp_z_by", 
                    "interp_r_ax", "interp_r_ay", "interp_r_bx", "interp_r_by"]
-            lines.append('\t'.join(keys))
+            yield '\t'.join(keys)
             
-            for frame in bone_frames:
-                # VMD骨骼帧应该统一使用3元素欧拉角格式（度数）
-                if len(frame.rotation) != 3:
-                    raise ValueError(f"Invalid rotation format: expected 3 Euler angles, got {len(frame.rotation)} elements")
-                
-                # 直接使用存储的欧拉角（已经是度数格式）
-                euler_angles = frame.rotation
-                
-                row = [
-                    frame.bone_name,
-                    str(frame.frame_number),
-                    f"{frame.position[0]:.6f}",
-                    f"{frame.position[1]:.6f}",
-                    f"{frame.position[2]:.6f}",
-                    f"{euler_angles[0]:.6f}",
-                    f"{euler_angles[1]:.6f}",
-                    f"{euler_angles[2]:.6f}",
-                    str(int(frame.physics_disabled))
-                ]
-                
-                # 添加插值参数
-                for interp_val in frame.interpolation:
-                    row.append(str(interp_val))
-                
-                lines.append('\t'.join(row))
-        
-        return lines
+            formatter = RowFormatter("sdffffffd", float_precision)
+            lines = formatter.format_rows(self._bone_frame_rows(bone_frames))
+            for frame, line in zip(bone_frames, lines):
+                yield self._with_interpolation(line, frame.interpolation)
+    
+    @staticmethod
+    def _bone_frame_rows(bone_frames: List[VmdBoneFrame]) -> Iterator[tuple]:
+        """产出骨骼帧文本行中除插值参数外的字段"""
+        for frame in bone_frames:
+            # VMD骨骼帧应该统一使用3元素欧拉角格式（度数）
+            rotation = frame.rotation
+            if len(rotation) != 3:
+                raise ValueError(f"Invalid rotation format: expected 3 Euler angles, got {len(rotation)} elements")
+            
+            position = frame.position
+            yield (
+                frame.bone_name, frame.frame_number,
+                position[0], position[1], position[2],
+                rotation[0], rotation[1], rotation[2],
+                frame.physics_disabled
+            )
     
-    def _format_text_morph_frames(self, morph_frames: List[VmdMorphFrame]) -> List[str]:
+    def _format_text_morph_frames(self, morph_frames: List[VmdMorphFrame],
+                                  float_precision: Optional[int] = DEFAULT_FLOAT_PRECISION) -> Iterator[str]:
         """格式化变形帧为文本"""
-        lines = [f"morphframe_ct:\t{len(morph_frames)}"]
+        yield f"morphframe_ct:\t{len(morph_frames)}"
         
         if morph_frames:
-            lines.append('\t'.join(["morph_name", "frame_num", "value"]))
+            yield '\t'.join(["morph_name", "frame_num", "value"])
             
-            for frame in morph_frames:
-                row = [frame.morph_name, str(frame.frame_number), f"{frame.weight:.6f}"]
-                lines.append('\t'.join(row))
-        
-        return lines
+            formatter = RowFormatter("sdf", float_precision)
+            yield from formatter.format_rows((frame.morph_name, frame.frame_number, frame.weight)
+                                             for frame in morph_frames)
     
-    def _format_text_camera_frames(self, camera_frames: List[VmdCameraFrame]) -> List[str]:
+    def _format_text_camera_frames(self, camera_frames: List[VmdCameraFrame],
+                                   float_precision: Optional[int] = DEFAULT_FLOAT_PRECISION) -> Iterator[str]:
         """格式化相机帧为文本"""
-        lines = [f"camframe_ct:\t{len(camera_frames)}"]
+        yield f"camframe_ct:\t{len(camera_frames)}"
         
         if camera_frames:
             keys = ["frame_num", "target_dist", "Xpos", "Ypos", "Zpos", "Xrot", "Yrot", "Zrot", "FOV", "perspective"] + \
@@ -1492,70 +1569,47 @@ class VmdParser:
                     "interp_r_ax", "interp_r_ay", "interp_r_bx", "interp_r_by",
                     "interp_dist_ax", "interp_dist_ay", "interp_dist_bx", "interp_dist_by",
                     "interp_fov_ax", "interp_fov_ay", "interp_fov_bx", "interp_fov_by"]
-            lines.append('\t'.join(keys))
+            yield '\t'.join(keys)
             
-            for frame in camera_frames:
-                row = [
-                    str(frame.frame_number),
-                    f"{frame.distance:.6f}",
-                    f"{frame.position[0]:.6f}",
-                    f"{frame.position[1]:.6f}",
-                    f"{frame.position[2]:.6f}",
-                    f"{frame.rotation[0]:.6f}",
-                    f"{frame.rotation[1]:.6f}",
-                    f"{frame.rotation[2]:.6f}",
-                    f"{frame.fov:.6f}",
-                    str(int(frame.perspective))
-                ]
-                
-                # 添加插值参数
-                for interp_val in frame.interpolation:
-                    row.append(str(interp_val))
-                
-                lines.append('\t'.join(row))
-        
-        return lines
+            formatter = RowFormatter("dffffffffd", float_precision)
+            lines = formatter.format_rows((
+                frame.frame_number, frame.distance,
+                *frame.position[:3], *frame.rotation[:3],
+                frame.fov, frame.perspective
+            ) for frame in camera_frames)
+            for frame, line in zip(camera_frames, lines):
+                yield self._with_interpolation(line, frame.interpolation)
     
-    def _format_text_light_frames(self, light_frames: List[VmdLightFrame]) -> List[str]:
+    def _format_text_light_frames(self, light_frames: List[VmdLightFrame],
+                                  float_precision: Optional[int] = DEFAULT_FLOAT_PRECISION) -> Iterator[str]:
         """格式化光源帧为文本"""
-        lines = [f"lightframe_ct:\t{len(light_frames)}"]
+        yield f"lightframe_ct:\t{len(light_frames)}"
         
         if light_frames:
-            lines.append('\t'.join(["frame_num", "red", "green", "blue", "x_dir", "y_dir", "z_dir"]))
+            yield '\t'.join(["frame_num", "red", "green", "blue", "x_dir", "y_dir", "z_dir"])
             
-            for frame in light_frames:
-                row = [
-                    str(frame.frame_number),
-                    f"{frame.color[0]:.6f}",
-                    f"{frame.color[1]:.6f}",
-                    f"{frame.color[2]:.6f}",
-                    f"{frame.position[0]:.6f}",
-                    f"{frame.position[1]:.6f}",
-                    f"{frame.position[2]:.6f}"
-                ]
-                lines.append('\t'.join(row))
-        
-        return lines
+            formatter = RowFormatter("dffffff", float_precision)
+            yield from formatter.format_rows((frame.frame_number, *frame.color[:3], *frame.position[:3])
+                                             for frame in light_frames)
     
-    def _format_text_shadow_frames(self, shadow_frames: List[VmdShadowFrame]) -> List[str]:
+    def _format_text_shadow_frames(self, shadow_frames: List[VmdShadowFrame],
+                                   float_precision: Optional[int] = DEFAULT_FLOAT_PRECISION) -> Iterator[str]:
         """格式化阴影帧为文本"""
-        lines = [f"shadowframe_ct:\t{len(shadow_frames)}"]
+        yield f"shadowframe_ct:\t{len(shadow_frames)}"
         
         if shadow_frames:
-            lines.append('\t'.join(["frame_num", "mode", "shadowrange"]))
+            yield '\t'.join(["frame_num", "mode", "shadowrange"])
             
-            for frame in shadow_frames:
-                row = [str(frame.frame_number), str(frame.shadow_mode), f"{frame.distance:.6f}"]
-                lines.append('\t'.join(row))
-        
-        return lines
+            formatter = RowFormatter("ddf", float_precision)
+            yield from formatter.format_rows((frame.frame_number, frame.shadow_mode, frame.distance)
+                                             for frame in shadow_frames)
     
-    def _format_text_ik_frames(self, ik_frames: List[VmdIkFrame]) -> List[str]:
+    def _format_text_ik_frames(self, ik_frames: List[VmdIkFrame]) -> Iterator[str]:
         """格式化IK帧为文本"""
-        lines = [f"ik/dispframe_ct:\t{len(ik_frames)}"]
+        yield f"ik/dispframe_ct:\t{len(ik_frames)}"
         
         if ik_frames:
-            lines.append('\t'.join(["frame_num", "display_model", "{ik_name", "ik_enable}"]))
+            yield '\t'.join(["frame_num", "display_model", "{ik_name", "ik_enable}"])
             
             for frame in ik_frames:
                 row = [str(frame.frame_number), str(int(frame.display))]
@@ -1564,6 +1618,4 @@ class VmdParser:
                     row.append(ik_bone.bone_name)
                     row.append(str(int(ik_bone.ik_enabled)))
                 
-                lines.append('\t'.join(row))
-        
-        return lines
+                yield '\t'.join(row)
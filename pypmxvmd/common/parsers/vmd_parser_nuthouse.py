@@ -1022,7 +1022,7 @@ class VmdParserNuthouse:
             xyz_rads = [math.radians(r) for r in frame.rotation]
             
             # 解构插值数据为具体字段
-            interp = frame.interpolation if frame.interpolation else [20, 107, 20, 107] * 6
+            interp = frame.interpolation if frame.interpolation else [20, 20, 107, 107] * 6
             x_ax, x_ay, x_bx, x_by = interp[0:4]
             y_ax, y_ay, y_bx, y_by = interp[4:8]
             z_ax, z_ay, z_bx, z_by = interp[8:12]
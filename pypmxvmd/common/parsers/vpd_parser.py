@@ -6,12 +6,178 @@ VPD是纯文本格式，用于存储单帧姿势数据。
 基于Nuthouse01的原始实现重构。
 """
 
-import re
 import math
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Union, Optional, Callable
+from typing import Iterable, Iterator, Union, Optional, Callable
+
+from pypmxvmd.common.models.vpd import VpdPose, VpdBonePose, VpdMorphPose, VpdPoseTable
+from pypmxvmd.common import instrumentation
+from pypmxvmd.common.io.text_io import (
+    TextRowReader, TextChunkWriter, RowFormatter, DEFAULT_FLOAT_PRECISION,
+    parse_float_rows
+)
+
+# 尝试导入Cython优化模块
+try:
+    from pypmxvmd.common.parsers._fast_vpd import tokenize_vpd_cython
+    _CYTHON_AVAILABLE = True
+except ImportError:
+    _CYTHON_AVAILABLE = False
+
+VPD_MAGIC = "Vocaloid Pose Data file"
+
+# 批量解析时每个任务处理的文件数
+_BATCH_CHUNK_SIZE = 256
+
+
+def _read_numbers(line: str, count: int, what: str) -> list:
+    """解析形如 "  a,b,c;  // 注释" 的数值行"""
+    body, sep, _ = line.partition(';')
+    parts = body.split(',')
+    if not sep or len(parts) != count:
+        raise ValueError(f"找不到{what}")
+    try:
+        return [float(p) for p in parts]
+    except ValueError:
+        raise ValueError(f"找不到{what}") from None
+
+
+def _read_item_name(line: str, prefix: str, what: str) -> str:
+    """解析形如 "Bone0{名称  // 注释" 的条目头，返回名称"""
+    brace = line.find('{')
+    if brace < 0 or not line.startswith(prefix) or not line[len(prefix):brace].isdigit():
+        raise ValueError(f"找不到{what}")
+    return line[brace + 1:].split('//', 1)[0].rstrip()
+
+
+def _tokenize_vpd_text(text: str) -> tuple:
+    """单遍扫描已解码的VPD文本（纯Python实现）
+
+    不使用正则表达式，按行用字符串方法切分，数值直接转换为float。
+
+    Args:
+        text: VPD文件全文
+
+    Returns:
+        (模型名称, [(骨骼名, [x, y, z], [qx, qy, qz, qw]), ...], [(变形名, 权重), ...])
+
+    Raises:
+        ValueError: 格式错误，信息中包含行号
+    """
+    lines = text.splitlines()
+    if not lines or lines[0] != VPD_MAGIC:
+        raise ValueError(f"无效的VPD文件头，期望: '{VPD_MAGIC}'")
+
+    # 只遍历非空行，行号从文件头之后的第2行开始
+    rows = ((number, line) for number, line in enumerate(lines[1:], 2)
+            if line and not line.isspace())
+    eof = (len(lines), None)
+    number = len(lines)
+
+    try:
+        number, line = next(rows, eof)
+        title_end = line.rfind('.osm;') if line is not None else -1
+        if title_end < 0:
+            raise ValueError("找不到模型标题")
+        model_name = line[:title_end]
+
+        number, line = next(rows, eof)
+        if line is None:
+            raise ValueError("找不到骨骼数量")
+        bone_count = int(_read_numbers(line, 1, "骨骼数量")[0])
+
+        bones = []
+        for _ in range(bone_count):
+            number, name_line = next(rows, eof)
+            if name_line is None:
+                raise ValueError("文件意外结束，骨骼数据不完整")
+            name = _read_item_name(name_line, "Bone", "骨骼名称")
+            number, line = next(rows, eof)
+            if line is None:
+                raise ValueError("文件意外结束，骨骼数据不完整")
+            position = _read_numbers(line, 3, "骨骼位置")
+            number, line = next(rows, eof)
+            if line is None:
+                raise ValueError("文件意外结束，骨骼数据不完整")
+            rotation = _read_numbers(line, 4, "骨骼旋转")
+            number, line = next(rows, eof)
+            if line is None:
+                raise ValueError("文件意外结束，骨骼数据不完整")
+            if not line.lstrip().startswith('}'):
+                raise ValueError("骨骼项未正确关闭")
+            bones.append((name, position, rotation))
+
+        morphs = []
+        for number, name_line in rows:
+            name = _read_item_name(name_line, "Morph", "变形名称")
+            number, line = next(rows, eof)
+            if line is None:
+                raise ValueError("文件意外结束，变形数据不完整")
+            weight = _read_numbers(line, 1, "变形值")[0]
+            number, line = next(rows, eof)
+            if line is None:
+                raise ValueError("文件意外结束，变形数据不完整")
+            if not line.lstrip().startswith('}'):
+                raise ValueError("变形项未正确关闭")
+            morphs.append((name, weight))
+    except ValueError as e:
+        raise ValueError(f"第{number}行: {e}") from None
+
+    return model_name, bones, morphs
+
+
+def _tokenize_vpd_bytes(data: bytes) -> tuple:
+    """对VPD文件字节进行编码识别并分词
+
+    带UTF-8 BOM的文件按UTF-8解析，否则先按Shift-JIS、失败后按UTF-8解析。
+    数据只从磁盘读取一次，编码重试在内存中完成。
+
+    Args:
+        data: 文件字节
+
+    Returns:
+        (分词结果, 使用的编码)
+
+    Raises:
+        UnicodeDecodeError: 所有候选编码都无法解码
+        ValueError: 格式错误
+    """
+    if data.startswith(b'\xef\xbb\xbf'):
+        data = data[3:]
+        encodings = ('utf-8',)
+    else:
+        encodings = ('shift_jis', 'utf-8')
+
+    last_error = None
+    for encoding in encodings:
+        try:
+            if _CYTHON_AVAILABLE:
+                return tokenize_vpd_cython(data, encoding), encoding
+            return _tokenize_vpd_text(data.decode(encoding)), encoding
+        except UnicodeDecodeError as e:
+            last_error = e
+    raise last_error
+
+
+def _tokenize_vpd_files(file_paths: list) -> list:
+    """批量分词任务（在工作进程/线程中执行）
+
+    Returns:
+        [(文件路径, 分词结果或None, 错误信息或None), ...]
+    """
+    results = []
+    for file_path in file_paths:
+        try:
+            with open(file_path, 'rb') as f:
+                data = f.read()
+            tokens, _ = _tokenize_vpd_bytes(data)
+            results.append((file_path, tokens, None))
+        except (OSError, ValueError) as e:
+            results.append((file_path, None, f"{type(e).__name__}: {e}"))
+    return results
 
-from pypmxvmd.common.models.vpd import VpdPose, VpdBonePose, VpdMorphPose
 
 
 class VpdParser:
@@ -28,21 +194,6 @@ class VpdParser:
             progress_callback: 进度回调函数，接受0.0-1.0的进度值
         """
         self._progress_callback = progress_callback
-        self._setup_regex_patterns()
-    
-    def _setup_regex_patterns(self) -> None:
-        """设置正则表达式模式"""
-        # 数字模式
-        n = r"\s*([-0-9\.]+)\s*"
-        
-        # 各种格式的模式
-        self._title_pattern = re.compile(r"(.*)\.osm;")
-        self._bone_pattern = re.compile(r"Bone(\d+)\{(.*?)\s*(//.*)?$")
-        self._morph_pattern = re.compile(r"Morph(\d+)\{(.*?)\s*(//.*)?$")
-        self._close_pattern = re.compile(r"\s*\}")
-        self._f1_pattern = re.compile(n + ";")
-        self._f3_pattern = re.compile(n + "," + n + "," + n + ";")
-        self._f4_pattern = re.compile(n + "," + n + "," + n + "," + n + ";")
     
     def _report_progress(self, progress: float, message: str = "") -> None:
         """报告解析进度"""
@@ -107,6 +258,13 @@ class VpdParser:
         
         return [w, x, y, z]
     
+    def _trace_file(self, operation: str, start_ns: int, vpd_pose: VpdPose,
+                    backend: str = "python") -> None:
+        """报告整个文件的埋点事件"""
+        instrumentation.tracer("vpd", operation, backend).file(
+            instrumentation.now_ns() - start_ns, None,
+            len(vpd_pose.bone_poses) + len(vpd_pose.morph_poses))
+    
     def parse_file(self, file_path: Union[str, Path], 
                   more_info: bool = False) -> VpdPose:
         """解析VPD文件
@@ -127,170 +285,95 @@ class VpdParser:
         
         if not file_path.exists():
             raise FileNotFoundError(f"VPD文件不存在: {file_path}")
+        start_ns = instrumentation.now_ns()
         
         try:
-            # 读取文本文件（使用shift_jis编码）
-            with open(file_path, 'r', encoding='shift_jis') as f:
-                lines = [line.rstrip('\n\r') for line in f.readlines()]
-            
-            # 验证魔术头
-            if not lines or lines[0] != "Vocaloid Pose Data file":
-                raise ValueError("无效的VPD文件头，期望: 'Vocaloid Pose Data file'")
-            
-            # 移除头部
-            lines.pop(0)
-            
-            # 解析文件内容
-            pose = self._parse_lines(lines, more_info)
-            
-            print("VPD解析完成")
-            return pose
-            
-        except UnicodeDecodeError:
-            # 如果shift_jis解码失败，尝试其他编码
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    lines = [line.rstrip('\n\r') for line in f.readlines()]
-                pose = self._parse_lines(lines, more_info)
-                print("VPD解析完成 (使用UTF-8编码)")
-                return pose
-            except Exception as e:
-                raise ValueError(f"VPD文件编码错误: {e}")
+            # 一次性读入字节，编码识别和分词都在内存中完成
+            data = file_path.read_bytes()
+            (model_name, bones, morphs), encoding = _tokenize_vpd_bytes(data)
+        except UnicodeDecodeError as e:
+            raise ValueError(f"VPD文件编码错误: {e}")
         except Exception as e:
             raise ValueError(f"VPD文件解析失败: {e}") from e
+        
+        pose = self._build_pose(model_name, bones, morphs)
+        if more_info:
+            print(f"模型名称: '{model_name}'")
+            print(f"骨骼数量: {len(bones)}")
+            print(f"变形数量: {len(morphs)}")
+            print(f"文件编码: {encoding}")
+        
+        print("VPD解析完成")
+        self._trace_file("parse", start_ns, pose, "cython" if _CYTHON_AVAILABLE else "python")
+        return pose
     
-    def _parse_lines(self, lines: list, more_info: bool) -> VpdPose:
-        """解析VPD文件行内容"""
-        # 状态机变量
-        parse_state = 0  # 0=title, 10=numbones, 20-23=bone, 30-32=morph
-        num_bones = 0
-        
-        # 临时变量
-        temp_title = ""
-        temp_name = ""
-        temp_pos = []
-        temp_rot = []
-        temp_value = 0.0
-        
-        # 结果存储
-        bone_poses = []
-        morph_poses = []
+    @staticmethod
+    def _build_pose(model_name: str, bones: list, morphs: list) -> VpdPose:
+        """由分词结果构建VPD姿势对象（旋转保持四元数XYZW格式）"""
+        return VpdPose(
+            model_name=model_name,
+            bone_poses=[VpdBonePose(bone_name=name, position=position, rotation=rotation)
+                        for name, position, rotation in bones],
+            morph_poses=[VpdMorphPose(morph_name=name, weight=weight)
+                         for name, weight in morphs]
+        )
+    
+    def parse_many(self, file_paths: Iterable[Union[str, Path]],
+                   max_workers: Optional[int] = None,
+                   use_processes: bool = True,
+                   skip_errors: bool = False) -> VpdPoseTable:
+        """并行解析大量VPD文件，汇总为一张列式姿势表
+
+        文件按批分发给工作进程（或线程），每个工作者只返回分词结果，
+        不创建VpdPose对象，也不输出逐文件的提示信息。结果按输入顺序写入表中。
         
-        for line_idx, line in enumerate(lines):
-            # 跳过空行和空白行
-            if not line or line.isspace():
-                continue
+        Args:
+            file_paths: VPD文件路径序列
+            max_workers: 最大并行数，默认CPU核心数；为1时在当前线程中顺序解析
+            use_processes: 使用进程池（默认），否则使用线程池
+            skip_errors: 为True时跳过无法解析的文件并记录在表的errors中，否则抛出异常
             
-            try:
-                if parse_state == 0:  # 解析模型标题
-                    match = self._title_pattern.match(line)
-                    if not match:
-                        raise ValueError(f"第{line_idx + 2}行: 找不到模型标题")
-                    temp_title = match.group(1)
-                    if more_info:
-                        print(f"模型名称: '{temp_title}'")
-                    parse_state = 10
-                
-                elif parse_state == 10:  # 解析骨骼数量
-                    match = self._f1_pattern.match(line)
-                    if not match:
-                        raise ValueError(f"第{line_idx + 2}行: 找不到骨骼数量")
-                    num_bones = int(float(match.group(1)))
-                    if more_info:
-                        print(f"骨骼数量: {num_bones}")
-                    parse_state = 30 if num_bones == 0 else 20
-                
-                elif parse_state == 20:  # 解析骨骼名称
-                    match = self._bone_pattern.match(line)
-                    if not match:
-                        raise ValueError(f"第{line_idx + 2}行: 找不到骨骼名称")
-                    _, temp_name = match.group(1, 2)
-                    parse_state = 21
-                
-                elif parse_state == 21:  # 解析骨骼位置
-                    match = self._f3_pattern.match(line)
-                    if not match:
-                        raise ValueError(f"第{line_idx + 2}行: 找不到骨骼位置")
-                    temp_pos = [float(x) for x in match.group(1, 2, 3)]
-                    parse_state = 22
-                
-                elif parse_state == 22:  # 解析骨骼旋转（四元数）
-                    match = self._f4_pattern.match(line)
-                    if not match:
-                        raise ValueError(f"第{line_idx + 2}行: 找不到骨骼旋转")
-                    quat_xyzw = [float(x) for x in match.group(1, 2, 3, 4)]
-                    # VPD格式存储为XYZW，转换为WXYZ
-                    x, y, z, w = quat_xyzw
-                    quat_wxyz = [w, x, y, z]
-                    # 转换为欧拉角
-                    temp_rot = self._quaternion_to_euler(quat_wxyz)
-                    parse_state = 23
-                
-                elif parse_state == 23:  # 解析骨骼结束标记
-                    match = self._close_pattern.match(line)
-                    if not match:
-                        raise ValueError(f"第{line_idx + 2}行: 骨骼项未正确关闭")
-                    
-                    # 创建骨骼姿势对象
-                    bone_pose = VpdBonePose(
-                        bone_name=temp_name,
-                        position=temp_pos,
-                        rotation=quat_xyzw  # 保存原始四元数XYZW格式
-                    )
-                    bone_poses.append(bone_pose)
-                    
-                    # 检查是否已解析完所有骨骼
-                    if len(bone_poses) == num_bones:
-                        parse_state = 30
-                    else:
-                        parse_state = 20
-                
-                elif parse_state == 30:  # 解析变形名称
-                    match = self._morph_pattern.match(line)
-                    if not match:
-                        raise ValueError(f"第{line_idx + 2}行: 找不到变形名称")
-                    _, temp_name = match.group(1, 2)
-                    parse_state = 31
-                
-                elif parse_state == 31:  # 解析变形值
-                    match = self._f1_pattern.match(line)
-                    if not match:
-                        raise ValueError(f"第{line_idx + 2}行: 找不到变形值")
-                    temp_value = float(match.group(1))
-                    parse_state = 32
-                
-                elif parse_state == 32:  # 解析变形结束标记
-                    match = self._close_pattern.match(line)
-                    if not match:
-                        raise ValueError(f"第{line_idx + 2}行: 变形项未正确关闭")
-                    
-                    # 创建变形姿势对象
-                    morph_pose = VpdMorphPose(
-                        morph_name=temp_name,
-                        weight=temp_value
-                    )
-                    morph_poses.append(morph_pose)
-                    parse_state = 30  # 继续解析变形
-                
-                else:
-                    raise ValueError(f"解析状态错误: {parse_state}")
-                
-            except Exception as e:
-                raise ValueError(f"第{line_idx + 2}行解析失败: {e}") from e
-        
-        # 检查结束状态
-        if parse_state != 30:
-            raise ValueError(f"文件意外结束，解析状态: {parse_state}")
+        Returns:
+            列式姿势表
+            
+        Raises:
+            ValueError: 某个文件解析失败且skip_errors为False
+        """
+        paths = [str(p) for p in file_paths]
+        start_ns = instrumentation.now_ns()
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
         
-        if more_info:
-            print(f"变形数量: {len(morph_poses)}")
+        chunks = [paths[i:i + _BATCH_CHUNK_SIZE] for i in range(0, len(paths), _BATCH_CHUNK_SIZE)]
+        table = VpdPoseTable()
         
-        # 创建并返回VPD姿势对象
-        return VpdPose(
-            model_name=temp_title,
-            bone_poses=bone_poses,
-            morph_poses=morph_poses
-        )
+        if max_workers <= 1 or len(chunks) <= 1:
+            self._collect_batches(table, map(_tokenize_vpd_files, chunks), len(chunks), skip_errors)
+        else:
+            executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+            with executor_class(max_workers=min(max_workers, len(chunks))) as executor:
+                self._collect_batches(table, executor.map(_tokenize_vpd_files, chunks),
+                                      len(chunks), skip_errors)
+        
+        instrumentation.tracer("vpd", "parse_many", "cython" if _CYTHON_AVAILABLE else "python").file(
+            instrumentation.now_ns() - start_ns, None,
+            len(table.bone_indices) + len(table.morph_indices))
+        print(f"批量解析VPD完成: {len(table)}个姿势，失败{len(table.errors)}个文件")
+        return table
+    
+    def _collect_batches(self, table: VpdPoseTable, batches, batch_count: int,
+                         skip_errors: bool) -> None:
+        """把各批分词结果按顺序写入姿势表"""
+        for done, batch in enumerate(batches, 1):
+            for file_path, tokens, error in batch:
+                if tokens is None:
+                    if not skip_errors:
+                        raise ValueError(f"VPD文件解析失败: {file_path}: {error}")
+                    table.errors[file_path] = error
+                    continue
+                model_name, bones, morphs = tokens
+                table.add_pose(model_name, bones, morphs, file_path)
+            self._report_progress(done / batch_count)
     
     def write_file(self, vpd_pose: VpdPose, file_path: Union[str, Path]) -> None:
         """写入VPD文件
@@ -304,6 +387,7 @@ class VpdParser:
         
         # 验证输入数据
         vpd_pose.validate()
+        start_ns = instrumentation.now_ns()
         
         # 构建输出行
         lines = []
@@ -363,6 +447,7 @@ class VpdParser:
         
         except IOError as e:
             raise IOError(f"写入VPD文件失败: {file_path}, 错误: {e}")
+        self._trace_file("write", start_ns, vpd_pose)
         
         print("VPD文件写入完成")
     
@@ -394,196 +479,172 @@ class VpdParser:
         if first_line == "Vocaloid Pose Data file":
             return self.parse_file(file_path, more_info)
         
-        # 否则解析为结构化文本格式
+        # 否则解析为结构化文本格式（逐行流式读取）
+        start_ns = instrumentation.now_ns()
         with open(file_path, 'r', encoding='utf-8') as f:
-            lines = [line.strip().split('\t') if '\t' in line else [line.strip()] 
-                    for line in f.readlines() if line.strip()]
-        
-        if more_info:
-            print(f"结构化文本文件总行数: {len(lines)}")
-            
-        line_idx = 0
-        
-        try:
-            # 解析头部
-            header_info, line_idx = self._parse_structured_header(lines, line_idx)
+            reader = TextRowReader(f)
             
-            # 解析骨骼姿势
-            bone_poses, line_idx = self._parse_structured_bone_poses(lines, line_idx, more_info)
-            
-            # 解析变形姿势
-            morph_poses, line_idx = self._parse_structured_morph_poses(lines, line_idx, more_info)
-            
-        except (ValueError, IndexError) as e:
-            raise ValueError(f"VPD结构化文本文件解析失败在第{line_idx + 1}行: {e}")
+            try:
+                # 解析头部
+                header_info = self._parse_structured_header(reader)
+                
+                # 解析骨骼姿势
+                bone_poses = self._parse_structured_bone_poses(reader, more_info)
+                
+                # 解析变形姿势
+                morph_poses = self._parse_structured_morph_poses(reader, more_info)
+                
+            except (ValueError, IndexError) as e:
+                raise ValueError(f"VPD结构化文本文件解析失败在第{reader.line_number}行: {e}")
         
         if more_info:
             print(f"VPD结构化文本解析完成")
         
-        return VpdPose(
+        pose = VpdPose(
             model_name=header_info['model_name'],
             bone_poses=bone_poses,
             morph_poses=morph_poses
         )
+        self._trace_file("parse_text", start_ns, pose)
+        return pose
     
-    def write_text_file(self, vpd_pose: VpdPose, file_path: Union[str, Path]) -> None:
+    def write_text_file(self, vpd_pose: VpdPose, file_path: Union[str, Path],
+                        float_precision: Optional[int] = DEFAULT_FLOAT_PRECISION) -> None:
         """将VPD姿势数据导出为结构化文本文件（制表符分隔格式）
         
         Args:
             vpd_pose: VPD姿势对象
             file_path: 输出文件路径
+            float_precision: 浮点小数位数，默认6位；为None时输出能精确还原float32的最短表示
         """
         file_path = Path(file_path)
         print(f"开始写入VPD结构化文本文件: {file_path}")
+        start_ns = instrumentation.now_ns()
         
-        lines = []
-        
-        # 写入头部
-        lines.extend(self._format_structured_header(vpd_pose))
-        
-        # 写入骨骼姿势
-        lines.extend(self._format_structured_bone_poses(vpd_pose.bone_poses))
-        
-        # 写入变形姿势
-        lines.extend(self._format_structured_morph_poses(vpd_pose.morph_poses))
-        
-        # 写入文件
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(lines))
+        with open(file_path, 'w', encoding='utf-8') as f, TextChunkWriter(f) as writer:
+            # 写入头部
+            writer.write_lines(self._format_structured_header(vpd_pose))
+            
+            # 写入骨骼姿势
+            writer.write_lines(self._format_structured_bone_poses(vpd_pose.bone_poses, float_precision))
+            
+            # 写入变形姿势
+            writer.write_lines(self._format_structured_morph_poses(vpd_pose.morph_poses, float_precision))
+        self._trace_file("write_text", start_ns, vpd_pose)
         
-        print(f"VPD结构化文本文件写入完成，总行数: {len(lines)}")
+        print(f"VPD结构化文本文件写入完成，总行数: {writer.line_count}")
     
-    def _parse_structured_header(self, lines: list, start_idx: int) -> tuple:
+    def _parse_structured_header(self, reader: TextRowReader) -> dict:
         """解析结构化文本头部"""
-        if start_idx >= len(lines) or len(lines[start_idx]) != 2 or lines[start_idx][0] != "model_name:":
-            raise ValueError("缺少模型名称")
-        model_name = lines[start_idx][1]
+        model_name = reader.read_field("model_name:", "缺少模型名称")
         
         header_info = {
             'model_name': model_name
         }
         
-        return header_info, start_idx + 1
+        return header_info
     
-    def _parse_structured_bone_poses(self, lines: list, start_idx: int, more_info: bool) -> tuple:
-        """解析结构化骨骼姿势数据"""
-        if start_idx >= len(lines) or len(lines[start_idx]) != 2 or lines[start_idx][0] != "bone_pose_count:":
-            raise ValueError("缺少骨骼姿势计数")
-        
-        bone_count = int(lines[start_idx][1])
-        line_idx = start_idx + 1
+    def _read_structured_section(self, reader: TextRowReader, marker: str, missing: str,
+                                 label: str, more_info: bool):
+        """读取一个结构化文本数据段的计数行和键名行，逐行产出数据行"""
+        count = int(reader.read_field(marker, missing))
         
         if more_info:
-            print(f"骨骼姿势数量: {bone_count}")
+            print(f"{label}数量: {count}")
         
-        bone_poses = []
-        if bone_count > 0:
+        if count > 0:
             # 跳过键名行
-            if line_idx >= len(lines):
-                raise ValueError("骨骼姿势数据不完整")
-            line_idx += 1
+            if reader.read_row() is None:
+                raise ValueError(f"{label}数据不完整")
             
-            for i in range(bone_count):
-                if line_idx >= len(lines):
-                    raise ValueError(f"骨骼姿势数据不完整，期望{bone_count}个姿势，只找到{i}个")
-                
-                row = lines[line_idx]
-                if len(row) < 8:  # 骨骼名称 + 位置(3) + 旋转(4)
-                    raise ValueError(f"骨骼姿势格式错误，期望至少8个字段，得到{len(row)}个")
-                
-                bone_pose = VpdBonePose(
-                    bone_name=row[0],
-                    position=[float(row[1]), float(row[2]), float(row[3])],
-                    rotation=[float(row[4]), float(row[5]), float(row[6]), float(row[7])]
-                )
-                bone_poses.append(bone_pose)
-                line_idx += 1
-        
-        return bone_poses, line_idx
+            i = 0
+            for i, row in enumerate(reader.read_rows(count), 1):
+                yield row
+            if i < count:
+                raise ValueError(f"{label}数据不完整，期望{count}个姿势，只找到{i}个")
     
-    def _parse_structured_morph_poses(self, lines: list, start_idx: int, more_info: bool) -> tuple:
-        """解析结构化变形姿势数据"""
-        if start_idx >= len(lines) or len(lines[start_idx]) != 2 or lines[start_idx][0] != "morph_pose_count:":
-            raise ValueError("缺少变形姿势计数")
-        
-        morph_count = int(lines[start_idx][1])
-        line_idx = start_idx + 1
-        
-        if more_info:
-            print(f"变形姿势数量: {morph_count}")
+    def _parse_structured_bone_poses(self, reader: TextRowReader, more_info: bool) -> list:
+        """解析结构化骨骼姿势数据"""
+        bone_poses = []
+        rows = self._read_structured_section(reader, "bone_pose_count:", "缺少骨骼姿势计数",
+                                             "骨骼姿势", more_info)
+        for block in reader.convert_blocks(rows, self._bone_poses_from_rows):
+            bone_poses.extend(block)
         
+        return bone_poses
+    
+    @staticmethod
+    def _bone_poses_from_rows(rows: list) -> list:
+        """将一块骨骼姿势行转换为骨骼姿势列表"""
+        shortest = min(map(len, rows))
+        if shortest < 8:  # 骨骼名称 + 位置(3) + 旋转(4)
+            raise ValueError(f"骨骼姿势格式错误，期望至少8个字段，得到{shortest}个")
+        
+        values = parse_float_rows(rows, 1, 8)
+        return [
+            VpdBonePose(
+                bone_name=row[0],
+                position=values[base:base + 3],
+                rotation=values[base + 3:base + 7]
+            )
+            for row, base in zip(rows, range(0, len(values), 7))
+        ]
+    
+    def _parse_structured_morph_poses(self, reader: TextRowReader, more_info: bool) -> list:
+        """解析结构化变形姿势数据"""
         morph_poses = []
-        if morph_count > 0:
-            # 跳过键名行
-            if line_idx >= len(lines):
-                raise ValueError("变形姿势数据不完整")
-            line_idx += 1
+        for row in self._read_structured_section(reader, "morph_pose_count:", "缺少变形姿势计数",
+                                                 "变形姿势", more_info):
+            if len(row) != 2:
+                raise ValueError(f"变形姿势格式错误，期望2个字段，得到{len(row)}个")
             
-            for i in range(morph_count):
-                if line_idx >= len(lines):
-                    raise ValueError(f"变形姿势数据不完整，期望{morph_count}个姿势，只找到{i}个")
-                
-                row = lines[line_idx]
-                if len(row) != 2:
-                    raise ValueError(f"变形姿势格式错误，期望2个字段，得到{len(row)}个")
-                
-                morph_pose = VpdMorphPose(
-                    morph_name=row[0],
-                    weight=float(row[1])
-                )
-                morph_poses.append(morph_pose)
-                line_idx += 1
-        
-        return morph_poses, line_idx
+            morph_pose = VpdMorphPose(
+                morph_name=row[0],
+                weight=float(row[1])
+            )
+            morph_poses.append(morph_pose)
+        
+        return morph_poses
     
-    def _format_structured_header(self, vpd_pose: VpdPose) -> list:
+    def _format_structured_header(self, vpd_pose: VpdPose) -> Iterator[str]:
         """格式化头部为结构化文本"""
-        return [
-            f"model_name:\t{vpd_pose.model_name}"
-        ]
+        yield f"model_name:\t{vpd_pose.model_name}"
     
-    def _format_structured_bone_poses(self, bone_poses: list) -> list:
+    def _format_structured_bone_poses(self, bone_poses: list,
+                                      float_precision: Optional[int] = DEFAULT_FLOAT_PRECISION) -> Iterator[str]:
         """格式化骨骼姿势为结构化文本"""
-        lines = [f"bone_pose_count:\t{len(bone_poses)}"]
+        yield f"bone_pose_count:\t{len(bone_poses)}"
         
         if bone_poses:
             # 键名行
             keys = ["bone_name", "pos_x", "pos_y", "pos_z", "quat_x", "quat_y", "quat_z", "quat_w"]
-            lines.append('\t'.join(keys))
+            yield '\t'.join(keys)
             
-            for bone_pose in bone_poses:
-                # 确保旋转是四元数格式
-                if len(bone_pose.rotation) == 3:
-                    # 如果是欧拉角，转换为四元数
-                    quat_wxyz = self._euler_to_quaternion(bone_pose.rotation)
-                    w, x, y, z = quat_wxyz
-                    rotation = [x, y, z, w]  # XYZW格式
-                else:
-                    rotation = bone_pose.rotation
-                
-                row = [
-                    bone_pose.bone_name,
-                    f"{bone_pose.position[0]:.6f}",
-                    f"{bone_pose.position[1]:.6f}",
-                    f"{bone_pose.position[2]:.6f}",
-                    f"{rotation[0]:.6f}",
-                    f"{rotation[1]:.6f}",
-                    f"{rotation[2]:.6f}",
-                    f"{rotation[3]:.6f}"
-                ]
-                lines.append('\t'.join(row))
-        
-        return lines
+            formatter = RowFormatter("sfffffff", float_precision)
+            yield from formatter.format_rows(self._bone_pose_rows(bone_poses))
     
-    def _format_structured_morph_poses(self, morph_poses: list) -> list:
+    def _bone_pose_rows(self, bone_poses: list) -> Iterator[tuple]:
+        """产出骨骼姿势文本行的字段，旋转统一为XYZW四元数"""
+        for bone_pose in bone_poses:
+            # 确保旋转是四元数格式
+            if len(bone_pose.rotation) == 3:
+                # 如果是欧拉角，转换为四元数
+                quat_wxyz = self._euler_to_quaternion(bone_pose.rotation)
+                w, x, y, z = quat_wxyz
+                rotation = [x, y, z, w]  # XYZW格式
+            else:
+                rotation = bone_pose.rotation
+            
+            yield (bone_pose.bone_name, *bone_pose.position[:3], *rotation[:4])
+    
+    def _format_structured_morph_poses(self, morph_poses: list,
+                                       float_precision: Optional[int] = DEFAULT_FLOAT_PRECISION) -> Iterator[str]:
         """格式化变形姿势为结构化文本"""
-        lines = [f"morph_pose_count:\t{len(morph_poses)}"]
+        yield f"morph_pose_count:\t{len(morph_poses)}"
         
         if morph_poses:
-            lines.append('\t'.join(["morph_name", "weight"]))
+            yield '\t'.join(["morph_name", "weight"])
             
-            for morph_pose in morph_poses:
-                row = [morph_pose.morph_name, f"{morph_pose.weight:.6f}"]
-                lines.append('\t'.join(row))
-        
-        return lines
\ No newline at end of file
+            formatter = RowFormatter("sf", float_precision)
+            yield from formatter.format_rows((morph_pose.morph_name, morph_pose.weight)
+                                             for morph_pose in morph_poses)
\ No newline at end of file
@@ -0,0 +1,67 @@
+"""
+PyPMXVMD 数据处理
+
+在列式数据上批量处理动作、姿势和模型，例如VPD与VMD之间的转换。
+
+各处理模块在首次访问时才导入。
+"""
+
+import importlib
+
+_LAZY_ATTRS = {
+    "poses_to_columns": "pypmxvmd.common.processing.convert",
+    "poses_to_motion": "pypmxvmd.common.processing.convert",
+    "motion_to_pose_table": "pypmxvmd.common.processing.convert",
+    "motion_to_poses": "pypmxvmd.common.processing.convert",
+    "sort_keyframes": "pypmxvmd.common.processing.keyframes",
+    "normalize_motion": "pypmxvmd.common.processing.keyframes",
+    "merge_motions": "pypmxvmd.common.processing.combine",
+    "concat_motions": "pypmxvmd.common.processing.combine",
+    "diff": "pypmxvmd.common.processing.diff",
+    "diff_motions": "pypmxvmd.common.processing.diff",
+    "diff_models": "pypmxvmd.common.processing.diff",
+    "mirror": "pypmxvmd.common.processing.mirror",
+    "mirror_name": "pypmxvmd.common.processing.mirror",
+    "MirrorNameTable": "pypmxvmd.common.processing.mirror",
+    "check_compat": "pypmxvmd.common.processing.compat",
+    "ModelNameIndex": "pypmxvmd.common.processing.compat",
+    "CompatReport": "pypmxvmd.common.processing.compat",
+    "retarget": "pypmxvmd.common.processing.retarget",
+    "NameMap": "pypmxvmd.common.processing.retarget",
+    "RetargetMap": "pypmxvmd.common.processing.retarget",
+    "apply_morphs": "pypmxvmd.common.processing.morph",
+    "MorphEngine": "pypmxvmd.common.processing.morph",
+    "MorphResult": "pypmxvmd.common.processing.morph",
+    "extract_submeshes": "pypmxvmd.common.processing.submesh",
+    "MaterialSubmesh": "pypmxvmd.common.processing.submesh",
+    "optimize_mesh": "pypmxvmd.common.processing.optimize",
+    "average_cache_miss_ratio": "pypmxvmd.common.processing.optimize",
+    "MeshOptimizationReport": "pypmxvmd.common.processing.optimize",
+    "weld_vertices": "pypmxvmd.common.processing.weld",
+    "WeldReport": "pypmxvmd.common.processing.weld",
+    "nearest_vertices": "pypmxvmd.common.processing.spatial",
+    "VertexSpatialIndex": "pypmxvmd.common.processing.spatial",
+    "recompute_normals": "pypmxvmd.common.processing.normals",
+    "compute_normals": "pypmxvmd.common.processing.normals",
+    "compute_tangents": "pypmxvmd.common.processing.normals",
+    "simplify_mesh": "pypmxvmd.common.processing.simplify",
+    "generate_lods": "pypmxvmd.common.processing.simplify",
+    "bake_ik": "pypmxvmd.common.processing.ik",
+    "sample_camera": "pypmxvmd.common.processing.camera",
+    "CameraSamples": "pypmxvmd.common.processing.camera",
+}
+
+__all__ = list(_LAZY_ATTRS)
+
+
+def __getattr__(name: str):
+    """按需导入处理函数"""
+    if name in _LAZY_ATTRS:
+        value = getattr(importlib.import_module(_LAZY_ATTRS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+from array import array
+from typing import Tuple
+
+
+def normal_sums_cython(indices: array, positions: array, by_angle: bool) -> array: ...
+
+
+def normalize_normals_cython(sums: array, normals: array) -> None: ...
+
+
+def tangent_sums_cython(indices: array, positions: array, uvs: array) -> Tuple[array, array]: ...
+
+
+def finish_tangents_cython(normals: array, tangent_sums: array, bitangent_sums: array) -> array: ...
@@ -0,0 +1,215 @@
+# cython: language_level=3
+# cython: boundscheck=False
+# cython: wraparound=False
+# cython: cdivision=True
+# cython: initializedcheck=False
+# cython: nonecheck=False
+"""
+PyPMXVMD 法线与切线计算内核 (Cython优化)
+
+与 normals.py 中的纯Python循环逐步对应：逐三角面计算面法线或UV导数并按权重累加到顶点（scatter-add），
+再逐顶点归一化或正交化。全部在C层面的扁平缓冲区上完成，运算顺序与纯Python实现相同。
+"""
+
+from libc.math cimport sqrt, atan2, fabs
+from cpython cimport array
+import array
+
+cdef double _PI = 3.141592653589793
+cdef array.array _DOUBLE_TEMPLATE = array.array('d', [])
+cdef array.array _FLOAT_TEMPLATE = array.array('f', [])
+
+
+cdef inline void _corner_angles(double ax, double ay, double az, double bx, double by, double bz,
+                                double cx, double cy, double cz, double length,
+                                double* weights) noexcept nogil:
+    """三角面三个角的角度；length 为两条边叉积的长度"""
+    weights[0] = atan2(length, (bx - ax) * (cx - ax) + (by - ay) * (cy - ay) + (bz - az) * (cz - az))
+    weights[1] = atan2(length, (cx - bx) * (ax - bx) + (cy - by) * (ay - by) + (cz - bz) * (az - bz))
+    weights[2] = _PI - weights[0] - weights[1]
+
+
+cdef _check_indices(const unsigned int[:] indices, Py_ssize_t vertex_count):
+    cdef Py_ssize_t i
+    for i in range(indices.shape[0]):
+        if indices[i] >= vertex_count:
+            raise IndexError(f"顶点索引超出范围: {indices[i]}")
+
+
+def normal_sums_cython(const unsigned int[:] indices, const double[:] positions, bint by_angle):
+    """累加加权面法线
+
+    Args:
+        indices: 扁平的面索引 array('I')
+        positions: 扁平的顶点坐标 array('d')
+        by_angle: True时按角度加权（面法线先归一化），False时按面积加权
+
+    Returns:
+        与 positions 等长的 array('d')
+    """
+    cdef Py_ssize_t count = positions.shape[0]
+    cdef array.array result = array.clone(_DOUBLE_TEMPLATE, count, True)
+    cdef double[:] sums = result
+    cdef Py_ssize_t face, corner, base
+    cdef Py_ssize_t ia, ib, ic
+    cdef double ax, ay, az, bx, by, bz, cx, cy, cz
+    cdef double ux, uy, uz, vx, vy, vz, nx, ny, nz, length
+    cdef double weights[3]
+    cdef Py_ssize_t bases[3]
+    _check_indices(indices, count // 3)
+    with nogil:
+        for face in range(0, indices.shape[0] - 2, 3):
+            ia = indices[face] * 3
+            ib = indices[face + 1] * 3
+            ic = indices[face + 2] * 3
+            ax, ay, az = positions[ia], positions[ia + 1], positions[ia + 2]
+            bx, by, bz = positions[ib], positions[ib + 1], positions[ib + 2]
+            cx, cy, cz = positions[ic], positions[ic + 1], positions[ic + 2]
+            ux, uy, uz = bx - ax, by - ay, bz - az
+            vx, vy, vz = cx - ax, cy - ay, cz - az
+            nx = uy * vz - uz * vy
+            ny = uz * vx - ux * vz
+            nz = ux * vy - uy * vx
+            length = sqrt(nx * nx + ny * ny + nz * nz)
+            if length == 0.0:
+                continue
+            if by_angle:
+                nx, ny, nz = nx / length, ny / length, nz / length
+                _corner_angles(ax, ay, az, bx, by, bz, cx, cy, cz, length, weights)
+            else:
+                weights[0] = weights[1] = weights[2] = 1.0
+            bases[0], bases[1], bases[2] = ia, ib, ic
+            for corner in range(3):
+                base = bases[corner]
+                sums[base] += nx * weights[corner]
+                sums[base + 1] += ny * weights[corner]
+                sums[base + 2] += nz * weights[corner]
+    return result
+
+
+def normalize_normals_cython(const double[:] sums, float[:] normals):
+    """把累加结果归一化写入 normals（array('f')），长度过小的顶点保留原值"""
+    cdef Py_ssize_t base
+    cdef double x, y, z, length
+    if normals.shape[0] != sums.shape[0]:
+        raise ValueError(f"法线数量({normals.shape[0]})与累加结果数量({sums.shape[0]})不符")
+    with nogil:
+        for base in range(0, sums.shape[0] - 2, 3):
+            x, y, z = sums[base], sums[base + 1], sums[base + 2]
+            length = sqrt(x * x + y * y + z * z)
+            if length > 1e-12:
+                normals[base] = x / length
+                normals[base + 1] = y / length
+                normals[base + 2] = z / length
+
+
+def tangent_sums_cython(const unsigned int[:] indices, const double[:] positions, const double[:] uvs):
+    """累加按角度加权的逐三角面切线和副切线
+
+    Returns:
+        (切线累加 array('d'), 副切线累加 array('d'))，长度均与 positions 相同
+    """
+    cdef Py_ssize_t count = positions.shape[0]
+    cdef array.array tangent_result = array.clone(_DOUBLE_TEMPLATE, count, True)
+    cdef array.array bitangent_result = array.clone(_DOUBLE_TEMPLATE, count, True)
+    cdef double[:] tangent_sums = tangent_result
+    cdef double[:] bitangent_sums = bitangent_result
+    cdef Py_ssize_t face, corner, base
+    cdef Py_ssize_t a, b, c, ia, ib, ic
+    cdef double ax, ay, az, bx, by, bz, cx, cy, cz
+    cdef double ux, uy, uz, vx, vy, vz, nx, ny, nz, length
+    cdef double du1, dv1, du2, dv2, determinant
+    cdef double tx, ty, tz, sx, sy, sz, t_length, s_length
+    cdef double weights[3]
+    cdef Py_ssize_t bases[3]
+    if uvs.shape[0] * 3 != count * 2:
+        raise ValueError(f"UV数量({uvs.shape[0]})与坐标数量({count})不符")
+    _check_indices(indices, count // 3)
+    with nogil:
+        for face in range(0, indices.shape[0] - 2, 3):
+            a, b, c = indices[face], indices[face + 1], indices[face + 2]
+            ia, ib, ic = a * 3, b * 3, c * 3
+            ax, ay, az = positions[ia], positions[ia + 1], positions[ia + 2]
+            bx, by, bz = positions[ib], positions[ib + 1], positions[ib + 2]
+            cx, cy, cz = positions[ic], positions[ic + 1], positions[ic + 2]
+            ux, uy, uz = bx - ax, by - ay, bz - az
+            vx, vy, vz = cx - ax, cy - ay, cz - az
+            du1, dv1 = uvs[b * 2] - uvs[a * 2], uvs[b * 2 + 1] - uvs[a * 2 + 1]
+            du2, dv2 = uvs[c * 2] - uvs[a * 2], uvs[c * 2 + 1] - uvs[a * 2 + 1]
+            determinant = du1 * dv2 - du2 * dv1
+            nx = uy * vz - uz * vy
+            ny = uz * vx - ux * vz
+            nz = ux * vy - uy * vx
+            length = sqrt(nx * nx + ny * ny + nz * nz)
+            if determinant == 0.0 or length == 0.0:
+                continue
+            tx, ty, tz = ux * dv2 - vx * dv1, uy * dv2 - vy * dv1, uz * dv2 - vz * dv1
+            sx, sy, sz = vx * du1 - ux * du2, vy * du1 - uy * du2, vz * du1 - uz * du2
+            if determinant < 0:
+                tx, ty, tz, sx, sy, sz = -tx, -ty, -tz, -sx, -sy, -sz
+            t_length = sqrt(tx * tx + ty * ty + tz * tz)
+            if t_length == 0.0:
+                t_length = 1.0
+            s_length = sqrt(sx * sx + sy * sy + sz * sz)
+            if s_length == 0.0:
+                s_length = 1.0
+            tx, ty, tz = tx / t_length, ty / t_length, tz / t_length
+            sx, sy, sz = sx / s_length, sy / s_length, sz / s_length
+            _corner_angles(ax, ay, az, bx, by, bz, cx, cy, cz, length, weights)
+            bases[0], bases[1], bases[2] = ia, ib, ic
+            for corner in range(3):
+                base = bases[corner]
+                tangent_sums[base] += tx * weights[corner]
+                tangent_sums[base + 1] += ty * weights[corner]
+                tangent_sums[base + 2] += tz * weights[corner]
+                bitangent_sums[base] += sx * weights[corner]
+                bitangent_sums[base + 1] += sy * weights[corner]
+                bitangent_sums[base + 2] += sz * weights[corner]
+    return tangent_result, bitangent_result
+
+
+def finish_tangents_cython(const double[:] normals, const double[:] tangent_sums,
+                           const double[:] bitangent_sums):
+    """对顶点法线正交化切线并求副切线方向
+
+    Returns:
+        扁平的切线 array('f') [x0, y0, z0, w0, ...]
+    """
+    cdef Py_ssize_t vertex_count = normals.shape[0] // 3
+    cdef array.array result = array.clone(_FLOAT_TEMPLATE, vertex_count * 4, True)
+    cdef float[:] tangents = result
+    cdef Py_ssize_t vertex, base, out
+    cdef double nx, ny, nz, tx, ty, tz, dot, length, bx, by, bz
+    if tangent_sums.shape[0] != normals.shape[0] or bitangent_sums.shape[0] != normals.shape[0]:
+        raise ValueError("切线累加结果与法线数量不符")
+    with nogil:
+        for vertex in range(vertex_count):
+            base = vertex * 3
+            nx, ny, nz = normals[base], normals[base + 1], normals[base + 2]
+            tx, ty, tz = tangent_sums[base], tangent_sums[base + 1], tangent_sums[base + 2]
+            dot = nx * tx + ny * ty + nz * tz
+            tx, ty, tz = tx - nx * dot, ty - ny * dot, tz - nz * dot
+            length = sqrt(tx * tx + ty * ty + tz * tz)
+            if length < 1e-12:
+                # 没有有效UV时取任意与法线垂直的方向
+                if fabs(nx) > fabs(ny):
+                    tx, ty, tz = nz, 0.0, -nx
+                else:
+                    tx, ty, tz = 0.0, -nz, ny
+                length = sqrt(tx * tx + ty * ty + tz * tz)
+                if length < 1e-12:
+                    tx, ty, tz, length = 1.0, 0.0, 0.0, 1.0
+            tx, ty, tz = tx / length, ty / length, tz / length
+            bx = ny * tz - nz * ty
+            by = nz * tx - nx * tz
+            bz = nx * ty - ny * tx
+            out = vertex * 4
+            tangents[out] = tx
+            tangents[out + 1] = ty
+            tangents[out + 2] = tz
+            if (bx * bitangent_sums[base] + by * bitangent_sums[base + 1]
+                    + bz * bitangent_sums[base + 2]) >= 0.0:
+                tangents[out + 3] = 1.0
+            else:
+                tangents[out + 3] = -1.0
+    return result
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from array import array
+from typing import List, Tuple
+
+
+def cache_misses_cython(indices: array, cache_size: int) -> int: ...
+
+
+def localize_cython(indices: array) -> Tuple[array, array]: ...
+
+
+def tipsify_cython(indices: array, vertex_count: int, cache_size: int) -> Tuple[array, List[int]]: ...
+
+
+def cluster_stats_cython(order: array, clusters: List[int], indices: array,
+                         positions: array) -> List[Tuple[List[float], List[float], float]]: ...
+
+
+def gather_triangles_cython(indices: array, order: array) -> array: ...
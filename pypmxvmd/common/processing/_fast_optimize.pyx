@@ -0,0 +1,311 @@
+# cython: language_level=3
+# cython: boundscheck=False
+# cython: wraparound=False
+# cython: cdivision=True
+# cython: initializedcheck=False
+# cython: nonecheck=False
+"""
+PyPMXVMD 网格优化内核 (Cython优化)
+
+与 optimize.py 中的纯Python实现逐步对应：Tipsify 三角面排序、簇的朝向统计、
+FIFO顶点缓存模拟以及材质顶点的局部编号，结果与纯Python实现相同。
+
+优化策略:
+- 顶点到三角面的邻接表为CSR格式的C数组
+- 候选顶点直接取死路栈中本轮压入的部分，不另建列表
+- 缓存模拟用环形缓冲区和逐顶点标记代替 deque 和集合
+"""
+
+from libc.math cimport pow
+from libc.string cimport memset
+from cpython.mem cimport PyMem_Malloc, PyMem_Free
+from cpython cimport array
+import array
+
+cdef array.array _INDEX_TEMPLATE = array.array('I', [])
+
+
+cdef void* _alloc(Py_ssize_t size) except NULL:
+    cdef void* memory = PyMem_Malloc(size if size > 0 else 1)
+    if memory == NULL:
+        raise MemoryError()
+    memset(memory, 0, size if size > 0 else 1)
+    return memory
+
+
+cdef unsigned int _max_index(const unsigned int[:] indices) noexcept nogil:
+    cdef unsigned int result = 0
+    cdef Py_ssize_t i
+    for i in range(indices.shape[0]):
+        if indices[i] > result:
+            result = indices[i]
+    return result
+
+
+def cache_misses_cython(const unsigned int[:] indices, Py_ssize_t cache_size):
+    """模拟FIFO顶点缓存，返回缓存未命中次数"""
+    cdef Py_ssize_t count = indices.shape[0]
+    cdef Py_ssize_t misses = 0, filled = 0, head = 0, i
+    cdef unsigned int vertex
+    cdef char* cached
+    cdef unsigned int* ring
+    if count == 0:
+        return 0
+    if cache_size <= 0:
+        return count
+    cached = <char*>_alloc(<Py_ssize_t>_max_index(indices) + 1)
+    try:
+        ring = <unsigned int*>_alloc(cache_size * sizeof(unsigned int))
+        try:
+            with nogil:
+                for i in range(count):
+                    vertex = indices[i]
+                    if cached[vertex]:
+                        continue
+                    misses += 1
+                    cached[vertex] = 1
+                    if filled == cache_size:
+                        # 环形缓冲区已满：最旧的顶点出队，新顶点写入其位置
+                        cached[ring[head]] = 0
+                        ring[head] = vertex
+                        head = (head + 1) % cache_size
+                    else:
+                        ring[filled] = vertex
+                        filled += 1
+        finally:
+            PyMem_Free(ring)
+    finally:
+        PyMem_Free(cached)
+    return misses
+
+
+def localize_cython(const unsigned int[:] indices):
+    """把顶点索引按首次出现的顺序重新编号为 0..n-1
+
+    Returns:
+        (局部索引 array('I'), 局部 -> 原顶点索引 array('I'))
+    """
+    cdef Py_ssize_t count = indices.shape[0]
+    cdef Py_ssize_t i, used = 0
+    cdef unsigned int vertex
+    cdef array.array local_result = array.clone(_INDEX_TEMPLATE, count, False)
+    cdef array.array vertex_result = array.clone(_INDEX_TEMPLATE, count, False)
+    cdef unsigned int[:] local = local_result
+    cdef unsigned int[:] vertices = vertex_result
+    cdef unsigned int* remap
+    if count == 0:
+        return local_result, vertex_result
+    # 0 表示未编号，其余为局部编号 + 1
+    remap = <unsigned int*>_alloc((<Py_ssize_t>_max_index(indices) + 1) * sizeof(unsigned int))
+    try:
+        with nogil:
+            for i in range(count):
+                vertex = indices[i]
+                if remap[vertex] == 0:
+                    vertices[used] = vertex
+                    used += 1
+                    remap[vertex] = <unsigned int>used
+                local[i] = remap[vertex] - 1
+    finally:
+        PyMem_Free(remap)
+    array.resize(vertex_result, used)
+    return local_result, vertex_result
+
+
+def tipsify_cython(const unsigned int[:] indices, Py_ssize_t vertex_count, Py_ssize_t cache_size):
+    """Tipsify 三角面排序
+
+    Args:
+        indices: 局部顶点索引 array('I')（顶点编号为 0..vertex_count-1 且都被使用）
+        vertex_count: 顶点数量
+        cache_size: 顶点缓存大小
+
+    Returns:
+        (三角面的新顺序 array('I'), 各簇在新顺序中的起点列表)
+    """
+    cdef Py_ssize_t corner_count = indices.shape[0]
+    cdef Py_ssize_t triangle_count = corner_count // 3
+    cdef array.array order_result = array.clone(_INDEX_TEMPLATE, triangle_count, False)
+    cdef unsigned int[:] order = order_result
+    cdef list cluster_starts
+    cdef Py_ssize_t* clusters
+    cdef Py_ssize_t* live
+    cdef Py_ssize_t* offsets
+    cdef Py_ssize_t* fill
+    cdef Py_ssize_t* adjacency
+    cdef Py_ssize_t* cache_time
+    cdef Py_ssize_t* dead_end
+    cdef char* emitted
+    cdef Py_ssize_t i, position, triangle, base, corner, vertex, best, best_priority, priority, age
+    cdef Py_ssize_t dead_end_size = 0, candidates_start, emitted_count = 0, cluster_count = 1
+    cdef Py_ssize_t timestamp = cache_size + 1
+    cdef Py_ssize_t cursor = 1
+    cdef Py_ssize_t fanning = 0 if vertex_count else -1
+
+    for i in range(corner_count):
+        if indices[i] >= vertex_count:
+            raise IndexError(f"顶点索引超出范围: {indices[i]}")
+    live = <Py_ssize_t*>_alloc(vertex_count * sizeof(Py_ssize_t))
+    offsets = <Py_ssize_t*>_alloc((vertex_count + 1) * sizeof(Py_ssize_t))
+    fill = <Py_ssize_t*>_alloc(vertex_count * sizeof(Py_ssize_t))
+    adjacency = <Py_ssize_t*>_alloc(corner_count * sizeof(Py_ssize_t))
+    cache_time = <Py_ssize_t*>_alloc(vertex_count * sizeof(Py_ssize_t))
+    dead_end = <Py_ssize_t*>_alloc(corner_count * sizeof(Py_ssize_t))
+    emitted = <char*>_alloc(triangle_count)
+    clusters = <Py_ssize_t*>_alloc((triangle_count + 1) * sizeof(Py_ssize_t))
+    try:
+        with nogil:
+            for i in range(triangle_count * 3):
+                live[indices[i]] += 1
+            for vertex in range(vertex_count):
+                offsets[vertex + 1] = offsets[vertex] + live[vertex]
+                fill[vertex] = offsets[vertex]
+            for position in range(triangle_count * 3):
+                vertex = indices[position]
+                adjacency[fill[vertex]] = position // 3
+                fill[vertex] += 1
+
+            while fanning >= 0:
+                # 本轮压入死路栈的顶点就是候选顶点
+                candidates_start = dead_end_size
+                for i in range(offsets[fanning], offsets[fanning + 1]):
+                    triangle = adjacency[i]
+                    if emitted[triangle]:
+                        continue
+                    emitted[triangle] = 1
+                    order[emitted_count] = <unsigned int>triangle
+                    emitted_count += 1
+                    base = triangle * 3
+                    for corner in range(3):
+                        vertex = indices[base + corner]
+                        dead_end[dead_end_size] = vertex
+                        dead_end_size += 1
+                        live[vertex] -= 1
+                        if timestamp - cache_time[vertex] > cache_size:
+                            cache_time[vertex] = timestamp
+                            timestamp += 1
+
+                # 优先选择仍有三角面、且发射其全部三角面后仍在缓存中的最旧顶点
+                best = -1
+                best_priority = -1
+                for i in range(candidates_start, dead_end_size):
+                    vertex = dead_end[i]
+                    if live[vertex] > 0:
+                        priority = 0
+                        age = timestamp - cache_time[vertex]
+                        if age + 2 * live[vertex] <= cache_size:
+                            priority = age
+                        if priority > best_priority:
+                            best_priority = priority
+                            best = vertex
+                if best < 0:
+                    while dead_end_size > 0:
+                        dead_end_size -= 1
+                        vertex = dead_end[dead_end_size]
+                        if live[vertex] > 0:
+                            best = vertex
+                            break
+                    if best < 0:
+                        while cursor < vertex_count and live[cursor] == 0:
+                            cursor += 1
+                        best = cursor if cursor < vertex_count else -1
+                    if best >= 0:
+                        # 走入死路后重新选择了扇形中心，开始新的簇
+                        clusters[cluster_count] = emitted_count
+                        cluster_count += 1
+                fanning = best
+        cluster_starts = [clusters[i] for i in range(cluster_count)]
+    finally:
+        PyMem_Free(live)
+        PyMem_Free(offsets)
+        PyMem_Free(fill)
+        PyMem_Free(adjacency)
+        PyMem_Free(cache_time)
+        PyMem_Free(dead_end)
+        PyMem_Free(emitted)
+        PyMem_Free(clusters)
+    array.resize(order_result, emitted_count)
+    return order_result, cluster_starts
+
+
+def cluster_stats_cython(const unsigned int[:] order, list clusters, const unsigned int[:] indices,
+                         const double[:] positions):
+    """逐簇统计按面积加权的中心和未归一化的法线和
+
+    Args:
+        order: 三角面顺序
+        clusters: 各簇在 order 中的起点
+        indices: 局部顶点索引
+        positions: 局部顶点的扁平坐标 array('d')
+
+    Returns:
+        每个簇一个 (中心 [x, y, z], 法线和 [x, y, z], 面积和)
+    """
+    cdef Py_ssize_t cluster_count = len(clusters)
+    cdef Py_ssize_t vertex_count = positions.shape[0] // 3
+    cdef Py_ssize_t cluster, start, end, i, axis, ia, ib, ic, base
+    cdef double a[3]
+    cdef double b[3]
+    cdef double c[3]
+    cdef double normal[3]
+    cdef double center[3]
+    cdef double e1x, e1y, e1z, e2x, e2y, e2z, nx, ny, nz, area, area_sum
+    cdef list stats = []
+    for i in range(indices.shape[0]):
+        if indices[i] >= vertex_count:
+            raise IndexError(f"顶点索引超出范围: {indices[i]}")
+    for i in range(order.shape[0]):
+        if order[i] >= indices.shape[0] // 3:
+            raise IndexError(f"三角面索引超出范围: {order[i]}")
+    for cluster in range(cluster_count):
+        start = clusters[cluster]
+        end = clusters[cluster + 1] if cluster + 1 < cluster_count else order.shape[0]
+        if start < 0 or end > order.shape[0]:
+            raise IndexError(f"簇范围无效: [{start}, {end})")
+        normal[0] = normal[1] = normal[2] = 0.0
+        center[0] = center[1] = center[2] = 0.0
+        area_sum = 0.0
+        for i in range(start, end):
+            base = order[i] * 3
+            ia, ib, ic = indices[base] * 3, indices[base + 1] * 3, indices[base + 2] * 3
+            for axis in range(3):
+                a[axis] = positions[ia + axis]
+                b[axis] = positions[ib + axis]
+                c[axis] = positions[ic + axis]
+            e1x, e1y, e1z = b[0] - a[0], b[1] - a[1], b[2] - a[2]
+            e2x, e2y, e2z = c[0] - a[0], c[1] - a[1], c[2] - a[2]
+            nx = e1y * e2z - e1z * e2y
+            ny = e1z * e2x - e1x * e2z
+            nz = e1x * e2y - e1y * e2x
+            # 与Python的 ** 0.5 相同，使用 pow 而不是 sqrt
+            area = pow(nx * nx + ny * ny + nz * nz, 0.5)
+            normal[0] += nx
+            normal[1] += ny
+            normal[2] += nz
+            for axis in range(3):
+                center[axis] += area * (a[axis] + b[axis] + c[axis]) / 3.0
+            area_sum += area
+        if area_sum != 0.0:
+            for axis in range(3):
+                center[axis] = center[axis] / area_sum
+        stats.append(([center[0], center[1], center[2]], [normal[0], normal[1], normal[2]], area_sum))
+    return stats
+
+
+def gather_triangles_cython(const unsigned int[:] indices, const unsigned int[:] order):
+    """按三角面顺序取出索引，返回 array('I')"""
+    cdef Py_ssize_t count = order.shape[0]
+    cdef Py_ssize_t triangle_count = indices.shape[0] // 3
+    cdef array.array result = array.clone(_INDEX_TEMPLATE, count * 3, False)
+    cdef unsigned int[:] out = result
+    cdef Py_ssize_t i, base
+    for i in range(count):
+        if order[i] >= triangle_count:
+            raise IndexError(f"三角面索引超出范围: {order[i]}")
+    with nogil:
+        for i in range(count):
+            base = order[i] * 3
+            out[i * 3] = indices[base]
+            out[i * 3 + 1] = indices[base + 1]
+            out[i * 3 + 2] = indices[base + 2]
+    return result
@@ -0,0 +1,8 @@
+from __future__ import annotations
+
+from array import array
+from typing import List, Tuple
+
+
+def collapse_edges_cython(indices: array, positions: array, shared: bytes, morph_ids: array,
+                          target_faces: int, max_error: float) -> Tuple[array, List[int]]: ...
@@ -0,0 +1,476 @@
+# cython: language_level=3
+# cython: boundscheck=False
+# cython: wraparound=False
+# cython: cdivision=True
+# cython: initializedcheck=False
+# cython: nonecheck=False
+"""
+PyPMXVMD 网格简化边折叠内核 (Cython优化)
+
+与 simplify.py 中的 _MaterialSimplifier 逐步对应：同样的二次误差、同样的锁定规则、同样的翻转检查，
+堆项按 (误差, 版本a, 版本b, a, b, 源, 目标) 的字典序弹出，因此折叠顺序和结果与纯Python实现相同。
+
+优化策略:
+- 材质内的顶点按全局索引排序后编号，局部编号的大小关系与全局索引一致，堆项比较无需换算
+- 二次误差矩阵、版本号、邻接面列表保存在C数组中，堆为C结构体数组上的二叉堆
+- 边的使用次数通过对64位边键排序统计，不使用字典
+"""
+
+from libc.math cimport sqrt
+from libc.stdlib cimport qsort
+from libc.string cimport memset
+from cpython.mem cimport PyMem_Malloc, PyMem_Realloc, PyMem_Free
+from cpython cimport array
+import array
+
+cdef array.array _INDEX_TEMPLATE = array.array('I', [])
+
+
+ctypedef struct _Entry:
+    double cost
+    int version_a
+    int version_b
+    int a
+    int b
+    int source
+    int target
+
+
+ctypedef struct _FaceList:
+    int* items
+    int size
+    int capacity
+
+
+cdef int _compare_uint(const void* left, const void* right) noexcept nogil:
+    cdef unsigned int x = (<const unsigned int*>left)[0]
+    cdef unsigned int y = (<const unsigned int*>right)[0]
+    return (x > y) - (x < y)
+
+
+cdef int _compare_edge(const void* left, const void* right) noexcept nogil:
+    cdef unsigned long long x = (<const unsigned long long*>left)[0]
+    cdef unsigned long long y = (<const unsigned long long*>right)[0]
+    return (x > y) - (x < y)
+
+
+cdef inline bint _less(_Entry* x, _Entry* y) noexcept nogil:
+    """与Python元组比较相同的字典序"""
+    if x.cost != y.cost:
+        return x.cost < y.cost
+    if x.version_a != y.version_a:
+        return x.version_a < y.version_a
+    if x.version_b != y.version_b:
+        return x.version_b < y.version_b
+    if x.a != y.a:
+        return x.a < y.a
+    if x.b != y.b:
+        return x.b < y.b
+    if x.source != y.source:
+        return x.source < y.source
+    return x.target < y.target
+
+
+cdef inline double _error(const double* q, double x, double y, double z) noexcept nogil:
+    return (q[0] * x * x + 2 * q[1] * x * y + 2 * q[2] * x * z + 2 * q[3] * x
+            + q[4] * y * y + 2 * q[5] * y * z + 2 * q[6] * y
+            + q[7] * z * z + 2 * q[8] * z + q[9])
+
+
+cdef inline void _normal(const double* p, double* x, double* y, double* z) noexcept nogil:
+    cdef double ux = p[3] - p[0], uy = p[4] - p[1], uz = p[5] - p[2]
+    cdef double vx = p[6] - p[0], vy = p[7] - p[1], vz = p[8] - p[2]
+    x[0] = uy * vz - uz * vy
+    y[0] = uz * vx - ux * vz
+    z[0] = ux * vy - uy * vx
+
+
+cdef class _Collapser:
+    """单个材质子网格的边折叠状态"""
+
+    cdef const double[:] positions
+    cdef Py_ssize_t vertex_count
+    cdef Py_ssize_t face_count
+    cdef unsigned int* vertices
+    cdef int* faces
+    cdef char* alive
+    cdef double* quadrics
+    cdef int* versions
+    cdef int* morph_ids
+    cdef int* marks
+    cdef char* locked
+    cdef char* removed
+    cdef _FaceList* adjacency
+    cdef _Entry* heap
+    cdef Py_ssize_t heap_size
+    cdef Py_ssize_t heap_capacity
+
+    def __dealloc__(self):
+        cdef Py_ssize_t i
+        if self.adjacency != NULL:
+            for i in range(self.vertex_count):
+                PyMem_Free(self.adjacency[i].items)
+        PyMem_Free(self.adjacency)
+        PyMem_Free(self.vertices)
+        PyMem_Free(self.faces)
+        PyMem_Free(self.alive)
+        PyMem_Free(self.quadrics)
+        PyMem_Free(self.versions)
+        PyMem_Free(self.morph_ids)
+        PyMem_Free(self.marks)
+        PyMem_Free(self.locked)
+        PyMem_Free(self.removed)
+        PyMem_Free(self.heap)
+
+    cdef void* _alloc(self, Py_ssize_t size) except NULL:
+        cdef void* memory = PyMem_Malloc(size if size > 0 else 1)
+        if memory == NULL:
+            raise MemoryError()
+        memset(memory, 0, size if size > 0 else 1)
+        return memory
+
+    cdef int _setup(self, const unsigned int[:] indices, const double[:] positions,
+                    const unsigned char[:] shared, const int[:] morph_ids) except -1:
+        cdef Py_ssize_t corner_count = (indices.shape[0] // 3) * 3
+        cdef Py_ssize_t global_count = positions.shape[0] // 3
+        cdef Py_ssize_t i, j, count, face, corner, low, high, middle
+        cdef unsigned int value
+        cdef unsigned long long* edges
+        cdef unsigned long long edge
+        cdef int vertex, other, a, b, c
+        cdef double ux, uy, uz, vx, vy, vz, nx, ny, nz, length, area, d
+        cdef double plane[10]
+        cdef double* total
+
+        if shared.shape[0] < global_count or morph_ids.shape[0] < global_count:
+            raise ValueError("锁定标记或变形编号数量少于顶点数量")
+        for i in range(corner_count):
+            if indices[i] >= global_count:
+                raise IndexError(f"顶点索引超出范围: {indices[i]}")
+        self.positions = positions
+        self.face_count = corner_count // 3
+
+        # 局部编号：排序去重后的全局索引
+        self.vertices = <unsigned int*>self._alloc(corner_count * sizeof(unsigned int))
+        for i in range(corner_count):
+            self.vertices[i] = indices[i]
+        qsort(self.vertices, corner_count, sizeof(unsigned int), _compare_uint)
+        count = 0
+        for i in range(corner_count):
+            if count == 0 or self.vertices[i] != self.vertices[count - 1]:
+                self.vertices[count] = self.vertices[i]
+                count += 1
+        self.vertex_count = count
+
+        self.faces = <int*>self._alloc(corner_count * sizeof(int))
+        for i in range(corner_count):
+            value = indices[i]
+            low, high = 0, count - 1
+            while low < high:
+                middle = (low + high) // 2
+                if self.vertices[middle] < value:
+                    low = middle + 1
+                else:
+                    high = middle
+            self.faces[i] = <int>low
+
+        self.alive = <char*>self._alloc(self.face_count)
+        self.quadrics = <double*>self._alloc(count * 10 * sizeof(double))
+        self.versions = <int*>self._alloc(count * sizeof(int))
+        self.morph_ids = <int*>self._alloc(count * sizeof(int))
+        self.marks = <int*>self._alloc(count * sizeof(int))
+        self.locked = <char*>self._alloc(count)
+        self.removed = <char*>self._alloc(count)
+        self.adjacency = <_FaceList*>self._alloc(count * sizeof(_FaceList))
+        for i in range(count):
+            self.morph_ids[i] = morph_ids[self.vertices[i]]
+            self.locked[i] = shared[self.vertices[i]] != 0
+            self.marks[i] = -1
+
+        for face in range(self.face_count):
+            self.alive[face] = 1
+            a, b, c = self.faces[face * 3], self.faces[face * 3 + 1], self.faces[face * 3 + 2]
+            ux = self._x(b) - self._x(a)
+            uy = self._y(b) - self._y(a)
+            uz = self._z(b) - self._z(a)
+            vx = self._x(c) - self._x(a)
+            vy = self._y(c) - self._y(a)
+            vz = self._z(c) - self._z(a)
+            nx = uy * vz - uz * vy
+            ny = uz * vx - ux * vz
+            nz = ux * vy - uy * vx
+            length = sqrt(nx * nx + ny * ny + nz * nz)
+            if length != 0.0:
+                area = length * 0.5
+                nx, ny, nz = nx / length, ny / length, nz / length
+                d = -(nx * self._x(a) + ny * self._y(a) + nz * self._z(a))
+                plane[0], plane[1], plane[2], plane[3] = area * (nx * nx), area * (nx * ny), area * (nx * nz), area * (nx * d)
+                plane[4], plane[5], plane[6] = area * (ny * ny), area * (ny * nz), area * (ny * d)
+                plane[7], plane[8], plane[9] = area * (nz * nz), area * (nz * d), area * (d * d)
+            for corner in range(3):
+                vertex = self.faces[face * 3 + corner]
+                self._add_face(vertex, <int>face)
+                if length != 0.0:
+                    total = self.quadrics + vertex * 10
+                    for j in range(10):
+                        total[j] += plane[j]
+
+        # 边界边（只属于一个面）和非流形边的端点不可折叠
+        edges = <unsigned long long*>self._alloc(corner_count * sizeof(unsigned long long))
+        try:
+            for face in range(self.face_count):
+                for corner in range(3):
+                    vertex = self.faces[face * 3 + corner]
+                    other = self.faces[face * 3 + (corner + 1) % 3]
+                    if vertex > other:
+                        vertex, other = other, vertex
+                    edges[face * 3 + corner] = (<unsigned long long>vertex << 32) | <unsigned int>other
+            qsort(edges, corner_count, sizeof(unsigned long long), _compare_edge)
+            i = 0
+            while i < corner_count:
+                j = i
+                while j < corner_count and edges[j] == edges[i]:
+                    j += 1
+                if j - i != 2:
+                    self.locked[edges[i] >> 32] = 1
+                    self.locked[edges[i] & 0xFFFFFFFF] = 1
+                i = j
+            i = 0
+            while i < corner_count:
+                edge = edges[i]
+                self._push(<int>(edge >> 32), <int>(edge & 0xFFFFFFFF))
+                while i < corner_count and edges[i] == edge:
+                    i += 1
+        finally:
+            PyMem_Free(edges)
+        return 0
+
+    cdef inline double _x(self, int vertex) noexcept nogil:
+        return self.positions[self.vertices[vertex] * 3]
+
+    cdef inline double _y(self, int vertex) noexcept nogil:
+        return self.positions[self.vertices[vertex] * 3 + 1]
+
+    cdef inline double _z(self, int vertex) noexcept nogil:
+        return self.positions[self.vertices[vertex] * 3 + 2]
+
+    cdef int _add_face(self, int vertex, int face) except -1:
+        cdef _FaceList* faces = &self.adjacency[vertex]
+        cdef int capacity
+        cdef int* items
+        if faces.size == faces.capacity:
+            capacity = faces.capacity * 2 if faces.capacity else 8
+            items = <int*>PyMem_Realloc(faces.items, capacity * sizeof(int))
+            if items == NULL:
+                raise MemoryError()
+            faces.items = items
+            faces.capacity = capacity
+        faces.items[faces.size] = face
+        faces.size += 1
+        return 0
+
+    cdef void _discard_face(self, int vertex, int face) noexcept nogil:
+        cdef _FaceList* faces = &self.adjacency[vertex]
+        cdef int i
+        for i in range(faces.size):
+            if faces.items[i] == face:
+                faces.size -= 1
+                faces.items[i] = faces.items[faces.size]
+                return
+
+    cdef inline bint _cost(self, int source, int target, double* cost) noexcept nogil:
+        """可折叠时写入误差并返回True"""
+        cdef double x, y, z
+        if self.locked[source] or self.morph_ids[source] != self.morph_ids[target]:
+            return False
+        x, y, z = self._x(target), self._y(target), self._z(target)
+        cost[0] = (_error(self.quadrics + source * 10, x, y, z)
+                   + _error(self.quadrics + target * 10, x, y, z))
+        if cost[0] < 0.0:
+            cost[0] = 0.0
+        return True
+
+    cdef int _push(self, int a, int b) except -1:
+        cdef double cost, other_cost
+        cdef int source, target
+        cdef _Entry entry
+        cdef _Entry* heap
+        cdef Py_ssize_t capacity, position, parent
+        if a == b:
+            return 0
+        if self._cost(a, b, &cost):
+            source, target = a, b
+            if self._cost(b, a, &other_cost) and other_cost < cost:
+                cost, source, target = other_cost, b, a
+        elif self._cost(b, a, &cost):
+            source, target = b, a
+        else:
+            return 0
+        entry.cost = cost
+        entry.version_a = self.versions[a]
+        entry.version_b = self.versions[b]
+        entry.a, entry.b, entry.source, entry.target = a, b, source, target
+
+        if self.heap_size == self.heap_capacity:
+            capacity = self.heap_capacity * 2 if self.heap_capacity else 1024
+            heap = <_Entry*>PyMem_Realloc(self.heap, capacity * sizeof(_Entry))
+            if heap == NULL:
+                raise MemoryError()
+            self.heap = heap
+            self.heap_capacity = capacity
+        position = self.heap_size
+        self.heap_size += 1
+        while position > 0:
+            parent = (position - 1) // 2
+            if not _less(&entry, &self.heap[parent]):
+                break
+            self.heap[position] = self.heap[parent]
+            position = parent
+        self.heap[position] = entry
+        return 0
+
+    cdef _Entry _pop(self) noexcept nogil:
+        cdef _Entry top = self.heap[0]
+        cdef _Entry last
+        cdef Py_ssize_t position = 0, child
+        self.heap_size -= 1
+        if self.heap_size:
+            last = self.heap[self.heap_size]
+            while True:
+                child = position * 2 + 1
+                if child >= self.heap_size:
+                    break
+                if child + 1 < self.heap_size and _less(&self.heap[child + 1], &self.heap[child]):
+                    child += 1
+                if not _less(&self.heap[child], &last):
+                    break
+                self.heap[position] = self.heap[child]
+                position = child
+            self.heap[position] = last
+        return top
+
+    cdef bint _contains(self, Py_ssize_t face, int vertex) noexcept nogil:
+        return (self.faces[face * 3] == vertex or self.faces[face * 3 + 1] == vertex
+                or self.faces[face * 3 + 2] == vertex)
+
+    cdef bint _flips(self, int source, int target) noexcept nogil:
+        """折叠后是否有三角面翻转"""
+        cdef _FaceList* faces = &self.adjacency[source]
+        cdef int i, corner, vertex
+        cdef Py_ssize_t face
+        cdef double p[9]
+        cdef double q[9]
+        cdef double before_x, before_y, before_z, after_x, after_y, after_z
+        for i in range(faces.size):
+            face = faces.items[i]
+            if self._contains(face, target):
+                continue
+            for corner in range(3):
+                vertex = self.faces[face * 3 + corner]
+                p[corner * 3], p[corner * 3 + 1], p[corner * 3 + 2] = self._x(vertex), self._y(vertex), self._z(vertex)
+                if vertex == source:
+                    vertex = target
+                q[corner * 3], q[corner * 3 + 1], q[corner * 3 + 2] = self._x(vertex), self._y(vertex), self._z(vertex)
+            _normal(p, &before_x, &before_y, &before_z)
+            _normal(q, &after_x, &after_y, &after_z)
+            if before_x * after_x + before_y * after_y + before_z * after_z <= 0.0:
+                return True
+        return False
+
+    cdef Py_ssize_t run(self, Py_ssize_t target_faces, double max_error) except -1:
+        """折叠到 target_faces 个面或误差超过 max_error，返回剩余面数"""
+        cdef Py_ssize_t remaining = 0
+        cdef Py_ssize_t face
+        cdef _Entry entry
+        cdef _FaceList* faces
+        cdef int i, j, corner, source, target, vertex
+        for face in range(self.face_count):
+            if (self.faces[face * 3] != self.faces[face * 3 + 1] and self.faces[face * 3 + 1] != self.faces[face * 3 + 2]
+                    and self.faces[face * 3] != self.faces[face * 3 + 2]):
+                remaining += 1
+        while remaining > target_faces and self.heap_size:
+            entry = self._pop()
+            if self.removed[entry.a] or self.removed[entry.b] or \
+                    self.versions[entry.a] != entry.version_a or self.versions[entry.b] != entry.version_b:
+                continue
+            if entry.cost > max_error:
+                break
+            source, target = entry.source, entry.target
+            if self._flips(source, target):
+                continue
+            faces = &self.adjacency[source]
+            for i in range(faces.size):
+                face = faces.items[i]
+                if self._contains(face, target):
+                    self.alive[face] = 0
+                    remaining -= 1
+                    for corner in range(3):
+                        vertex = self.faces[face * 3 + corner]
+                        if vertex != source:
+                            self._discard_face(vertex, <int>face)
+                else:
+                    for corner in range(3):
+                        if self.faces[face * 3 + corner] == source:
+                            self.faces[face * 3 + corner] = target
+                    self._add_face(target, <int>face)
+            PyMem_Free(faces.items)
+            faces.items = NULL
+            faces.size = faces.capacity = 0
+            self.removed[source] = 1
+            for j in range(10):
+                self.quadrics[target * 10 + j] = self.quadrics[source * 10 + j] + self.quadrics[target * 10 + j]
+            self.versions[target] += 1
+            faces = &self.adjacency[target]
+            for i in range(faces.size):
+                face = faces.items[i]
+                for corner in range(3):
+                    vertex = self.faces[face * 3 + corner]
+                    if vertex != target and self.marks[vertex] != target:
+                        self.marks[vertex] = target
+                        self._push(target, vertex)
+            # 下一次折叠可能再次以同一顶点为目标，清除标记
+            for i in range(faces.size):
+                face = faces.items[i]
+                for corner in range(3):
+                    self.marks[self.faces[face * 3 + corner]] = -1
+        return remaining
+
+    cdef tuple result(self):
+        cdef Py_ssize_t face, kept = 0
+        cdef Py_ssize_t vertex
+        cdef int a, b, c
+        cdef array.array indices = array.clone(_INDEX_TEMPLATE, self.face_count * 3, False)
+        cdef unsigned int[:] out = indices
+        cdef list removed = []
+        for face in range(self.face_count):
+            a, b, c = self.faces[face * 3], self.faces[face * 3 + 1], self.faces[face * 3 + 2]
+            if self.alive[face] and a != b and b != c and a != c:
+                out[kept * 3], out[kept * 3 + 1], out[kept * 3 + 2] = self.vertices[a], self.vertices[b], self.vertices[c]
+                kept += 1
+        array.resize(indices, kept * 3)
+        for vertex in range(self.vertex_count):
+            if self.removed[vertex]:
+                removed.append(self.vertices[vertex])
+        return indices, removed
+
+
+def collapse_edges_cython(const unsigned int[:] indices, const double[:] positions,
+                          const unsigned char[:] shared, const int[:] morph_ids,
+                          Py_ssize_t target_faces, double max_error):
+    """对一个材质子网格做二次误差边折叠
+
+    Args:
+        indices: 材质的扁平面索引 array('I')（全局顶点索引）
+        positions: 全部顶点的扁平坐标 array('d')
+        shared: 每个顶点一个字节，非0表示被多个材质共用（不可折叠）
+        morph_ids: 每个顶点参与的变形集合的编号，编号相同才可折叠
+        target_faces: 目标面数
+        max_error: 允许的最大二次误差
+
+    Returns:
+        (剩余面的扁平索引 array('I'), 被折叠掉的全局顶点索引列表)
+    """
+    cdef _Collapser collapser = _Collapser()
+    collapser._setup(indices, positions, shared, morph_ids)
+    collapser.run(target_faces, max_error)
+    return collapser.result()
@@ -0,0 +1,205 @@
+"""
+PyPMXVMD 相机动作采样
+
+在任意帧上对相机VMD采样，得到每帧的视点、观察矩阵和投影矩阵，全部写入连续的扁平数组。
+
+相机关键帧的6个通道（目标X/Y/Z、旋转、距离、视角）各自使用区间后一个关键帧的贝塞尔曲线插值，
+旋转按欧拉角逐分量插值（与MMD一致，可以跨越多圈）。相邻两帧的关键帧视为镜头切换：
+两帧之间的小数帧保持前一个关键帧，不插值。
+
+相机位于 目标位置 + R * (0, 0, 距离)，R 依次绕Y、X、Z轴旋转（偏航、俯仰、滚转），
+距离通常为负数（位于模型正面）。矩阵按行主序存储，作用于列向量（p' = M * p）。
+"""
+
+import math
+from array import array
+from typing import List, Sequence, Tuple
+
+from pypmxvmd.common.math3d import bezier_progress
+from pypmxvmd.common.models.vmd import VmdMotion, VmdCameraFrame
+from pypmxvmd.common.processing.keyframes import unique_order
+
+_Vector = Tuple[float, float, float]
+
+
+class CameraSamples:
+    """相机采样结果，每个采样帧一行
+
+    Attributes:
+        frames: 采样帧号，与输入顺序相同
+        eye_positions: 视点位置 array('f')，每帧3个
+        targets: 注视点位置 array('f')，每帧3个
+        fovs: 垂直视角（度）array('f')，每帧1个
+        view_matrices: 观察矩阵 array('f')，每帧16个（行主序）
+        projection_matrices: 投影矩阵 array('f')，每帧16个（行主序）
+    """
+
+    def __init__(self, frames: List[float]):
+        count = len(frames)
+        self.frames = frames
+        self.eye_positions = array('f', bytes(4 * 3 * count))
+        self.targets = array('f', bytes(4 * 3 * count))
+        self.fovs = array('f', bytes(4 * count))
+        self.view_matrices = array('f', bytes(4 * 16 * count))
+        self.projection_matrices = array('f', bytes(4 * 16 * count))
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def eye(self, index: int) -> List[float]:
+        """第index个采样帧的视点位置"""
+        return list(self.eye_positions[index * 3:index * 3 + 3])
+
+    def view_matrix(self, index: int) -> List[List[float]]:
+        """第index个采样帧的观察矩阵（4行）"""
+        values = self.view_matrices[index * 16:index * 16 + 16]
+        return [list(values[row * 4:row * 4 + 4]) for row in range(4)]
+
+    def projection_matrix(self, index: int) -> List[List[float]]:
+        """第index个采样帧的投影矩阵（4行）"""
+        values = self.projection_matrices[index * 16:index * 16 + 16]
+        return [list(values[row * 4:row * 4 + 4]) for row in range(4)]
+
+
+def _normalize(x: float, y: float, z: float) -> _Vector:
+    length = math.sqrt(x * x + y * y + z * z) or 1.0
+    return x / length, y / length, z / length
+
+
+def _cross(a: Sequence[float], b: Sequence[float]) -> _Vector:
+    return (a[1] * b[2] - a[2] * b[1],
+            a[2] * b[0] - a[0] * b[2],
+            a[0] * b[1] - a[1] * b[0])
+
+
+def _orientation(rotation: Sequence[float]) -> Tuple[_Vector, _Vector]:
+    """旋转（度）下相机局部 +Z 轴和 +Y 轴的世界方向，R = Ry * Rx * Rz"""
+    rx, ry, rz = (math.radians(angle) for angle in rotation)
+    cx, sx = math.cos(rx), math.sin(rx)
+    cy, sy = math.cos(ry), math.sin(ry)
+    cz, sz = math.cos(rz), math.sin(rz)
+    # Rx * Rz 作用于 (0, 0, 1) 和 (0, 1, 0)，再绕Y轴旋转
+    forward = (0.0, -sx, cx)
+    up = (-sz, cx * cz, sx * cz)
+    return ((cy * forward[0] + sy * forward[2], forward[1], -sy * forward[0] + cy * forward[2]),
+            (cy * up[0] + sy * up[2], up[1], -sy * up[0] + cy * up[2]))
+
+
+def _keyframes(motion: VmdMotion) -> List[VmdCameraFrame]:
+    frames = motion.camera_frames
+    if not frames:
+        raise ValueError("动作中没有相机关键帧")
+    return [frames[index] for index in unique_order([frame.frame_number for frame in frames])]
+
+
+def _interpolate(previous: VmdCameraFrame, current: VmdCameraFrame, frame: float) -> tuple:
+    """在区间 [previous, current] 内插值，返回 (目标位置, 旋转, 距离, 视角)"""
+    span = current.frame_number - previous.frame_number
+    t = (frame - previous.frame_number) / span
+    curves = current.interpolation
+
+    def progress(index: int) -> float:
+        return bezier_progress(curves[index * 4:index * 4 + 4], t)
+
+    def channel(index: int, start: float, end: float) -> float:
+        return start + (end - start) * progress(index)
+
+    target = [channel(axis, previous.position[axis], current.position[axis]) for axis in range(3)]
+    rotation_progress = progress(3)
+    rotation = [start + (end - start) * rotation_progress
+                for start, end in zip(previous.rotation, current.rotation)]
+    distance = channel(4, previous.distance, current.distance)
+    return target, rotation, distance, channel(5, previous.fov, current.fov)
+
+
+def sample_camera(motion: VmdMotion, frames: Sequence[float], aspect: float = 16.0 / 9.0,
+                  near: float = 1.0, far: float = 10000.0, right_handed: bool = True) -> CameraSamples:
+    """在指定帧上对相机动作采样
+
+    Args:
+        motion: 相机VMD动作
+        frames: 采样帧号，可以是小数，顺序任意
+        aspect: 画面宽高比
+        near: 近裁剪面距离
+        far: 远裁剪面距离
+        right_handed: 为True时把Z轴取反换算为右手坐标系，矩阵使用OpenGL约定（视线朝 -Z，
+            裁剪空间Z为 -1 到 1）；为False时保持MMD的左手坐标系，矩阵使用Direct3D约定
+            （视线朝 +Z，裁剪空间Z为 0 到 1）
+
+    Returns:
+        CameraSamples对象。关闭透视的关键帧使用正交投影，可见高度等于透视投影在注视点处的高度
+
+    Raises:
+        ValueError: 动作中没有相机关键帧，或 aspect、near、far 无效
+    """
+    if aspect <= 0.0 or not 0.0 < near < far:
+        raise ValueError(f"投影参数无效: aspect={aspect}, near={near}, far={far}")
+    keys = _keyframes(motion)
+    frames = list(frames)
+    samples = CameraSamples(frames)
+    flip = -1.0 if right_handed else 1.0
+    k = 0
+    for query in sorted(range(len(frames)), key=frames.__getitem__):
+        frame = frames[query]
+        while k + 1 < len(keys) and keys[k + 1].frame_number <= frame:
+            k += 1
+        key = keys[k]
+        if k + 1 == len(keys) or frame <= key.frame_number \
+                or keys[k + 1].frame_number - key.frame_number <= 1:
+            # 第一个关键帧之前、最后一个关键帧之后、恰好落在关键帧上或镜头切换
+            target, rotation, distance, fov = key.position, key.rotation, key.distance, key.fov
+        else:
+            target, rotation, distance, fov = _interpolate(key, keys[k + 1], frame)
+
+        axis, up = _orientation(rotation)
+        tx, ty, tz = target[0], target[1], target[2] * flip
+        ex, ey, ez = tx + axis[0] * distance, ty + axis[1] * distance, tz + axis[2] * distance * flip
+        up = (up[0], up[1], up[2] * flip)
+        # 视线方向：距离为0时视点与注视点重合，沿相机局部 +Z 轴观察
+        if distance:
+            forward = _normalize(tx - ex, ty - ey, tz - ez)
+        else:
+            forward = (axis[0], axis[1], axis[2] * flip)
+        if right_handed:
+            side = _normalize(*_cross(forward, up))
+            true_up = _cross(side, forward)
+            rows = (side, true_up, (-forward[0], -forward[1], -forward[2]))
+        else:
+            side = _normalize(*_cross(up, forward))
+            true_up = _cross(forward, side)
+            rows = (side, true_up, forward)
+        base = query * 16
+        view = samples.view_matrices
+        for row, (x, y, z) in enumerate(rows):
+            view[base + row * 4:base + row * 4 + 4] = array('f', (x, y, z, -(x * ex + y * ey + z * ez)))
+        view[base + 15] = 1.0
+
+        y_scale = 1.0 / math.tan(math.radians(fov) * 0.5)
+        projection = samples.projection_matrices
+        if key.perspective:
+            projection[base] = y_scale / aspect
+            projection[base + 5] = y_scale
+            if right_handed:
+                projection[base + 10] = (far + near) / (near - far)
+                projection[base + 11] = 2.0 * far * near / (near - far)
+                projection[base + 14] = -1.0
+            else:
+                projection[base + 10] = far / (far - near)
+                projection[base + 11] = -near * far / (far - near)
+                projection[base + 14] = 1.0
+        else:
+            half_height = abs(distance) / y_scale or 1.0
+            projection[base] = 1.0 / (half_height * aspect)
+            projection[base + 5] = 1.0 / half_height
+            if right_handed:
+                projection[base + 10] = -2.0 / (far - near)
+                projection[base + 11] = -(far + near) / (far - near)
+            else:
+                projection[base + 10] = 1.0 / (far - near)
+                projection[base + 11] = -near / (far - near)
+            projection[base + 15] = 1.0
+
+        samples.eye_positions[query * 3:query * 3 + 3] = array('f', (ex, ey, ez))
+        samples.targets[query * 3:query * 3 + 3] = array('f', (tx, ty, tz))
+        samples.fovs[query] = fov
+    return samples
@@ -0,0 +1,205 @@
+"""
+PyPMXVMD VMD动作合并与拼接
+
+把多个VMD动作的关键帧收集到连续数组中（名称通过全局名称表去重为整数ID），
+在数组上统一加上帧偏移、排序和去重，最后一次性生成新的关键帧对象。
+不会对原关键帧调用 copy()/deepcopy，输入的动作保持不变。
+"""
+
+from array import array
+from typing import Dict, List, Optional, Sequence
+
+from pypmxvmd.common.models.vmd import (
+    VmdMotion, VmdHeader, VmdBoneFrame, VmdMorphFrame, VmdCameraFrame,
+    VmdLightFrame, VmdShadowFrame, VmdIkFrame, VmdIkBone
+)
+from pypmxvmd.common.processing.keyframes import unique_order
+
+
+class _NameTable:
+    """名称 -> 整数ID 的全局名称表"""
+
+    def __init__(self):
+        self.names: List[str] = []
+        self._lookup: Dict[str, int] = {}
+
+    def intern(self, name: str) -> int:
+        index = self._lookup.get(name)
+        if index is None:
+            index = self._lookup[name] = len(self.names)
+            self.names.append(name)
+        return index
+
+
+def _last_frame(motion: VmdMotion) -> int:
+    """动作中最后一个关键帧的帧号，没有关键帧时为0"""
+    last = 0
+    for frames in (motion.bone_frames, motion.morph_frames, motion.camera_frames,
+                   motion.light_frames, motion.shadow_frames, motion.ik_frames):
+        if frames:
+            last = max(last, max(frame.frame_number for frame in frames))
+    return last
+
+
+def _check_frames(frame_numbers: array) -> None:
+    if frame_numbers and min(frame_numbers) < 0:
+        raise ValueError(f"偏移后的帧号不能为负: {min(frame_numbers)}")
+
+
+def _order(keys: array, normalize: bool) -> Sequence[int]:
+    return unique_order(keys) if normalize else range(len(keys))
+
+
+def _combine_bone_frames(motions: Sequence[VmdMotion], offsets: Sequence[int],
+                         normalize: bool) -> List[VmdBoneFrame]:
+    names = _NameTable()
+    name_ids, frame_numbers = array('I'), array('q')
+    positions, rotations = array('d'), array('d')
+    interpolation, physics = array('b'), bytearray()
+    for motion, offset in zip(motions, offsets):
+        frames = motion.bone_frames
+        name_ids.extend(names.intern(frame.bone_name) for frame in frames)
+        frame_numbers.extend(frame.frame_number + offset for frame in frames)
+        for frame in frames:
+            positions.extend(frame.position)
+            rotations.extend(frame.rotation)
+            interpolation.extend(frame.interpolation)
+        physics.extend(1 if frame.physics_disabled else 0 for frame in frames)
+    count = len(frame_numbers)
+    if len(positions) != 3 * count or len(rotations) != 3 * count or len(interpolation) != 16 * count:
+        raise ValueError("骨骼关键帧的位置/旋转/插值分量数不正确")
+    _check_frames(frame_numbers)
+
+    keys = array('Q', (name_id << 32 | frame for name_id, frame in zip(name_ids, frame_numbers)))
+    bone_names = names.names
+    return [
+        VmdBoneFrame(bone_name=bone_names[name_ids[i]], frame_number=frame_numbers[i],
+                     position=positions[i * 3:i * 3 + 3].tolist(),
+                     rotation=rotations[i * 3:i * 3 + 3].tolist(),
+                     interpolation=interpolation[i * 16:i * 16 + 16].tolist(),
+                     physics_disabled=bool(physics[i]))
+        for i in _order(keys, normalize)
+    ]
+
+
+def _combine_morph_frames(motions: Sequence[VmdMotion], offsets: Sequence[int],
+                          normalize: bool) -> List[VmdMorphFrame]:
+    names = _NameTable()
+    name_ids, frame_numbers, weights = array('I'), array('q'), array('d')
+    for motion, offset in zip(motions, offsets):
+        frames = motion.morph_frames
+        name_ids.extend(names.intern(frame.morph_name) for frame in frames)
+        frame_numbers.extend(frame.frame_number + offset for frame in frames)
+        weights.extend(frame.weight for frame in frames)
+    _check_frames(frame_numbers)
+
+    keys = array('Q', (name_id << 32 | frame for name_id, frame in zip(name_ids, frame_numbers)))
+    morph_names = names.names
+    return [
+        VmdMorphFrame(morph_name=morph_names[name_ids[i]], frame_number=frame_numbers[i],
+                      weight=weights[i])
+        for i in _order(keys, normalize)
+    ]
+
+
+def _combine_other_frames(motions: Sequence[VmdMotion], offsets: Sequence[int],
+                          attr: str, rebuild, normalize: bool) -> list:
+    """合并相机/光照/阴影/IK关键帧（数量通常很少，逐个重建）"""
+    sources, frame_numbers = [], array('q')
+    for motion, offset in zip(motions, offsets):
+        frames = getattr(motion, attr)
+        sources.extend(frames)
+        frame_numbers.extend(frame.frame_number + offset for frame in frames)
+    _check_frames(frame_numbers)
+    keys = array('Q', frame_numbers)
+    return [rebuild(sources[i], frame_numbers[i]) for i in _order(keys, normalize)]
+
+
+def _rebuild_camera(frame: VmdCameraFrame, frame_number: int) -> VmdCameraFrame:
+    return VmdCameraFrame(frame_number=frame_number, distance=frame.distance,
+                          position=list(frame.position), rotation=list(frame.rotation),
+                          interpolation=list(frame.interpolation), fov=frame.fov,
+                          perspective=frame.perspective)
+
+
+def _rebuild_light(frame: VmdLightFrame, frame_number: int) -> VmdLightFrame:
+    return VmdLightFrame(frame_number=frame_number, color=list(frame.color),
+                         position=list(frame.position))
+
+
+def _rebuild_shadow(frame: VmdShadowFrame, frame_number: int) -> VmdShadowFrame:
+    return VmdShadowFrame(frame_number=frame_number, shadow_mode=frame.shadow_mode,
+                          distance=frame.distance)
+
+
+def _rebuild_ik(frame: VmdIkFrame, frame_number: int) -> VmdIkFrame:
+    return VmdIkFrame(frame_number=frame_number, display=frame.display,
+                      ik_bones=[VmdIkBone(bone_name=bone.bone_name, ik_enabled=bone.ik_enabled)
+                                for bone in frame.ik_bones])
+
+
+def _combine(motions: Sequence[VmdMotion], offsets: Sequence[int],
+             model_name: Optional[str], normalize: bool) -> VmdMotion:
+    result = VmdMotion()
+    first = motions[0].header if motions else VmdHeader()
+    result.header = VmdHeader(version=first.version,
+                              model_name=first.model_name if model_name is None else model_name)
+    result.bone_frames = _combine_bone_frames(motions, offsets, normalize)
+    result.morph_frames = _combine_morph_frames(motions, offsets, normalize)
+    result.camera_frames = _combine_other_frames(motions, offsets, "camera_frames",
+                                                 _rebuild_camera, normalize)
+    result.light_frames = _combine_other_frames(motions, offsets, "light_frames",
+                                                _rebuild_light, normalize)
+    result.shadow_frames = _combine_other_frames(motions, offsets, "shadow_frames",
+                                                 _rebuild_shadow, normalize)
+    result.ik_frames = _combine_other_frames(motions, offsets, "ik_frames", _rebuild_ik, normalize)
+    return result
+
+
+def merge_motions(motions: Sequence[VmdMotion], model_name: Optional[str] = None,
+                  normalize: bool = True) -> VmdMotion:
+    """在同一时间轴上合并多个动作（例如分别包含不同骨骼的动作）
+
+    Args:
+        motions: 待合并的动作
+        model_name: 结果的模型名称，默认使用第一个动作的模型名称
+        normalize: 是否按 (名称, 帧号) 排序并去重；同一骨骼同一帧
+            出现在多个动作中时，列表中靠后的动作优先
+
+    Returns:
+        新的VmdMotion，关键帧为新建对象
+    """
+    motions = list(motions)
+    return _combine(motions, [0] * len(motions), model_name, normalize)
+
+
+def concat_motions(motions: Sequence[VmdMotion], offsets: Optional[Sequence[int]] = None,
+                   gap: int = 0, model_name: Optional[str] = None,
+                   normalize: bool = True) -> VmdMotion:
+    """按时间顺序拼接多个动作
+
+    Args:
+        motions: 按播放顺序排列的动作
+        offsets: 每个动作的帧偏移；省略时第一个动作从0开始，
+            之后每个动作从上一个动作最后一个关键帧再往后 gap 帧处开始
+            （gap=0 时相邻片段共用衔接帧，由后一个片段的关键帧生效）
+        gap: 自动计算偏移时片段之间的间隔帧数
+        model_name: 结果的模型名称，默认使用第一个动作的模型名称
+        normalize: 是否按 (名称, 帧号) 排序并去重，重复时后面的片段优先
+
+    Returns:
+        新的VmdMotion，关键帧为新建对象
+
+    Raises:
+        ValueError: 偏移数量与动作数量不一致，或偏移后帧号为负
+    """
+    motions = list(motions)
+    if offsets is None:
+        offsets = []
+        start = 0
+        for motion in motions:
+            offsets.append(start)
+            start += _last_frame(motion) + gap
+    elif len(offsets) != len(motions):
+        raise ValueError(f"偏移数量({len(offsets)})与动作数量({len(motions)})不一致")
+    return _combine(motions, list(offsets), model_name, normalize)
@@ -0,0 +1,168 @@
+"""
+PyPMXVMD 模型/动作兼容性检查
+
+VMD按名称引用骨骼和变形，名称以Shift-JIS编码并截断为固定字节数。
+这里把模型的骨骼/变形名称按同样的规则编码成原始字节，建立哈希索引并缓存在模型上，
+再与VMD名称表做集合比较。模型和动作都可以只扫描名称表，不解析顶点或关键帧。
+"""
+
+from pathlib import Path
+from typing import Dict, List, Union
+
+from pypmxvmd.common.models.pmx import PmxModel, PmxNameTable
+from pypmxvmd.common.models.vmd import (
+    VmdMotion, VmdNameTable, VMD_NAME_LENGTH, VMD_IK_NAME_LENGTH, encode_vmd_name
+)
+from pypmxvmd.common.parsers.pmx_parser import PmxParser
+from pypmxvmd.common.parsers.vmd_parser import VmdParser
+
+VMD_ENCODING = "shift_jis"
+
+
+class ModelNameIndex:
+    """模型骨骼/变形名称的原始字节索引
+
+    Attributes:
+        bone_names: 模型骨骼名称（按骨骼顺序）
+        morph_names: 模型变形名称（按变形顺序）
+        bone_keys: 截断为15字节的骨骼名称原始字节 -> 骨骼索引
+        ik_bone_keys: 截断为20字节的骨骼名称原始字节 -> 骨骼索引
+        morph_keys: 截断为15字节的变形名称原始字节 -> 变形索引
+    """
+
+    def __init__(self, model: Union[PmxModel, PmxNameTable]):
+        if isinstance(model, PmxNameTable):
+            self.bone_names: List[str] = list(model.bone_names)
+            self.morph_names: List[str] = list(model.morph_names)
+        else:
+            self.bone_names = [bone.name_jp for bone in model.bones]
+            self.morph_names = [morph.name_jp for morph in model.morphs]
+        self.bone_keys = self._build(self.bone_names, VMD_NAME_LENGTH)
+        self.ik_bone_keys = self._build(self.bone_names, VMD_IK_NAME_LENGTH)
+        self.morph_keys = self._build(self.morph_names, VMD_NAME_LENGTH)
+        self._signature = self.signature(model)
+
+    @staticmethod
+    def _build(names: List[str], length: int) -> Dict[bytes, int]:
+        keys: Dict[bytes, int] = {}
+        for index, name in enumerate(names):
+            keys.setdefault(encode_vmd_name(name, VMD_ENCODING, length), index)
+        return keys
+
+    @staticmethod
+    def signature(model: Union[PmxModel, PmxNameTable]) -> tuple:
+        """用于判断缓存是否失效的模型签名（骨骼/变形列表的身份和长度）"""
+        if isinstance(model, PmxNameTable):
+            bones, morphs = model.bone_names, model.morph_names
+        else:
+            bones, morphs = model.bones, model.morphs
+        return id(bones), len(bones), id(morphs), len(morphs)
+
+    @classmethod
+    def of(cls, model: Union[PmxModel, PmxNameTable], refresh: bool = False) -> 'ModelNameIndex':
+        """获取模型的名称索引，首次调用时构建并缓存在模型上
+
+        替换或增删骨骼/变形列表后会自动重建；原地重命名骨骼或变形后需传入 refresh=True。
+        """
+        index = getattr(model, "_name_index", None)
+        if refresh or index is None or index._signature != cls.signature(model):
+            index = cls(model)
+            model._name_index = index
+        return index
+
+
+class CompatReport:
+    """兼容性检查结果
+
+    Attributes:
+        missing_bones: 动作中有关键帧但模型中不存在的骨骼名称
+        missing_morphs: 动作中有关键帧但模型中不存在的变形名称
+        missing_ik_bones: IK关键帧引用但模型中不存在的骨骼名称
+        unanimated_bones: 模型中没有任何关键帧的骨骼名称（按模型顺序）
+        matched_bones: 模型中存在的骨骼轨道数量
+        matched_morphs: 模型中存在的变形轨道数量
+    """
+
+    def __init__(self):
+        self.missing_bones: List[str] = []
+        self.missing_morphs: List[str] = []
+        self.missing_ik_bones: List[str] = []
+        self.unanimated_bones: List[str] = []
+        self.matched_bones = 0
+        self.matched_morphs = 0
+
+    @property
+    def is_compatible(self) -> bool:
+        """动作引用的所有骨骼和变形都存在于模型中"""
+        return not (self.missing_bones or self.missing_morphs or self.missing_ik_bones)
+
+    def __repr__(self) -> str:
+        return (f"CompatReport(missing_bones={len(self.missing_bones)}, "
+                f"missing_morphs={len(self.missing_morphs)}, "
+                f"missing_ik_bones={len(self.missing_ik_bones)}, "
+                f"unanimated_bones={len(self.unanimated_bones)})")
+
+
+def _decode(raw: bytes) -> str:
+    return raw.decode(VMD_ENCODING, errors='ignore')
+
+
+def _name_table(motion: Union[VmdMotion, VmdNameTable, str, Path]) -> VmdNameTable:
+    if isinstance(motion, VmdNameTable):
+        return motion
+    if isinstance(motion, VmdMotion):
+        return VmdNameTable.from_motion(motion, VMD_ENCODING)
+    if isinstance(motion, (str, Path)):
+        return VmdParser().scan_names(motion)
+    raise ValueError(f"不支持的动作类型: {type(motion).__name__}")
+
+
+def _model_names(model: Union[PmxModel, PmxNameTable, str, Path]) -> Union[PmxModel, PmxNameTable]:
+    if isinstance(model, (PmxModel, PmxNameTable)):
+        return model
+    if isinstance(model, (str, Path)):
+        return PmxParser().scan_names(model)
+    raise ValueError(f"不支持的模型类型: {type(model).__name__}")
+
+
+def check_compat(model: Union[PmxModel, PmxNameTable, str, Path],
+                 motion: Union[VmdMotion, VmdNameTable, str, Path],
+                 refresh_index: bool = False) -> CompatReport:
+    """检查动作中的骨骼/变形名称是否都存在于模型中
+
+    同一个模型对象（PmxModel或PmxNameTable）多次检查时复用缓存的名称索引；
+    需要对照多个模型检查同一个动作时，可先用 scan_vmd_names 扫描一次再传入名称表。
+
+    Args:
+        model: PmxModel、PmxNameTable 或PMX文件路径；
+            传入路径时只扫描骨骼/变形名称，不解析顶点和材质
+        motion: VmdMotion、VmdNameTable 或VMD文件路径；
+            传入路径时只扫描名称表，不解码关键帧
+        refresh_index: 是否强制重建模型的名称索引
+
+    Returns:
+        CompatReport
+
+    Raises:
+        ValueError: 模型或动作类型不受支持，或文件格式错误
+    """
+    index = ModelNameIndex.of(_model_names(model), refresh_index)
+    names = _name_table(motion)
+    report = CompatReport()
+
+    animated = set()
+    for raw in names.bone_names:
+        bone = index.bone_keys.get(raw)
+        if bone is None:
+            report.missing_bones.append(_decode(raw))
+        else:
+            animated.add(bone)
+    report.matched_bones = len(animated)
+    report.unanimated_bones = [name for i, name in enumerate(index.bone_names) if i not in animated]
+
+    morph_keys = index.morph_keys
+    report.missing_morphs = [_decode(raw) for raw in names.morph_names if raw not in morph_keys]
+    report.matched_morphs = len(names.morph_names) - len(report.missing_morphs)
+    ik_keys = index.ik_bone_keys
+    report.missing_ik_bones = [_decode(raw) for raw in names.ik_bone_names if raw not in ik_keys]
+    return report
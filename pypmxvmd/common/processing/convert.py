@@ -0,0 +1,271 @@
+"""
+PyPMXVMD VPD/VMD批量转换
+
+在列式数据上完成姿势与动作之间的转换：
+- 多个VPD姿势按顺序打包为一个VMD动作，每个姿势占用一个关键帧时刻
+- 在指定帧上对VMD动作采样（按贝塞尔插值曲线计算），得到一组姿势
+
+所有中间数据都保存在 array 连续数组中，按骨骼/变形轨道整体处理，
+只在最终生成 VmdMotion 或 VpdPose 时才创建逐帧对象。
+"""
+
+from array import array
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
+
+from pypmxvmd.common.math3d import bezier_progress, slerp
+from pypmxvmd.common.models.vmd import (
+    VmdBoneColumns, VmdHeader, VmdMorphColumns, VmdMotion
+)
+from pypmxvmd.common.models.vpd import VpdPose, VpdPoseTable
+
+
+def _as_pose_table(poses: Union[VpdPoseTable, Iterable[VpdPose]]) -> VpdPoseTable:
+    """把VpdPose序列转换为列式姿势表，已是姿势表时直接返回"""
+    if isinstance(poses, VpdPoseTable):
+        return poses
+    table = VpdPoseTable()
+    for pose in poses:
+        table.add_vpd_pose(pose)
+    return table
+
+
+def _check_frame_numbers(frame_numbers: Sequence[int], pose_count: int) -> array:
+    frames = array('I', frame_numbers)
+    if len(frames) != pose_count:
+        raise ValueError(f"帧号数量({len(frames)})与姿势数量({pose_count})不一致")
+    for i in range(1, len(frames)):
+        if frames[i] <= frames[i - 1]:
+            raise ValueError(f"帧号必须严格递增: {frames[i - 1]} -> {frames[i]}")
+    return frames
+
+
+def _column(values: array, index: int, width: int, row_size: int) -> array:
+    """从行优先的稠密矩阵中取出第index列（每个单元width个分量）"""
+    rows = len(values) // row_size if row_size else 0
+    column = array(values.typecode, bytes(values.itemsize * width * rows))
+    for component in range(width):
+        column[component::width] = values[index * width + component::row_size]
+    return column
+
+
+def _group_entries(indices: array, offsets: array, group_count: int) -> Tuple[array, array, array]:
+    """按名称索引对CSR条目做计数排序（组内保持姿势顺序）
+
+    Returns:
+        (组偏移, 排序后的条目索引, 排序后条目所属的姿势)
+    """
+    counts = array('q', bytes(8 * (group_count + 1)))
+    for index in indices:
+        counts[index + 1] += 1
+    for group in range(group_count):
+        counts[group + 1] += counts[group]
+    cursor = array('q', counts)
+    entries = array('q', bytes(8 * len(indices)))
+    owners = array('q', bytes(8 * len(indices)))
+    pose = 0
+    for entry, index in enumerate(indices):
+        while offsets[pose + 1] <= entry:
+            pose += 1
+        slot = cursor[index]
+        entries[slot] = entry
+        owners[slot] = pose
+        cursor[index] = slot + 1
+    return counts, entries, owners
+
+
+def poses_to_columns(table: VpdPoseTable, frame_numbers: Sequence[int],
+                     fill_missing: bool = True) -> Tuple[VmdBoneColumns, VmdMorphColumns]:
+    """把姿势表转置为按骨骼/变形分轨的关键帧列
+
+    Args:
+        table: 列式姿势表
+        frame_numbers: 每个姿势对应的帧号，必须严格递增
+        fill_missing: 姿势中缺少的骨骼补为初始姿态（零位移、单位旋转），
+            缺少的变形补为0，使每个姿势在播放时都能精确还原；
+            为False时只输出姿势中实际存在的条目
+
+    Returns:
+        (骨骼关键帧列, 变形关键帧列)
+
+    Raises:
+        ValueError: 帧号数量与姿势数量不一致或帧号未严格递增
+    """
+    pose_count = len(table)
+    frames = _check_frame_numbers(frame_numbers, pose_count)
+    bones = VmdBoneColumns()
+    morphs = VmdMorphColumns()
+
+    if fill_missing:
+        bone_count = len(table.bone_names)
+        positions, rotations, _ = table.to_dense()
+        for index, name in enumerate(table.bone_names):
+            bones.append_track(name, frames,
+                               _column(positions, index, 3, bone_count * 3),
+                               _column(rotations, index, 4, bone_count * 4))
+
+        morph_count = len(table.morph_names)
+        weights = array('f', bytes(4 * morph_count * pose_count))
+        for pose in range(pose_count):
+            row = pose * morph_count
+            for entry in range(table.morph_offsets[pose], table.morph_offsets[pose + 1]):
+                weights[row + table.morph_indices[entry]] = table.morph_weights[entry]
+        for index, name in enumerate(table.morph_names):
+            morphs.append_track(name, frames, weights[index::morph_count])
+        return bones, morphs
+
+    offsets, entries, owners = _group_entries(table.bone_indices, table.bone_offsets,
+                                              len(table.bone_names))
+    for index, name in enumerate(table.bone_names):
+        track_frames, positions, rotations = array('I'), array('f'), array('f')
+        for slot in range(offsets[index], offsets[index + 1]):
+            entry = entries[slot]
+            track_frames.append(frames[owners[slot]])
+            positions.extend(table.positions[entry * 3:entry * 3 + 3])
+            rotations.extend(table.rotations[entry * 4:entry * 4 + 4])
+        bones.append_track(name, track_frames, positions, rotations)
+
+    offsets, entries, owners = _group_entries(table.morph_indices, table.morph_offsets,
+                                              len(table.morph_names))
+    for index, name in enumerate(table.morph_names):
+        span = range(offsets[index], offsets[index + 1])
+        morphs.append_track(name, (frames[owners[slot]] for slot in span),
+                            (table.morph_weights[entries[slot]] for slot in span))
+    return bones, morphs
+
+
+def poses_to_motion(poses: Union[VpdPoseTable, Iterable[VpdPose]],
+                    frame_numbers: Optional[Sequence[int]] = None,
+                    start_frame: int = 0, frame_step: int = 1,
+                    model_name: Optional[str] = None,
+                    fill_missing: bool = True) -> VmdMotion:
+    """把多个姿势打包为一个VMD动作，每个姿势占用一个关键帧时刻
+
+    Args:
+        poses: 姿势表或VpdPose序列（旋转为四元数 [x, y, z, w]）
+        frame_numbers: 每个姿势的帧号，省略时从start_frame开始每隔frame_step帧放置一个
+        start_frame: 第一个姿势的帧号
+        frame_step: 相邻姿势的帧间隔
+        model_name: 动作的模型名称，默认使用第一个姿势的模型名称
+        fill_missing: 是否为缺少的骨骼/变形补齐初始值，见 poses_to_columns
+
+    Returns:
+        VmdMotion对象，关键帧使用线性插值
+
+    Raises:
+        ValueError: 帧号无效
+    """
+    table = _as_pose_table(poses)
+    if frame_numbers is None:
+        if frame_step < 1:
+            raise ValueError(f"帧间隔必须大于0: {frame_step}")
+        frame_numbers = range(start_frame, start_frame + frame_step * len(table), frame_step)
+    bones, morphs = poses_to_columns(table, frame_numbers, fill_missing)
+
+    if model_name is None:
+        model_name = table.model_names[0] if table.model_names else ""
+    motion = VmdMotion()
+    motion.header = VmdHeader(version=2, model_name=model_name)
+    motion.bone_frames = bones.to_frames()
+    motion.morph_frames = morphs.to_frames()
+    return motion
+
+
+def _sample_bone_columns(columns: VmdBoneColumns, frames: Sequence[float]) -> Tuple[array, array]:
+    """在指定帧上对所有骨骼轨道采样
+
+    Returns:
+        (位置array('f')，每行 轨道数*3 个值；旋转array('f')，每行 轨道数*4 个值)
+    """
+    track_count = columns.track_count
+    order = sorted(range(len(frames)), key=frames.__getitem__)
+    positions = array('f', bytes(4 * 3 * track_count * len(frames)))
+    rotations = array('f', bytes(4 * 4 * track_count * len(frames)))
+    key_frames, key_positions = columns.frame_numbers, columns.positions
+    key_rotations, interpolation = columns.rotations, columns.interpolation
+
+    for track in range(track_count):
+        start, end = columns.track_range(track)
+        k = start
+        for query in order:
+            frame = frames[query]
+            while k + 1 < end and key_frames[k + 1] <= frame:
+                k += 1
+            cell = query * track_count + track
+            if k + 1 == end or frame <= key_frames[k]:
+                # 第一个关键帧之前、恰好落在关键帧上或最后一个关键帧之后
+                positions[cell * 3:cell * 3 + 3] = key_positions[k * 3:k * 3 + 3]
+                rotations[cell * 4:cell * 4 + 4] = key_rotations[k * 4:k * 4 + 4]
+                continue
+
+            # 区间 [k, k + 1] 使用后一个关键帧的插值曲线
+            n = k + 1
+            t = (frame - key_frames[k]) / (key_frames[n] - key_frames[k])
+            curves = interpolation[n * 16:n * 16 + 16]
+            for axis in range(3):
+                p0 = key_positions[k * 3 + axis]
+                p1 = key_positions[n * 3 + axis]
+                progress = bezier_progress(curves[axis * 4:axis * 4 + 4], t)
+                positions[cell * 3 + axis] = p0 + (p1 - p0) * progress
+            rotations[cell * 4:cell * 4 + 4] = array('f', slerp(
+                key_rotations[k * 4:k * 4 + 4], key_rotations[n * 4:n * 4 + 4],
+                bezier_progress(curves[12:16], t)))
+    return positions, rotations
+
+
+def _sample_morph_columns(columns: VmdMorphColumns, frames: Sequence[float]) -> array:
+    """在指定帧上对所有变形轨道线性采样，返回每行 轨道数 个权重"""
+    track_count = columns.track_count
+    order = sorted(range(len(frames)), key=frames.__getitem__)
+    weights = array('f', bytes(4 * track_count * len(frames)))
+    key_frames, key_weights = columns.frame_numbers, columns.weights
+
+    for track in range(track_count):
+        start, end = columns.track_range(track)
+        k = start
+        for query in order:
+            frame = frames[query]
+            while k + 1 < end and key_frames[k + 1] <= frame:
+                k += 1
+            cell = query * track_count + track
+            if k + 1 == end or frame <= key_frames[k]:
+                weights[cell] = key_weights[k]
+            else:
+                t = (frame - key_frames[k]) / (key_frames[k + 1] - key_frames[k])
+                weights[cell] = key_weights[k] + (key_weights[k + 1] - key_weights[k]) * t
+    return weights
+
+
+def motion_to_pose_table(motion: VmdMotion, frames: Sequence[float],
+                         model_name: Optional[str] = None) -> VpdPoseTable:
+    """在指定帧上对VMD动作采样，得到列式姿势表
+
+    骨骼位置按各轴的贝塞尔曲线插值，旋转按旋转曲线做球面线性插值，
+    变形权重线性插值。第一个关键帧之前和最后一个关键帧之后保持端点值。
+
+    Args:
+        motion: VMD动作
+        frames: 采样帧号，可以是小数，顺序任意
+        model_name: 姿势的模型名称，默认使用动作头中的模型名称
+
+    Returns:
+        VpdPoseTable对象，每个采样帧一个姿势，包含动作中的全部骨骼和变形
+    """
+    frames = list(frames)
+    bones = VmdBoneColumns.from_frames(motion.bone_frames)
+    morphs = VmdMorphColumns.from_frames(motion.morph_frames)
+    positions, rotations = _sample_bone_columns(bones, frames)
+    weights = _sample_morph_columns(morphs, frames)
+    if model_name is None:
+        model_name = motion.header.model_name
+    return VpdPoseTable.from_dense(len(frames), bones.bone_names, positions, rotations,
+                                   morphs.morph_names, weights, model_name)
+
+
+def motion_to_poses(motion: VmdMotion, frames: Sequence[float],
+                    model_name: Optional[str] = None) -> List[VpdPose]:
+    """在指定帧上对VMD动作采样，得到VpdPose列表
+
+    参数含义同 motion_to_pose_table。
+    """
+    table = motion_to_pose_table(motion, frames, model_name)
+    return [table.get_pose(i) for i in range(len(table))]
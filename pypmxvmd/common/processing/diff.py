@@ -0,0 +1,293 @@
+"""
+PyPMXVMD 结构化差异比较
+
+比较两个VMD动作或两个PMX模型，按数据段报告新增、删除和变化的元素。
+
+- VMD关键帧以 (名称, 帧号) 或帧号为键，通过哈希集合运算找出新增/删除的键，
+  同一动作内键重复时以最后一个为准
+- PMX元素以下标为键，逐个比较
+- 字段先整体做精确比较（list的==在C层完成），只有不相等时才逐分量按容差比较；
+  骨骼标志、IK链接、变形项目等嵌套对象按其 to_list() 逐分量比较
+"""
+
+from operator import attrgetter
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple, Union
+
+from pypmxvmd.common.models.base import BaseModel
+from pypmxvmd.common.models.vmd import VmdMotion
+from pypmxvmd.common.models.pmx import PmxModel, MaterialFlags, BoneFlags
+
+DEFAULT_TOLERANCE = 1e-5
+
+_BONE_FIELDS = ("position", "rotation", "interpolation", "physics_disabled")
+_MORPH_FIELDS = ("weight",)
+_CAMERA_FIELDS = ("distance", "position", "rotation", "interpolation", "fov", "perspective")
+_LIGHT_FIELDS = ("color", "position")
+_SHADOW_FIELDS = ("shadow_mode", "distance")
+_VERTEX_FIELDS = ("position", "normal", "uv", "additional_uvs", "weight_mode", "weight", "edge_scale")
+_MATERIAL_FIELDS = ("name_jp", "name_en", "diffuse_color", "specular_color", "specular_strength",
+                    "ambient_color", "flags", "edge_color", "edge_size", "texture_path",
+                    "sphere_path", "sphere_mode", "toon_path", "comment", "face_count")
+_PMX_BONE_FIELDS = ("name_jp", "name_en", "position", "parent_index", "deform_layer", "bone_flags",
+                    "tail", "inherit_parent_index", "inherit_ratio", "fixed_axis", "local_axis_x",
+                    "local_axis_z", "external_parent_index", "ik_target_index", "ik_loop_count",
+                    "ik_angle_limit", "ik_links")
+_PMX_MORPH_FIELDS = ("name_jp", "name_en", "panel", "morph_type", "items")
+_FRAME_FIELDS = ("name_jp", "name_en", "is_special", "items")
+_RIGIDBODY_FIELDS = ("name_jp", "name_en", "bone_index", "group", "nocollide_groups", "shape",
+                     "size", "position", "rotation", "physics_mode", "mass", "move_damping",
+                     "rotation_damping", "repulsion", "friction")
+_JOINT_FIELDS = ("name_jp", "name_en", "joint_type", "rigidbody1_index", "rigidbody2_index",
+                 "position", "rotation", "position_min", "position_max", "rotation_min",
+                 "rotation_max", "position_spring", "rotation_spring")
+
+
+class SectionDiff:
+    """单个数据段的差异
+
+    Attributes:
+        added: 只在b中存在的键
+        removed: 只在a中存在的键
+        changed: 两侧都存在但内容不同的键
+        fields: 变化的键 -> 发生变化的字段名列表
+    """
+
+    def __init__(self):
+        self.added: List[Hashable] = []
+        self.removed: List[Hashable] = []
+        self.changed: List[Hashable] = []
+        self.fields: Dict[Hashable, List[str]] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+    def __repr__(self) -> str:
+        return (f"SectionDiff(added={len(self.added)}, removed={len(self.removed)}, "
+                f"changed={len(self.changed)})")
+
+    def by_track(self) -> Dict[str, 'SectionDiff']:
+        """按轨道名称拆分差异（仅适用于 (名称, 帧号) 键）"""
+        tracks: Dict[str, SectionDiff] = {}
+        for attr in ("added", "removed", "changed"):
+            for key in getattr(self, attr):
+                track = tracks.get(key[0])
+                if track is None:
+                    track = tracks[key[0]] = SectionDiff()
+                getattr(track, attr).append(key)
+                if attr == "changed":
+                    track.fields[key] = self.fields[key]
+        return tracks
+
+
+class MotionDiff:
+    """两个VMD动作的差异"""
+
+    SECTIONS = ("bone_frames", "morph_frames", "camera_frames",
+                "light_frames", "shadow_frames", "ik_frames")
+
+    def __init__(self):
+        self.header_changed = False
+        self.bone_frames = SectionDiff()
+        self.morph_frames = SectionDiff()
+        self.camera_frames = SectionDiff()
+        self.light_frames = SectionDiff()
+        self.shadow_frames = SectionDiff()
+        self.ik_frames = SectionDiff()
+
+    def __bool__(self) -> bool:
+        return self.header_changed or any(getattr(self, name) for name in self.SECTIONS)
+
+    def summary(self) -> Dict[str, Tuple[int, int, int]]:
+        """各数据段的 (新增, 删除, 变化) 数量"""
+        return {name: (len(section.added), len(section.removed), len(section.changed))
+                for name in self.SECTIONS for section in (getattr(self, name),)}
+
+
+class ModelDiff:
+    """两个PMX模型的差异（键为元素下标）"""
+
+    SECTIONS = ("vertices", "faces", "textures", "materials", "bones", "morphs",
+                "frames", "rigidbodies", "joints", "softbodies")
+
+    def __init__(self):
+        self.header_changed = False
+        self.vertices = SectionDiff()
+        self.faces = SectionDiff()
+        self.textures = SectionDiff()
+        self.materials = SectionDiff()
+        self.bones = SectionDiff()
+        self.morphs = SectionDiff()
+        self.frames = SectionDiff()
+        self.rigidbodies = SectionDiff()
+        self.joints = SectionDiff()
+        self.softbodies = SectionDiff()
+
+    def __bool__(self) -> bool:
+        return self.header_changed or any(getattr(self, name) for name in self.SECTIONS)
+
+    def summary(self) -> Dict[str, Tuple[int, int, int]]:
+        """各数据段的 (新增, 删除, 变化) 数量"""
+        return {name: (len(section.added), len(section.removed), len(section.changed))
+                for name in self.SECTIONS for section in (getattr(self, name),)}
+
+
+def values_close(a: Any, b: Any, tolerance: float) -> bool:
+    """按容差比较两个值，支持数值、嵌套列表/元组、标志位和嵌套的数据模型对象"""
+    if a == b:
+        return True
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return len(a) == len(b) and all(values_close(x, y, tolerance) for x, y in zip(a, b))
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)) \
+            and not isinstance(a, bool) and not isinstance(b, bool):
+        return abs(a - b) <= tolerance
+    if isinstance(a, (MaterialFlags, BoneFlags)) and type(a) is type(b):
+        return a.to_list() == b.to_list()
+    if isinstance(a, BaseModel) and type(a) is type(b):
+        return values_close(a.to_list(), b.to_list(), tolerance)
+    return False
+
+
+def _changed_fields(a: Any, b: Any, fields: Sequence[str], tolerance: float) -> List[str]:
+    changed = []
+    for field in fields:
+        va, vb = getattr(a, field), getattr(b, field)
+        if va is not vb and not values_close(va, vb, tolerance):
+            changed.append(field)
+    return changed
+
+
+def _keyed(items: list, key_attrs: Sequence[str]) -> dict:
+    """键 -> 元素 的字典，键重复时以最后一个为准"""
+    if len(key_attrs) == 1:
+        return dict(zip(map(attrgetter(key_attrs[0]), items), items))
+    return dict(zip(map(attrgetter(*key_attrs), items), items))
+
+
+def _diff_keyed(items_a: list, items_b: list, key_attrs: Sequence[str],
+                fields: Sequence[str], tolerance: float,
+                compare: Optional[Callable[[Any, Any], List[str]]] = None) -> SectionDiff:
+    """以键比较两组元素"""
+    result = SectionDiff()
+    map_a, map_b = _keyed(items_a, key_attrs), _keyed(items_b, key_attrs)
+    keys_a, keys_b = map_a.keys(), map_b.keys()
+    result.added = sorted(keys_b - keys_a)
+    result.removed = sorted(keys_a - keys_b)
+    # 所有字段打包成元组一次比较，绝大多数未变化的元素不会进入逐字段比较
+    values = attrgetter(*fields) if fields else None
+    changed_keys = []
+    for k, item_a in map_a.items():
+        item_b = map_b.get(k)
+        if item_b is None or item_a is item_b:
+            continue
+        if values is not None and values(item_a) == values(item_b):
+            continue
+        changed_keys.append(k)
+    for k in sorted(changed_keys):
+        changed = (compare(map_a[k], map_b[k]) if compare is not None
+                   else _changed_fields(map_a[k], map_b[k], fields, tolerance))
+        if changed:
+            result.changed.append(k)
+            result.fields[k] = changed
+    return result
+
+
+def _diff_indexed(items_a: list, items_b: list, fields: Optional[Sequence[str]],
+                  tolerance: float) -> SectionDiff:
+    """按下标比较两组元素，fields为None时直接比较元素本身"""
+    result = SectionDiff()
+    common = min(len(items_a), len(items_b))
+    result.added = list(range(common, len(items_b)))
+    result.removed = list(range(common, len(items_a)))
+    values = attrgetter(*fields) if fields else None
+    for i, a, b in zip(range(common), items_a, items_b):
+        if a is b or (values(a) == values(b) if values is not None else a == b):
+            continue
+        if fields is None:
+            if not values_close(a, b, tolerance):
+                result.changed.append(i)
+                result.fields[i] = ["value"]
+            continue
+        changed = _changed_fields(a, b, fields, tolerance)
+        if changed:
+            result.changed.append(i)
+            result.fields[i] = changed
+    return result
+
+
+def _ik_fields(a, b) -> List[str]:
+    changed = []
+    if a.display != b.display:
+        changed.append("display")
+    if [(bone.bone_name, bone.ik_enabled) for bone in a.ik_bones] != \
+            [(bone.bone_name, bone.ik_enabled) for bone in b.ik_bones]:
+        changed.append("ik_bones")
+    return changed
+
+
+def diff_motions(a: VmdMotion, b: VmdMotion, tolerance: float = DEFAULT_TOLERANCE) -> MotionDiff:
+    """比较两个VMD动作
+
+    Args:
+        a: 原动作
+        b: 新动作
+        tolerance: 浮点字段的绝对容差
+
+    Returns:
+        MotionDiff，骨骼/变形关键帧的键为 (名称, 帧号)，其余关键帧的键为帧号
+    """
+    result = MotionDiff()
+    result.header_changed = (a.header.version != b.header.version
+                             or a.header.model_name != b.header.model_name)
+    result.bone_frames = _diff_keyed(a.bone_frames, b.bone_frames,
+                                     ("bone_name", "frame_number"), _BONE_FIELDS, tolerance)
+    result.morph_frames = _diff_keyed(a.morph_frames, b.morph_frames,
+                                      ("morph_name", "frame_number"), _MORPH_FIELDS, tolerance)
+    frame_key = ("frame_number",)
+    result.camera_frames = _diff_keyed(a.camera_frames, b.camera_frames, frame_key,
+                                       _CAMERA_FIELDS, tolerance)
+    result.light_frames = _diff_keyed(a.light_frames, b.light_frames, frame_key,
+                                      _LIGHT_FIELDS, tolerance)
+    result.shadow_frames = _diff_keyed(a.shadow_frames, b.shadow_frames, frame_key,
+                                       _SHADOW_FIELDS, tolerance)
+    result.ik_frames = _diff_keyed(a.ik_frames, b.ik_frames, frame_key, (), tolerance, _ik_fields)
+    return result
+
+
+def diff_models(a: PmxModel, b: PmxModel, tolerance: float = DEFAULT_TOLERANCE) -> ModelDiff:
+    """比较两个PMX模型
+
+    Args:
+        a: 原模型
+        b: 新模型
+        tolerance: 浮点字段的绝对容差
+
+    Returns:
+        ModelDiff，各数据段的键为元素下标
+    """
+    result = ModelDiff()
+    result.header_changed = a.header.to_list() != b.header.to_list()
+    result.vertices = _diff_indexed(a.vertices, b.vertices, _VERTEX_FIELDS, tolerance)
+    result.faces = _diff_indexed(a.faces, b.faces, None, 0)
+    result.textures = _diff_indexed(a.textures, b.textures, None, 0)
+    result.materials = _diff_indexed(a.materials, b.materials, _MATERIAL_FIELDS, tolerance)
+    result.bones = _diff_indexed(a.bones, b.bones, _PMX_BONE_FIELDS, tolerance)
+    result.morphs = _diff_indexed(a.morphs, b.morphs, _PMX_MORPH_FIELDS, tolerance)
+    result.frames = _diff_indexed(a.frames, b.frames, _FRAME_FIELDS, tolerance)
+    result.rigidbodies = _diff_indexed(a.rigidbodies, b.rigidbodies, _RIGIDBODY_FIELDS, tolerance)
+    result.joints = _diff_indexed(a.joints, b.joints, _JOINT_FIELDS, tolerance)
+    result.softbodies = _diff_indexed(a.softbodies, b.softbodies, None, tolerance)
+    return result
+
+
+def diff(a: Union[VmdMotion, PmxModel], b: Union[VmdMotion, PmxModel],
+         tolerance: float = DEFAULT_TOLERANCE) -> Union[MotionDiff, ModelDiff]:
+    """比较两个VMD动作或两个PMX模型
+
+    Raises:
+        ValueError: 两个对象类型不同或不受支持
+    """
+    if isinstance(a, VmdMotion) and isinstance(b, VmdMotion):
+        return diff_motions(a, b, tolerance)
+    if isinstance(a, PmxModel) and isinstance(b, PmxModel):
+        return diff_models(a, b, tolerance)
+    raise ValueError(f"不支持比较的类型: {type(a).__name__} 与 {type(b).__name__}")
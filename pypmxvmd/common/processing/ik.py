@@ -0,0 +1,417 @@
+"""
+PyPMXVMD IK烘焙
+
+按MMD的CCD（循环坐标下降）算法在每一帧求解模型的IK链，把IK链接骨骼的最终旋转
+写成普通的骨骼关键帧，得到不依赖IK的动作（供MMD以外的引擎使用）。
+
+所有采样帧的骨骼位置/旋转先一次批量插值到扁平数组中，之后逐帧求解；
+帧之间互不依赖，可以分块交给多个进程。同一帧内的IK链按骨骼变形顺序依次求解，
+后面的IK链（如脚尖IK）看到的是前面IK链（如腿IK）求解后的姿势。
+
+- IK的开关取每帧之前最近的IK关键帧，没有IK关键帧时全部启用
+- 每次迭代中单个链接的旋转角度不超过IK骨骼的单位角（ik_angle_limit）
+- 只限制一个轴的链接（如膝盖）直接在该轴的平面内求解角度，再限制到上下限之间；
+  其余有角度限制的链接按欧拉角逐轴限制
+- 计算骨骼全局变换时考虑旋转/移动付与
+"""
+
+import copy
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from pypmxvmd.common.math3d import (
+    euler_to_quaternion, quaternion_to_euler, quaternion_multiply, slerp
+)
+from pypmxvmd.common.models.pmx import PmxModel, PmxBoneTopology
+from pypmxvmd.common.models.vmd import (
+    VmdMotion, VmdBoneFrame, VmdBoneColumns, VmdIkFrame, VmdIkBone,
+    VMD_NAME_LENGTH, VMD_IK_NAME_LENGTH, encode_vmd_name
+)
+from pypmxvmd.common.processing.compat import ModelNameIndex, VMD_ENCODING
+from pypmxvmd.common.processing.convert import _sample_bone_columns
+
+_Quaternion = Tuple[float, float, float, float]
+_Vector = Tuple[float, float, float]
+
+_IDENTITY = (1.0, 0.0, 0.0, 0.0)
+_AXES = ((1.0, 0.0, 0.0), (0.0, 1.0, 0.0), (0.0, 0.0, 1.0))
+# 目标骨骼与IK骨骼的距离平方小于此值时视为已收敛
+_CONVERGED = 1e-10
+
+
+def _conjugate(q: _Quaternion) -> _Quaternion:
+    return q[0], -q[1], -q[2], -q[3]
+
+
+def _rotate(q: _Quaternion, v: Sequence[float]) -> _Vector:
+    """用单位四元数 (w, x, y, z) 旋转向量"""
+    w, x, y, z = q
+    vx, vy, vz = v
+    tx = 2.0 * (y * vz - z * vy)
+    ty = 2.0 * (z * vx - x * vz)
+    tz = 2.0 * (x * vy - y * vx)
+    return (vx + w * tx + y * tz - z * ty,
+            vy + w * ty + z * tx - x * tz,
+            vz + w * tz + x * ty - y * tx)
+
+
+def _axis_angle(axis: Sequence[float], angle: float) -> _Quaternion:
+    s = math.sin(angle * 0.5)
+    return math.cos(angle * 0.5), axis[0] * s, axis[1] * s, axis[2] * s
+
+
+def _bone_key(name: str) -> bytes:
+    return encode_vmd_name(name, VMD_ENCODING, VMD_NAME_LENGTH)
+
+
+def _ik_key(name: str) -> bytes:
+    return encode_vmd_name(name, VMD_ENCODING, VMD_IK_NAME_LENGTH)
+
+
+def _clamp(value: float, low: float, high: float) -> float:
+    return low if value < low else high if value > high else value
+
+
+class _IkLink:
+    """IK链接：骨骼、单轴限制的轴号（无则为-1）和角度上下限（弧度）"""
+
+    __slots__ = ("bone", "axis", "limit_min", "limit_max", "path")
+
+    def __init__(self, bone: int, limit_min: Optional[Sequence[float]],
+                 limit_max: Optional[Sequence[float]]):
+        self.bone = bone
+        self.axis = -1
+        self.limit_min: Optional[List[float]] = None
+        self.limit_max: Optional[List[float]] = None
+        self.path: List[int] = []
+        if limit_min is not None and limit_max is not None:
+            self.limit_min = [math.radians(value) for value in limit_min]
+            self.limit_max = [math.radians(value) for value in limit_max]
+            free = [axis for axis in range(3) if self.limit_min[axis] or self.limit_max[axis]]
+            if len(free) == 1:
+                self.axis = free[0]
+
+
+class _IkChain:
+    """一个IK骨骼的求解数据"""
+
+    __slots__ = ("name", "bone", "target", "loop_count", "unit_angle", "links")
+
+    def __init__(self, name: str, bone: int, target: int, loop_count: int, unit_angle: float,
+                 links: List[_IkLink]):
+        self.name = name
+        self.bone = bone
+        self.target = target
+        self.loop_count = loop_count
+        self.unit_angle = unit_angle
+        self.links = links
+
+
+class _IkRig:
+    """求解IK所需的骨骼子集（IK骨骼、目标、链接及它们的祖先和付与亲）
+
+    只保存普通的列表和数值，可以直接传给工作进程。
+    """
+
+    def __init__(self, model: PmxModel, topology: PmxBoneTopology, chains: List[_IkChain]):
+        bones = model.bones
+        needed = set()
+        pending = [bone for chain in chains for bone in
+                   [chain.bone, chain.target] + [link.bone for link in chain.links]]
+        while pending:
+            bone = pending.pop()
+            if bone in needed:
+                continue
+            needed.add(bone)
+            parent = topology.parents[bone]
+            if parent >= 0:
+                pending.append(parent)
+            flags = bones[bone].bone_flags
+            inherit = bones[bone].inherit_parent_index
+            if (flags.inherit_rot or flags.inherit_trans) and inherit is not None \
+                    and 0 <= inherit < len(bones):
+                pending.append(inherit)
+        # 按深度优先先序排列，父骨骼总在子骨骼之前
+        self.bones = sorted(needed, key=topology.enter.__getitem__)
+        self.parents = {bone: topology.parents[bone] for bone in needed}
+        self.offsets: Dict[int, _Vector] = {}
+        self.inherits: Dict[int, Tuple[int, float, bool, bool]] = {}
+        for bone in needed:
+            position = bones[bone].position
+            parent = topology.parents[bone]
+            origin = bones[parent].position if parent >= 0 else (0.0, 0.0, 0.0)
+            self.offsets[bone] = (position[0] - origin[0], position[1] - origin[1],
+                                  position[2] - origin[2])
+            flags = bones[bone].bone_flags
+            inherit = bones[bone].inherit_parent_index
+            if (flags.inherit_rot or flags.inherit_trans) and inherit in needed and inherit != bone:
+                self.inherits[bone] = (inherit, bones[bone].inherit_ratio or 0.0,
+                                       flags.inherit_rot, flags.inherit_trans)
+        for chain in chains:
+            for link in chain.links:
+                # 链接骨骼到目标骨骼的路径（不含链接骨骼自身之外的祖先）
+                path = [chain.target]
+                while path[-1] != link.bone and path[-1] >= 0:
+                    path.append(topology.parents[path[-1]])
+                link.path = list(reversed(path)) if path[-1] == link.bone else []
+        self.chains = chains
+
+    def _update(self, bone: int, state: tuple) -> None:
+        """由局部旋转/移动和父骨骼的全局变换计算一个骨骼的全局变换"""
+        rotations, translations, effective_rotations, effective_translations, global_rotations, \
+            global_positions = state
+        rotation = rotations[bone]
+        tx, ty, tz = translations[bone]
+        inherit = self.inherits.get(bone)
+        if inherit is not None:
+            source, ratio, inherit_rot, inherit_trans = inherit
+            if inherit_rot:
+                inherited = slerp(_IDENTITY, effective_rotations[source], ratio)
+                rotation = quaternion_multiply(inherited, rotation)
+            if inherit_trans:
+                sx, sy, sz = effective_translations[source]
+                tx, ty, tz = tx + sx * ratio, ty + sy * ratio, tz + sz * ratio
+        effective_rotations[bone] = rotation
+        effective_translations[bone] = (tx, ty, tz)
+        ox, oy, oz = self.offsets[bone]
+        parent = self.parents[bone]
+        if parent >= 0:
+            parent_rotation = global_rotations[parent]
+            dx, dy, dz = _rotate(parent_rotation, (ox + tx, oy + ty, oz + tz))
+            px, py, pz = global_positions[parent]
+            global_positions[bone] = (px + dx, py + dy, pz + dz)
+            global_rotations[bone] = quaternion_multiply(parent_rotation, rotation)
+        else:
+            global_positions[bone] = (ox + tx, oy + ty, oz + tz)
+            global_rotations[bone] = rotation
+
+    def _base_rotation(self, bone: int, state: tuple) -> _Quaternion:
+        """骨骼自身局部旋转之前的全局旋转（父骨骼旋转和付与旋转）"""
+        global_rotations, rotations = state[4], state[0]
+        return quaternion_multiply(global_rotations[bone], _conjugate(rotations[bone]))
+
+    def _solve_chain(self, chain: _IkChain, state: tuple) -> None:
+        rotations, global_rotations, global_positions = state[0], state[4], state[5]
+        gx, gy, gz = global_positions[chain.bone]
+        for _ in range(chain.loop_count):
+            tx, ty, tz = global_positions[chain.target]
+            if (tx - gx) ** 2 + (ty - gy) ** 2 + (tz - gz) ** 2 < _CONVERGED:
+                break
+            for link in chain.links:
+                if not link.path:
+                    continue
+                bone = link.bone
+                lx, ly, lz = global_positions[bone]
+                tx, ty, tz = global_positions[chain.target]
+                if link.axis >= 0:
+                    # 单轴限制：在垂直于该轴的平面内求解转角
+                    inverse = _conjugate(self._base_rotation(bone, state))
+                    target = _rotate(inverse, (tx - lx, ty - ly, tz - lz))
+                    goal = _rotate(inverse, (gx - lx, gy - ly, gz - lz))
+                    axis = link.axis
+                    current = math.radians(quaternion_to_euler(*rotations[bone])[axis])
+                    u, v = (axis + 1) % 3, (axis + 2) % 3
+                    delta = (math.atan2(goal[v], goal[u]) - math.atan2(target[v], target[u]))
+                    delta = (delta + math.pi) % (2.0 * math.pi) - math.pi
+                    delta = _clamp(delta, -chain.unit_angle, chain.unit_angle)
+                    angle = _clamp(current + delta, link.limit_min[axis], link.limit_max[axis])
+                    rotations[bone] = _axis_angle(_AXES[axis], angle)
+                else:
+                    inverse = _conjugate(global_rotations[bone])
+                    target = _rotate(inverse, (tx - lx, ty - ly, tz - lz))
+                    goal = _rotate(inverse, (gx - lx, gy - ly, gz - lz))
+                    target_length = math.sqrt(target[0] ** 2 + target[1] ** 2 + target[2] ** 2)
+                    goal_length = math.sqrt(goal[0] ** 2 + goal[1] ** 2 + goal[2] ** 2)
+                    if target_length < 1e-12 or goal_length < 1e-12:
+                        continue
+                    dot = (target[0] * goal[0] + target[1] * goal[1] + target[2] * goal[2]) \
+                        / (target_length * goal_length)
+                    angle = math.acos(_clamp(dot, -1.0, 1.0))
+                    if angle < 1e-5:
+                        continue
+                    cx = target[1] * goal[2] - target[2] * goal[1]
+                    cy = target[2] * goal[0] - target[0] * goal[2]
+                    cz = target[0] * goal[1] - target[1] * goal[0]
+                    length = math.sqrt(cx * cx + cy * cy + cz * cz)
+                    if length < 1e-12:
+                        continue
+                    angle = min(angle, chain.unit_angle)
+                    step = _axis_angle((cx / length, cy / length, cz / length), angle)
+                    rotation = quaternion_multiply(rotations[bone], step)
+                    if link.limit_min is not None:
+                        euler = quaternion_to_euler(*rotation)
+                        rotation = euler_to_quaternion([
+                            math.degrees(_clamp(math.radians(euler[axis]), link.limit_min[axis],
+                                                link.limit_max[axis]))
+                            for axis in range(3)])
+                    rotations[bone] = rotation
+                for path_bone in link.path:
+                    self._update(path_bone, state)
+
+    def solve(self, bone_tracks: Dict[int, int], track_count: int, positions: Sequence[float],
+              rotations: Sequence[float], enabled: Sequence[Sequence[bool]]) -> List[List[_Quaternion]]:
+        """逐帧求解
+
+        Args:
+            bone_tracks: 骨骼索引 -> 采样数组中的轨道号
+            track_count: 采样数组中每帧的轨道数
+            positions: 每帧 track_count*3 个位置
+            rotations: 每帧 track_count*4 个四元数 [x, y, z, w]
+            enabled: 每帧各IK链是否启用
+
+        Returns:
+            每帧各骨骼（按 self.bones 顺序）的局部旋转 (w, x, y, z)
+        """
+        results = []
+        for frame, flags in enumerate(enabled):
+            local_rotations: Dict[int, _Quaternion] = {}
+            translations: Dict[int, _Vector] = {}
+            for bone in self.bones:
+                track = bone_tracks.get(bone, -1)
+                if track < 0:
+                    local_rotations[bone] = _IDENTITY
+                    translations[bone] = (0.0, 0.0, 0.0)
+                    continue
+                cell = frame * track_count + track
+                x, y, z, w = rotations[cell * 4:cell * 4 + 4]
+                local_rotations[bone] = (w, x, y, z)
+                translations[bone] = tuple(positions[cell * 3:cell * 3 + 3])
+            state = (local_rotations, translations, {}, {}, {}, {})
+            for bone in self.bones:
+                self._update(bone, state)
+            for chain, chain_enabled in zip(self.chains, flags):
+                if chain_enabled:
+                    self._solve_chain(chain, state)
+                    for bone in self.bones:
+                        self._update(bone, state)
+            results.append([local_rotations[bone] for bone in self.bones])
+        return results
+
+
+def _solve_block(task: tuple) -> List[List[_Quaternion]]:
+    rig, bone_tracks, track_count, positions, rotations, enabled = task
+    return rig.solve(bone_tracks, track_count, positions, rotations, enabled)
+
+
+def _ik_states(motion: VmdMotion, chains: List[_IkChain], frames: Sequence[int],
+               ik_keys: Dict[bytes, int]) -> List[List[bool]]:
+    """每个采样帧各IK链的开关（取该帧之前最近的IK关键帧，默认启用）"""
+    chain_slots = {chain.bone: slot for slot, chain in enumerate(chains)}
+    changes = []
+    for ik_frame in sorted(motion.ik_frames, key=lambda item: item.frame_number):
+        for ik_bone in ik_frame.ik_bones:
+            bone = ik_keys.get(_ik_key(ik_bone.bone_name), -1)
+            if bone in chain_slots:
+                changes.append((ik_frame.frame_number, chain_slots[bone], bool(ik_bone.ik_enabled)))
+    state = [True] * len(chains)
+    result: List[Optional[List[bool]]] = [None] * len(frames)
+    position = 0
+    for index in sorted(range(len(frames)), key=frames.__getitem__):
+        while position < len(changes) and changes[position][0] <= frames[index]:
+            _frame, slot, value = changes[position]
+            state[slot] = value
+            position += 1
+        result[index] = list(state)
+    return result
+
+
+def bake_ik(motion: VmdMotion, model: PmxModel, frames: Optional[Sequence[int]] = None,
+            max_workers: Optional[int] = 1) -> VmdMotion:
+    """把IK的结果烘焙为普通骨骼关键帧
+
+    Args:
+        motion: VMD动作（不修改）
+        model: 动作对应的PMX模型，需要包含骨骼
+        frames: 要烘焙的帧号，默认为0到最后一个骨骼/IK关键帧的每一帧
+        max_workers: 并行进程数，None为CPU核心数；为1时在当前进程中求解
+
+    Returns:
+        新的动作。IK链接骨骼的关键帧替换为每个烘焙帧一个的关键帧（线性插值），
+        被烘焙的IK骨骼在IK关键帧中全部设为关闭，其余数据与原动作共用
+
+    Raises:
+        ValueError: 帧号为负数，或骨骼的父子关系无效（见 PmxBoneTopology）
+    """
+    topology = PmxBoneTopology.of(model)
+    names = ModelNameIndex.of(model)
+    chains = []
+    for ik_bone in topology.order:
+        bone = model.bones[ik_bone]
+        if not bone.bone_flags.ik or bone.ik_target_index is None \
+                or not 0 <= bone.ik_target_index < len(model.bones) or not bone.ik_links:
+            continue
+        links = [_IkLink(link.bone_index, link.limit_min, link.limit_max) for link in bone.ik_links
+                 if 0 <= link.bone_index < len(model.bones) and link.bone_index != bone.ik_target_index]
+        unit_angle = math.radians(bone.ik_angle_limit) if bone.ik_angle_limit else math.pi
+        chains.append(_IkChain(bone.name_jp, ik_bone, bone.ik_target_index, bone.ik_loop_count or 0,
+                               unit_angle, links))
+    if frames is None:
+        last = max([frame.frame_number for frame in motion.bone_frames]
+                   + [frame.frame_number for frame in motion.ik_frames] + [0])
+        frames = range(last + 1)
+    frames = list(frames)
+    if any(frame < 0 for frame in frames):
+        raise ValueError("烘焙帧号不能为负数")
+
+    enabled = _ik_states(motion, chains, frames, names.ik_bone_keys)
+    active = [slot for slot in range(len(chains)) if any(state[slot] for state in enabled)]
+    chains = [chains[slot] for slot in active]
+    enabled = [[state[slot] for slot in active] for state in enabled]
+    result = copy.copy(motion)
+    if not chains or not frames:
+        return result
+
+    rig = _IkRig(model, topology, chains)
+    needed = set(rig.bones)
+    columns = VmdBoneColumns.from_frames([
+        frame for frame in motion.bone_frames if names.bone_keys.get(_bone_key(frame.bone_name), -1) in needed])
+    bone_tracks = {names.bone_keys[_bone_key(name)]: track
+                   for track, name in enumerate(columns.bone_names)}
+    positions, rotations = _sample_bone_columns(columns, frames)
+    track_count = columns.track_count
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    blocks = max(1, min(max_workers, len(frames)))
+    bounds = [len(frames) * block // blocks for block in range(blocks + 1)]
+    tasks = [(rig, bone_tracks, track_count,
+              positions[bounds[block] * track_count * 3:bounds[block + 1] * track_count * 3],
+              rotations[bounds[block] * track_count * 4:bounds[block + 1] * track_count * 4],
+              enabled[bounds[block]:bounds[block + 1]]) for block in range(blocks)]
+    if blocks == 1:
+        solved = _solve_block(tasks[0])
+    else:
+        with ProcessPoolExecutor(max_workers=blocks) as executor:
+            solved = [pose for block in executor.map(_solve_block, tasks) for pose in block]
+
+    baked = sorted({link.bone for chain in chains for link in chain.links if link.path})
+    slots = {bone: slot for slot, bone in enumerate(rig.bones)}
+    baked_keys = {_bone_key(model.bones[bone].name_jp) for bone in baked}
+    bone_frames = [frame for frame in motion.bone_frames if _bone_key(frame.bone_name) not in baked_keys]
+    for bone in baked:
+        slot = slots[bone]
+        track = bone_tracks.get(bone, -1)
+        for index, frame in enumerate(frames):
+            if track >= 0:
+                cell = index * track_count + track
+                position = list(positions[cell * 3:cell * 3 + 3])
+            else:
+                position = [0.0, 0.0, 0.0]
+            bone_frames.append(VmdBoneFrame(bone_name=model.bones[bone].name_jp, frame_number=frame,
+                                            position=position,
+                                            rotation=quaternion_to_euler(*solved[index][slot])))
+    result.bone_frames = bone_frames
+
+    chain_names = [chain.name for chain in chains]
+    chain_keys = {_ik_key(name) for name in chain_names}
+    ik_frames = []
+    for ik_frame in motion.ik_frames or [VmdIkFrame(frame_number=0)]:
+        ik_bones = [VmdIkBone(item.bone_name, False) if _ik_key(item.bone_name) in chain_keys else item
+                    for item in ik_frame.ik_bones]
+        present = {_ik_key(item.bone_name) for item in ik_bones}
+        ik_bones.extend(VmdIkBone(name, False) for name in chain_names if _ik_key(name) not in present)
+        ik_frames.append(VmdIkFrame(ik_frame.frame_number, ik_frame.display, ik_bones))
+    result.ik_frames = ik_frames
+    return result
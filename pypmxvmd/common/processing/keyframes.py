@@ -0,0 +1,79 @@
+"""
+PyPMXVMD 关键帧整理
+
+对VMD关键帧做批量排序和去重：骨骼/变形关键帧按名称分组、组内按帧号升序，
+其余关键帧按帧号升序；同一 (名称, 帧号) 或同一帧号出现多次时保留最后一个。
+
+排序键为 名称ID << 32 | 帧号 的单个整数（名称ID按首次出现的顺序分配），
+一次稳定排序即可完成按 (名称, 帧号) 的字典序排序。
+"""
+
+from array import array
+from typing import List, Optional, Sequence, TypeVar
+
+from pypmxvmd.common.models.vmd import VmdMotion
+
+_Frame = TypeVar('_Frame')
+
+
+def unique_order(keys: Sequence[int]) -> List[int]:
+    """按键稳定排序，返回排序后的下标；键相同时只保留输入中最后一个的下标"""
+    order = sorted(range(len(keys)), key=keys.__getitem__)
+    last = len(order) - 1
+    return [index for position, index in enumerate(order)
+            if position == last or keys[order[position + 1]] != keys[index]]
+
+
+def _sorted_unique(frames: List[_Frame], keys: array) -> List[_Frame]:
+    """按键稳定排序，键相同的关键帧只保留输入中最后一个"""
+    return [frames[index] for index in unique_order(keys)]
+
+
+def sort_keyframes(frames: List[_Frame], name_attr: Optional[str] = None) -> List[_Frame]:
+    """排序并去重关键帧列表
+
+    Args:
+        frames: 关键帧列表（不会被修改）
+        name_attr: 名称属性，例如 "bone_name"；为None时只按帧号排序
+
+    Returns:
+        新的关键帧列表，(名称, 帧号) 重复时保留输入中最后一个
+    """
+    if name_attr is None:
+        keys = array('Q', (frame.frame_number for frame in frames))
+        return _sorted_unique(frames, keys)
+
+    name_ids = {}
+    keys = array('Q')
+    for frame in frames:
+        name = getattr(frame, name_attr)
+        name_id = name_ids.get(name)
+        if name_id is None:
+            name_id = name_ids[name] = len(name_ids)
+        keys.append(name_id << 32 | frame.frame_number)
+    return _sorted_unique(frames, keys)
+
+
+def normalize_motion(motion: VmdMotion, in_place: bool = False) -> VmdMotion:
+    """整理VMD动作的全部关键帧
+
+    骨骼/变形关键帧按名称分组（名称按首次出现的顺序排列）并按帧号排序，
+    相机、光照、阴影和IK关键帧按帧号排序；重复的关键帧保留最后一个。
+
+    Args:
+        motion: VMD动作
+        in_place: 是否直接修改传入的动作；为False时返回新的VmdMotion，
+            关键帧对象与原动作共享
+
+    Returns:
+        整理后的VmdMotion
+    """
+    result = motion if in_place else VmdMotion()
+    result.header = motion.header
+    result.bone_frames = sort_keyframes(motion.bone_frames, "bone_name")
+    result.morph_frames = sort_keyframes(motion.morph_frames, "morph_name")
+    result.camera_frames = sort_keyframes(motion.camera_frames)
+    result.light_frames = sort_keyframes(motion.light_frames)
+    result.shadow_frames = sort_keyframes(motion.shadow_frames)
+    result.ik_frames = sort_keyframes(motion.ik_frames)
+    return result
@@ -0,0 +1,213 @@
+"""
+PyPMXVMD 左右镜像
+
+以YZ平面为镜面翻转动作和姿势：
+- 名称中的「左」「右」互换（每个名称只计算一次，结果缓存在名称对照表中）
+- 位置取反X分量
+- 四元数 [x, y, z, w] 变为 [x, -y, -z, w]
+- 欧拉角 [x, y, z] 变为 [x, -y, -z]
+
+镜像变换 M 满足 M·R(x)·M = R(x)、M·R(y)·M = R(-y)、M·R(z)·M = R(-z)，
+因此无论欧拉角的旋转顺序如何，直接对分量取反即可，不需要经过四元数转换，不会损失精度。
+"""
+
+from array import array
+from typing import Dict, Iterable, Mapping, Optional, Union
+
+from pypmxvmd.common.models.vmd import (
+    VmdMotion, VmdHeader, VmdBoneFrame, VmdMorphFrame, VmdCameraFrame,
+    VmdLightFrame, VmdShadowFrame, VmdIkFrame, VmdIkBone
+)
+from pypmxvmd.common.models.vpd import VpdPose, VpdPoseTable, VpdBonePose, VpdMorphPose
+
+_SIDE_SWAP = str.maketrans({"左": "右", "右": "左"})
+
+
+def mirror_name(name: str) -> str:
+    """互换名称中的「左」「右」"""
+    return name.translate(_SIDE_SWAP)
+
+
+class MirrorNameTable:
+    """镜像名称对照表
+
+    默认规则为互换「左」「右」；extra_pairs 中的名称对双向生效并优先于默认规则，
+    用于处理不按左右命名的骨骼或变形（例如 {"ウィンク": "ウィンク右"}）。
+    """
+
+    def __init__(self, extra_pairs: Optional[Mapping[str, str]] = None):
+        self._table: Dict[str, str] = {}
+        for left, right in (extra_pairs or {}).items():
+            self._table[left] = right
+            self._table[right] = left
+
+    def __getitem__(self, name: str) -> str:
+        mirrored = self._table.get(name)
+        if mirrored is None:
+            mirrored = self._table[name] = mirror_name(name)
+        return mirrored
+
+    def map_all(self, names: Iterable[str]) -> list:
+        """批量镜像名称"""
+        return [self[name] for name in names]
+
+
+def _name_table(name_map: Union[MirrorNameTable, Mapping[str, str], None]) -> MirrorNameTable:
+    if isinstance(name_map, MirrorNameTable):
+        return name_map
+    return MirrorNameTable(name_map)
+
+
+def _mirror_bone_frames(frames: list, names: MirrorNameTable) -> list:
+    return [
+        VmdBoneFrame(bone_name=names[frame.bone_name], frame_number=frame.frame_number,
+                     position=[-frame.position[0], frame.position[1], frame.position[2]],
+                     rotation=[frame.rotation[0], -frame.rotation[1], -frame.rotation[2]],
+                     interpolation=list(frame.interpolation),
+                     physics_disabled=frame.physics_disabled)
+        for frame in frames
+    ]
+
+
+def _mirror_camera_frames(frames: list) -> list:
+    return [
+        VmdCameraFrame(frame_number=frame.frame_number, distance=frame.distance,
+                       position=[-frame.position[0], frame.position[1], frame.position[2]],
+                       rotation=[frame.rotation[0], -frame.rotation[1], -frame.rotation[2]],
+                       interpolation=list(frame.interpolation), fov=frame.fov,
+                       perspective=frame.perspective)
+        for frame in frames
+    ]
+
+
+def mirror_motion(motion: VmdMotion,
+                  name_map: Union[MirrorNameTable, Mapping[str, str], None] = None) -> VmdMotion:
+    """左右镜像VMD动作（包括相机和光照关键帧）
+
+    Args:
+        motion: VMD动作（不会被修改）
+        name_map: 额外的名称对或MirrorNameTable
+
+    Returns:
+        新的VmdMotion，关键帧为新建对象
+    """
+    names = _name_table(name_map)
+    result = VmdMotion()
+    result.header = VmdHeader(version=motion.header.version, model_name=motion.header.model_name)
+    result.bone_frames = _mirror_bone_frames(motion.bone_frames, names)
+    result.morph_frames = [
+        VmdMorphFrame(morph_name=names[frame.morph_name], frame_number=frame.frame_number,
+                      weight=frame.weight)
+        for frame in motion.morph_frames
+    ]
+    result.camera_frames = _mirror_camera_frames(motion.camera_frames)
+    result.light_frames = [
+        VmdLightFrame(frame_number=frame.frame_number, color=list(frame.color),
+                      position=[-frame.position[0], frame.position[1], frame.position[2]])
+        for frame in motion.light_frames
+    ]
+    result.shadow_frames = [
+        VmdShadowFrame(frame_number=frame.frame_number, shadow_mode=frame.shadow_mode,
+                       distance=frame.distance)
+        for frame in motion.shadow_frames
+    ]
+    result.ik_frames = [
+        VmdIkFrame(frame_number=frame.frame_number, display=frame.display,
+                   ik_bones=[VmdIkBone(bone_name=names[bone.bone_name], ik_enabled=bone.ik_enabled)
+                             for bone in frame.ik_bones])
+        for frame in motion.ik_frames
+    ]
+    return result
+
+
+def mirror_pose(pose: VpdPose,
+                name_map: Union[MirrorNameTable, Mapping[str, str], None] = None) -> VpdPose:
+    """左右镜像VPD姿势
+
+    Args:
+        pose: VPD姿势（不会被修改）
+        name_map: 额外的名称对或MirrorNameTable
+
+    Returns:
+        新的VpdPose
+    """
+    names = _name_table(name_map)
+    bone_poses = [
+        VpdBonePose(bone_name=names[bone.bone_name],
+                    position=[-bone.position[0], bone.position[1], bone.position[2]],
+                    rotation=[bone.rotation[0], -bone.rotation[1], -bone.rotation[2], bone.rotation[3]])
+        for bone in pose.bone_poses
+    ]
+    morph_poses = [VpdMorphPose(morph_name=names[morph.morph_name], weight=morph.weight)
+                   for morph in pose.morph_poses]
+    return VpdPose(model_name=pose.model_name, bone_poses=bone_poses, morph_poses=morph_poses)
+
+
+def _negated(values: array, start: int, step: int) -> array:
+    return array(values.typecode, [-v for v in values[start::step]])
+
+
+def mirror_pose_table(table: VpdPoseTable,
+                      name_map: Union[MirrorNameTable, Mapping[str, str], None] = None) -> VpdPoseTable:
+    """左右镜像整个姿势表
+
+    直接在列式数组上按步长切片取反，名称表只镜像一次，各姿势的下标数组原样复制。
+
+    Args:
+        table: 姿势表（不会被修改）
+        name_map: 额外的名称对或MirrorNameTable
+
+    Returns:
+        新的VpdPoseTable
+
+    Raises:
+        ValueError: 镜像后的名称发生重复
+    """
+    names = _name_table(name_map)
+    result = VpdPoseTable()
+    result.file_paths = list(table.file_paths)
+    result.model_names = list(table.model_names)
+    result.bone_names = names.map_all(table.bone_names)
+    result.morph_names = names.map_all(table.morph_names)
+    if len(set(result.bone_names)) != len(result.bone_names) or \
+            len(set(result.morph_names)) != len(result.morph_names):
+        raise ValueError("镜像后的骨骼或变形名称发生重复，请检查名称对照表")
+    result._bone_lookup = {name: i for i, name in enumerate(result.bone_names)}
+    result._morph_lookup = {name: i for i, name in enumerate(result.morph_names)}
+    result.bone_offsets = array(table.bone_offsets.typecode, table.bone_offsets)
+    result.bone_indices = array(table.bone_indices.typecode, table.bone_indices)
+    result.morph_offsets = array(table.morph_offsets.typecode, table.morph_offsets)
+    result.morph_indices = array(table.morph_indices.typecode, table.morph_indices)
+    result.morph_weights = array(table.morph_weights.typecode, table.morph_weights)
+    result.errors = dict(table.errors)
+
+    result.positions = array(table.positions.typecode, table.positions)
+    result.positions[0::3] = _negated(table.positions, 0, 3)
+    result.rotations = array(table.rotations.typecode, table.rotations)
+    result.rotations[1::4] = _negated(table.rotations, 1, 4)
+    result.rotations[2::4] = _negated(table.rotations, 2, 4)
+    return result
+
+
+def mirror(data: Union[VmdMotion, VpdPose, VpdPoseTable],
+           name_map: Union[MirrorNameTable, Mapping[str, str], None] = None
+           ) -> Union[VmdMotion, VpdPose, VpdPoseTable]:
+    """左右镜像VMD动作、VPD姿势或姿势表
+
+    Args:
+        data: VmdMotion、VpdPose 或 VpdPoseTable
+        name_map: 额外的名称对（双向生效）或MirrorNameTable
+
+    Returns:
+        与输入同类型的新对象
+
+    Raises:
+        ValueError: 不支持的数据类型
+    """
+    if isinstance(data, VmdMotion):
+        return mirror_motion(data, name_map)
+    if isinstance(data, VpdPose):
+        return mirror_pose(data, name_map)
+    if isinstance(data, VpdPoseTable):
+        return mirror_pose_table(data, name_map)
+    raise ValueError(f"不支持镜像的数据类型: {type(data).__name__}")
@@ -0,0 +1,272 @@
+"""
+PyPMXVMD 变形计算
+
+把模型的顶点、UV和骨骼变形编译成稀疏的 (分量下标, 增量) 数组，
+组变形递归展开为对其余变形的线性组合（检测循环引用），编译结果缓存在模型上。
+给定一组变形权重后，每个生效的变形只需在扁平的顶点坐标数组上做一次 zip 循环，
+未被任何变形引用的顶点不参与计算。
+
+材质变形和冲击变形不影响顶点，不参与计算。
+"""
+
+from array import array
+from typing import Dict, List, Mapping, Sequence, Tuple, Union
+
+from pypmxvmd.common.math3d import euler_to_quaternion, quaternion_multiply, slerp
+from pypmxvmd.common.models.pmx import PmxModel, PmxMorph, MorphType
+
+_IDENTITY = (1.0, 0.0, 0.0, 0.0)
+# UV变形类型 -> UV通道（0为基础UV，1-4为附加UV）
+_UV_CHANNELS = {MorphType.UV: 0, MorphType.EXTENDED_UV1: 1, MorphType.EXTENDED_UV2: 2,
+                MorphType.EXTENDED_UV3: 3, MorphType.EXTENDED_UV4: 4}
+
+_Sparse = Tuple[array, array]
+
+
+class MorphResult:
+    """变形计算结果
+
+    Attributes:
+        positions: 变形后的顶点位置，扁平数组 [x0, y0, z0, x1, ...]
+        uvs: 变形后的UV，扁平数组 [u0, v0, u1, ...]
+        additional_uvs: 变形后的附加UV，每个通道一个扁平数组（每顶点4个分量）
+        bone_offsets: 骨骼索引 -> (位移 [x, y, z], 旋转四元数 (w, x, y, z))
+        weights: 展开组变形和翻转变形后，各变形的有效权重（变形索引 -> 权重）
+    """
+
+    def __init__(self, positions: array, uvs: array, additional_uvs: List[array],
+                 bone_offsets: Dict[int, Tuple[List[float], Tuple[float, float, float, float]]],
+                 weights: Dict[int, float]):
+        self.positions = positions
+        self.uvs = uvs
+        self.additional_uvs = additional_uvs
+        self.bone_offsets = bone_offsets
+        self.weights = weights
+
+    def position(self, vertex_index: int) -> List[float]:
+        """返回单个顶点变形后的位置"""
+        start = vertex_index * 3
+        return list(self.positions[start:start + 3])
+
+    def uv(self, vertex_index: int) -> List[float]:
+        """返回单个顶点变形后的UV"""
+        start = vertex_index * 2
+        return list(self.uvs[start:start + 2])
+
+
+def _accumulate(target: array, slots: array, deltas: array, weight: float) -> None:
+    for slot, delta in zip(slots, deltas):
+        target[slot] += weight * delta
+
+
+class MorphEngine:
+    """编译后的模型变形数据
+
+    构造时一次性编译全部变形；之后每次 apply 只复制基础顶点数组并叠加生效的变形。
+    通过 MorphEngine.of(model) 获取时编译结果缓存在模型上，替换或增删顶点/变形列表后
+    自动重新编译；原地修改顶点或变形项目后需传入 refresh=True。
+
+    Args:
+        model: PMX模型
+
+    Raises:
+        ValueError: 变形引用了越界的顶点/变形索引，或组变形存在循环引用
+    """
+
+    def __init__(self, model: PmxModel):
+        vertices = model.vertices
+        morphs = model.morphs
+        vertex_count = len(vertices)
+        self.morph_names: List[str] = [morph.name_jp for morph in morphs]
+        self._lookup: Dict[str, int] = {}
+        for index, name in enumerate(self.morph_names):
+            self._lookup.setdefault(name, index)
+
+        self.base_positions = array('f', [c for vertex in vertices for c in vertex.position])
+        self.base_uvs = array('f', [c for vertex in vertices for c in vertex.uv])
+        channels = min((len(vertex.additional_uvs) for vertex in vertices), default=0)
+        self.base_additional_uvs = [
+            array('f', [c for vertex in vertices for c in vertex.additional_uvs[channel]])
+            for channel in range(channels)
+        ]
+
+        self._types = [morph.morph_type for morph in morphs]
+        self._vertex: Dict[int, _Sparse] = {}
+        self._uv: Dict[int, Tuple[int, array, array]] = {}
+        self._bone: Dict[int, List[Tuple[int, List[float], Tuple[float, float, float, float]]]] = {}
+        self._flip: Dict[int, List[Tuple[int, float]]] = {}
+        for index, morph in enumerate(morphs):
+            morph_type = morph.morph_type
+            if morph_type == MorphType.VERTEX:
+                self._vertex[index] = self._compile_offsets(morph, vertex_count, 3)
+            elif morph_type in _UV_CHANNELS:
+                channel = _UV_CHANNELS[morph_type]
+                if channel <= channels:
+                    slots, deltas = self._compile_offsets(morph, vertex_count, 2 if channel == 0 else 4)
+                    self._uv[index] = (channel, slots, deltas)
+            elif morph_type == MorphType.BONE:
+                self._bone[index] = [(item.bone_index, item.translation,
+                                      euler_to_quaternion(item.rotation)) for item in morph.items]
+            elif morph_type == MorphType.FLIP:
+                self._flip[index] = [(self._check_morph(morph, item.morph_index), item.value)
+                                     for item in morph.items]
+
+        memo: Dict[int, Dict[int, float]] = {}
+        self._expansion = [list(self._flatten(morphs, index, [], memo).items())
+                           for index in range(len(morphs))]
+        self._signature = self.signature(model)
+
+    def _check_morph(self, morph: PmxMorph, index: int) -> int:
+        if not 0 <= index < len(self._types):
+            raise ValueError(f"变形 '{morph.name_jp}' 引用的变形索引越界: {index}")
+        return index
+
+    @staticmethod
+    def _compile_offsets(morph: PmxMorph, vertex_count: int, components: int) -> _Sparse:
+        """把顶点/UV偏移编译为 (扁平分量下标, 增量)，省略为0的分量"""
+        slots = array('I')
+        deltas = array('f')
+        for item in morph.items:
+            vertex_index = item.vertex_index
+            if not 0 <= vertex_index < vertex_count:
+                raise ValueError(f"变形 '{morph.name_jp}' 的顶点索引越界: {vertex_index}")
+            base = vertex_index * components
+            offset = item.offset
+            for component in range(components):
+                delta = offset[component]
+                if delta:
+                    slots.append(base + component)
+                    deltas.append(delta)
+        return slots, deltas
+
+    def _flatten(self, morphs: List[PmxMorph], index: int, stack: List[int],
+                 memo: Dict[int, Dict[int, float]]) -> Dict[int, float]:
+        """把组变形展开为 {非组变形索引: 系数}；翻转变形作为终端保留，在 apply 时按权重选择"""
+        if index in memo:
+            return memo[index]
+        if index in stack:
+            chain = " -> ".join(morphs[i].name_jp for i in stack[stack.index(index):] + [index])
+            raise ValueError(f"组变形存在循环引用: {chain}")
+        morph = morphs[index]
+        stack.append(index)
+        if morph.morph_type == MorphType.GROUP:
+            result: Dict[int, float] = {}
+            for item in morph.items:
+                child = self._check_morph(morph, item.morph_index)
+                for base, factor in self._flatten(morphs, child, stack, memo).items():
+                    result[base] = result.get(base, 0.0) + factor * item.value
+        else:
+            if morph.morph_type == MorphType.FLIP:
+                for child, _value in self._flip[index]:
+                    self._flatten(morphs, child, stack, memo)
+            result = {index: 1.0}
+        stack.pop()
+        memo[index] = result
+        return result
+
+    @staticmethod
+    def signature(model: PmxModel) -> tuple:
+        """用于判断缓存是否失效的模型签名（顶点/变形列表的身份和长度）"""
+        return id(model.vertices), len(model.vertices), id(model.morphs), len(model.morphs)
+
+    @classmethod
+    def of(cls, model: PmxModel, refresh: bool = False) -> 'MorphEngine':
+        """获取模型的变形编译结果，首次调用时编译并缓存在模型上"""
+        engine = getattr(model, "_morph_engine", None)
+        if refresh or engine is None or engine._signature != cls.signature(model):
+            engine = cls(model)
+            model._morph_engine = engine
+        return engine
+
+    def effective_weights(self, weights: Union[Mapping[str, float], Sequence[float]]) -> Dict[int, float]:
+        """展开组变形和翻转变形，返回 {变形索引: 有效权重}
+
+        翻转变形把 0-1 的权重等分给各项目，只施加权重所在区间对应的项目（按项目系数）。
+
+        Args:
+            weights: {变形名称: 权重}，或按变形顺序排列的权重序列
+
+        Raises:
+            ValueError: 变形名称不存在，或权重序列比变形列表长
+        """
+        if isinstance(weights, Mapping):
+            pending = []
+            for name, weight in weights.items():
+                index = self._lookup.get(name)
+                if index is None:
+                    raise ValueError(f"未知的变形名称: {name}")
+                pending.append((index, weight))
+        else:
+            if len(weights) > len(self._types):
+                raise ValueError(f"权重数量({len(weights)})超过变形数量({len(self._types)})")
+            pending = list(enumerate(weights))
+
+        effective: Dict[int, float] = {}
+        while pending:
+            index, weight = pending.pop()
+            if not weight:
+                continue
+            for base, factor in self._expansion[index]:
+                value = weight * factor
+                items = self._flip.get(base)
+                if items is None:
+                    effective[base] = effective.get(base, 0.0) + value
+                elif items and value > 0.0:
+                    pending.append(items[min(int(value * len(items)), len(items) - 1)])
+        return effective
+
+    def apply(self, weights: Union[Mapping[str, float], Sequence[float]]) -> MorphResult:
+        """按权重计算变形后的顶点位置、UV和骨骼偏移
+
+        Args:
+            weights: {变形名称: 权重}，或按变形顺序排列的权重序列
+
+        Returns:
+            MorphResult
+
+        Raises:
+            ValueError: 变形名称不存在，或权重序列比变形列表长
+        """
+        effective = self.effective_weights(weights)
+        positions = array('f', self.base_positions)
+        uv_channels = [array('f', self.base_uvs)] + [array('f', uvs) for uvs in self.base_additional_uvs]
+        bone_offsets: Dict[int, Tuple[List[float], Tuple[float, float, float, float]]] = {}
+
+        for index, weight in effective.items():
+            if not weight:
+                continue
+            sparse = self._vertex.get(index)
+            if sparse is not None:
+                _accumulate(positions, sparse[0], sparse[1], weight)
+                continue
+            uv = self._uv.get(index)
+            if uv is not None:
+                _accumulate(uv_channels[uv[0]], uv[1], uv[2], weight)
+                continue
+            for bone_index, translation, rotation in self._bone.get(index, ()):
+                offset, current = bone_offsets.get(bone_index, ([0.0, 0.0, 0.0], _IDENTITY))
+                offset[0] += weight * translation[0]
+                offset[1] += weight * translation[1]
+                offset[2] += weight * translation[2]
+                rotation = quaternion_multiply(current, slerp(_IDENTITY, rotation, weight))
+                bone_offsets[bone_index] = (offset, rotation)
+
+        return MorphResult(positions, uv_channels[0], uv_channels[1:], bone_offsets, effective)
+
+
+def apply_morphs(model: PmxModel, weights: Union[Mapping[str, float], Sequence[float]]) -> MorphResult:
+    """按权重计算模型变形后的顶点位置、UV和骨骼偏移
+
+    编译结果缓存在模型上，对同一模型反复调用时只做叠加计算。
+
+    Args:
+        model: PMX模型
+        weights: {变形名称: 权重}，或按变形顺序排列的权重序列
+
+    Returns:
+        MorphResult
+
+    Raises:
+        ValueError: 变形名称不存在、索引越界或组变形存在循环引用
+    """
+    return MorphEngine.of(model).apply(weights)
@@ -0,0 +1,287 @@
+"""
+PyPMXVMD 法线与切线计算
+
+在扁平的面索引缓冲区上逐三角面计算面法线，按面积或角度加权累加到顶点（scatter-add），
+不为三角面或顶点创建对象。
+
+PMX 模型在UV接缝和硬边处把顶点拆成多份。合并接缝时，同一材质内位置相同的顶点共享法线，
+两侧法线夹角超过折痕角的视为硬边，不合并；不同材质之间的顶点从不合并。
+
+切线按 MikkTSpace 的做法逐三角面由UV导数求出，按角度加权累加，
+再对顶点法线做 Gram-Schmidt 正交化，第4个分量为副切线方向（±1）。
+
+逐三角面的累加和逐顶点的归一化在Cython模块可用时由 _fast_normals 完成，
+否则使用下面的纯Python循环，两者运算顺序相同。
+"""
+
+import math
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from pypmxvmd.common.models.pmx import PmxModel, PmxMeshIndex
+
+# 尝试导入Cython优化模块
+try:
+    from pypmxvmd.common.processing._fast_normals import (
+        normal_sums_cython, normalize_normals_cython, tangent_sums_cython, finish_tangents_cython
+    )
+    _CYTHON_AVAILABLE = True
+except ImportError:
+    _CYTHON_AVAILABLE = False
+
+_WEIGHTINGS = ("angle", "area")
+
+
+def _doubles(values: Sequence[float]) -> array:
+    """转换为Cython内核使用的 array('d')，已经是时不复制"""
+    if isinstance(values, array) and values.typecode == 'd':
+        return values
+    return array('d', values)
+
+
+def _index_buffer(mesh_index: PmxMeshIndex) -> array:
+    indices = mesh_index.indices
+    if isinstance(indices, array) and indices.typecode == 'I':
+        return indices
+    return array('I', indices)
+
+
+def _model_positions(model: PmxModel, positions: Optional[Sequence[float]]) -> Sequence[float]:
+    if positions is None:
+        return array('d', [c for vertex in model.vertices for c in vertex.position])
+    if len(positions) != len(model.vertices) * 3:
+        raise ValueError(f"坐标数量({len(positions)})与顶点数量({len(model.vertices)})不符")
+    return positions
+
+
+def _corner_angles(ax, ay, az, bx, by, bz, cx, cy, cz, length):
+    """三角面三个角的角度；length 为两条边叉积的长度"""
+    angle_a = math.atan2(length, (bx - ax) * (cx - ax) + (by - ay) * (cy - ay) + (bz - az) * (cz - az))
+    angle_b = math.atan2(length, (cx - bx) * (ax - bx) + (cy - by) * (ay - by) + (cz - bz) * (az - bz))
+    return angle_a, angle_b, math.pi - angle_a - angle_b
+
+
+def _merge_seams(model: PmxModel, mesh_index: PmxMeshIndex, positions: Sequence[float],
+                 sums: Sequence[float], crease_angle: float) -> array:
+    """同一材质内位置相同、法线夹角不超过折痕角的顶点互相累加法线"""
+    material_of = [-1] * len(model.vertices)
+    indices = mesh_index.indices
+    for material_index, (face_offset, face_count) in enumerate(mesh_index.ranges):
+        for vertex in indices[face_offset * 3:(face_offset + face_count) * 3]:
+            if material_of[vertex] < 0:
+                material_of[vertex] = material_index
+    groups: Dict[tuple, List[int]] = {}
+    for vertex, material_index in enumerate(material_of):
+        if material_index >= 0:
+            base = vertex * 3
+            key = (material_index, positions[base], positions[base + 1], positions[base + 2])
+            groups.setdefault(key, []).append(vertex)
+
+    threshold = math.cos(math.radians(crease_angle))
+    merged = array('d', sums)
+    for members in groups.values():
+        if len(members) < 2:
+            continue
+        directions = {}
+        for vertex in members:
+            x, y, z = sums[vertex * 3:vertex * 3 + 3]
+            length = math.sqrt(x * x + y * y + z * z) or 1.0
+            directions[vertex] = (x / length, y / length, z / length)
+        for vertex in members:
+            own = directions[vertex]
+            base = vertex * 3
+            for other in members:
+                if other == vertex:
+                    continue
+                theirs = directions[other]
+                if own[0] * theirs[0] + own[1] * theirs[1] + own[2] * theirs[2] >= threshold:
+                    merged[base] += sums[other * 3]
+                    merged[base + 1] += sums[other * 3 + 1]
+                    merged[base + 2] += sums[other * 3 + 2]
+    return merged
+
+
+def compute_normals(model: PmxModel, weighting: str = "angle", merge_seams: bool = False,
+                    crease_angle: float = 180.0, positions: Optional[Sequence[float]] = None) -> array:
+    """计算平滑顶点法线
+
+    Args:
+        model: PMX模型
+        weighting: 面法线的加权方式，"angle"（按顶点处的角度）或 "area"（按三角面面积）
+        merge_seams: 是否合并同一材质内位置相同的顶点的法线（消除UV接缝处的光照断层）
+        crease_angle: 合并接缝时的折痕角（度），两侧法线夹角超过此值的接缝保留为硬边
+        positions: 扁平的顶点坐标（如 MorphResult.positions），None时使用顶点位置
+
+    Returns:
+        扁平的单位法线 array('f') [x0, y0, z0, ...]；不属于任何三角面（或只属于退化三角面）
+        的顶点保留原法线
+
+    Raises:
+        ValueError: 加权方式未知、坐标数量与顶点数量不符，或材质面数之和超过模型面数
+    """
+    if weighting not in _WEIGHTINGS:
+        raise ValueError(f"未知的加权方式: {weighting}，可选: {', '.join(_WEIGHTINGS)}")
+    positions = _model_positions(model, positions)
+    mesh_index = PmxMeshIndex.of(model)
+    by_angle = weighting == "angle"
+    if _CYTHON_AVAILABLE:
+        sums = normal_sums_cython(_index_buffer(mesh_index), _doubles(positions), by_angle)
+    else:
+        sums = _normal_sums(mesh_index.indices, positions, by_angle)
+
+    if merge_seams:
+        sums = _merge_seams(model, mesh_index, positions, sums, crease_angle)
+
+    normals = array('f', [c for vertex in model.vertices for c in vertex.normal])
+    if _CYTHON_AVAILABLE:
+        normalize_normals_cython(_doubles(sums), normals)
+    else:
+        _normalize_normals(sums, normals)
+    return normals
+
+
+def _normal_sums(indices: Sequence[int], positions: Sequence[float], by_angle: bool) -> List[float]:
+    """逐三角面累加加权面法线（纯Python实现）"""
+    sums = [0.0] * len(positions)
+    values = iter(indices)
+    for a, b, c in zip(values, values, values):
+        ia, ib, ic = a * 3, b * 3, c * 3
+        ax, ay, az = positions[ia], positions[ia + 1], positions[ia + 2]
+        bx, by, bz = positions[ib], positions[ib + 1], positions[ib + 2]
+        cx, cy, cz = positions[ic], positions[ic + 1], positions[ic + 2]
+        ux, uy, uz = bx - ax, by - ay, bz - az
+        vx, vy, vz = cx - ax, cy - ay, cz - az
+        nx, ny, nz = uy * vz - uz * vy, uz * vx - ux * vz, ux * vy - uy * vx
+        length = math.sqrt(nx * nx + ny * ny + nz * nz)
+        if not length:
+            continue
+        if by_angle:
+            nx, ny, nz = nx / length, ny / length, nz / length
+            weights = _corner_angles(ax, ay, az, bx, by, bz, cx, cy, cz, length)
+        else:
+            weights = (1.0, 1.0, 1.0)
+        for base, weight in zip((ia, ib, ic), weights):
+            sums[base] += nx * weight
+            sums[base + 1] += ny * weight
+            sums[base + 2] += nz * weight
+    return sums
+
+
+def _normalize_normals(sums: Sequence[float], normals: array) -> None:
+    """把累加结果归一化写入 normals，长度过小的顶点保留原值（纯Python实现）"""
+    for base in range(0, len(sums), 3):
+        x, y, z = sums[base], sums[base + 1], sums[base + 2]
+        length = math.sqrt(x * x + y * y + z * z)
+        if length > 1e-12:
+            normals[base] = x / length
+            normals[base + 1] = y / length
+            normals[base + 2] = z / length
+
+
+def recompute_normals(model: PmxModel, weighting: str = "angle", merge_seams: bool = False,
+                      crease_angle: float = 180.0) -> None:
+    """重新计算并原地写入顶点法线，参数同 compute_normals"""
+    normals = compute_normals(model, weighting, merge_seams, crease_angle)
+    for index, vertex in enumerate(model.vertices):
+        vertex.normal = list(normals[index * 3:index * 3 + 3])
+
+
+def compute_tangents(model: PmxModel, positions: Optional[Sequence[float]] = None,
+                     normals: Optional[Sequence[float]] = None) -> array:
+    """按UV计算顶点切线（MikkTSpace 风格）
+
+    Args:
+        model: PMX模型（使用顶点的基础UV）
+        positions: 扁平的顶点坐标，None时使用顶点位置
+        normals: 扁平的顶点法线（如 compute_normals 的结果），None时使用顶点法线
+
+    Returns:
+        扁平的切线 array('f') [x0, y0, z0, w0, ...]；xyz 为与法线正交的单位向量，
+        w 为副切线方向，副切线 = w * cross(法线, 切线)
+
+    Raises:
+        ValueError: 坐标或法线数量与顶点数量不符，或材质面数之和超过模型面数
+    """
+    positions = _model_positions(model, positions)
+    if normals is None:
+        normals = [c for vertex in model.vertices for c in vertex.normal]
+    elif len(normals) != len(positions):
+        raise ValueError(f"法线数量({len(normals)})与顶点数量({len(model.vertices)})不符")
+    uvs = [c for vertex in model.vertices for c in vertex.uv]
+    mesh_index = PmxMeshIndex.of(model)
+    if _CYTHON_AVAILABLE:
+        tangent_sums, bitangent_sums = tangent_sums_cython(
+            _index_buffer(mesh_index), _doubles(positions), array('d', uvs))
+        return finish_tangents_cython(_doubles(normals), tangent_sums, bitangent_sums)
+    tangent_sums, bitangent_sums = _tangent_sums(mesh_index.indices, positions, uvs)
+    return _finish_tangents(normals, tangent_sums, bitangent_sums)
+
+
+def _tangent_sums(indices: Sequence[int], positions: Sequence[float],
+                  uvs: Sequence[float]) -> Tuple[List[float], List[float]]:
+    """逐三角面累加按角度加权的切线和副切线（纯Python实现）"""
+    tangent_sums = [0.0] * len(positions)
+    bitangent_sums = [0.0] * len(positions)
+    values = iter(indices)
+    for a, b, c in zip(values, values, values):
+        ia, ib, ic = a * 3, b * 3, c * 3
+        ax, ay, az = positions[ia], positions[ia + 1], positions[ia + 2]
+        bx, by, bz = positions[ib], positions[ib + 1], positions[ib + 2]
+        cx, cy, cz = positions[ic], positions[ic + 1], positions[ic + 2]
+        ux, uy, uz = bx - ax, by - ay, bz - az
+        vx, vy, vz = cx - ax, cy - ay, cz - az
+        du1, dv1 = uvs[b * 2] - uvs[a * 2], uvs[b * 2 + 1] - uvs[a * 2 + 1]
+        du2, dv2 = uvs[c * 2] - uvs[a * 2], uvs[c * 2 + 1] - uvs[a * 2 + 1]
+        determinant = du1 * dv2 - du2 * dv1
+        nx, ny, nz = uy * vz - uz * vy, uz * vx - ux * vz, ux * vy - uy * vx
+        length = math.sqrt(nx * nx + ny * ny + nz * nz)
+        if not determinant or not length:
+            continue
+        tx, ty, tz = ux * dv2 - vx * dv1, uy * dv2 - vy * dv1, uz * dv2 - vz * dv1
+        sx, sy, sz = vx * du1 - ux * du2, vy * du1 - uy * du2, vz * du1 - uz * du2
+        if determinant < 0:
+            tx, ty, tz, sx, sy, sz = -tx, -ty, -tz, -sx, -sy, -sz
+        t_length = math.sqrt(tx * tx + ty * ty + tz * tz) or 1.0
+        s_length = math.sqrt(sx * sx + sy * sy + sz * sz) or 1.0
+        tx, ty, tz = tx / t_length, ty / t_length, tz / t_length
+        sx, sy, sz = sx / s_length, sy / s_length, sz / s_length
+        for base, weight in zip((ia, ib, ic), _corner_angles(ax, ay, az, bx, by, bz, cx, cy, cz, length)):
+            tangent_sums[base] += tx * weight
+            tangent_sums[base + 1] += ty * weight
+            tangent_sums[base + 2] += tz * weight
+            bitangent_sums[base] += sx * weight
+            bitangent_sums[base + 1] += sy * weight
+            bitangent_sums[base + 2] += sz * weight
+    return tangent_sums, bitangent_sums
+
+
+def _finish_tangents(normals: Sequence[float], tangent_sums: Sequence[float],
+                     bitangent_sums: Sequence[float]) -> array:
+    """对顶点法线正交化切线并求副切线方向（纯Python实现）"""
+    vertex_count = len(normals) // 3
+    tangents = array('f', bytes(4 * 4 * vertex_count))
+    for vertex in range(vertex_count):
+        base = vertex * 3
+        nx, ny, nz = normals[base], normals[base + 1], normals[base + 2]
+        tx, ty, tz = tangent_sums[base], tangent_sums[base + 1], tangent_sums[base + 2]
+        dot = nx * tx + ny * ty + nz * tz
+        tx, ty, tz = tx - nx * dot, ty - ny * dot, tz - nz * dot
+        length = math.sqrt(tx * tx + ty * ty + tz * tz)
+        if length < 1e-12:
+            # 没有有效UV时取任意与法线垂直的方向
+            tx, ty, tz = (nz, 0.0, -nx) if abs(nx) > abs(ny) else (0.0, -nz, ny)
+            length = math.sqrt(tx * tx + ty * ty + tz * tz)
+            if length < 1e-12:
+                tx, ty, tz, length = 1.0, 0.0, 0.0, 1.0
+        tx, ty, tz = tx / length, ty / length, tz / length
+        bx = ny * tz - nz * ty
+        by = nz * tx - nx * tz
+        bz = nx * ty - ny * tx
+        handedness = 1.0 if (bx * bitangent_sums[base] + by * bitangent_sums[base + 1]
+                             + bz * bitangent_sums[base + 2]) >= 0.0 else -1.0
+        out = vertex * 4
+        tangents[out] = tx
+        tangents[out + 1] = ty
+        tangents[out + 2] = tz
+        tangents[out + 3] = handedness
+    return tangents
@@ -0,0 +1,311 @@
+"""
+PyPMXVMD 骨骼/变形名称重定向
+
+通过名称映射表把动作或姿势的骨骼/变形轨道改名，可选地对指定骨骼叠加静止姿势旋转偏移
+和位移缩放。
+
+名称映射先在去重后的名称上求出 (源名称 -> 目标名称, 缩放, 偏移)，每个名称只解析一次；
+通配符/正则规则在构造映射表时编译，解析结果缓存在映射表中，同一映射表反复使用时
+只需字典查找。列式数据（VmdBoneColumns/VmdMorphColumns）按轨道整段切片复制，
+只对需要变换的轨道逐帧计算。
+"""
+
+import re
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+from pypmxvmd.common.math3d import euler_to_quaternion, quaternion_multiply, quaternion_to_euler
+from pypmxvmd.common.models.vmd import (
+    VmdMotion, VmdHeader, VmdBoneFrame, VmdMorphFrame, VmdIkFrame, VmdIkBone,
+    VmdBoneColumns, VmdMorphColumns
+)
+from pypmxvmd.common.models.vpd import VpdPose, VpdBonePose, VpdMorphPose
+
+_Quaternion = Tuple[float, float, float, float]
+
+
+def _compile_rule(pattern: Union[str, 're.Pattern'], replacement: str) -> Tuple['re.Pattern', str]:
+    """编译一条规则：字符串按通配符处理（* 和 ? 各自成为一个捕获组），re.Pattern 原样使用"""
+    if isinstance(pattern, re.Pattern):
+        return pattern, replacement
+    parts = []
+    for char in pattern:
+        if char == '*':
+            parts.append('(.*)')
+        elif char == '?':
+            parts.append('(.)')
+        else:
+            parts.append(re.escape(char))
+    return re.compile(''.join(parts)), replacement
+
+
+class NameMap:
+    """名称映射表
+
+    查找顺序：精确映射 -> 按顺序匹配的第一条规则 -> 未匹配名称的默认处理。
+    精确映射的目标为None表示丢弃该轨道。规则须匹配整个名称，替换字符串中可用
+    \\1、\\2 等引用通配符或正则的捕获组。
+
+    Args:
+        names: 精确映射 源名称 -> 目标名称
+        rules: (模式, 替换) 列表；模式为通配符字符串或 re.compile 的结果
+        keep_unmapped: 未匹配的名称是否原样保留（否则丢弃）
+    """
+
+    def __init__(self, names: Optional[Mapping[str, Optional[str]]] = None,
+                 rules: Iterable[Tuple[Union[str, 're.Pattern'], str]] = (),
+                 keep_unmapped: bool = True):
+        self._names = dict(names or {})
+        self._rules = [_compile_rule(pattern, replacement) for pattern, replacement in rules]
+        self.keep_unmapped = keep_unmapped
+        self._cache: Dict[str, Optional[str]] = {}
+
+    def get(self, name: str) -> Optional[str]:
+        """返回目标名称，丢弃时返回None"""
+        try:
+            return self._cache[name]
+        except KeyError:
+            pass
+        if name in self._names:
+            target = self._names[name]
+        else:
+            for pattern, replacement in self._rules:
+                match = pattern.fullmatch(name)
+                if match is not None:
+                    target = match.expand(replacement)
+                    break
+            else:
+                target = name if self.keep_unmapped else None
+        self._cache[name] = target
+        return target
+
+
+class RetargetMap:
+    """重定向配置
+
+    Args:
+        bones: 骨骼名称映射（NameMap 或 源名称 -> 目标名称 的字典）
+        morphs: 变形名称映射（NameMap 或字典），省略时保留原名称
+        rotation_offsets: 目标骨骼名称 -> 静止姿势旋转偏移（欧拉角，度）；
+            结果旋转为 动作旋转 * 偏移，即先施加偏移再施加动作旋转
+        translation_scale: 位移缩放；为数值时作用于所有骨骼，
+            为字典时按目标骨骼名称指定（未指定的骨骼为1.0）
+    """
+
+    def __init__(self, bones: Union[NameMap, Mapping[str, Optional[str]], None] = None,
+                 morphs: Union[NameMap, Mapping[str, Optional[str]], None] = None,
+                 rotation_offsets: Optional[Mapping[str, Sequence[float]]] = None,
+                 translation_scale: Union[float, Mapping[str, float]] = 1.0):
+        self.bones = bones if isinstance(bones, NameMap) else NameMap(bones)
+        self.morphs = morphs if isinstance(morphs, NameMap) else NameMap(morphs)
+        self.rotation_offsets: Dict[str, _Quaternion] = {
+            name: euler_to_quaternion(euler) for name, euler in (rotation_offsets or {}).items()}
+        if isinstance(translation_scale, Mapping):
+            self._scales = {name: float(scale) for name, scale in translation_scale.items()}
+            self._default_scale = 1.0
+        else:
+            self._scales = {}
+            self._default_scale = float(translation_scale)
+
+    def bone_plan(self, names: Iterable[str]) -> Dict[str, Optional[Tuple[str, float, Optional[_Quaternion]]]]:
+        """为一组源骨骼名称求出 (目标名称, 位移缩放, 旋转偏移)，丢弃的骨骼为None
+
+        Raises:
+            ValueError: 多个源骨骼映射到同一个目标名称
+        """
+        plan = {}
+        for name in names:
+            target = self.bones.get(name)
+            plan[name] = None if target is None else (
+                target, self._scales.get(target, self._default_scale), self.rotation_offsets.get(target))
+        _check_unique({name: entry and entry[0] for name, entry in plan.items()}, "骨骼")
+        return plan
+
+    def morph_plan(self, names: Iterable[str]) -> Dict[str, Optional[str]]:
+        """为一组源变形名称求出目标名称，丢弃的变形为None
+
+        Raises:
+            ValueError: 多个源变形映射到同一个目标名称
+        """
+        plan = {name: self.morphs.get(name) for name in names}
+        _check_unique(plan, "变形")
+        return plan
+
+
+def _check_unique(plan: Mapping[str, Optional[str]], kind: str) -> None:
+    seen: Dict[str, str] = {}
+    for source, target in plan.items():
+        if target is None:
+            continue
+        other = seen.setdefault(target, source)
+        if other != source:
+            raise ValueError(f"多个{kind}映射到同一名称 '{target}': '{other}', '{source}'")
+
+
+def _as_map(mapping: Union[RetargetMap, Mapping[str, Optional[str]]]) -> RetargetMap:
+    return mapping if isinstance(mapping, RetargetMap) else RetargetMap(bones=mapping)
+
+
+def _offset_euler(rotation: Sequence[float], offset: _Quaternion) -> List[float]:
+    return quaternion_to_euler(*quaternion_multiply(euler_to_quaternion(rotation), offset))
+
+
+def retarget_motion(motion: VmdMotion,
+                    mapping: Union[RetargetMap, Mapping[str, Optional[str]]]) -> VmdMotion:
+    """重定向VMD动作
+
+    Args:
+        motion: VMD动作（不会被修改）
+        mapping: RetargetMap，或只映射骨骼名称的字典
+
+    Returns:
+        新的VmdMotion；相机、光照和阴影关键帧与原动作共享
+
+    Raises:
+        ValueError: 多个源名称映射到同一个目标名称
+    """
+    mapping = _as_map(mapping)
+    bone_plan = mapping.bone_plan(dict.fromkeys(frame.bone_name for frame in motion.bone_frames))
+    morph_plan = mapping.morph_plan(dict.fromkeys(frame.morph_name for frame in motion.morph_frames))
+
+    bone_frames = []
+    for frame in motion.bone_frames:
+        entry = bone_plan[frame.bone_name]
+        if entry is None:
+            continue
+        target, scale, offset = entry
+        position = frame.position
+        bone_frames.append(VmdBoneFrame(
+            bone_name=target, frame_number=frame.frame_number,
+            position=[position[0] * scale, position[1] * scale, position[2] * scale]
+            if scale != 1.0 else list(position),
+            rotation=_offset_euler(frame.rotation, offset) if offset else list(frame.rotation),
+            interpolation=list(frame.interpolation), physics_disabled=frame.physics_disabled))
+
+    result = VmdMotion()
+    result.header = VmdHeader(version=motion.header.version, model_name=motion.header.model_name)
+    result.bone_frames = bone_frames
+    result.morph_frames = [
+        VmdMorphFrame(morph_name=morph_plan[frame.morph_name], frame_number=frame.frame_number,
+                      weight=frame.weight)
+        for frame in motion.morph_frames if morph_plan[frame.morph_name] is not None
+    ]
+    ik_names = {}
+    for frame in motion.ik_frames:
+        for bone in frame.ik_bones:
+            if bone.bone_name not in ik_names:
+                ik_names[bone.bone_name] = mapping.bones.get(bone.bone_name)
+    result.ik_frames = [
+        VmdIkFrame(frame_number=frame.frame_number, display=frame.display,
+                   ik_bones=[VmdIkBone(bone_name=ik_names[bone.bone_name], ik_enabled=bone.ik_enabled)
+                             for bone in frame.ik_bones if ik_names[bone.bone_name] is not None])
+        for frame in motion.ik_frames
+    ]
+    result.camera_frames = motion.camera_frames
+    result.light_frames = motion.light_frames
+    result.shadow_frames = motion.shadow_frames
+    return result
+
+
+def retarget_pose(pose: VpdPose, mapping: Union[RetargetMap, Mapping[str, Optional[str]]]) -> VpdPose:
+    """重定向VPD姿势（旋转为四元数 [x, y, z, w]）
+
+    Raises:
+        ValueError: 多个源名称映射到同一个目标名称
+    """
+    mapping = _as_map(mapping)
+    bone_plan = mapping.bone_plan(bone.bone_name for bone in pose.bone_poses)
+    morph_plan = mapping.morph_plan(morph.morph_name for morph in pose.morph_poses)
+    bone_poses = []
+    for bone in pose.bone_poses:
+        entry = bone_plan[bone.bone_name]
+        if entry is None:
+            continue
+        target, scale, offset = entry
+        x, y, z, w = bone.rotation
+        if offset:
+            w, x, y, z = quaternion_multiply((w, x, y, z), offset)
+        bone_poses.append(VpdBonePose(bone_name=target,
+                                      position=[value * scale for value in bone.position],
+                                      rotation=[x, y, z, w]))
+    morph_poses = [VpdMorphPose(morph_name=morph_plan[morph.morph_name], weight=morph.weight)
+                   for morph in pose.morph_poses if morph_plan[morph.morph_name] is not None]
+    return VpdPose(model_name=pose.model_name, bone_poses=bone_poses, morph_poses=morph_poses)
+
+
+def retarget_bone_columns(columns: VmdBoneColumns,
+                          mapping: Union[RetargetMap, Mapping[str, Optional[str]]]) -> VmdBoneColumns:
+    """重定向列式骨骼关键帧
+
+    改名只作用于轨道名称表；不需要变换的轨道按整段切片复制，
+    有缩放或旋转偏移的轨道才逐帧计算。
+
+    Raises:
+        ValueError: 多个源名称映射到同一个目标名称
+    """
+    plan = _as_map(mapping).bone_plan(columns.bone_names)
+    result = VmdBoneColumns()
+    for track, name in enumerate(columns.bone_names):
+        entry = plan[name]
+        if entry is None:
+            continue
+        target, scale, offset = entry
+        start, end = columns.track_range(track)
+        positions = columns.positions[start * 3:end * 3]
+        rotations = columns.rotations[start * 4:end * 4]
+        if scale != 1.0:
+            positions = [value * scale for value in positions]
+        if offset:
+            transformed = []
+            for i in range(0, len(rotations), 4):
+                x, y, z, w = rotations[i:i + 4]
+                w, x, y, z = quaternion_multiply((w, x, y, z), offset)
+                transformed.extend((x, y, z, w))
+            rotations = transformed
+        result.append_track(target, columns.frame_numbers[start:end], positions, rotations,
+                            columns.interpolation[start * 16:end * 16],
+                            columns.physics_disabled[start:end])
+    return result
+
+
+def retarget_morph_columns(columns: VmdMorphColumns,
+                           mapping: Union[RetargetMap, Mapping[str, Optional[str]]]) -> VmdMorphColumns:
+    """重定向列式变形关键帧（只改名，权重按整段切片复制）
+
+    Raises:
+        ValueError: 多个源名称映射到同一个目标名称
+    """
+    plan = _as_map(mapping).morph_plan(columns.morph_names)
+    result = VmdMorphColumns()
+    for track, name in enumerate(columns.morph_names):
+        target = plan[name]
+        if target is None:
+            continue
+        start, end = columns.track_range(track)
+        result.append_track(target, columns.frame_numbers[start:end], columns.weights[start:end])
+    return result
+
+
+def retarget(data: Union[VmdMotion, VpdPose, VmdBoneColumns, VmdMorphColumns],
+             mapping: Union[RetargetMap, Mapping[str, Optional[str]]]
+             ) -> Union[VmdMotion, VpdPose, VmdBoneColumns, VmdMorphColumns]:
+    """按映射表重定向动作、姿势或列式关键帧
+
+    Args:
+        data: VmdMotion、VpdPose、VmdBoneColumns 或 VmdMorphColumns
+        mapping: RetargetMap，或只映射骨骼名称的字典
+
+    Returns:
+        与输入同类型的新对象
+
+    Raises:
+        ValueError: 数据类型不受支持，或多个源名称映射到同一个目标名称
+    """
+    if isinstance(data, VmdMotion):
+        return retarget_motion(data, mapping)
+    if isinstance(data, VpdPose):
+        return retarget_pose(data, mapping)
+    if isinstance(data, VmdBoneColumns):
+        return retarget_bone_columns(data, mapping)
+    if isinstance(data, VmdMorphColumns):
+        return retarget_morph_columns(data, mapping)
+    raise ValueError(f"不支持重定向的数据类型: {type(data).__name__}")
@@ -0,0 +1,315 @@
+"""
+PyPMXVMD 网格简化（LOD生成）
+
+二次误差度量（QEM, Garland & Heckbert 1997）边折叠简化，逐材质进行，材质范围保持不变。
+边折叠按误差放入堆中，顶点的二次误差更新后旧的堆项按版本号作废。
+
+折叠后保留的顶点总是边的一个端点（不计算新位置），因此其UV、骨骼权重和变形偏移都原样保留，
+被折叠的顶点的权重由保留顶点的权重代替。以下顶点不会被折叠掉：
+
+- 材质子网格边界上的顶点：PMX 在UV接缝处拆分顶点，接缝在索引拓扑中就是边界，因此接缝和模型的开放边缘都保持不变
+- 被多个材质共用的顶点
+- 与另一端参与的顶点/UV变形不同的顶点（两端参与相同的变形时才可折叠）
+
+Cython模块可用时边折叠由 _fast_simplify 完成，折叠顺序和结果与纯Python实现相同。
+"""
+
+import copy
+import heapq
+import math
+from array import array
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from pypmxvmd.common.models.pmx import (
+    PmxModel, PmxMeshIndex, PmxVertex, PmxMorphItemVertex, PmxMorphItemUV
+)
+
+# 尝试导入Cython优化模块
+try:
+    from pypmxvmd.common.processing._fast_simplify import collapse_edges_cython
+    _CYTHON_AVAILABLE = True
+except ImportError:
+    _CYTHON_AVAILABLE = False
+
+_Quadric = List[float]
+
+
+def _plane_quadric(a: Sequence[float], b: Sequence[float], c: Sequence[float]) -> Optional[_Quadric]:
+    """三角面所在平面的二次误差矩阵（按面积加权），上三角10个分量"""
+    ux, uy, uz = b[0] - a[0], b[1] - a[1], b[2] - a[2]
+    vx, vy, vz = c[0] - a[0], c[1] - a[1], c[2] - a[2]
+    nx, ny, nz = uy * vz - uz * vy, uz * vx - ux * vz, ux * vy - uy * vx
+    length = math.sqrt(nx * nx + ny * ny + nz * nz)
+    if not length:
+        return None
+    area = length * 0.5
+    nx, ny, nz = nx / length, ny / length, nz / length
+    d = -(nx * a[0] + ny * a[1] + nz * a[2])
+    return [area * value for value in (nx * nx, nx * ny, nx * nz, nx * d, ny * ny, ny * nz, ny * d,
+                                       nz * nz, nz * d, d * d)]
+
+
+def _error(q: _Quadric, p: Sequence[float]) -> float:
+    x, y, z = p[0], p[1], p[2]
+    return (q[0] * x * x + 2 * q[1] * x * y + 2 * q[2] * x * z + 2 * q[3] * x
+            + q[4] * y * y + 2 * q[5] * y * z + 2 * q[6] * y
+            + q[7] * z * z + 2 * q[8] * z + q[9])
+
+
+def _normal(a: Sequence[float], b: Sequence[float], c: Sequence[float]) -> Tuple[float, float, float]:
+    ux, uy, uz = b[0] - a[0], b[1] - a[1], b[2] - a[2]
+    vx, vy, vz = c[0] - a[0], c[1] - a[1], c[2] - a[2]
+    return uy * vz - uz * vy, uz * vx - ux * vz, ux * vy - uy * vx
+
+
+class _MaterialSimplifier:
+    """单个材质子网格的边折叠"""
+
+    def __init__(self, faces: List[List[int]], positions: List[List[float]],
+                 locked: Set[int], morph_sets: Dict[int, frozenset]):
+        self.faces = faces
+        self.alive = [True] * len(faces)
+        self.positions = positions
+        self.morph_sets = morph_sets
+        self.adjacency: Dict[int, Set[int]] = {}
+        self.quadrics: Dict[int, _Quadric] = {}
+        self.version: Dict[int, int] = {}
+        self.removed: Set[int] = set()
+
+        edge_uses: Dict[Tuple[int, int], int] = {}
+        for face_id, face in enumerate(faces):
+            quadric = _plane_quadric(*(positions[v] for v in face))
+            for corner, vertex in enumerate(face):
+                self.adjacency.setdefault(vertex, set()).add(face_id)
+                total = self.quadrics.setdefault(vertex, [0.0] * 10)
+                if quadric is not None:
+                    for k in range(10):
+                        total[k] += quadric[k]
+                other = face[(corner + 1) % 3]
+                edge = (vertex, other) if vertex < other else (other, vertex)
+                edge_uses[edge] = edge_uses.get(edge, 0) + 1
+        # 边界边（只属于一个面）和非流形边的端点不可折叠
+        self.locked = set(locked)
+        for (a, b), uses in edge_uses.items():
+            if uses != 2:
+                self.locked.add(a)
+                self.locked.add(b)
+        self.heap: List[tuple] = []
+        for a, b in edge_uses:
+            self._push(a, b)
+
+    def _cost(self, source: int, target: int) -> Optional[float]:
+        if source in self.locked or self.morph_sets.get(source) != self.morph_sets.get(target):
+            return None
+        position = self.positions[target]
+        return max(_error(self.quadrics[source], position) + _error(self.quadrics[target], position), 0.0)
+
+    def _push(self, a: int, b: int) -> None:
+        if a == b:
+            # 退化三角面的自环边
+            return
+        best = None
+        for source, target in ((a, b), (b, a)):
+            cost = self._cost(source, target)
+            if cost is not None and (best is None or cost < best[0]):
+                best = (cost, source, target)
+        if best is not None:
+            cost, source, target = best
+            heapq.heappush(self.heap, (cost, self.version.get(a, 0), self.version.get(b, 0), a, b,
+                                       source, target))
+
+    def _flips(self, source: int, target: int) -> bool:
+        """折叠后是否有三角面翻转"""
+        positions = self.positions
+        moved = positions[target]
+        for face_id in self.adjacency[source]:
+            face = self.faces[face_id]
+            if target in face:
+                continue
+            before = _normal(*(positions[v] for v in face))
+            after = _normal(*(moved if v == source else positions[v] for v in face))
+            if before[0] * after[0] + before[1] * after[1] + before[2] * after[2] <= 0.0:
+                return True
+        return False
+
+    def run(self, target_faces: int, max_error: float) -> int:
+        """折叠到 target_faces 个面或误差超过 max_error，返回剩余面数"""
+        remaining = sum(1 for face in self.faces if len(set(face)) == 3)
+        heap = self.heap
+        while remaining > target_faces and heap:
+            cost, version_a, version_b, a, b, source, target = heapq.heappop(heap)
+            if a in self.removed or b in self.removed or \
+                    self.version.get(a, 0) != version_a or self.version.get(b, 0) != version_b:
+                continue
+            if cost > max_error:
+                break
+            if self._flips(source, target):
+                continue
+            for face_id in list(self.adjacency[source]):
+                face = self.faces[face_id]
+                if target in face:
+                    self.alive[face_id] = False
+                    remaining -= 1
+                    for vertex in face:
+                        self.adjacency[vertex].discard(face_id)
+                else:
+                    face[:] = [target if vertex == source else vertex for vertex in face]
+                    self.adjacency[target].add(face_id)
+            del self.adjacency[source]
+            self.removed.add(source)
+            self.quadrics[target] = [x + y for x, y in zip(self.quadrics[source], self.quadrics[target])]
+            self.version[target] = self.version.get(target, 0) + 1
+            neighbours = {vertex for face_id in self.adjacency[target] for vertex in self.faces[face_id]}
+            neighbours.discard(target)
+            for vertex in neighbours:
+                self._push(target, vertex)
+        return remaining
+
+    def result(self) -> List[List[int]]:
+        return [face for face, alive in zip(self.faces, self.alive) if alive and len(set(face)) == 3]
+
+
+def _copy_vertex(vertex: PmxVertex) -> PmxVertex:
+    return PmxVertex(list(vertex.position), list(vertex.normal), list(vertex.uv),
+                     [list(uv) for uv in vertex.additional_uvs], vertex.weight_mode,
+                     [list(pair) for pair in vertex.weight], vertex.edge_scale)
+
+
+def simplify_mesh(model: PmxModel, ratio: float = 0.5, max_error: float = math.inf) -> PmxModel:
+    """生成简化后的模型（LOD）
+
+    每个材质的面数减少到原来的约 ratio 倍；锁定的顶点较多（接缝、边界多）的材质可能达不到目标。
+
+    Args:
+        model: PMX模型（不修改）
+        ratio: 目标面数比例，0-1
+        max_error: 允许的最大二次误差，超过时该材质停止简化
+
+    Returns:
+        新的PMX模型。顶点、面、材质和变形为新对象，其余数据（骨骼、纹理、刚体等）与原模型共用
+
+    Raises:
+        ValueError: ratio不在0-1之间，材质面数之和超过模型面数，或变形引用了越界的顶点索引
+    """
+    if not 0.0 <= ratio <= 1.0:
+        raise ValueError(f"简化比例必须在0-1之间: {ratio}")
+    vertex_count = len(model.vertices)
+    positions = [vertex.position for vertex in model.vertices]
+    morph_members: Dict[int, Set[int]] = {}
+    for morph_index, morph in enumerate(model.morphs):
+        for item in morph.items:
+            if isinstance(item, (PmxMorphItemVertex, PmxMorphItemUV)):
+                if not 0 <= item.vertex_index < vertex_count:
+                    raise ValueError(f"变形 '{morph.name_jp}' 的顶点索引越界: {item.vertex_index}")
+                morph_members.setdefault(item.vertex_index, set()).add(morph_index)
+    morph_sets = {vertex: frozenset(members) for vertex, members in morph_members.items()}
+
+    mesh_index = PmxMeshIndex.of(model)
+    indices = mesh_index.indices
+    ranges = list(mesh_index.ranges)
+    covered = sum(count for _offset, count in ranges)
+    ranges.append((covered, len(indices) // 3 - covered))
+    material_indices = []
+    owner: Dict[int, int] = {}
+    shared: Set[int] = set()
+    for material_index, (face_offset, face_count) in enumerate(ranges):
+        values = indices[face_offset * 3:(face_offset + face_count) * 3]
+        material_indices.append(values)
+        for vertex in values:
+            if owner.setdefault(vertex, material_index) != material_index:
+                shared.add(vertex)
+
+    if _CYTHON_AVAILABLE:
+        flat_positions = array('d', [c for position in positions for c in position])
+        shared_flags = bytearray(vertex_count)
+        for vertex in shared:
+            shared_flags[vertex] = 1
+        set_ids: Dict[frozenset, int] = {}
+        morph_ids = array('i', bytes(4 * vertex_count))
+        for vertex, members in morph_sets.items():
+            morph_ids[vertex] = set_ids.setdefault(members, len(set_ids) + 1)
+
+    removed: Set[int] = set()
+    new_faces: List[List[int]] = []
+    face_counts = []
+    for material_index, values in enumerate(material_indices):
+        face_count = len(values) // 3
+        if material_index < len(model.materials) and face_count and ratio < 1.0:
+            target_faces = math.ceil(face_count * ratio)
+            if _CYTHON_AVAILABLE:
+                values, collapsed = collapse_edges_cython(
+                    array('I', values), flat_positions, shared_flags, morph_ids, target_faces, max_error)
+                removed.update(collapsed)
+            else:
+                values = iter(values)
+                simplifier = _MaterialSimplifier([[a, b, c] for a, b, c in zip(values, values, values)],
+                                                 positions, shared, morph_sets)
+                simplifier.run(target_faces, max_error)
+                values = [vertex for face in simplifier.result() for vertex in face]
+                removed |= simplifier.removed
+        values = iter(values)
+        faces = [[a, b, c] for a, b, c in zip(values, values, values)]
+        new_faces.extend(faces)
+        face_counts.append(len(faces))
+
+    remap = [-1] * vertex_count
+    kept = []
+    for vertex in range(vertex_count):
+        if vertex not in removed:
+            remap[vertex] = len(kept)
+            kept.append(vertex)
+
+    lod = copy.copy(model)
+    lod.vertices = [_copy_vertex(model.vertices[vertex]) for vertex in kept]
+    lod.faces = [[remap[v] for v in face] for face in new_faces]
+    lod.materials = [copy.copy(material) for material in model.materials]
+    for material, count in zip(lod.materials, face_counts):
+        material.face_count = count * 3
+    lod.morphs = []
+    for morph in model.morphs:
+        morph = copy.copy(morph)
+        items = []
+        for item in morph.items:
+            if isinstance(item, (PmxMorphItemVertex, PmxMorphItemUV)):
+                if item.vertex_index in removed:
+                    continue
+                item = copy.copy(item)
+                item.vertex_index = remap[item.vertex_index]
+            items.append(item)
+        morph.items = items
+        lod.morphs.append(morph)
+    lod._name_index = None
+    lod._morph_engine = None
+    lod._mesh_index = None
+    lod._spatial_index = None
+    lod._bone_topology = None
+    return lod
+
+
+def generate_lods(model: PmxModel, ratios: Sequence[float] = (0.5, 0.25, 0.125),
+                  max_error: float = math.inf) -> List[PmxModel]:
+    """生成多级LOD
+
+    每一级从上一级继续简化，比例按原模型计算，必须递减。
+
+    Args:
+        model: PMX模型（不修改）
+        ratios: 各级相对原模型的面数比例
+        max_error: 每一级允许的最大二次误差
+
+    Returns:
+        各级LOD模型，顺序与 ratios 相同
+
+    Raises:
+        ValueError: ratios不是0-1之间的递减序列
+    """
+    lods = []
+    previous = 1.0
+    source = model
+    for ratio in ratios:
+        if not 0.0 < ratio <= previous:
+            raise ValueError(f"LOD比例必须在0-1之间且递减: {list(ratios)}")
+        source = simplify_mesh(source, ratio / previous, max_error)
+        lods.append(source)
+        previous = ratio
+    return lods
@@ -0,0 +1,259 @@
+"""
+PyPMXVMD 顶点空间索引
+
+把顶点位置放入均匀网格：顶点按格子编号排序后，坐标和原索引保存在两个扁平数组中，
+每个非空格子只记录其在数组中的 (起点, 终点)，不为顶点创建对象。
+
+最近顶点查询从查询点所在格子开始逐圈向外搜索，当下一圈不可能更近时停止；
+半径和包围盒查询只遍历与查询范围相交的格子。所有查询都接受扁平的坐标序列，一次处理一批点。
+"""
+
+import math
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from pypmxvmd.common.models.pmx import PmxModel
+
+_INF = float("inf")
+# 自动选择网格边长时，每个非空格子的目标平均顶点数
+_TARGET_DENSITY = 2.0
+
+
+class VertexSpatialIndex:
+    """顶点位置的均匀网格索引
+
+    通过 VertexSpatialIndex.of(model) 获取时索引缓存在模型上，替换或增删顶点列表后
+    自动重建；原地修改顶点位置后需传入 refresh=True。
+
+    Args:
+        positions: 扁平的顶点坐标 [x0, y0, z0, x1, ...]（如 MorphResult.positions）
+        cell_size: 网格边长，None时按包围盒和顶点数自动选择
+
+    Raises:
+        ValueError: 坐标数量不是3的倍数，或 cell_size 不为正数
+    """
+
+    def __init__(self, positions: Sequence[float], cell_size: Optional[float] = None):
+        if len(positions) % 3:
+            raise ValueError(f"坐标数量必须是3的倍数: {len(positions)}")
+        if cell_size is not None and cell_size <= 0:
+            raise ValueError(f"网格边长必须为正数: {cell_size}")
+        count = len(positions) // 3
+        self.vertex_count = count
+        axes = [positions[axis::3] for axis in range(3)]
+        self._lower = [min(values, default=0.0) for values in axes]
+        extent = [max(values, default=0.0) - low for values, low in zip(axes, self._lower)]
+        if cell_size is None:
+            cell_size = self._auto_cell_size(axes, extent)
+        self.cell_size = cell_size
+        keys = self._cell_keys(axes, cell_size)
+        order = sorted(range(count), key=keys.__getitem__)
+        self._order = array('I', order)
+        xs, ys, zs = axes
+        self._coords = array('d', [c for i in order for c in (xs[i], ys[i], zs[i])])
+        self._cells: Dict[int, Tuple[int, int]] = {}
+        start = 0
+        for position in range(1, count + 1):
+            if position == count or keys[order[position]] != keys[order[start]]:
+                self._cells[keys[order[start]]] = (start, position)
+                start = position
+        self._signature: Optional[tuple] = None
+
+    def _cell_keys(self, axes: List[Sequence[float]], cell_size: float) -> List[int]:
+        """设置网格尺寸并返回每个顶点所在格子的编号"""
+        inverse = 1.0 / cell_size
+        extent = [max(values, default=0.0) - low for values, low in zip(axes, self._lower)]
+        self._dims = [int(length * inverse) + 1 for length in extent]
+        nx, ny, _nz = self._dims
+        lx, ly, lz = self._lower
+        return [int((x - lx) * inverse) + nx * (int((y - ly) * inverse) + ny * int((z - lz) * inverse))
+                for x, y, z in zip(*axes)]
+
+    def _auto_cell_size(self, axes: List[Sequence[float]], extent: List[float]) -> float:
+        """按包围盒体积估算边长，再按非空格子的平均顶点数修正
+
+        模型顶点大多分布在表面上，按体积估算的格子过大，因此按实际占用情况缩小，
+        使每个非空格子平均约有 _TARGET_DENSITY 个顶点。
+        """
+        count = len(axes[0])
+        if not count:
+            return 1.0
+        longest = max(extent) or 1.0
+        volume = 1.0
+        for length in extent:
+            volume *= max(length, longest * 1e-3)
+        cell_size = (volume / count) ** (1.0 / 3.0)
+        for _attempt in range(4):
+            density = count / len(set(self._cell_keys(axes, cell_size)))
+            if density <= _TARGET_DENSITY * 1.5:
+                break
+            cell_size *= math.sqrt(_TARGET_DENSITY / density)
+        return cell_size
+
+    @staticmethod
+    def signature(model: PmxModel) -> tuple:
+        """用于判断缓存是否失效的模型签名（顶点列表的身份和长度）"""
+        return id(model.vertices), len(model.vertices)
+
+    @classmethod
+    def of(cls, model: PmxModel, refresh: bool = False) -> 'VertexSpatialIndex':
+        """获取模型顶点的空间索引，首次调用时构建并缓存在模型上"""
+        index = getattr(model, "_spatial_index", None)
+        if refresh or index is None or index._signature != cls.signature(model):
+            index = cls([c for vertex in model.vertices for c in vertex.position])
+            index._signature = cls.signature(model)
+            model._spatial_index = index
+        return index
+
+    def _cell_of(self, x: float, y: float, z: float) -> List[int]:
+        """查询点所在格子（限制在网格范围内）"""
+        inverse = 1.0 / self.cell_size
+        return [min(max(int(math.floor((c - low) * inverse)), 0), dim - 1)
+                for c, low, dim in zip((x, y, z), self._lower, self._dims)]
+
+    def _cell_range(self, low: float, high: float, axis: int) -> range:
+        inverse = 1.0 / self.cell_size
+        origin = self._lower[axis]
+        first = max(int(math.floor((low - origin) * inverse)), 0)
+        last = min(int(math.floor((high - origin) * inverse)), self._dims[axis] - 1)
+        return range(first, last + 1)
+
+    def _nearest(self, x: float, y: float, z: float, limit: float) -> Tuple[int, float]:
+        cells = self._cells
+        coords = self._coords
+        nx, ny, nz = self._dims
+        size = self.cell_size
+        cx, cy, cz = self._cell_of(x, y, z)
+        # 查询点到所在格子的距离；第 r+1 圈及以外的顶点距离查询点至少 r*size - gap
+        gap = math.sqrt(sum(
+            max(low + cell * size - c, c - (low + (cell + 1) * size), 0.0) ** 2
+            for c, low, cell in zip((x, y, z), self._lower, (cx, cy, cz))))
+        best = limit * limit if limit != _INF else _INF
+        best_slot = -1
+        for ring in range(max(nx, ny, nz) + 1):
+            for ix in range(max(cx - ring, 0), min(cx + ring, nx - 1) + 1):
+                edge_x = abs(ix - cx) == ring
+                for iy in range(max(cy - ring, 0), min(cy + ring, ny - 1) + 1):
+                    if edge_x or abs(iy - cy) == ring:
+                        layers = range(max(cz - ring, 0), min(cz + ring, nz - 1) + 1)
+                    else:
+                        layers = [iz for iz in (cz - ring, cz + ring) if 0 <= iz < nz]
+                    row = ix + nx * iy
+                    for iz in layers:
+                        span = cells.get(row + nx * ny * iz)
+                        if span is None:
+                            continue
+                        for slot in range(span[0], span[1]):
+                            base = slot * 3
+                            dx = coords[base] - x
+                            dy = coords[base + 1] - y
+                            dz = coords[base + 2] - z
+                            distance = dx * dx + dy * dy + dz * dz
+                            if distance < best or (distance == best and best_slot < 0):
+                                best = distance
+                                best_slot = slot
+            bound = ring * size - gap
+            if bound > 0 and bound * bound >= best:
+                break
+        if best_slot < 0:
+            return -1, _INF
+        return self._order[best_slot], math.sqrt(best)
+
+    def nearest(self, points: Sequence[float], max_distance: float = _INF) -> Tuple[array, array]:
+        """批量查询最近顶点
+
+        Args:
+            points: 扁平的查询点坐标 [x0, y0, z0, x1, ...]
+            max_distance: 最大距离，超过时视为没有找到
+
+        Returns:
+            (顶点索引 array('i')，未找到为-1; 距离 array('d')，未找到为inf)
+        """
+        indices = array('i')
+        distances = array('d')
+        for position in range(0, len(points) - 2, 3):
+            index, distance = self._nearest(points[position], points[position + 1],
+                                            points[position + 2], max_distance)
+            indices.append(index)
+            distances.append(distance)
+        return indices, distances
+
+    def within_radius(self, points: Sequence[float], radius: float) -> List[array]:
+        """批量查询与各查询点距离不超过 radius 的顶点
+
+        Returns:
+            每个查询点一个顶点索引数组 array('I')（按空间顺序，不按距离排序）
+        """
+        cells = self._cells
+        coords = self._coords
+        nx, ny, _nz = self._dims
+        limit = radius * radius
+        results = []
+        for position in range(0, len(points) - 2, 3):
+            x, y, z = points[position], points[position + 1], points[position + 2]
+            found = array('I')
+            for iz in self._cell_range(z - radius, z + radius, 2):
+                for iy in self._cell_range(y - radius, y + radius, 1):
+                    row = nx * (iy + ny * iz)
+                    for ix in self._cell_range(x - radius, x + radius, 0):
+                        span = cells.get(row + ix)
+                        if span is None:
+                            continue
+                        for slot in range(span[0], span[1]):
+                            base = slot * 3
+                            dx = coords[base] - x
+                            dy = coords[base + 1] - y
+                            dz = coords[base + 2] - z
+                            if dx * dx + dy * dy + dz * dz <= limit:
+                                found.append(self._order[slot])
+            results.append(found)
+        return results
+
+    def in_boxes(self, boxes: Sequence[float]) -> List[array]:
+        """批量查询位于轴对齐包围盒内（含边界）的顶点
+
+        Args:
+            boxes: 扁平的包围盒 [min_x, min_y, min_z, max_x, max_y, max_z, ...]
+
+        Returns:
+            每个包围盒一个顶点索引数组 array('I')
+        """
+        cells = self._cells
+        coords = self._coords
+        nx, ny, _nz = self._dims
+        results = []
+        for position in range(0, len(boxes) - 5, 6):
+            x0, y0, z0, x1, y1, z1 = boxes[position:position + 6]
+            found = array('I')
+            for iz in self._cell_range(z0, z1, 2):
+                for iy in self._cell_range(y0, y1, 1):
+                    row = nx * (iy + ny * iz)
+                    for ix in self._cell_range(x0, x1, 0):
+                        span = cells.get(row + ix)
+                        if span is None:
+                            continue
+                        for slot in range(span[0], span[1]):
+                            base = slot * 3
+                            if x0 <= coords[base] <= x1 and y0 <= coords[base + 1] <= y1 \
+                                    and z0 <= coords[base + 2] <= z1:
+                                found.append(self._order[slot])
+            results.append(found)
+        return results
+
+
+def nearest_vertices(source: PmxModel, target: PmxModel,
+                     max_distance: float = _INF) -> Tuple[array, array]:
+    """为 source 的每个顶点查找 target 中最近的顶点（用于权重、变形的迁移）
+
+    target 的空间索引缓存在 target 模型上。
+
+    Args:
+        source: 查询顶点所在的模型
+        target: 被查询的模型
+        max_distance: 最大距离，超过时视为没有找到
+
+    Returns:
+        (target 顶点索引 array('i')，未找到为-1; 距离 array('d')，未找到为inf)
+    """
+    points = array('d', [c for vertex in source.vertices for c in vertex.position])
+    return VertexSpatialIndex.of(target).nearest(points, max_distance)
@@ -0,0 +1,76 @@
+"""
+PyPMXVMD 按材质拆分子网格
+
+基于解析时预先计算的 PmxMeshIndex：各材质的面索引直接取索引缓冲区的 memoryview 切片，
+不复制也不遍历面列表。压缩模式为每个材质重新编号顶点，输出局部索引和所用顶点的原索引。
+"""
+
+from array import array
+from typing import List, Optional, Sequence, Union
+
+from pypmxvmd.common.models.pmx import PmxModel, PmxMeshIndex
+
+
+class MaterialSubmesh:
+    """单个材质的子网格
+
+    Attributes:
+        material_index: 材质索引
+        face_offset: 起始面（三角面为单位）
+        face_count: 面数
+        indices: 顶点索引，每3个为一个三角面；未压缩时为模型索引缓冲区的 memoryview 切片，
+            压缩时为指向 vertex_indices 的局部索引 array('I')
+        vertex_indices: 压缩时为子网格使用的模型顶点索引（按首次出现顺序），未压缩时为None
+    """
+
+    def __init__(self, material_index: int, face_offset: int, face_count: int,
+                 indices: Union[memoryview, array], vertex_indices: Optional[array] = None):
+        self.material_index = material_index
+        self.face_offset = face_offset
+        self.face_count = face_count
+        self.indices = indices
+        self.vertex_indices = vertex_indices
+
+    def gather(self, values: Sequence[float], stride: int) -> Sequence[float]:
+        """按 vertex_indices 提取逐顶点数据（例如 MorphResult.positions，stride=3）
+
+        未压缩的子网格使用模型的全部顶点，直接返回 values。
+        """
+        if self.vertex_indices is None:
+            return values
+        typecode = values.typecode if isinstance(values, array) else 'f'
+        return array(typecode, [values[v * stride + c] for v in self.vertex_indices for c in range(stride)])
+
+    def __repr__(self) -> str:
+        return (f"MaterialSubmesh(material_index={self.material_index}, face_offset={self.face_offset}, "
+                f"face_count={self.face_count}, compact={self.vertex_indices is not None})")
+
+
+def _compact(indices: memoryview) -> tuple:
+    remap = {}
+    local = array('I', [remap.setdefault(v, len(remap)) for v in indices])
+    return local, array('I', remap)
+
+
+def extract_submeshes(model: PmxModel, compact: bool = False) -> List[MaterialSubmesh]:
+    """按材质拆分模型的面索引
+
+    Args:
+        model: PMX模型
+        compact: 是否为每个材质重新编号顶点（输出局部索引和 vertex_indices）
+
+    Returns:
+        按材质顺序排列的子网格列表
+
+    Raises:
+        ValueError: 材质面数之和超过模型面数
+    """
+    mesh_index = PmxMeshIndex.of(model)
+    submeshes = []
+    for material_index, (face_offset, face_count) in enumerate(mesh_index.ranges):
+        indices = mesh_index.material_faces(material_index)
+        vertex_indices = None
+        if compact:
+            indices, vertex_indices = _compact(indices)
+        submeshes.append(MaterialSubmesh(material_index, face_offset, face_count, indices, vertex_indices))
+    return submeshes
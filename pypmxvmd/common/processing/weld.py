@@ -0,0 +1,170 @@
+"""
+PyPMXVMD 顶点焊接
+
+合并位置、法线、UV、附加UV、权重和边缘缩放都相同（或在容差内）的重复顶点。
+精确模式以顶点全部属性组成的元组为键做一次哈希；容差模式把顶点位置放入边长为容差的
+网格，只与相邻27个格子中属性类别相同的代表顶点比较，不做两两比较。
+
+被顶点/UV变形引用的顶点只与变形偏移完全相同的顶点合并，合并后变形效果不变。
+"""
+
+import math
+from array import array
+from typing import Dict, List, Tuple
+
+from pypmxvmd.common.models.pmx import (
+    PmxModel, PmxMeshIndex, PmxVertex, PmxMorphItemVertex, PmxMorphItemUV
+)
+
+
+class WeldReport:
+    """顶点焊接结果
+
+    Attributes:
+        vertex_count_before: 焊接前的顶点数
+        vertex_count_after: 焊接后的顶点数
+        removed_faces: 被删除的退化三角面数（包括原本就退化的三角面）
+        vertex_remap: 原顶点索引 -> 新顶点索引
+    """
+
+    def __init__(self, vertex_count_before: int, vertex_count_after: int,
+                 removed_faces: int, vertex_remap: array):
+        self.vertex_count_before = vertex_count_before
+        self.vertex_count_after = vertex_count_after
+        self.removed_faces = removed_faces
+        self.vertex_remap = vertex_remap
+
+    def __repr__(self) -> str:
+        return (f"WeldReport(vertices={self.vertex_count_before}->{self.vertex_count_after}, "
+                f"removed_faces={self.removed_faces})")
+
+
+def _morph_signatures(model: PmxModel) -> Dict[int, tuple]:
+    """顶点索引 -> 引用该顶点的 (变形索引, 偏移) 元组"""
+    vertex_count = len(model.vertices)
+    signatures: Dict[int, list] = {}
+    for morph_index, morph in enumerate(model.morphs):
+        for item in morph.items:
+            if isinstance(item, (PmxMorphItemVertex, PmxMorphItemUV)):
+                if not 0 <= item.vertex_index < vertex_count:
+                    raise ValueError(f"变形 '{morph.name_jp}' 的顶点索引越界: {item.vertex_index}")
+                signatures.setdefault(item.vertex_index, []).append((morph_index, tuple(item.offset)))
+    return {vertex: tuple(entries) for vertex, entries in signatures.items()}
+
+
+def _exact_key(vertex: PmxVertex, morphs: tuple) -> tuple:
+    return (tuple(vertex.position), tuple(vertex.normal), tuple(vertex.uv),
+            tuple(tuple(uv) for uv in vertex.additional_uvs), vertex.weight_mode,
+            tuple(tuple(pair) for pair in vertex.weight), vertex.edge_scale, morphs)
+
+
+def _split(vertex: PmxVertex, morphs: tuple) -> Tuple[tuple, List[float]]:
+    """拆分为必须完全相同的类别键和可在容差内比较的连续分量"""
+    category = (vertex.weight_mode, tuple(pair[0] for pair in vertex.weight),
+                len(vertex.additional_uvs), morphs)
+    values = list(vertex.position) + list(vertex.normal) + list(vertex.uv)
+    for uv in vertex.additional_uvs:
+        values.extend(uv)
+    values.extend(pair[1] for pair in vertex.weight)
+    values.append(vertex.edge_scale)
+    return category, values
+
+
+def _cluster_exact(vertices: List[PmxVertex], signatures: Dict[int, tuple]) -> List[int]:
+    representatives: Dict[tuple, int] = {}
+    return [representatives.setdefault(_exact_key(vertex, signatures.get(index, ())), index)
+            for index, vertex in enumerate(vertices)]
+
+
+def _cluster_grid(vertices: List[PmxVertex], signatures: Dict[int, tuple], epsilon: float) -> List[int]:
+    grid: Dict[tuple, List[Tuple[int, List[float]]]] = {}
+    neighbours = [(dx, dy, dz) for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)]
+    owner = []
+    for index, vertex in enumerate(vertices):
+        category, values = _split(vertex, signatures.get(index, ()))
+        cx, cy, cz = (math.floor(c / epsilon) for c in vertex.position)
+        match = index
+        for dx, dy, dz in neighbours:
+            for candidate, candidate_values in grid.get((cx + dx, cy + dy, cz + dz, category), ()):
+                if all(abs(a - b) <= epsilon for a, b in zip(values, candidate_values)):
+                    match = candidate
+                    break
+            if match != index:
+                break
+        if match == index:
+            grid.setdefault((cx, cy, cz, category), []).append((index, values))
+        owner.append(match)
+    return owner
+
+
+def weld_vertices(model: PmxModel, epsilon: float = 0.0) -> WeldReport:
+    """原地合并重复顶点
+
+    重复顶点保留首次出现的一个，面和顶点/UV变形的顶点索引同步改写；合并后有重复顶点的
+    退化三角面被删除，材质的面数相应减少。
+
+    Args:
+        model: PMX模型（原地修改）
+        epsilon: 各属性分量的绝对容差，0表示要求完全相同
+
+    Returns:
+        WeldReport
+
+    Raises:
+        ValueError: epsilon为负数，材质面数之和超过模型面数，或变形引用了越界的顶点索引
+    """
+    if epsilon < 0:
+        raise ValueError(f"容差不能为负数: {epsilon}")
+    vertices = model.vertices
+    mesh_index = PmxMeshIndex.of(model)
+    signatures = _morph_signatures(model)
+    if epsilon:
+        owner = _cluster_grid(vertices, signatures, epsilon)
+    else:
+        owner = _cluster_exact(vertices, signatures)
+
+    remap = array('i', [-1]) * len(vertices)
+    welded = []
+    for index, representative in enumerate(owner):
+        if representative == index:
+            remap[index] = len(welded)
+            welded.append(vertices[index])
+        else:
+            remap[index] = remap[representative]
+
+    # 改写面索引并删除退化三角面；未被材质覆盖的面视为一个额外的范围
+    indices = mesh_index.indices
+    ranges = list(mesh_index.ranges)
+    covered = sum(count for _offset, count in ranges)
+    ranges.append((covered, len(indices) // 3 - covered))
+    faces = []
+    kept_counts = []
+    for face_offset, face_count in ranges:
+        kept = 0
+        for position in range(face_offset * 3, (face_offset + face_count) * 3, 3):
+            a, b, c = remap[indices[position]], remap[indices[position + 1]], remap[indices[position + 2]]
+            if a != b and b != c and a != c:
+                faces.append([a, b, c])
+                kept += 1
+        kept_counts.append(kept)
+    for material, kept in zip(model.materials, kept_counts):
+        material.face_count = kept * 3
+
+    # 被合并顶点的变形项目与代表顶点的项目相同，只保留代表顶点的项目
+    for morph in model.morphs:
+        if any(isinstance(item, (PmxMorphItemVertex, PmxMorphItemUV)) for item in morph.items):
+            items = []
+            for item in morph.items:
+                if isinstance(item, (PmxMorphItemVertex, PmxMorphItemUV)):
+                    if owner[item.vertex_index] != item.vertex_index:
+                        continue
+                    item.vertex_index = remap[item.vertex_index]
+                items.append(item)
+            morph.items = items
+
+    vertex_count_before = len(vertices)
+    removed_faces = len(indices) // 3 - len(faces)
+    model.vertices = welded
+    model.faces = faces
+    model._mesh_index = None
+    return WeldReport(vertex_count_before, len(welded), removed_faces, remap)
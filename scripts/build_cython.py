@@ -7,8 +7,13 @@ Cython模块编译脚本
 
 编译后的模块可直接导入使用:
     from pypmxvmd.common.io._fast_binary import FastBinaryReader
+    from pypmxvmd.common.io._fast_text import format_float_column_cython
     from pypmxvmd.common.parsers._fast_vmd import parse_vmd_cython
     from pypmxvmd.common.parsers._fast_pmx import parse_pmx_cython
+    from pypmxvmd.common.parsers._fast_vpd import tokenize_vpd_cython
+    from pypmxvmd.common.processing._fast_normals import normal_sums_cython
+    from pypmxvmd.common.processing._fast_simplify import collapse_edges_cython
+    from pypmxvmd.common.processing._fast_optimize import tipsify_cython
 """
 
 import os
@@ -40,6 +45,11 @@ def build_cython_modules():
             sources=["pypmxvmd/common/io/_fast_binary.pyx"],
             language="c",
         ),
+        Extension(
+            "pypmxvmd.common.io._fast_text",
+            sources=["pypmxvmd/common/io/_fast_text.pyx"],
+            language="c",
+        ),
         Extension(
             "pypmxvmd.common.parsers._fast_vmd",
             sources=["pypmxvmd/common/parsers/_fast_vmd.pyx"],
@@ -50,6 +60,26 @@ def build_cython_modules():
             sources=["pypmxvmd/common/parsers/_fast_pmx.pyx"],
             language="c",
         ),
+        Extension(
+            "pypmxvmd.common.parsers._fast_vpd",
+            sources=["pypmxvmd/common/parsers/_fast_vpd.pyx"],
+            language="c",
+        ),
+        Extension(
+            "pypmxvmd.common.processing._fast_normals",
+            sources=["pypmxvmd/common/processing/_fast_normals.pyx"],
+            language="c",
+        ),
+        Extension(
+            "pypmxvmd.common.processing._fast_simplify",
+            sources=["pypmxvmd/common/processing/_fast_simplify.pyx"],
+            language="c",
+        ),
+        Extension(
+            "pypmxvmd.common.processing._fast_optimize",
+            sources=["pypmxvmd/common/processing/_fast_optimize.pyx"],
+            language="c",
+        ),
     ]
 
     # 编译选项
@@ -112,8 +142,13 @@ def verify_compilation():
 
     modules = [
         ("pypmxvmd.common.io._fast_binary", "FastBinaryReader"),
+        ("pypmxvmd.common.io._fast_text", "format_float_column_cython"),
         ("pypmxvmd.common.parsers._fast_vmd", "parse_vmd_cython"),
         ("pypmxvmd.common.parsers._fast_pmx", "parse_pmx_cython"),
+        ("pypmxvmd.common.parsers._fast_vpd", "tokenize_vpd_cython"),
+        ("pypmxvmd.common.processing._fast_normals", "normal_sums_cython"),
+        ("pypmxvmd.common.processing._fast_simplify", "collapse_edges_cython"),
+        ("pypmxvmd.common.processing._fast_optimize", "tipsify_cython"),
     ]
 
     all_ok = True
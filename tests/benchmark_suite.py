@@ -0,0 +1,352 @@
+"""可复现的性能基准测试套件
+
+使用 tests/synthetic_data.py 按固定规模和随机种子生成VMD/PMX/VPD文件，
+对每种可用后端（Cython / 快速解析 / Nuthouse）计时解析、写入、文本往返、验证和复制，
+并记录吞吐量（MB/s、元素/s）与tracemalloc峰值内存。
+
+结果以JSON输出，可与基线JSON比较以发现性能回退：
+
+    python tests/benchmark_suite.py --preset small --output result.json
+    python tests/benchmark_suite.py --preset small --compare baseline.json --threshold 0.15
+
+存在回退时进程以退出码1结束，便于在CI中使用。
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pypmxvmd.common.parsers.vmd_parser import VmdParser, _CYTHON_AVAILABLE as _VMD_CYTHON
+from pypmxvmd.common.parsers.pmx_parser import PmxParser, _CYTHON_AVAILABLE as _PMX_CYTHON
+from pypmxvmd.common.parsers.vpd_parser import VpdParser
+from pypmxvmd.common.parsers.vmd_parser_nuthouse import VmdParserNuthouse
+from pypmxvmd.common.parsers.pmx_parser_nuthouse import PmxParserNuthouse
+
+from tests import synthetic_data
+
+# 各预设下的数据规模
+PRESETS: Dict[str, Dict[str, Dict[str, Any]]] = {
+    "tiny": {
+        "vmd": {"bone_frames": 200, "morph_frames": 50, "camera_frames": 20},
+        "pmx": {"vertex_count": 300, "face_count": 400, "bone_count": 20, "morph_count": 4},
+        "vpd": {"bone_count": 20, "morph_count": 5},
+    },
+    "small": {
+        "vmd": {"bone_frames": 5000, "morph_frames": 1000, "camera_frames": 200},
+        "pmx": {"vertex_count": 5000, "face_count": 8000, "bone_count": 100, "morph_count": 20},
+        "vpd": {"bone_count": 100, "morph_count": 30},
+    },
+    "large": {
+        "vmd": {"bone_frames": 100000, "morph_frames": 20000, "camera_frames": 2000,
+                "bone_tracks": 120, "morph_tracks": 60},
+        "pmx": {"vertex_count": 100000, "face_count": 150000, "bone_count": 400,
+                "morph_count": 100, "morph_item_count": 500},
+        "vpd": {"bone_count": 500, "morph_count": 100},
+    },
+}
+
+OPERATIONS = ("parse", "write", "text_roundtrip", "validate", "copy")
+
+# 导入耗时场景：在全新解释器中执行的语句
+IMPORT_CASES = {
+    "import_package": "import pypmxvmd",
+    "import_vmd": "import pypmxvmd; pypmxvmd.VmdParser",
+    "import_pmx": "import pypmxvmd; pypmxvmd.PmxParser",
+    "import_vpd": "import pypmxvmd; pypmxvmd.VpdParser",
+    "import_all": "import pypmxvmd; pypmxvmd.VmdParser; pypmxvmd.PmxParser; pypmxvmd.VpdParser",
+}
+
+
+def _element_count(obj) -> int:
+    """返回对象中主要元素的数量（关键帧/顶点/姿势数）"""
+    if hasattr(obj, "bone_frames"):
+        return (len(obj.bone_frames) + len(obj.morph_frames) + len(obj.camera_frames)
+                + len(obj.light_frames) + len(obj.shadow_frames) + len(obj.ik_frames))
+    if hasattr(obj, "vertices"):
+        return len(obj.vertices) + len(obj.faces)
+    if hasattr(obj, "bone_poses"):
+        return len(obj.bone_poses) + len(obj.morph_poses)
+    return 0
+
+
+def _backends(fmt: str) -> Dict[str, Dict[str, Callable]]:
+    """返回格式对应的后端表：{后端名: {parse, write, write_text, parse_text}}"""
+    if fmt == "vmd":
+        fast = VmdParser()
+        nut = VmdParserNuthouse()
+        table = {}
+        if _VMD_CYTHON:
+            table["cython"] = {"parse": fast.parse_file_cython, "write": fast.write_file,
+                               "write_text": fast.write_text_file, "parse_text": fast.parse_text_file}
+        table["fast"] = {"parse": fast.parse_file_fast, "write": fast.write_file,
+                         "write_text": fast.write_text_file, "parse_text": fast.parse_text_file}
+        table["nuthouse"] = {"parse": nut.parse_file, "write": nut.write_file,
+                             "write_text": nut.write_text_file, "parse_text": nut.parse_text_file}
+        return table
+    if fmt == "pmx":
+        fast = PmxParser()
+        nut = PmxParserNuthouse()
+        table = {}
+        if _PMX_CYTHON:
+            table["cython"] = {"parse": fast.parse_file_cython, "write": fast.write_file,
+                               "write_text": fast.write_text_file, "parse_text": fast.parse_text_file}
+        table["fast"] = {"parse": fast.parse_file_fast, "write": fast.write_file,
+                         "write_text": fast.write_text_file, "parse_text": fast.parse_text_file}
+        table["nuthouse"] = {"parse": nut.parse_file, "write": nut.write_file,
+                             "write_text": nut.write_text_file, "parse_text": nut.parse_text_file}
+        return table
+    if fmt == "vpd":
+        parser = VpdParser()
+        return {"python": {"parse": parser.parse_file, "write": parser.write_file,
+                           "write_text": parser.write_text_file, "parse_text": parser.parse_text_file}}
+    raise ValueError(f"未知格式: {fmt}")
+
+
+def _measure(func: Callable[[], Any], repeat: int, memory: bool) -> Dict[str, Any]:
+    """执行计时，返回中位数/最小值及可选的峰值内存
+
+    计时和内存测量分开进行，避免tracemalloc拖慢计时结果。
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    result = {"seconds": statistics.median(times), "min_seconds": min(times), "repeat": repeat}
+    if memory:
+        tracemalloc.start()
+        try:
+            func()
+            result["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def _run_imports(repeat: int) -> List[Dict[str, Any]]:
+    """在子进程中测量包的导入耗时
+
+    每次测量都启动新的解释器，只计入语句本身的耗时，不含解释器启动时间。
+    """
+    project_root = str(Path(__file__).parent.parent)
+    results = []
+    for operation, statement in IMPORT_CASES.items():
+        code = ("import time; _t = time.perf_counter(); "
+                f"{statement}; print(time.perf_counter() - _t)")
+        entry = {"format": "import", "backend": "python", "operation": operation,
+                 "bytes": 0, "elements": 0, "params": {"statement": statement}}
+        try:
+            times = []
+            for _ in range(repeat):
+                output = subprocess.run([sys.executable, "-c", code], cwd=project_root,
+                                        capture_output=True, text=True, check=True).stdout
+                times.append(float(output.strip().splitlines()[-1]))
+            entry.update({"seconds": statistics.median(times), "min_seconds": min(times),
+                          "repeat": repeat, "mb_per_s": None, "elements_per_s": None})
+        except Exception as e:
+            entry["error"] = f"{type(e).__name__}: {e}"
+        results.append(entry)
+    return results
+
+
+def _run_format(fmt: str, params: Dict[str, Any], workdir: Path, repeat: int,
+                memory: bool, seed: int, operations) -> List[Dict[str, Any]]:
+    """对单个格式的全部后端和操作执行基准测试"""
+    source = workdir / f"synthetic.{fmt}"
+    getattr(synthetic_data, f"write_{fmt}")(source, seed=seed, **params)
+    size = source.stat().st_size
+    results = []
+
+    for backend, funcs in _backends(fmt).items():
+        def record(operation: str, func: Callable[[], Any], elements: int, nbytes: int):
+            entry = {"format": fmt, "backend": backend, "operation": operation,
+                     "bytes": nbytes, "elements": elements, "params": params}
+            try:
+                entry.update(_measure(func, repeat, memory))
+                seconds = entry["seconds"] or 1e-12
+                entry["mb_per_s"] = nbytes / seconds / (1024 * 1024) if nbytes else None
+                entry["elements_per_s"] = elements / seconds if elements else None
+            except Exception as e:
+                entry["error"] = f"{type(e).__name__}: {e}"
+            results.append(entry)
+
+        try:
+            obj = funcs["parse"](source)
+        except Exception as e:
+            results.append({"format": fmt, "backend": backend, "operation": "parse",
+                            "bytes": size, "elements": 0, "params": params,
+                            "error": f"{type(e).__name__}: {e}"})
+            continue
+        elements = _element_count(obj)
+
+        if "parse" in operations:
+            record("parse", lambda: funcs["parse"](source), elements, size)
+        if "write" in operations:
+            out_path = workdir / f"out_{backend}.{fmt}"
+            record("write", lambda: funcs["write"](obj, out_path), elements, size)
+        if "text_roundtrip" in operations:
+            text_path = workdir / f"out_{backend}_{fmt}.txt"
+
+            def roundtrip():
+                funcs["write_text"](obj, text_path)
+                funcs["parse_text"](text_path)
+            record("text_roundtrip", roundtrip, elements, size)
+        if "validate" in operations:
+            record("validate", obj.validate, elements, 0)
+        if "copy" in operations:
+            record("copy", obj.copy, elements, 0)
+    return results
+
+
+def run_suite(preset: str = "small", formats=("vmd", "pmx", "vpd", "import"), repeat: int = 3,
+              memory: bool = True, seed: int = 0, operations=OPERATIONS,
+              quiet: bool = True) -> Dict[str, Any]:
+    """运行基准测试套件
+
+    Args:
+        preset: 数据规模预设名称
+        formats: 参与测试的格式，"import" 表示测量包导入耗时
+        repeat: 每项操作的重复次数（取中位数）
+        memory: 是否测量tracemalloc峰值内存
+        seed: 合成数据的随机种子
+        operations: 参与测试的操作
+        quiet: 是否屏蔽解析器/写入器的进度输出
+
+    Returns:
+        可直接序列化为JSON的结果字典
+    """
+    if preset not in PRESETS:
+        raise ValueError(f"未知预设: {preset}，可选值: {', '.join(PRESETS)}")
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        for fmt in formats:
+            if fmt == "import":
+                results.extend(_run_imports(repeat))
+                continue
+            sink = io.StringIO() if quiet else None
+            with contextlib.redirect_stdout(sink) if quiet else contextlib.nullcontext():
+                results.extend(_run_format(fmt, PRESETS[preset][fmt], workdir,
+                                           repeat, memory, seed, operations))
+
+    return {
+        "meta": {
+            "preset": preset,
+            "seed": seed,
+            "repeat": repeat,
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "cython": {"vmd": _VMD_CYTHON, "pmx": _PMX_CYTHON},
+        },
+        "results": results,
+    }
+
+
+def _result_key(entry: Dict[str, Any]) -> tuple:
+    return entry["format"], entry["backend"], entry["operation"]
+
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any],
+                    threshold: float = 0.10) -> List[Dict[str, Any]]:
+    """与基线结果比较
+
+    Args:
+        current: 本次运行结果
+        baseline: 基线结果
+        threshold: 允许的相对减速比例，超过即视为回退
+
+    Returns:
+        每个可比较项目的比较记录列表，回退项目的 regression 为 True
+    """
+    base_map = {_result_key(e): e for e in baseline.get("results", []) if "seconds" in e}
+    comparisons = []
+    for entry in current.get("results", []):
+        key = _result_key(entry)
+        base = base_map.get(key)
+        if base is None or "seconds" not in entry:
+            continue
+        ratio = entry["seconds"] / base["seconds"] if base["seconds"] else float("inf")
+        comparisons.append({
+            "format": key[0], "backend": key[1], "operation": key[2],
+            "baseline_seconds": base["seconds"], "seconds": entry["seconds"],
+            "ratio": ratio, "regression": ratio > 1.0 + threshold,
+        })
+    return comparisons
+
+
+def _print_table(report: Dict[str, Any], comparisons: Optional[List[Dict[str, Any]]]) -> None:
+    """打印可读的结果表"""
+    ratios = {(c["format"], c["backend"], c["operation"]): c for c in comparisons or []}
+    print(f"{'格式':<5} {'后端':<9} {'操作':<15} {'中位数(s)':>10} {'MB/s':>9} {'元素/s':>12} {'峰值内存':>10}  备注")
+    for e in report["results"]:
+        if "error" in e:
+            print(f"{e['format']:<5} {e['backend']:<9} {e['operation']:<15} {'-':>10} {'-':>9} {'-':>12} {'-':>10}  {e['error']}")
+            continue
+        mbps = f"{e['mb_per_s']:.2f}" if e.get("mb_per_s") else "-"
+        eps = f"{e['elements_per_s']:.0f}" if e.get("elements_per_s") else "-"
+        mem = f"{e['peak_memory_bytes'] / 1024 / 1024:.1f}MB" if "peak_memory_bytes" in e else "-"
+        note = ""
+        cmp_entry = ratios.get(_result_key(e))
+        if cmp_entry:
+            note = f"x{cmp_entry['ratio']:.2f}" + (" 回退!" if cmp_entry["regression"] else "")
+        print(f"{e['format']:<5} {e['backend']:<9} {e['operation']:<15} {e['seconds']:>10.4f} {mbps:>9} {eps:>12} {mem:>10}  {note}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="PyPMXVMD 可复现性能基准测试")
+    parser.add_argument("--preset", default="small", choices=sorted(PRESETS))
+    parser.add_argument("--formats", default="vmd,pmx,vpd,import",
+                        help="逗号分隔的格式列表（import 为导入耗时）")
+    parser.add_argument("--operations", default=",".join(OPERATIONS), help="逗号分隔的操作列表")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="不测量峰值内存")
+    parser.add_argument("--output", help="结果JSON输出路径")
+    parser.add_argument("--compare", help="基线JSON路径")
+    parser.add_argument("--threshold", type=float, default=0.10, help="回退判定阈值（相对减速比例）")
+    args = parser.parse_args(argv)
+
+    report = run_suite(preset=args.preset,
+                       formats=[f for f in args.formats.split(",") if f],
+                       repeat=args.repeat,
+                       memory=not args.no_memory,
+                       seed=args.seed,
+                       operations=[o for o in args.operations.split(",") if o])
+
+    comparisons = None
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        comparisons = compare_results(report, baseline, args.threshold)
+        report["comparison"] = {"baseline": args.compare, "threshold": args.threshold,
+                                "items": comparisons}
+
+    _print_table(report, comparisons)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\n结果已写入: {args.output}")
+
+    if comparisons and any(c["regression"] for c in comparisons):
+        print("\n检测到性能回退")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,336 @@
+"""
+合成MMD测试数据生成器
+
+按给定的规模参数确定性地生成VMD/PMX/VPD文件内容，供基准测试与单元测试使用。
+相同的参数和随机种子总是生成逐字节相同的数据。
+生成器直接按照文件格式打包字节，不依赖被测的解析器/写入器。
+"""
+
+import random
+import struct
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Union
+
+# 常见的骨骼/变形名称，超出部分使用编号名称补足
+_BONE_NAMES = [
+    "全ての親", "センター", "グルーブ", "腰", "上半身", "上半身2", "首", "頭",
+    "左肩", "左腕", "左ひじ", "左手首", "右肩", "右腕", "右ひじ", "右手首",
+    "下半身", "左足", "左ひざ", "左足首", "右足", "右ひざ", "右足首",
+    "左足ＩＫ", "右足ＩＫ", "左つま先ＩＫ", "右つま先ＩＫ",
+]
+_MORPH_NAMES = [
+    "まばたき", "笑い", "ウィンク", "ウィンク右", "あ", "い", "う", "え", "お",
+    "にやり", "真面目", "困る", "怒り", "上", "下",
+]
+
+# PMX权重模式编号（与WeightMode枚举一致）
+_WEIGHT_MODE_IDS = {"BDEF1": 0, "BDEF2": 1, "BDEF4": 2, "SDEF": 3, "QDEF": 4}
+
+_UNSIGNED_INDEX = {1: "B", 2: "H", 4: "I"}
+_SIGNED_INDEX = {1: "b", 2: "h", 4: "i"}
+
+
+def _pick_names(base: Sequence[str], prefix: str, count: int) -> list:
+    """返回count个不重复的名称"""
+    names = list(base[:count])
+    for i in range(len(names), count):
+        names.append(f"{prefix}{i:03d}")
+    return names
+
+
+def _fixed_sjis(text: str, length: int) -> bytes:
+    """编码为定长的Shift-JIS字节串（截断并以0填充）"""
+    raw = text.encode("shift_jis")[:length]
+    return raw + b"\x00" * (length - len(raw))
+
+
+def _random_quaternion(rng: random.Random) -> tuple:
+    """生成单位四元数 (x, y, z, w)"""
+    x, y, z, w = (rng.uniform(-1.0, 1.0) for _ in range(4))
+    norm = (x * x + y * y + z * z + w * w) ** 0.5 or 1.0
+    return x / norm, y / norm, z / norm, w / norm
+
+
+def _index_size_for(count: int) -> int:
+    """按元素数量选择最小的有符号索引字节数"""
+    if count < 128:
+        return 1
+    if count < 32768:
+        return 2
+    return 4
+
+
+def _vertex_index_size_for(count: int) -> int:
+    """按顶点数量选择最小的无符号顶点索引字节数"""
+    if count < 256:
+        return 1
+    if count < 65536:
+        return 2
+    return 4
+
+
+# ===== VMD =====
+
+def make_vmd_bytes(bone_frames: int = 1000,
+                   morph_frames: int = 200,
+                   camera_frames: int = 0,
+                   bone_tracks: int = 20,
+                   morph_tracks: int = 10,
+                   model_name: str = "SyntheticModel",
+                   seed: int = 0) -> bytes:
+    """生成VMD二进制数据
+
+    关键帧按轨道轮流分配，帧号随轨道内序号递增。
+
+    Args:
+        bone_frames: 骨骼关键帧数量
+        morph_frames: 变形关键帧数量
+        camera_frames: 相机关键帧数量
+        bone_tracks: 不同骨骼名称的数量
+        morph_tracks: 不同变形名称的数量
+        model_name: 模型名称
+        seed: 随机种子
+
+    Returns:
+        VMD文件的完整字节内容
+    """
+    rng = random.Random(seed)
+    out = bytearray()
+    out += b"Vocaloid Motion Data 0002" + b"\x00" * 5
+    out += _fixed_sjis(model_name, 20)
+
+    bone_names = [_fixed_sjis(n, 15) for n in _pick_names(_BONE_NAMES, "ボーン", max(1, bone_tracks))]
+    bone_struct = struct.Struct("<15s I 7f")
+    interp_struct = struct.Struct("<bb bb 12b xbb 45x")
+    out += struct.pack("<I", bone_frames)
+    for i in range(bone_frames):
+        track = i % len(bone_names)
+        frame_num = (i // len(bone_names)) * 3
+        qx, qy, qz, qw = _random_quaternion(rng)
+        out += bone_struct.pack(bone_names[track], frame_num,
+                                rng.uniform(-5, 5), rng.uniform(-5, 5), rng.uniform(-5, 5),
+                                qx, qy, qz, qw)
+        ax, ay, bx, by = (rng.randint(0, 127) for _ in range(4))
+        # x_ax, y_ax, phys1, phys2, x_ay, y_ay, z_ay, r_ay, x_bx..r_bx, x_by..r_by, z_ax, r_ax
+        out += interp_struct.pack(ax, ax, ax, ax, ay, ay, ay, ay,
+                                  bx, bx, bx, bx, by, by, by, by, ax, ax)
+
+    morph_names = [_fixed_sjis(n, 15) for n in _pick_names(_MORPH_NAMES, "モーフ", max(1, morph_tracks))]
+    morph_struct = struct.Struct("<15s I f")
+    out += struct.pack("<I", morph_frames)
+    for i in range(morph_frames):
+        track = i % len(morph_names)
+        frame_num = (i // len(morph_names)) * 2
+        out += morph_struct.pack(morph_names[track], frame_num, rng.random())
+
+    cam_struct = struct.Struct("<I 7f 24b I ?")
+    out += struct.pack("<I", camera_frames)
+    for i in range(camera_frames):
+        interp = [rng.randint(0, 127) for _ in range(24)]
+        out += cam_struct.pack(i * 5, -rng.uniform(10, 60),
+                               rng.uniform(-5, 5), rng.uniform(0, 20), rng.uniform(-5, 5),
+                               rng.uniform(-1, 1), rng.uniform(-3, 3), rng.uniform(-0.2, 0.2),
+                               *interp, rng.randint(10, 60), rng.random() < 0.9)
+
+    # 光源、阴影、IK帧
+    out += struct.pack("<III", 0, 0, 0)
+    return bytes(out)
+
+
+# ===== PMX =====
+
+def make_pmx_bytes(vertex_count: int = 1000,
+                   face_count: int = 1500,
+                   bone_count: int = 30,
+                   morph_count: int = 10,
+                   material_count: int = 4,
+                   morph_item_count: int = 50,
+                   weight_modes: Optional[Dict[str, float]] = None,
+                   additional_uvs: int = 0,
+                   vertex_index_size: Optional[int] = None,
+                   bone_index_size: Optional[int] = None,
+                   texture_count: int = 3,
+                   utf8: bool = False,
+                   seed: int = 0) -> bytes:
+    """生成PMX 2.0二进制数据
+
+    Args:
+        vertex_count: 顶点数量
+        face_count: 三角面数量
+        bone_count: 骨骼数量（至少为1）
+        morph_count: 顶点变形数量
+        material_count: 材质数量，面平均分配给各材质
+        morph_item_count: 每个变形的顶点偏移数量
+        weight_modes: 权重模式比例，例如 {"BDEF1": 0.5, "BDEF2": 0.5}
+        additional_uvs: 附加UV数量 (0-4)
+        vertex_index_size: 顶点索引字节数，None时按顶点数自动选择
+        bone_index_size: 骨骼索引字节数，None时按骨骼数自动选择
+        texture_count: 纹理数量
+        utf8: 是否使用UTF-8编码文本（否则UTF-16LE）
+        seed: 随机种子
+
+    Returns:
+        PMX文件的完整字节内容
+    """
+    rng = random.Random(seed)
+    bone_count = max(1, bone_count)
+    material_count = max(1, material_count)
+    weight_modes = weight_modes or {"BDEF1": 0.4, "BDEF2": 0.4, "BDEF4": 0.15, "SDEF": 0.05}
+    mode_ids = [_WEIGHT_MODE_IDS[name] for name in weight_modes]
+    mode_weights = list(weight_modes.values())
+
+    vsize = vertex_index_size or _vertex_index_size_for(vertex_count)
+    bsize = bone_index_size or _index_size_for(bone_count)
+    tsize = _index_size_for(texture_count)
+    msize = _index_size_for(material_count)
+    morph_size = _index_size_for(morph_count)
+    rb_size = 1
+    vfmt = "<" + _UNSIGNED_INDEX[vsize]
+    bfmt = _SIGNED_INDEX[bsize]
+    tfmt = "<" + _SIGNED_INDEX[tsize]
+    encoding = "utf-8" if utf8 else "utf-16le"
+
+    def text(value: str) -> bytes:
+        raw = value.encode(encoding)
+        return struct.pack("<I", len(raw)) + raw
+
+    out = bytearray()
+    out += b"PMX " + struct.pack("<f", 2.0)
+    out += struct.pack("<9B", 8, 1 if utf8 else 0, additional_uvs,
+                       vsize, tsize, msize, bsize, morph_size, rb_size)
+    out += text("合成モデル") + text("SyntheticModel")
+    out += text("ベンチマーク用") + text("generated for benchmarks")
+
+    # 顶点
+    base = struct.Struct("<8f")
+    bdef1 = struct.Struct("<B" + bfmt)
+    bdef2 = struct.Struct("<B2" + bfmt + "f")
+    bdef4 = struct.Struct("<B4" + bfmt + "4f")
+    sdef = struct.Struct("<B2" + bfmt + "10f")
+    out += struct.pack("<I", vertex_count)
+    for _ in range(vertex_count):
+        out += base.pack(rng.uniform(-10, 10), rng.uniform(0, 20), rng.uniform(-10, 10),
+                         0.0, 1.0, 0.0, rng.random(), rng.random())
+        for _ in range(additional_uvs):
+            out += struct.pack("<4f", rng.random(), rng.random(), rng.random(), rng.random())
+        mode = rng.choices(mode_ids, mode_weights)[0]
+        b = [rng.randrange(bone_count) for _ in range(4)]
+        if mode == 0:
+            out += bdef1.pack(mode, b[0])
+        elif mode == 1:
+            out += bdef2.pack(mode, b[0], b[1], rng.random())
+        elif mode == 3:
+            out += sdef.pack(mode, b[0], b[1], rng.random(), *(rng.uniform(-1, 1) for _ in range(9)))
+        else:
+            w = [rng.random() for _ in range(4)]
+            total = sum(w)
+            out += bdef4.pack(mode, *b, *(x / total for x in w))
+        out += struct.pack("<f", 1.0)
+
+    # 面
+    out += struct.pack("<I", face_count * 3)
+    index_struct = struct.Struct("<3" + _UNSIGNED_INDEX[vsize])
+    for _ in range(face_count):
+        out += index_struct.pack(rng.randrange(vertex_count), rng.randrange(vertex_count),
+                                 rng.randrange(vertex_count))
+
+    # 纹理
+    out += struct.pack("<I", texture_count)
+    for i in range(texture_count):
+        out += text(f"tex/texture_{i:02d}.png")
+
+    # 材质（面数按PMX规范为顶点索引数）
+    out += struct.pack("<I", material_count)
+    per_material = [face_count // material_count] * material_count
+    per_material[-1] += face_count - sum(per_material)
+    for i in range(material_count):
+        out += text(f"材質{i}") + text(f"material_{i}")
+        out += struct.pack("<4f3ff3f", 1.0, 1.0, 1.0, 1.0, 0.5, 0.5, 0.5, 5.0, 0.3, 0.3, 0.3)
+        out += struct.pack("<B4ff", 0x1E, 0.0, 0.0, 0.0, 1.0, 1.0)
+        out += struct.pack(tfmt, (i % texture_count) if texture_count else -1)
+        out += struct.pack(tfmt, -1)
+        out += struct.pack("<BBB", 0, 1, i % 10)
+        out += text("")
+        out += struct.pack("<I", per_material[i] * 3)
+
+    # 骨骼（链式父子关系，尾部指向下一个骨骼）
+    out += struct.pack("<I", bone_count)
+    bone_names = _pick_names(_BONE_NAMES, "ボーン", bone_count)
+    for i in range(bone_count):
+        out += text(bone_names[i]) + text(f"bone_{i}")
+        out += struct.pack("<3f", 0.0, float(i), 0.0)
+        out += struct.pack("<" + bfmt, i - 1)
+        out += struct.pack("<i", 0)
+        out += struct.pack("<BB", 0x1B, 0x00)
+        out += struct.pack("<" + bfmt, i + 1 if i + 1 < bone_count else -1)
+
+    # 顶点变形
+    out += struct.pack("<I", morph_count)
+    morph_names = _pick_names(_MORPH_NAMES, "モーフ", morph_count)
+    item_struct = struct.Struct(vfmt + "3f")
+    for i in range(morph_count):
+        out += text(morph_names[i]) + text(f"morph_{i}")
+        items = min(morph_item_count, vertex_count)
+        out += struct.pack("<bbi", 4, 1, items)
+        for _ in range(items):
+            out += item_struct.pack(rng.randrange(vertex_count), rng.uniform(-0.1, 0.1),
+                                    rng.uniform(-0.1, 0.1), rng.uniform(-0.1, 0.1))
+
+    # 显示枠、刚体、关节
+    out += struct.pack("<iii", 0, 0, 0)
+    return bytes(out)
+
+
+# ===== VPD =====
+
+def make_vpd_text(bone_count: int = 50,
+                  morph_count: int = 10,
+                  model_name: str = "SyntheticModel",
+                  seed: int = 0) -> str:
+    """生成VPD文本内容
+
+    Args:
+        bone_count: 骨骼姿势数量
+        morph_count: 变形姿势数量
+        model_name: 模型名称
+        seed: 随机种子
+
+    Returns:
+        VPD文件文本（写入时使用Shift-JIS编码）
+    """
+    rng = random.Random(seed)
+    lines = ["Vocaloid Pose Data file", "", f"{model_name}.osm;", f"{bone_count};", ""]
+    for i, name in enumerate(_pick_names(_BONE_NAMES, "ボーン", bone_count)):
+        qx, qy, qz, qw = _random_quaternion(rng)
+        lines.append(f"Bone{i}{{{name}")
+        lines.append(f"  {rng.uniform(-1, 1):.6f},{rng.uniform(-1, 1):.6f},{rng.uniform(-1, 1):.6f};")
+        lines.append(f"  {qx:.6f},{qy:.6f},{qz:.6f},{qw:.6f};")
+        lines.append("}")
+        lines.append("")
+    for i, name in enumerate(_pick_names(_MORPH_NAMES, "モーフ", morph_count)):
+        lines.append(f"Morph{i}{{{name}")
+        lines.append(f"  {rng.random():.3f};")
+        lines.append("}")
+        lines.append("")
+    return "\n".join(lines) + "\n"
+
+
+def write_vmd(path: Union[str, Path], **kwargs) -> Path:
+    """生成VMD并写入文件，参数同 make_vmd_bytes"""
+    path = Path(path)
+    path.write_bytes(make_vmd_bytes(**kwargs))
+    return path
+
+
+def write_pmx(path: Union[str, Path], **kwargs) -> Path:
+    """生成PMX并写入文件，参数同 make_pmx_bytes"""
+    path = Path(path)
+    path.write_bytes(make_pmx_bytes(**kwargs))
+    return path
+
+
+def write_vpd(path: Union[str, Path], **kwargs) -> Path:
+    """生成VPD并写入文件，参数同 make_vpd_text"""
+    path = Path(path)
+    path.write_bytes(make_vpd_text(**kwargs).encode("shift_jis"))
+    return path
@@ -0,0 +1,156 @@
+"""
+Tests for bone section parsing and the cached bone hierarchy topology.
+"""
+
+import math
+import struct
+
+import pytest
+
+from pypmxvmd.common.models.pmx import (
+    PmxModel, PmxBone, PmxBoneIkLink, PmxBoneTopology, BoneFlags
+)
+from pypmxvmd.common.parsers.pmx_sections import PmxSectionReader, parse_bones_and_morphs
+
+
+def _text(value):
+    raw = value.encode("utf-16le")
+    return struct.pack("<I", len(raw)) + raw
+
+
+def _bone(parent, layer=0, after_physics=False, ik_links=None):
+    flags = BoneFlags(deform_after_phys=after_physics, ik=ik_links is not None)
+    links = [PmxBoneIkLink(bone_index=index) for index in ik_links or []]
+    return PmxBone(parent_index=parent, deform_layer=layer, bone_flags=flags, ik_links=links)
+
+
+def _model(*bones):
+    model = PmxModel()
+    model.bones = list(bones)
+    return model
+
+
+class TestBoneSection:
+    """Bone records are decoded by the shared section reader."""
+
+    def _bone_section(self):
+        data = struct.pack("<i", 3)
+        # 0: root, tail offset, local axes
+        data += _text("センター") + _text("center") + struct.pack("<3fbi", 0, 8, 0, -1, 0)
+        data += struct.pack("<BB", 0x1A, 0x08) + struct.pack("<3f", 0, 1, 0)
+        data += struct.pack("<6f", 1, 0, 0, 0, 0, 1)
+        # 1: tail link, inherited rotation, fixed axis, external parent, after physics
+        data += _text("腕") + _text("arm") + struct.pack("<3fbi", 1, 2, 3, 0, 1)
+        data += struct.pack("<BB", 0x1B, 0x35) + struct.pack("<b", 0) + struct.pack("<bf", 0, 0.5)
+        data += struct.pack("<3f", 1, 0, 0) + struct.pack("<i", 7)
+        # 2: IK with one limited and one free link
+        data += _text("足IK") + _text("") + struct.pack("<3fbi", 0, 0, 0, 0, 2)
+        data += struct.pack("<BB", 0x3E, 0x00) + struct.pack("<3f", 0, 0, 1)
+        data += struct.pack("<bifi", 1, 40, math.radians(114.5916), 2)
+        data += struct.pack("<bB6f", 0, 1, math.radians(-180), 0, 0, math.radians(-0.5), 0, 0)
+        data += struct.pack("<bB", 1, 0)
+        return data
+
+    def test_read_bones(self):
+        data = self._bone_section()
+        reader = PmxSectionReader(data, 0, "utf-16le", (1, 1, 1, 1, 1, 1))
+        bones = reader.read_bones()
+        assert reader.pos == len(data)
+
+        center, arm, ik = bones
+        assert (center.name_jp, center.name_en, center.parent_index) == ("センター", "center", -1)
+        assert center.tail == [0.0, 1.0, 0.0]
+        assert center.bone_flags.visible and center.bone_flags.has_localaxis
+        assert center.bone_flags.rotateable and not center.bone_flags.translateable
+        assert (center.local_axis_x, center.local_axis_z) == ([1.0, 0.0, 0.0], [0.0, 0.0, 1.0])
+
+        assert (arm.position, arm.parent_index, arm.deform_layer, arm.tail) == ([1.0, 2.0, 3.0], 0, 1, 0)
+        assert arm.bone_flags.tail_usebonelink and arm.bone_flags.inherit_rot
+        assert arm.bone_flags.deform_after_phys and arm.bone_flags.has_external_parent
+        assert (arm.inherit_parent_index, arm.inherit_ratio) == (0, 0.5)
+        assert (arm.fixed_axis, arm.external_parent_index) == ([1.0, 0.0, 0.0], 7)
+
+        assert ik.bone_flags.ik and ik.bone_flags.translateable
+        assert (ik.ik_target_index, ik.ik_loop_count) == (1, 40)
+        assert ik.ik_angle_limit == pytest.approx(114.5916, abs=1e-3)
+        assert [link.bone_index for link in ik.ik_links] == [0, 1]
+        assert ik.ik_links[0].limit_min == pytest.approx([-180, 0, 0], abs=1e-4)
+        assert ik.ik_links[0].limit_max == pytest.approx([-0.5, 0, 0], abs=1e-4)
+        assert ik.ik_links[1].limit_min is None
+        for bone in bones:
+            bone.validate()
+
+    def test_parse_bones_and_morphs(self):
+        data = self._bone_section() + struct.pack("<i", 0)
+        bones, morphs = parse_bones_and_morphs(data, 0, "utf-16le", (1, 1, 1, 1, 1, 1))
+        assert [bone.name_jp for bone in bones] == ["センター", "腕", "足IK"]
+        assert morphs == []
+        assert parse_bones_and_morphs(data, len(data), "utf-16le", (1, 1, 1, 1, 1, 1)) == ([], [])
+
+
+class TestBoneTopology:
+    """Hierarchy arrays, Euler-tour subtree queries, evaluation order and IK membership."""
+
+    def _topology(self):
+        # 0 ─┬─ 1 ── 3
+        #    └─ 2 ── 4 (IK bone for links 3, 1)
+        # 5 (second root, after physics)
+        return PmxBoneTopology.of(_model(
+            _bone(-1), _bone(0, layer=1), _bone(0), _bone(1), _bone(2, layer=2, ik_links=[3, 1]),
+            _bone(-1, after_physics=True)))
+
+    def test_hierarchy(self):
+        topology = self._topology()
+        assert list(topology.parents) == [-1, 0, 0, 1, 2, -1]
+        assert list(topology.roots) == [0, 5]
+        assert list(topology.children(0)) == [1, 2]
+        assert list(topology.children(3)) == []
+        assert list(topology.depths) == [0, 1, 1, 2, 2, 0]
+        assert topology.ancestors(3) == [1, 0]
+        assert topology.ancestors(5) == []
+
+    def test_subtree_intervals(self):
+        topology = self._topology()
+        assert list(topology.preorder) == [0, 1, 3, 2, 4, 5]
+        assert list(topology.subtree(0)) == [0, 1, 3, 2, 4]
+        assert list(topology.subtree(2)) == [2, 4]
+        assert list(topology.subtree(5)) == [5]
+        assert topology.is_ancestor(0, 4) and topology.is_ancestor(1, 1)
+        assert not topology.is_ancestor(1, 4) and not topology.is_ancestor(5, 0)
+
+    def test_evaluation_order(self):
+        topology = self._topology()
+        assert list(topology.order) == [0, 2, 3, 1, 4, 5]
+        assert topology.after_physics == 5
+
+    def test_ik_membership(self):
+        topology = self._topology()
+        assert list(topology.ik_bones) == [4]
+        assert list(topology.ik_owners(1)) == [4]
+        assert list(topology.ik_owners(3)) == [4]
+        assert list(topology.ik_owners(4)) == []
+
+    def test_cached_and_invalidated(self):
+        model = _model(_bone(-1), _bone(0), _bone(1))
+        topology = PmxBoneTopology.of(model)
+        assert PmxBoneTopology.of(model) is topology
+        model.bones[2].parent_index = 0
+        rebuilt = PmxBoneTopology.of(model)
+        assert rebuilt is not topology
+        assert list(rebuilt.children(0)) == [1, 2]
+        model.bones[1].bone_flags.deform_after_phys = True
+        assert list(PmxBoneTopology.of(model).order) == [0, 2, 1]
+        model.bones.append(_bone(2))
+        assert list(PmxBoneTopology.of(model).subtree(2)) == [2, 3]
+
+    def test_empty_model(self):
+        topology = PmxBoneTopology.of(PmxModel())
+        assert len(topology.order) == 0 and len(topology.roots) == 0
+
+    def test_invalid_hierarchy(self):
+        with pytest.raises(ValueError):
+            PmxBoneTopology.of(_model(_bone(-1), _bone(5)))
+        with pytest.raises(ValueError):
+            PmxBoneTopology.of(_model(_bone(-1), _bone(2), _bone(1)))
+        with pytest.raises(ValueError):
+            PmxBoneTopology.of(_model(_bone(-1), _bone(0, ik_links=[9])))
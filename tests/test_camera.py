@@ -0,0 +1,152 @@
+"""
+Tests for camera motion sampling and view/projection matrix generation.
+"""
+
+import math
+
+import pytest
+
+import pypmxvmd
+from pypmxvmd.common.math3d import bezier_progress
+from pypmxvmd.common.models.vmd import VmdCameraFrame, VmdMotion
+
+LINEAR = [20, 20, 107, 107] * 6
+
+
+def _motion(*frames):
+    motion = VmdMotion()
+    motion.camera_frames = list(frames)
+    return motion
+
+
+def _transform(matrix, point):
+    return [sum(matrix[row][col] * value for col, value in enumerate(list(point) + [1.0]))
+            for row in range(4)]
+
+
+class TestCameraPlacement:
+    """Eye, target and view matrices follow MMD camera conventions."""
+
+    def test_default_camera(self):
+        motion = _motion(VmdCameraFrame(0, -45.0, [0.0, 10.0, 0.0]))
+        right = pypmxvmd.sample_camera(motion, [0])
+        assert right.eye(0) == pytest.approx([0.0, 10.0, 45.0])
+        assert list(right.targets) == pytest.approx([0.0, 10.0, 0.0])
+        assert right.fovs[0] == 30.0
+        left = pypmxvmd.sample_camera(motion, [0], right_handed=False)
+        assert left.eye(0) == pytest.approx([0.0, 10.0, -45.0])
+
+    @pytest.mark.parametrize("right_handed", [True, False])
+    def test_view_matrix(self, right_handed):
+        motion = _motion(VmdCameraFrame(0, -30.0, [1.0, 12.0, -2.0], [15.0, 40.0, 5.0]))
+        samples = pypmxvmd.sample_camera(motion, [0], right_handed=right_handed)
+        view = samples.view_matrix(0)
+        assert _transform(view, samples.eye(0))[:3] == pytest.approx([0.0, 0.0, 0.0], abs=1e-4)
+        depth = -30.0 if right_handed else 30.0
+        target = _transform(view, samples.targets[0:3])
+        assert target == pytest.approx([0.0, 0.0, depth, 1.0], abs=1e-4)
+        assert view[3] == [0.0, 0.0, 0.0, 1.0]
+
+    def test_yaw(self):
+        motion = _motion(VmdCameraFrame(0, -45.0, [0.0, 10.0, 0.0], [0.0, 90.0, 0.0]))
+        samples = pypmxvmd.sample_camera(motion, [0], right_handed=False)
+        assert samples.eye(0) == pytest.approx([-45.0, 10.0, 0.0], abs=1e-4)
+
+    def test_zero_distance(self):
+        motion = _motion(VmdCameraFrame(0, 0.0, [0.0, 10.0, 0.0]))
+        view = pypmxvmd.sample_camera(motion, [0]).view_matrix(0)
+        assert _transform(view, [0.0, 10.0, -5.0])[:3] == pytest.approx([0.0, 0.0, -5.0])
+
+
+class TestCameraInterpolation:
+    """Per-channel Bezier curves, holds and cuts."""
+
+    def test_channels(self):
+        ease = list(LINEAR)
+        ease[16:20] = [127, 0, 0, 127]  # distance
+        motion = _motion(VmdCameraFrame(0, -40.0, [0.0, 0.0, 0.0], [0.0, 0.0, 0.0], LINEAR, 20),
+                         VmdCameraFrame(10, -20.0, [10.0, 0.0, 0.0], [0.0, 30.0, 0.0], ease, 40))
+        samples = pypmxvmd.sample_camera(motion, [5], right_handed=False)
+        assert samples.targets[0] == pytest.approx(5.0, abs=1e-4)
+        assert samples.fovs[0] == pytest.approx(30.0, abs=1e-4)
+        distance = -40.0 + 20.0 * bezier_progress((127, 0, 0, 127), 0.5)
+        eye = samples.eye(0)
+        assert math.hypot(eye[0] - 5.0, eye[2]) == pytest.approx(abs(distance), abs=1e-4)
+        assert math.degrees(math.atan2(-eye[0] + 5.0, -eye[2])) == pytest.approx(15.0, abs=1e-3)
+
+    def test_holds_outside_range(self):
+        motion = _motion(VmdCameraFrame(10, -45.0, [1.0, 0.0, 0.0]),
+                         VmdCameraFrame(20, -45.0, [3.0, 0.0, 0.0]))
+        samples = pypmxvmd.sample_camera(motion, [0, 10, 25])
+        assert list(samples.targets[0::3]) == [1.0, 1.0, 3.0]
+
+    def test_cut(self):
+        motion = _motion(VmdCameraFrame(0, -45.0, [0.0, 0.0, 0.0]),
+                         VmdCameraFrame(10, -45.0, [10.0, 0.0, 0.0]),
+                         VmdCameraFrame(11, -45.0, [-50.0, 0.0, 0.0]))
+        samples = pypmxvmd.sample_camera(motion, [10.0, 10.5, 11.0, 12.0])
+        assert list(samples.targets[0::3]) == [10.0, 10.0, -50.0, -50.0]
+
+    def test_unsorted_keys_and_queries(self):
+        first = VmdCameraFrame(0, -45.0, [0.0, 0.0, 0.0])
+        second = VmdCameraFrame(10, -45.0, [10.0, 0.0, 0.0])
+        samples = pypmxvmd.sample_camera(_motion(second, first), [10, 2.5, 0, 5])
+        assert list(samples.frames) == [10, 2.5, 0, 5]
+        assert list(samples.targets[0::3]) == pytest.approx([10.0, 2.5, 0.0, 5.0], abs=1e-4)
+        assert len(samples) == 4 and len(samples.view_matrices) == 64
+
+    def test_file_round_trip(self, tmp_path):
+        ease = [20, 20, 107, 107] * 6
+        ease[0:4] = [100, 10, 110, 40]  # X
+        motion = _motion(VmdCameraFrame(0, -45.0, [0.0, 0.0, 0.0]),
+                         VmdCameraFrame(100, -45.0, [10.0, 0.0, 0.0], interpolation=ease))
+        path = tmp_path / "camera.vmd"
+        pypmxvmd.save_vmd(motion, path)
+        raw = path.read_bytes()
+        # 文件中每个通道为 (ax, bx, ay, by)
+        assert bytes([100, 110, 10, 40]) in raw and bytes([100, 10, 110, 40]) not in raw
+        loaded = pypmxvmd.load_vmd(path)
+        assert [frame.interpolation for frame in loaded.camera_frames] == \
+            [frame.interpolation for frame in motion.camera_frames]
+        expected = pypmxvmd.sample_camera(motion, [25, 50, 75])
+        sampled = pypmxvmd.sample_camera(loaded, [25, 50, 75])
+        assert list(sampled.targets) == pytest.approx(list(expected.targets), abs=1e-5)
+        assert sampled.targets[0] == pytest.approx(10.0 * bezier_progress(ease[0:4], 0.25), abs=1e-5)
+
+    def test_default_curve_round_trip(self, tmp_path):
+        motion = _motion(VmdCameraFrame(0, -45.0, [0.0, 0.0, 0.0]),
+                         VmdCameraFrame(100, -45.0, [10.0, 0.0, 0.0]))
+        path = tmp_path / "camera.vmd"
+        pypmxvmd.save_vmd(motion, path)
+        loaded = pypmxvmd.load_vmd(path)
+        assert pypmxvmd.sample_camera(loaded, [50]).targets[0] == pytest.approx(5.0, abs=1e-5)
+
+    def test_errors(self):
+        with pytest.raises(ValueError):
+            pypmxvmd.sample_camera(VmdMotion(), [0])
+        with pytest.raises(ValueError):
+            pypmxvmd.sample_camera(_motion(VmdCameraFrame()), [0], near=0.0)
+
+
+class TestCameraProjection:
+    """Perspective and orthographic projection matrices."""
+
+    def test_perspective(self):
+        motion = _motion(VmdCameraFrame(0, -45.0, fov=60))
+        scale = 1.0 / math.tan(math.radians(30.0))
+        right = pypmxvmd.sample_camera(motion, [0], aspect=2.0, near=1.0, far=101.0)
+        assert list(right.projection_matrices) == pytest.approx(
+            [scale / 2.0, 0, 0, 0, 0, scale, 0, 0, 0, 0, -1.02, -2.02, 0, 0, -1, 0], abs=1e-5)
+        left = pypmxvmd.sample_camera(motion, [0], aspect=2.0, near=1.0, far=101.0, right_handed=False)
+        assert list(left.projection_matrices) == pytest.approx(
+            [scale / 2.0, 0, 0, 0, 0, scale, 0, 0, 0, 0, 1.01, -1.01, 0, 0, 1, 0], abs=1e-5)
+
+    def test_orthographic(self):
+        motion = _motion(VmdCameraFrame(0, -45.0, [0.0, 10.0, 0.0], fov=60, perspective=False))
+        samples = pypmxvmd.sample_camera(motion, [0], aspect=1.0)
+        projection = samples.projection_matrix(0)
+        half_height = 45.0 * math.tan(math.radians(30.0))
+        assert projection[1][1] == pytest.approx(1.0 / half_height)
+        assert projection[3] == [0.0, 0.0, 0.0, 1.0]
+        top = _transform(samples.view_matrix(0), [0.0, 10.0 + half_height, 0.0])
+        assert _transform(projection, top[:3])[1] == pytest.approx(1.0, abs=1e-4)
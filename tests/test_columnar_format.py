@@ -0,0 +1,226 @@
+"""
+Tests for the columnar container format (.vmda/.pmxa/.vpda).
+"""
+
+import struct
+
+import pytest
+
+import pypmxvmd
+from pypmxvmd.common.io.columnar_io import ColumnarReader, ColumnarWriter
+from pypmxvmd.common.models.pmx import (
+    BoneFlags, JointType, MorphPanel, MorphType, PmxBone, PmxBoneIkLink, PmxFrame, PmxFrameItem,
+    PmxJoint, PmxMorph, PmxMorphItemBone, PmxMorphItemGroup, PmxMorphItemImpulse,
+    PmxMorphItemMaterial, PmxMorphItemUV, PmxRigidBody, PmxSoftBody, RigidBodyPhysMode,
+    RigidBodyShape
+)
+from pypmxvmd.common.models.vmd import (
+    VmdIkBone, VmdIkFrame, VmdLightFrame, VmdShadowFrame, ShadowMode
+)
+from tests import synthetic_data
+
+
+def _f32(value):
+    return struct.unpack("<f", struct.pack("<f", value))[0]
+
+
+class TestColumnarContainer:
+    """Low-level container: typed columns, string tables, compression, random access."""
+
+    def _write(self, path, compress=False):
+        with ColumnarWriter(path, "TEST", compress=compress) as writer:
+            writer.add_metadata("meta", {"name": "モデル", "count": 3})
+            writer.add_column("ints", [1, -2, 3], 'i')
+            writer.add_column("vec", [0.5, 1.5, 2.5, 3.5, 4.5, 5.5], 'f', 3)
+            writer.add_strings("names", ["a", "ボーン", "a", ""])
+        return path
+
+    @pytest.mark.parametrize("compress", [False, True])
+    @pytest.mark.parametrize("use_mmap", [False, True])
+    def test_roundtrip(self, tmp_path, compress, use_mmap):
+        path = self._write(tmp_path / "a.bin", compress)
+        with ColumnarReader(path, use_mmap=use_mmap) as reader:
+            assert reader.kind == "TEST"
+            assert reader.names == ["meta", "ints", "vec", "names"]
+            assert reader.metadata("meta") == {"name": "モデル", "count": 3}
+            assert reader.column("ints").tolist() == [1, -2, 3]
+            assert reader.info("vec").width == 3 and reader.info("vec").rows == 2
+            assert reader.info("vec").compressed is compress
+            assert reader.column("vec").tolist() == [0.5, 1.5, 2.5, 3.5, 4.5, 5.5]
+            table, indices = reader.string_table("names")
+            assert table == ["a", "ボーン", ""]
+            assert indices.tolist() == [0, 1, 0, 2]
+            assert reader.strings("names") == ["a", "ボーン", "a", ""]
+
+    def test_mmap_columns_are_zero_copy_views(self, tmp_path):
+        path = self._write(tmp_path / "a.bin")
+        reader = ColumnarReader(path)
+        view = reader.column("vec")
+        assert isinstance(view, memoryview) and view.readonly
+        assert view.format == 'f'
+        assert reader.info("vec").offset % 8 == 0
+        view.release()
+        reader.close()
+
+    def test_errors(self, tmp_path):
+        path = self._write(tmp_path / "a.bin")
+        with ColumnarReader(path) as reader:
+            with pytest.raises(ValueError):
+                reader.column("missing")
+            with pytest.raises(ValueError):
+                reader.column("names")
+        with ColumnarWriter(tmp_path / "b.bin", "T") as writer:
+            with pytest.raises(ValueError):
+                writer.add_column("x", [1, 2, 3], 'f', 2)
+            writer.add_column("x", [1.0], 'f')
+            with pytest.raises(ValueError):
+                writer.add_column("x", [1.0], 'f')
+        (tmp_path / "c.bin").write_bytes(b"NOPE" + bytes(40))
+        with pytest.raises(ValueError, match="列式文件头"):
+            ColumnarReader(tmp_path / "c.bin")
+        data = path.read_bytes()
+        (tmp_path / "d.bin").write_bytes(data[:len(data) // 2])
+        with pytest.raises(ValueError):
+            ColumnarReader(tmp_path / "d.bin")
+
+
+class TestColumnarModels:
+    """Model round trips through the columnar parser."""
+
+    def test_vmd_roundtrip(self, tmp_path):
+        path = synthetic_data.write_vmd(tmp_path / "a.vmd", bone_frames=40,
+                                        morph_frames=8, camera_frames=3)
+        motion = pypmxvmd.load_vmd(path)
+        motion.light_frames = [VmdLightFrame(5, [0.1, 0.2, 0.3], [1, 2, 3])]
+        motion.shadow_frames = [VmdShadowFrame(7, ShadowMode.MODE2, 0.5)]
+        motion.ik_frames = [VmdIkFrame(0, True, [VmdIkBone("左足ＩＫ", True), VmdIkBone("右足ＩＫ", False)]),
+                            VmdIkFrame(9, False, [])]
+        pypmxvmd.save(motion, tmp_path / "a.vmda")
+        loaded = pypmxvmd.load(tmp_path / "a.vmda")
+
+        loaded.validate()
+        assert loaded.header.model_name == motion.header.model_name
+        assert [f.to_list() for f in loaded.bone_frames] == [
+            [f.bone_name, f.frame_number, [_f32(v) for v in f.position],
+             f.rotation, f.interpolation, f.physics_disabled]
+            for f in motion.bone_frames]
+        assert [(f.morph_name, f.frame_number) for f in loaded.morph_frames] == [
+            (f.morph_name, f.frame_number) for f in motion.morph_frames]
+        assert [f.interpolation for f in loaded.camera_frames] == [
+            f.interpolation for f in motion.camera_frames]
+        assert loaded.shadow_frames[0].shadow_mode == ShadowMode.MODE2
+        assert [[b.bone_name for b in f.ik_bones] for f in loaded.ik_frames] == [
+            ["左足ＩＫ", "右足ＩＫ"], []]
+        assert loaded.ik_frames[0].ik_bones[1].ik_enabled is False
+
+    def test_vmd_file_roundtrip_is_byte_identical(self, tmp_path):
+        source = synthetic_data.write_vmd(tmp_path / "a.vmd", bone_frames=200, morph_frames=20,
+                                          camera_frames=20)
+        motion = pypmxvmd.load_vmd(source)
+        pypmxvmd.save_vmd(motion, tmp_path / "direct.vmd")
+        pypmxvmd.save_columnar(motion, tmp_path / "a.vmda")
+        loaded = pypmxvmd.load_columnar(tmp_path / "a.vmda")
+        assert not pypmxvmd.diff(motion, loaded, tolerance=0)
+        pypmxvmd.save_vmd(loaded, tmp_path / "via.vmd")
+        assert (tmp_path / "via.vmd").read_bytes() == (tmp_path / "direct.vmd").read_bytes()
+
+    def test_pmx_roundtrip_compressed(self, tmp_path):
+        path = synthetic_data.write_pmx(tmp_path / "a.pmx", vertex_count=60, face_count=30,
+                                        material_count=3,
+                                        weight_modes={"BDEF1": 0.5, "BDEF4": 0.5})
+        model = pypmxvmd.load_pmx(path)
+        model.vertices[0].additional_uvs = [[0.25, 0.5, 0.75, 1.0]]
+        model.materials[0].flags.double_sided = True
+        pypmxvmd.save_columnar(model, tmp_path / "a.pmxa", compress=True)
+        loaded = pypmxvmd.load_columnar(tmp_path / "a.pmxa")
+
+        assert loaded.faces == model.faces
+        assert loaded.textures == model.textures
+        for vertex in model.vertices:
+            vertex.weight = [list(pair) for pair in vertex.weight]
+        assert [v.to_list() for v in loaded.vertices] == [v.to_list() for v in model.vertices]
+        assert [m.to_list() for m in loaded.materials] == [m.to_list() for m in model.materials]
+        assert loaded.materials[0].flags.double_sided is True
+        assert loaded.header.to_list() == model.header.to_list()
+
+    def test_vpd_and_pose_table_roundtrip(self, tmp_path):
+        paths = [synthetic_data.write_vpd(tmp_path / f"{i}.vpd", bone_count=4, morph_count=2, seed=i)
+                 for i in range(3)]
+        pose = pypmxvmd.load_vpd(paths[0])
+        pypmxvmd.save_columnar(pose, tmp_path / "a.vpda")
+        loaded = pypmxvmd.load_columnar(tmp_path / "a.vpda")
+        assert [b.to_list() for b in loaded.bone_poses] == [
+            [b.bone_name, [_f32(v) for v in b.position], [_f32(v) for v in b.rotation]]
+            for b in pose.bone_poses]
+
+        table = pypmxvmd.load_vpd_many(paths, max_workers=1)
+        pypmxvmd.save_columnar(table, tmp_path / "t.vpda")
+        loaded = pypmxvmd.load_columnar(tmp_path / "t.vpda")
+        assert len(loaded) == 3
+        assert loaded.bone_names == table.bone_names
+        assert loaded.bone_index(table.bone_names[-1]) == len(table.bone_names) - 1
+        assert loaded.get_pose(2).to_list() == table.get_pose(2).to_list()
+
+    def test_analytics_read_single_column(self, tmp_path):
+        path = synthetic_data.write_pmx(tmp_path / "a.pmx", vertex_count=20, face_count=10)
+        model = pypmxvmd.load_pmx(path)
+        pypmxvmd.save_columnar(model, tmp_path / "a.pmxa")
+        with pypmxvmd.open_columnar(tmp_path / "a.pmxa", use_mmap=False) as reader:
+            assert reader.kind == "PMX"
+            positions = reader.column("vertices.position")
+            assert len(positions) == 60
+            assert positions[3:6].tolist() == model.vertices[1].position
+
+    def test_unsupported_type(self, tmp_path):
+        with pytest.raises(ValueError):
+            pypmxvmd.save_columnar(object(), tmp_path / "x.vmda")
+
+    def test_pmx_rig_and_physics_roundtrip(self, tmp_path):
+        path = synthetic_data.write_pmx(tmp_path / "a.pmx", vertex_count=20, face_count=5,
+                                        bone_count=20, morph_count=4, morph_item_count=6)
+        model = pypmxvmd.load_pmx(path)
+        assert (len(model.bones), len(model.morphs)) == (20, 4)
+        model.bones[1] = PmxBone("左足ＩＫ", "leg IK", [1.0, 0.5, 0.0], 0, 1,
+                                 BoneFlags(ik=True, translateable=True, has_fixedaxis=True),
+                                 [0.0, 0.0, 1.0], inherit_parent_index=0, inherit_ratio=0.5,
+                                 fixed_axis=[1.0, 0.0, 0.0], ik_target_index=3, ik_loop_count=40,
+                                 ik_angle_limit=114.59155902616465,
+                                 ik_links=[PmxBoneIkLink(2, [-180.0, 0.0, 0.0], [-0.5, 0.0, 0.0]),
+                                           PmxBoneIkLink(3)])
+        model.bones[2].bone_flags.tail_usebonelink = True
+        model.bones[2].tail = 3
+        model.morphs += [
+            PmxMorph("笑い", "smile", MorphPanel.MOUTH, MorphType.GROUP, [PmxMorphItemGroup(0, 0.5)]),
+            PmxMorph("腕", "arm", MorphPanel.OTHER, MorphType.BONE,
+                     [PmxMorphItemBone(1, [0.0, 1.0, 0.0], [10.0, 20.000000001, 0.0])]),
+            PmxMorph("赤", "red", MorphPanel.OTHER, MorphType.MATERIAL,
+                     [PmxMorphItemMaterial(-1, 1, diffuse_color=[0.5, 0.0, 0.0, 0.0], edge_size=2.0)]),
+            PmxMorph("UV", "uv", MorphPanel.OTHER, MorphType.EXTENDED_UV2,
+                     [PmxMorphItemUV(4, [0.0, 0.25, 0.5, 0.75])]),
+            PmxMorph("衝撃", "impulse", MorphPanel.OTHER, MorphType.IMPULSE,
+                     [PmxMorphItemImpulse(0, True, [0.0, 1.0, 0.0], [0.0, 0.0, 1.0])]),
+        ]
+        model.frames = [PmxFrame("Root", "Root", True, [PmxFrameItem(False, 0)]),
+                        PmxFrame("表情", "Exp", False, [PmxFrameItem(True, 1), PmxFrameItem(True, 2)])]
+        model.rigidbodies = [PmxRigidBody("頭", "head", 0, 2, [1, 3], RigidBodyShape.CAPSULE,
+                                          [0.5, 1.0, 0.0], [0.0, 10.0, 0.0], [12.5, 0.1, 0.0],
+                                          RigidBodyPhysMode.PHYSICS_BONE, 2.0)]
+        model.joints = [PmxJoint("首", "neck", JointType.SPRING6DOF, 0, 0, [0.0, 9.0, 0.0],
+                                 rotation_min=[-30.000001, 0.0, 0.0], rotation_max=[30.0, 0.0, 0.0],
+                                 position_spring=[0.0, 100.0, 0.0])]
+
+        pypmxvmd.save_columnar(model, tmp_path / "a.pmxa", compress=True)
+        loaded = pypmxvmd.load_columnar(tmp_path / "a.pmxa")
+        for section in ("bones", "morphs", "frames", "rigidbodies", "joints"):
+            assert [item.to_list() for item in getattr(loaded, section)] == \
+                [item.to_list() for item in getattr(model, section)], section
+        assert not pypmxvmd.diff(model, loaded)
+        for bone in loaded.bones:
+            bone.validate()
+        assert loaded.bones[0].inherit_parent_index is None and loaded.bones[2].tail == 3
+
+    def test_pmx_softbodies_rejected(self, tmp_path):
+        model = pypmxvmd.PmxModel()
+        model.softbodies = [PmxSoftBody()]
+        with pytest.raises(ValueError):
+            pypmxvmd.save_columnar(model, tmp_path / "a.pmxa")
@@ -0,0 +1,118 @@
+"""
+Tests for name-table scanning and the model/motion compatibility checker.
+"""
+
+import pytest
+
+import pypmxvmd
+from pypmxvmd.common.models.pmx import PmxBone, PmxModel, PmxMorph, PmxNameTable
+from pypmxvmd.common.models.vmd import (
+    VmdBoneFrame, VmdIkBone, VmdIkFrame, VmdMorphFrame, VmdMotion, VmdNameTable
+)
+from pypmxvmd.common.processing import ModelNameIndex
+from tests import synthetic_data
+
+
+def _model(bones, morphs=()):
+    model = PmxModel()
+    model.bones = [PmxBone(name_jp=name) for name in bones]
+    model.morphs = [PmxMorph(name_jp=name) for name in morphs]
+    return model
+
+
+class TestNameScan:
+    """Header/count/name-only scans of VMD and PMX files."""
+
+    def test_vmd_scan_matches_full_parse(self, tmp_path):
+        path = synthetic_data.write_vmd(tmp_path / "a.vmd", bone_frames=90, morph_frames=12,
+                                        camera_frames=4, bone_tracks=9, morph_tracks=3)
+        table = pypmxvmd.scan_vmd_names(path)
+        motion = pypmxvmd.load_vmd(path)
+        assert table.model_name == motion.header.model_name
+        assert table.bone_frame_count == 90 and len(table.bone_names) == 9
+        assert table.morph_frame_count == 12 and table.camera_frame_count == 4
+        assert table.bone_names == VmdNameTable.from_motion(motion).bone_names
+        assert [name.decode("shift_jis") for name in table.morph_names] == ["まばたき", "笑い", "ウィンク"]
+
+    def test_vmd_scan_reads_ik_names(self, tmp_path):
+        motion = VmdMotion()
+        motion.ik_frames = [VmdIkFrame(0, True, [VmdIkBone("左足ＩＫ", True), VmdIkBone("右足ＩＫ", False)])]
+        pypmxvmd.save_vmd(motion, tmp_path / "ik.vmd")
+        table = pypmxvmd.scan_vmd_names(tmp_path / "ik.vmd")
+        assert table.ik_frame_count == 1
+        assert list(table.ik_bone_names) == ["左足ＩＫ".encode("shift_jis"), "右足ＩＫ".encode("shift_jis")]
+
+    def test_vmd_scan_rejects_truncated_file(self, tmp_path):
+        data = synthetic_data.make_vmd_bytes(bone_frames=10, morph_frames=0)
+        (tmp_path / "bad.vmd").write_bytes(data[:200])
+        with pytest.raises(ValueError):
+            pypmxvmd.scan_vmd_names(tmp_path / "bad.vmd")
+
+    @pytest.mark.parametrize("options", [{}, {"additional_uvs": 2, "utf8": True, "bone_count": 300,
+                                              "weight_modes": {"SDEF": 0.5, "BDEF4": 0.5}}])
+    def test_pmx_scan_matches_full_parse(self, tmp_path, options):
+        path = synthetic_data.write_pmx(tmp_path / "a.pmx", vertex_count=50, face_count=20,
+                                        morph_count=4, **options)
+        table = pypmxvmd.scan_pmx_names(path)
+        model = pypmxvmd.load_pmx(path)
+        assert table.header.name_jp == model.header.name_jp
+        assert (table.vertex_count, table.face_count) == (50, 20)
+        assert table.material_count == len(model.materials)
+        assert table.bone_names[:3] == ["全ての親", "センター", "グルーブ"]
+        assert len(table.bone_names) == options.get("bone_count", 30)
+        assert table.morph_names == ["まばたき", "笑い", "ウィンク", "ウィンク右"]
+
+
+class TestCheckCompat:
+    """Set-based comparison of motion track names against a model index."""
+
+    def test_report(self):
+        model = _model(["センター", "左腕", "右腕", "頭"], ["まばたき"])
+        motion = VmdMotion()
+        motion.bone_frames = [VmdBoneFrame("センター", 0), VmdBoneFrame("左腕", 0),
+                              VmdBoneFrame("左腕", 5), VmdBoneFrame("尻尾", 0)]
+        motion.morph_frames = [VmdMorphFrame("まばたき", 0), VmdMorphFrame("笑い", 0)]
+        motion.ik_frames = [VmdIkFrame(0, True, [VmdIkBone("左足ＩＫ", True)])]
+        report = pypmxvmd.check_compat(model, motion)
+        assert report.missing_bones == ["尻尾"]
+        assert report.missing_morphs == ["笑い"]
+        assert report.missing_ik_bones == ["左足ＩＫ"]
+        assert report.unanimated_bones == ["右腕", "頭"]
+        assert (report.matched_bones, report.matched_morphs) == (2, 1)
+        assert not report.is_compatible
+
+    def test_long_names_match_truncated_vmd_names(self):
+        long_name = "とても長い名前のボーン"  # 22 Shift-JIS bytes, stored as 15 in a VMD
+        table = VmdNameTable()
+        table.bone_names[long_name.encode("shift_jis")[:15]] = 1
+        report = pypmxvmd.check_compat(_model([long_name]), table)
+        assert report.is_compatible and report.unanimated_bones == []
+
+    def test_index_is_cached_and_invalidated(self):
+        model = _model(["センター"])
+        index = ModelNameIndex.of(model)
+        assert ModelNameIndex.of(model) is index
+        model.bones = model.bones + [PmxBone(name_jp="頭")]
+        rebuilt = ModelNameIndex.of(model)
+        assert rebuilt is not index and rebuilt.bone_names == ["センター", "頭"]
+        model.bones[1].name_jp = "首"
+        assert ModelNameIndex.of(model, refresh=True).bone_names == ["センター", "首"]
+
+    def test_files_only(self, tmp_path):
+        pmx = synthetic_data.write_pmx(tmp_path / "a.pmx", vertex_count=10, face_count=4,
+                                       bone_count=20, morph_count=5)
+        vmd = synthetic_data.write_vmd(tmp_path / "a.vmd", bone_frames=40, morph_frames=10,
+                                       bone_tracks=25, morph_tracks=5)
+        reference = pypmxvmd.scan_pmx_names(pmx)
+        assert isinstance(reference, PmxNameTable)
+        report = pypmxvmd.check_compat(reference, vmd)
+        assert len(report.missing_bones) == 5
+        assert report.missing_morphs == []
+        assert report.unanimated_bones == []
+        assert pypmxvmd.check_compat(pmx, vmd).missing_bones == report.missing_bones
+
+    def test_unsupported_types(self):
+        with pytest.raises(ValueError):
+            pypmxvmd.check_compat(object(), VmdMotion())
+        with pytest.raises(ValueError):
+            pypmxvmd.check_compat(PmxModel(), object())
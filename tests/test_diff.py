@@ -0,0 +1,148 @@
+"""
+Tests for structural diffs between motions and between models.
+"""
+
+import pytest
+
+import pypmxvmd
+from pypmxvmd.common.models.pmx import (
+    PmxBoneIkLink, PmxFrame, PmxFrameItem, PmxJoint, PmxRigidBody, PmxSoftBody
+)
+from pypmxvmd.common.models.vmd import (
+    VmdBoneFrame, VmdCameraFrame, VmdIkBone, VmdIkFrame, VmdMorphFrame, VmdMotion
+)
+from pypmxvmd.common.processing import diff_models, diff_motions
+from tests import synthetic_data
+
+
+def _motion(frames, morphs=()):
+    motion = VmdMotion()
+    motion.bone_frames = [VmdBoneFrame(name, f, [float(f), 0, 0], [0, 0, 0]) for name, f in frames]
+    motion.morph_frames = [VmdMorphFrame(name, f, 0.5) for name, f in morphs]
+    return motion
+
+
+class TestMotionDiff:
+    """Keyframe diffs keyed by (name, frame) or frame number."""
+
+    def test_identical_motions(self):
+        a = _motion([("a", 0), ("a", 10)], [("m", 0)])
+        b = _motion([("a", 10), ("a", 0)], [("m", 0)])
+        result = pypmxvmd.diff(a, b)
+        assert not result
+        assert result.summary()["bone_frames"] == (0, 0, 0)
+
+    def test_added_removed_changed(self):
+        a = _motion([("a", 0), ("a", 10), ("b", 5)])
+        b = _motion([("a", 0), ("a", 20), ("b", 5)])
+        b.bone_frames[2].rotation = [0, 45.0, 0]
+        b.bone_frames[0].interpolation[0] = 64
+        result = diff_motions(a, b)
+        assert result.bone_frames.added == [("a", 20)]
+        assert result.bone_frames.removed == [("a", 10)]
+        assert result.bone_frames.changed == [("a", 0), ("b", 5)]
+        assert result.bone_frames.fields[("b", 5)] == ["rotation"]
+        assert result.bone_frames.fields[("a", 0)] == ["interpolation"]
+
+        tracks = result.bone_frames.by_track()
+        assert sorted(tracks) == ["a", "b"]
+        assert tracks["a"].added == [("a", 20)] and tracks["a"].changed == [("a", 0)]
+        assert tracks["b"].fields == {("b", 5): ["rotation"]}
+
+    def test_tolerance(self):
+        a, b = _motion([("a", 0)]), _motion([("a", 0)])
+        b.bone_frames[0].position = [1e-7, 0, 0]
+        assert not diff_motions(a, b)
+        assert diff_motions(a, b, tolerance=0).bone_frames.changed == [("a", 0)]
+
+    def test_other_sections_and_header(self):
+        a, b = VmdMotion(), VmdMotion()
+        b.header.model_name = "other"
+        a.camera_frames = [VmdCameraFrame(0, 10.0, [0, 0, 0], [0, 0, 0])]
+        b.camera_frames = [VmdCameraFrame(0, 12.0, [0, 0, 0], [0, 0, 0]),
+                           VmdCameraFrame(30, 10.0, [0, 0, 0], [0, 0, 0])]
+        a.ik_frames = [VmdIkFrame(0, True, [VmdIkBone("左足ＩＫ", True)])]
+        b.ik_frames = [VmdIkFrame(0, True, [VmdIkBone("左足ＩＫ", False)])]
+        result = diff_motions(a, b)
+        assert result.header_changed
+        assert result.camera_frames.added == [30]
+        assert result.camera_frames.fields[0] == ["distance"]
+        assert result.ik_frames.fields[0] == ["ik_bones"]
+
+    def test_loaded_motion_against_itself(self, tmp_path):
+        path = synthetic_data.write_vmd(tmp_path / "a.vmd", bone_frames=200, morph_frames=20)
+        assert not pypmxvmd.diff(pypmxvmd.load_vmd(path), pypmxvmd.load_vmd(path))
+
+    def test_type_mismatch(self):
+        with pytest.raises(ValueError):
+            pypmxvmd.diff(VmdMotion(), object())
+
+
+class TestModelDiff:
+    """Per-section model diffs keyed by index."""
+
+    def test_section_changes(self, tmp_path):
+        path = synthetic_data.write_pmx(tmp_path / "a.pmx", vertex_count=30, face_count=10,
+                                        material_count=2)
+        a, b = pypmxvmd.load_pmx(path), pypmxvmd.load_pmx(path)
+        assert not diff_models(a, b)
+
+        b.vertices[3].position = [v + 1.0 for v in b.vertices[3].position]
+        b.faces.pop()
+        b.textures.append("new.png")
+        b.materials[1].flags.double_sided = not a.materials[1].flags.double_sided
+        result = diff_models(a, b)
+        assert result.vertices.changed == [3]
+        assert result.vertices.fields[3] == ["position"]
+        assert result.faces.removed == [9]
+        assert result.textures.added == [len(a.textures)]
+        assert result.materials.fields[1] == ["flags"]
+        assert result.summary()["faces"] == (0, 1, 0)
+
+    def test_tuple_and_list_weights_compare_equal(self, tmp_path):
+        path = synthetic_data.write_pmx(tmp_path / "a.pmx", vertex_count=10, face_count=4,
+                                        weight_modes={"BDEF4": 1.0})
+        a, b = pypmxvmd.load_pmx(path), pypmxvmd.load_pmx(path)
+        for vertex in b.vertices:
+            vertex.weight = [list(pair) for pair in vertex.weight]
+        assert not diff_models(a, b)
+
+    def test_bone_and_morph_sections(self, tmp_path):
+        path = synthetic_data.write_pmx(tmp_path / "a.pmx", vertex_count=20, face_count=5,
+                                        bone_count=6, morph_count=3, morph_item_count=4)
+        a, b = pypmxvmd.load_pmx(path), pypmxvmd.load_pmx(path)
+        assert len(a.bones) == 6 and len(a.morphs) == 3
+        assert not diff_models(a, b)
+
+        b.bones[2].position = [99.0, 99.0, 99.0]
+        b.bones[3].bone_flags.visible = not a.bones[3].bone_flags.visible
+        b.bones[4].ik_links = [PmxBoneIkLink(1, [-1.0, 0.0, 0.0], [0.0, 0.0, 0.0])]
+        b.morphs[0].items = []
+        offset = b.morphs[1].items[0].offset
+        b.morphs[1].items[0].offset = [v + 1e-7 for v in offset]
+        b.morphs.pop()
+        result = diff_models(a, b)
+        assert result.bones.changed == [2, 3, 4]
+        assert result.bones.fields == {2: ["position"], 3: ["bone_flags"], 4: ["ik_links"]}
+        assert result.morphs.changed == [0] and result.morphs.fields[0] == ["items"]
+        assert result.morphs.removed == [2]
+        assert result.summary()["bones"] == (0, 0, 3)
+
+    def test_frame_and_physics_sections(self):
+        a, b = pypmxvmd.PmxModel(), pypmxvmd.PmxModel()
+        for model in (a, b):
+            model.frames = [PmxFrame("Root", "Root", True, [PmxFrameItem(False, 0)])]
+            model.rigidbodies = [PmxRigidBody("頭", bone_index=0, size=[1.0, 2.0, 3.0])]
+            model.joints = [PmxJoint("首", rigidbody1_index=0, rigidbody2_index=0)]
+        assert not diff_models(a, b)
+
+        b.frames[0].items.append(PmxFrameItem(True, 0))
+        b.rigidbodies[0].mass = 2.0
+        b.rigidbodies[0].size = [1.0, 2.0, 3.0 + 1e-7]
+        b.joints[0].rotation_max = [0.0, 0.0, 45.0]
+        b.softbodies.append(PmxSoftBody())
+        result = diff_models(a, b)
+        assert result.frames.fields == {0: ["items"]}
+        assert result.rigidbodies.fields == {0: ["mass"]}
+        assert result.joints.fields == {0: ["rotation_max"]}
+        assert result.softbodies.added == [0]
@@ -0,0 +1,138 @@
+"""
+Tests for CCD IK baking.
+"""
+
+import math
+
+import pytest
+
+import pypmxvmd
+from pypmxvmd.common import math3d
+from pypmxvmd.common.models.pmx import BoneFlags, PmxBone, PmxBoneIkLink, PmxModel
+from pypmxvmd.common.models.vmd import VmdBoneFrame, VmdIkBone, VmdIkFrame, VmdMotion
+
+
+def _leg_model(loop_count=100, unit_angle=114.5916):
+    model = PmxModel()
+    model.bones = [
+        PmxBone("センター", position=[0, 10, 0], parent_index=-1),
+        PmxBone("左足", position=[1, 10, 0], parent_index=0),
+        PmxBone("左ひざ", position=[1, 5, 0], parent_index=1),
+        PmxBone("左足首", position=[1, 0, 0], parent_index=2),
+        PmxBone("左足ＩＫ", position=[1, 0, 0], parent_index=-1,
+                bone_flags=BoneFlags(ik=True, translateable=True), ik_target_index=3,
+                ik_loop_count=loop_count, ik_angle_limit=unit_angle,
+                ik_links=[PmxBoneIkLink(2, [-180.0, 0.0, 0.0], [-0.5, 0.0, 0.0]), PmxBoneIkLink(1)]),
+    ]
+    return model
+
+
+def _motion():
+    motion = VmdMotion()
+    motion.bone_frames = [
+        VmdBoneFrame("センター", 0, [0, -1, 0]),
+        VmdBoneFrame("左ひざ", 0, [0, 0, 0], [-30, 0, 0]),
+        VmdBoneFrame("左足ＩＫ", 0, [0, 0, 0]),
+        VmdBoneFrame("左足ＩＫ", 20, [0, 3, -2]),
+    ]
+    return motion
+
+
+def _global_positions(model, motion, frame):
+    """Independent forward kinematics over sampled local poses."""
+    pose = pypmxvmd.motion_to_poses(motion, [frame])[0]
+    local = {item.bone_name: item for item in pose.bone_poses}
+    rotations, positions = [], []
+    for bone in model.bones:
+        item = local.get(bone.name_jp)
+        if item is None:
+            rotation, offset = (1.0, 0.0, 0.0, 0.0), [0.0, 0.0, 0.0]
+        else:
+            x, y, z, w = item.rotation
+            rotation, offset = (w, x, y, z), item.position
+        if bone.parent_index < 0:
+            rotations.append(rotation)
+            positions.append([bone.position[k] + offset[k] for k in range(3)])
+            continue
+        parent = model.bones[bone.parent_index]
+        parent_rotation = rotations[bone.parent_index]
+        w, x, y, z = parent_rotation
+        vector = (0.0, *[bone.position[k] - parent.position[k] + offset[k] for k in range(3)])
+        _w, *moved = math3d.quaternion_multiply(math3d.quaternion_multiply(parent_rotation, vector),
+                                                (w, -x, -y, -z))
+        positions.append([positions[bone.parent_index][k] + moved[k] for k in range(3)])
+        rotations.append(math3d.quaternion_multiply(parent_rotation, rotation))
+    return positions
+
+
+def _baked_rotation(motion, bone_name, frame):
+    return next(item.rotation for item in motion.bone_frames
+                if item.bone_name == bone_name and item.frame_number == frame)
+
+
+class TestBakeIk:
+    """Baked FK keyframes reproduce the IK solution."""
+
+    def test_target_reaches_ik_bone(self):
+        model, motion = _leg_model(), _motion()
+        baked = pypmxvmd.bake_ik(motion, model)
+        for frame in (0, 5, 10, 20):
+            positions = _global_positions(model, baked, frame)
+            goal = _global_positions(model, motion, frame)[4]
+            assert positions[3] == pytest.approx(goal, abs=1e-3)
+
+    def test_output_frames(self):
+        model, motion = _leg_model(), _motion()
+        baked = pypmxvmd.bake_ik(motion, model)
+        knee = sorted(item.frame_number for item in baked.bone_frames if item.bone_name == "左ひざ")
+        assert knee == list(range(21))
+        assert sum(1 for item in baked.bone_frames if item.bone_name == "左足") == 21
+        center = [item for item in baked.bone_frames if item.bone_name == "センター"]
+        assert center == motion.bone_frames[:1]
+        assert [frame.to_list() for frame in baked.ik_frames] == [[0, True, [["左足ＩＫ", False]]]]
+        assert len(motion.bone_frames) == 4 and motion.ik_frames == []
+
+    def test_angle_limits(self):
+        model, motion = _leg_model(), _motion()
+        baked = pypmxvmd.bake_ik(motion, model, frames=range(0, 21, 5))
+        for frame in range(0, 21, 5):
+            x, y, z = _baked_rotation(baked, "左ひざ", frame)
+            assert -180.0 <= x <= -0.5
+            assert y == pytest.approx(0.0, abs=1e-6) and z == pytest.approx(0.0, abs=1e-6)
+
+    def test_unit_angle_per_iteration(self):
+        model, motion = _leg_model(loop_count=1, unit_angle=5.0), _motion()
+        motion.bone_frames[1].rotation = [-60.0, 0.0, 0.0]
+        baked = pypmxvmd.bake_ik(motion, model, frames=[20])
+        assert _baked_rotation(baked, "左ひざ", 20)[0] == pytest.approx(-55.0, abs=1e-4)
+        thigh = math3d.euler_to_quaternion(_baked_rotation(baked, "左足", 20))
+        assert 2.0 * math.degrees(math.acos(min(abs(thigh[0]), 1.0))) <= 5.0 + 1e-4
+
+    def test_ik_toggle(self):
+        model, motion = _leg_model(), _motion()
+        motion.ik_frames = [VmdIkFrame(0, True, [VmdIkBone("左足ＩＫ", True)]),
+                            VmdIkFrame(10, False, [VmdIkBone("左足ＩＫ", False)])]
+        baked = pypmxvmd.bake_ik(motion, model)
+        assert _baked_rotation(baked, "左ひざ", 15) == pytest.approx([-30.0, 0.0, 0.0], abs=1e-4)
+        assert _baked_rotation(baked, "左足", 15) == pytest.approx([0.0, 0.0, 0.0], abs=1e-6)
+        assert _baked_rotation(baked, "左ひざ", 5)[0] != pytest.approx(-30.0, abs=1e-2)
+        assert [frame.to_list() for frame in baked.ik_frames] == [
+            [0, True, [["左足ＩＫ", False]]], [10, False, [["左足ＩＫ", False]]]]
+
+    def test_disabled_everywhere_is_left_alone(self):
+        model, motion = _leg_model(), _motion()
+        motion.ik_frames = [VmdIkFrame(0, True, [VmdIkBone("左足ＩＫ", False)])]
+        baked = pypmxvmd.bake_ik(motion, model)
+        assert baked.bone_frames == motion.bone_frames
+        assert baked.ik_frames == motion.ik_frames
+
+    def test_process_pool_matches_serial(self):
+        model, motion = _leg_model(), _motion()
+        serial = pypmxvmd.bake_ik(motion, model, frames=range(8))
+        parallel = pypmxvmd.bake_ik(motion, model, frames=range(8), max_workers=2)
+        assert [item.to_list() for item in parallel.bone_frames] == \
+            [item.to_list() for item in serial.bone_frames]
+
+    def test_negative_frame(self):
+        with pytest.raises(ValueError):
+            pypmxvmd.bake_ik(_motion(), _leg_model(), frames=[-1])
@@ -0,0 +1,131 @@
+"""
+Tests for parser instrumentation hooks.
+"""
+
+import pytest
+
+import pypmxvmd
+from pypmxvmd.common import instrumentation
+from pypmxvmd.common.instrumentation import (
+    InstrumentationHook, StatsCollector, instrumented, set_hook, get_hook
+)
+from pypmxvmd.common.parsers import vmd_parser
+from pypmxvmd.common.parsers.vmd_parser import VmdParser, _CYTHON_AVAILABLE as VMD_CYTHON
+from pypmxvmd.common.parsers.vpd_parser import _CYTHON_AVAILABLE as VPD_CYTHON
+from tests import synthetic_data
+
+
+class _RecordingHook(InstrumentationHook):
+    def __init__(self):
+        self.sections = []
+        self.fallbacks = []
+
+    def on_section(self, event):
+        self.sections.append(event)
+
+    def on_fallback(self, event):
+        self.fallbacks.append(event)
+
+
+class TestInstrumentationHooks:
+    """Section and fallback events reported by parsers."""
+
+    def test_no_hook_by_default(self):
+        assert get_hook() is None
+        assert instrumentation.now_ns() == 0
+        tracer = instrumentation.tracer("vmd", "parse", "fast")
+        assert tracer.run("x", lambda a: a + 1, 1) == 2
+
+    def test_instrumented_restores_previous(self):
+        hook = _RecordingHook()
+        with instrumented(hook):
+            assert get_hook() is hook
+        assert get_hook() is None
+
+    def test_vmd_fast_sections(self, tmp_path):
+        path = synthetic_data.write_vmd(tmp_path / "a.vmd", bone_frames=40,
+                                        morph_frames=8, camera_frames=3)
+        hook = _RecordingHook()
+        with instrumented(hook):
+            VmdParser().parse_file_fast(path)
+
+        by_name = {e.section: e for e in hook.sections}
+        assert by_name["header"].start == 0
+        assert by_name["bone_frames"].count == 40
+        assert by_name["morph_frames"].count == 8
+        assert by_name["camera_frames"].count == 3
+        assert by_name["bone_frames"].end == by_name["morph_frames"].start
+        assert by_name["file"].end == path.stat().st_size
+        assert by_name["file"].count == 51
+        assert all(e.backend == "fast" and e.elapsed_ns >= 0 for e in hook.sections)
+
+    @pytest.mark.skipif(VMD_CYTHON, reason="Cython module is available")
+    def test_fallback_reported_when_cython_missing(self, tmp_path):
+        path = synthetic_data.write_vmd(tmp_path / "a.vmd", bone_frames=5, morph_frames=0)
+        hook = _RecordingHook()
+        with instrumented(hook):
+            pypmxvmd.load_vmd(path)
+        assert len(hook.fallbacks) == 1
+        event = hook.fallbacks[0]
+        assert (event.from_backend, event.to_backend) == ("cython", "fast")
+        assert event.error is None
+        assert event.reason == "unavailable"
+
+    def test_fallback_to_nuthouse_carries_exception(self, tmp_path, monkeypatch):
+        path = synthetic_data.write_vmd(tmp_path / "a.vmd", bone_frames=5, morph_frames=2)
+
+        def broken(*args, **kwargs):
+            raise ValueError("boom")
+
+        parser = VmdParser()
+        monkeypatch.setattr(vmd_parser, "_CYTHON_AVAILABLE", False)
+        monkeypatch.setattr(parser, "parse_file_fast", broken)
+        hook = _RecordingHook()
+        with instrumented(hook):
+            motion = parser.parse_file(path)
+        assert len(motion.bone_frames) == 5
+        fallback = [e for e in hook.fallbacks if e.to_backend == "nuthouse"]
+        assert len(fallback) == 1
+        assert str(fallback[0].error) == "boom"
+        assert any(e.backend == "nuthouse" and e.section == "file" for e in hook.sections)
+
+    def test_pmx_write_sections(self, tmp_path):
+        path = synthetic_data.write_pmx(tmp_path / "a.pmx", vertex_count=30, face_count=20)
+        model = pypmxvmd.load_pmx(path)
+        hook = _RecordingHook()
+        with instrumented(hook):
+            pypmxvmd.save_pmx(model, tmp_path / "b.pmx")
+        by_name = {e.section: e for e in hook.sections}
+        assert by_name["vertices"].count == 30
+        assert by_name["faces"].count == 20
+        assert by_name["file"].end == (tmp_path / "b.pmx").stat().st_size
+        assert by_name["materials"].end == by_name["file"].end
+
+
+class TestStatsCollector:
+    """Aggregation across calls."""
+
+    def test_aggregates_calls(self, tmp_path):
+        path = synthetic_data.write_vpd(tmp_path / "a.vpd", bone_count=4, morph_count=2)
+        collector = StatsCollector()
+        with instrumented(collector):
+            pypmxvmd.load_vpd(path)
+            pypmxvmd.load_vpd(path)
+        calls = collector.backend_calls()
+        backend = "cython" if VPD_CYTHON else "python"
+        assert calls[("vpd", "parse", backend)] == 2
+        summary = collector.summary()
+        assert summary[0]["count"] == 12
+        assert f"vpd/parse/{backend}" in collector.format_report()
+
+        collector.reset()
+        assert collector.summary() == []
+        assert collector.fallback_count == 0
+
+    def test_set_hook_returns_previous(self):
+        collector = StatsCollector()
+        assert set_hook(collector) is None
+        try:
+            assert set_hook(None) is collector
+        finally:
+            set_hook(None)
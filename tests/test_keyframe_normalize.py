@@ -0,0 +1,72 @@
+"""
+Tests for VMD keyframe sorting and deduplication.
+"""
+
+import pypmxvmd
+from pypmxvmd.common.models.vmd import (
+    VmdBoneFrame, VmdCameraFrame, VmdMorphFrame, VmdMotion
+)
+from pypmxvmd.common.processing.keyframes import sort_keyframes
+from tests import synthetic_data
+
+
+def _unordered_motion():
+    motion = VmdMotion()
+    motion.bone_frames = [
+        VmdBoneFrame("b", 10, [1, 0, 0]),
+        VmdBoneFrame("a", 5),
+        VmdBoneFrame("b", 0),
+        VmdBoneFrame("b", 10, [2, 0, 0]),
+        VmdBoneFrame("a", 1),
+    ]
+    motion.morph_frames = [VmdMorphFrame("x", 3, 0.1), VmdMorphFrame("x", 3, 0.9),
+                           VmdMorphFrame("x", 1, 0.5)]
+    motion.camera_frames = [VmdCameraFrame(20), VmdCameraFrame(4, distance=1.0),
+                            VmdCameraFrame(4, distance=2.0)]
+    return motion
+
+
+class TestSortKeyframes:
+    """Lexicographic (name, frame) sort with last-wins deduplication."""
+
+    def test_groups_sorts_and_keeps_last(self):
+        frames = _unordered_motion().bone_frames
+        result = sort_keyframes(frames, "bone_name")
+        assert [(f.bone_name, f.frame_number) for f in result] == [
+            ("b", 0), ("b", 10), ("a", 1), ("a", 5)]
+        assert result[1] is frames[3]
+        assert len(frames) == 5
+
+    def test_frame_only(self):
+        frames = _unordered_motion().camera_frames
+        result = sort_keyframes(frames)
+        assert [(f.frame_number, f.distance) for f in result] == [(4, 2.0), (20, 45.0)]
+        assert sort_keyframes([]) == []
+
+
+class TestNormalizeMotion:
+    """Whole-motion normalization and the save option."""
+
+    def test_copy_and_in_place(self):
+        motion = _unordered_motion()
+        normalized = pypmxvmd.normalize_motion(motion)
+        assert normalized is not motion
+        assert len(motion.bone_frames) == 5
+        assert [(m.frame_number, m.weight) for m in normalized.morph_frames] == [(1, 0.5), (3, 0.9)]
+        assert pypmxvmd.normalize_motion(motion, in_place=True) is motion
+        assert len(motion.bone_frames) == 4
+
+    def test_save_option(self, tmp_path):
+        motion = _unordered_motion()
+        pypmxvmd.save_vmd(motion, tmp_path / "a.vmd", normalize=True)
+        loaded = pypmxvmd.load_vmd(tmp_path / "a.vmd")
+        assert [(f.bone_name, f.frame_number) for f in loaded.bone_frames] == [
+            ("b", 0), ("b", 10), ("a", 1), ("a", 5)]
+        assert loaded.bone_frames[1].position[0] == 2.0
+        assert len(motion.bone_frames) == 5
+
+    def test_already_sorted_motion_is_unchanged(self, tmp_path):
+        path = synthetic_data.write_vmd(tmp_path / "a.vmd", bone_frames=50, morph_frames=10)
+        motion = pypmxvmd.load_vmd(path)
+        normalized = pypmxvmd.normalize_motion(motion)
+        assert sorted(id(f) for f in normalized.bone_frames) == sorted(id(f) for f in motion.bone_frames)
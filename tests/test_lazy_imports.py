@@ -0,0 +1,73 @@
+"""
+Tests for lazy package imports.
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import pypmxvmd
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+def _loaded_modules(statement: str) -> set:
+    """Run a statement in a fresh interpreter and return the loaded pypmxvmd modules."""
+    code = (f"import sys, json; {statement}; "
+            "print(json.dumps(sorted(m for m in sys.modules if m.startswith('pypmxvmd'))))")
+    output = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT,
+                            capture_output=True, text=True, check=True).stdout
+    return set(json.loads(output.strip().splitlines()[-1]))
+
+
+class TestLazyImports:
+    """`import pypmxvmd` defers parsers, models and accelerators."""
+
+    def test_import_loads_no_parsers(self):
+        modules = _loaded_modules("import pypmxvmd")
+        assert modules == {"pypmxvmd"}
+
+    def test_vmd_parser_does_not_load_other_formats(self):
+        modules = _loaded_modules("import pypmxvmd; pypmxvmd.VmdParser")
+        assert "pypmxvmd.common.parsers.vmd_parser" in modules
+        assert "pypmxvmd.common.parsers.pmx_parser" not in modules
+        assert "pypmxvmd.common.parsers.vpd_parser" not in modules
+        assert "pypmxvmd.common.parsers.vmd_parser_nuthouse" not in modules
+
+    def test_submodule_import_does_not_load_package_siblings(self):
+        modules = _loaded_modules("import pypmxvmd.common.parsers.vpd_parser")
+        assert "pypmxvmd.common.parsers.vmd_parser" not in modules
+        assert "pypmxvmd.common.models.pmx" not in modules
+
+
+class TestLazyAttributes:
+    """Public names stay reachable through module `__getattr__`."""
+
+    def test_public_names_resolve(self):
+        for name in pypmxvmd.__all__:
+            assert getattr(pypmxvmd, name) is not None
+        from pypmxvmd.common.parsers.vmd_parser import VmdParser
+        assert pypmxvmd.VmdParser is VmdParser
+
+    def test_common_package_names_resolve(self):
+        from pypmxvmd.common import VmdMotion, PmxParser, BinaryIOHandler
+        from pypmxvmd.common.models.vmd import VmdMotion as Direct
+        assert VmdMotion is Direct
+        assert PmxParser.__name__ == "PmxParser"
+        assert BinaryIOHandler.__name__ == "BinaryIOHandler"
+
+    def test_shared_parser_instance(self):
+        assert pypmxvmd._vmd_parser is pypmxvmd._vmd_parser
+
+    def test_unknown_attribute(self):
+        with pytest.raises(AttributeError):
+            pypmxvmd.NoSuchThing
+        with pytest.raises(AttributeError):
+            import pypmxvmd.common.parsers as parsers
+            parsers.NoSuchParser
+
+    def test_dir_lists_lazy_names(self):
+        assert "VmdParser" in dir(pypmxvmd)
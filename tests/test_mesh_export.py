@@ -0,0 +1,115 @@
+"""
+Tests for glTF binary and OBJ mesh export.
+"""
+
+import json
+import struct
+from array import array
+
+import pytest
+
+import pypmxvmd
+from pypmxvmd.common.models.pmx import (
+    MorphType, PmxMaterial, PmxModel, PmxMorph, PmxMorphItemVertex, PmxVertex
+)
+
+
+def _model():
+    model = PmxModel()
+    model.header.name_jp = "quad"
+    model.vertices = [PmxVertex(position=[float(i % 2), float(i // 2), float(i)], normal=[0.0, 0.0, -1.0],
+                                uv=[0.25 * i, 0.5]) for i in range(4)]
+    model.faces = [[0, 1, 2], [2, 1, 3]]
+    model.materials = [PmxMaterial(name_jp="a", name_en="front face", face_count=3, texture_path="tex\\a.png"),
+                       PmxMaterial(name_jp="b", diffuse_color=[1.0, 0.0, 0.0, 0.5], face_count=3)]
+    model.morphs = [PmxMorph("up", morph_type=MorphType.VERTEX, items=[PmxMorphItemVertex(3, [0.0, 2.0, 0.0])])]
+    return model
+
+
+def _read_glb(path):
+    data = path.read_bytes()
+    magic, version, total = struct.unpack_from("<III", data)
+    assert (magic, version, total) == (0x46546C67, 2, len(data))
+    json_length, _kind = struct.unpack_from("<II", data, 12)
+    document = json.loads(data[20:20 + json_length])
+    bin_length, _kind = struct.unpack_from("<II", data, 20 + json_length)
+    return document, data[28 + json_length:28 + json_length + bin_length]
+
+
+def _accessor(document, binary, index, typecode):
+    accessor = document["accessors"][index]
+    view = document["bufferViews"][accessor["bufferView"]]
+    start = view["byteOffset"] + accessor.get("byteOffset", 0)
+    width = {"SCALAR": 1, "VEC2": 2, "VEC3": 3}[accessor["type"]]
+    values = array(typecode)
+    values.frombytes(binary[start:start + accessor["count"] * width * values.itemsize])
+    return values.tolist()
+
+
+class TestExportGlb:
+    """Layout, coordinate conversion and streaming."""
+
+    def test_layout(self, tmp_path):
+        path = tmp_path / "a.glb"
+        pypmxvmd.export_glb(_model(), path)
+        document, binary = _read_glb(path)
+        assert len(binary) == document["buffers"][0]["byteLength"] == 4 * 12 * 2 + 4 * 8 + 6 * 4
+        primitives = document["meshes"][0]["primitives"]
+        assert [p["material"] for p in primitives] == [0, 1]
+        assert _accessor(document, binary, 0, "f")[:6] == [0.0, 0.0, -0.0, 1.0, 0.0, -1.0]
+        assert document["accessors"][0]["min"] == [0.0, 0.0, -3.0]
+        assert _accessor(document, binary, 1, "f")[:3] == [0.0, 0.0, 1.0]
+        assert _accessor(document, binary, primitives[1]["indices"], "I") == [2, 3, 1]
+        assert document["images"] == [{"uri": "tex/a.png"}]
+        assert document["materials"][1]["alphaMode"] == "BLEND"
+
+    def test_streaming_matches_bulk(self, tmp_path):
+        bulk, streamed = tmp_path / "bulk.glb", tmp_path / "streamed.glb"
+        pypmxvmd.export_glb(_model(), bulk, right_handed=False)
+        pypmxvmd.export_glb(_model(), streamed, right_handed=False, chunk_size=1)
+        assert bulk.read_bytes() == streamed.read_bytes()
+        document, binary = _read_glb(bulk)
+        assert _accessor(document, binary, 4, "I") == [2, 1, 3]
+
+    def test_morphed_and_posed_positions(self, tmp_path):
+        path = tmp_path / "a.glb"
+        pypmxvmd.export_glb(_model(), path, morphs={"up": 1.0}, right_handed=False)
+        document, binary = _read_glb(path)
+        assert _accessor(document, binary, 0, "f")[9:12] == [1.0, 3.0, 3.0]
+        positions = array('f', [0.0] * 12)
+        pypmxvmd.export_glb(_model(), path, positions=positions)
+        document, binary = _read_glb(path)
+        assert _accessor(document, binary, 0, "f") == [0.0] * 12
+        with pytest.raises(ValueError):
+            pypmxvmd.export_glb(_model(), path, positions=positions[:-1])
+        with pytest.raises(ValueError):
+            pypmxvmd.export_glb(_model(), path, chunk_size=0)
+
+    def test_empty_model(self, tmp_path):
+        path = tmp_path / "empty.glb"
+        pypmxvmd.export_glb(PmxModel(), path)
+        document = json.loads(path.read_bytes()[20:].decode("utf-8"))
+        assert "meshes" not in document and "buffers" not in document
+
+
+class TestExportObj:
+    """Text layout and material library."""
+
+    def test_layout(self, tmp_path):
+        path = tmp_path / "a.obj"
+        pypmxvmd.export_obj(_model(), path, chunk_size=3)
+        lines = path.read_text(encoding="utf-8").splitlines()
+        assert lines[1] == "mtllib a.mtl"
+        assert lines[2] == "v 0.000000 0.000000 -0.000000"
+        assert sum(line.startswith("v ") for line in lines) == 4
+        assert "vt 0.250000 0.500000" in lines
+        assert lines[lines.index("usemtl material0_front_face") + 1] == "f 1/1/1 3/3/3 2/2/2"
+        assert lines[-1] == "f 3/3/3 4/4/4 2/2/2"
+        mtl = (tmp_path / "a.mtl").read_text(encoding="utf-8")
+        assert "map_Kd tex/a.png" in mtl and "d 0.500000" in mtl
+
+    def test_without_mtl(self, tmp_path):
+        path = tmp_path / "b.obj"
+        pypmxvmd.export_obj(_model(), path, write_mtl=False, right_handed=False)
+        assert not (tmp_path / "b.mtl").exists()
+        assert "v 1.000000 1.000000 3.000000" in path.read_text(encoding="utf-8")
@@ -0,0 +1,110 @@
+"""
+Tests for left/right mirroring of motions and poses.
+"""
+
+import pytest
+
+import pypmxvmd
+from pypmxvmd.common import math3d
+from pypmxvmd.common.models.vmd import (
+    VmdBoneFrame, VmdCameraFrame, VmdIkBone, VmdIkFrame, VmdLightFrame, VmdMorphFrame, VmdMotion
+)
+from pypmxvmd.common.models.vpd import VpdBonePose, VpdMorphPose, VpdPose
+from pypmxvmd.common.processing import MirrorNameTable, mirror_name
+from tests import synthetic_data
+
+
+class TestMirrorNames:
+    """Name pair table."""
+
+    def test_swap_sides(self):
+        assert mirror_name("左腕") == "右腕"
+        assert mirror_name("右足ＩＫ") == "左足ＩＫ"
+        assert mirror_name("センター") == "センター"
+
+    def test_extra_pairs_are_bidirectional(self):
+        names = MirrorNameTable({"ウィンク": "ウィンク右"})
+        assert names["ウィンク"] == "ウィンク右"
+        assert names["ウィンク右"] == "ウィンク"
+        assert names.map_all(["左目", "まばたき"]) == ["右目", "まばたき"]
+
+
+class TestMirrorMotion:
+    """VMD motions, including camera and light frames."""
+
+    def test_bone_frames(self):
+        motion = VmdMotion()
+        motion.bone_frames = [VmdBoneFrame("左腕", 3, [1.0, 2.0, 3.0], [10.0, 20.0, 30.0])]
+        motion.morph_frames = [VmdMorphFrame("ウィンク右", 3, 0.7)]
+        motion.ik_frames = [VmdIkFrame(0, True, [VmdIkBone("左足ＩＫ", False)])]
+        mirrored = pypmxvmd.mirror(motion, {"ウィンク": "ウィンク右"})
+
+        frame = mirrored.bone_frames[0]
+        assert (frame.bone_name, frame.frame_number) == ("右腕", 3)
+        assert frame.position == [-1.0, 2.0, 3.0]
+        assert frame.rotation == [10.0, -20.0, -30.0]
+        assert frame.interpolation == motion.bone_frames[0].interpolation
+        assert frame.interpolation is not motion.bone_frames[0].interpolation
+        assert mirrored.morph_frames[0].morph_name == "ウィンク"
+        assert mirrored.ik_frames[0].ik_bones[0].bone_name == "右足ＩＫ"
+        assert motion.bone_frames[0].bone_name == "左腕"
+
+    def test_euler_negation_matches_reflected_quaternion(self):
+        euler = [25.0, -40.0, 70.0]
+        motion = VmdMotion()
+        motion.bone_frames = [VmdBoneFrame("首", 0, [0, 0, 0], euler)]
+        mirrored = pypmxvmd.mirror(motion).bone_frames[0].rotation
+        w, x, y, z = math3d.euler_to_quaternion(mirrored)
+        ow, ox, oy, oz = math3d.euler_to_quaternion(euler)
+        sign = 1 if w * ow >= 0 else -1
+        assert [w, x, y, z] == pytest.approx([sign * ow, sign * ox, -sign * oy, -sign * oz], abs=1e-9)
+
+    def test_camera_and_light(self):
+        motion = VmdMotion()
+        motion.camera_frames = [VmdCameraFrame(0, 30.0, [1.0, 10.0, 0.0], [0.1, 0.2, 0.3])]
+        motion.light_frames = [VmdLightFrame(0, [0.6, 0.6, 0.6], [-0.5, -1.0, 0.5])]
+        mirrored = pypmxvmd.mirror(motion)
+        assert mirrored.camera_frames[0].position == [-1.0, 10.0, 0.0]
+        assert mirrored.camera_frames[0].rotation == [0.1, -0.2, -0.3]
+        assert mirrored.light_frames[0].position == [0.5, -1.0, 0.5]
+
+    def test_double_mirror_is_identity(self, tmp_path):
+        path = synthetic_data.write_vmd(tmp_path / "a.vmd", bone_frames=100, morph_frames=10,
+                                        camera_frames=3)
+        motion = pypmxvmd.load_vmd(path)
+        assert not pypmxvmd.diff(motion, pypmxvmd.mirror(pypmxvmd.mirror(motion)))
+
+
+class TestMirrorPose:
+    """VPD poses and pose tables."""
+
+    def _pose(self):
+        return VpdPose("model", [VpdBonePose("左手首", [1.0, 2.0, 3.0], [0.1, 0.2, 0.3, 0.9]),
+                                 VpdBonePose("右手首", [4.0, 5.0, 6.0], [0.0, 0.0, 0.0, 1.0])],
+                       [VpdMorphPose("左眉上", 0.25)])
+
+    def test_pose(self):
+        mirrored = pypmxvmd.mirror(self._pose())
+        assert [b.bone_name for b in mirrored.bone_poses] == ["右手首", "左手首"]
+        assert mirrored.bone_poses[0].position == [-1.0, 2.0, 3.0]
+        assert mirrored.bone_poses[0].rotation == [0.1, -0.2, -0.3, 0.9]
+        assert mirrored.morph_poses[0].morph_name == "右眉上"
+
+    def test_pose_table_matches_single_pose(self, tmp_path):
+        paths = [synthetic_data.write_vpd(tmp_path / f"{i}.vpd", bone_count=6, morph_count=2, seed=i)
+                 for i in range(3)]
+        table = pypmxvmd.load_vpd_many(paths, max_workers=1)
+        mirrored = pypmxvmd.mirror(table)
+        assert len(mirrored) == 3
+        for i in range(3):
+            expected = pypmxvmd.mirror(table.get_pose(i))
+            actual = mirrored.get_pose(i)
+            assert [b.bone_name for b in actual.bone_poses] == [b.bone_name for b in expected.bone_poses]
+            for got, want in zip(actual.bone_poses, expected.bone_poses):
+                assert got.position == pytest.approx(want.position)
+                assert got.rotation == pytest.approx(want.rotation)
+            assert mirrored.bone_index(actual.bone_poses[0].bone_name) >= 0
+
+    def test_unsupported_type(self):
+        with pytest.raises(ValueError):
+            pypmxvmd.mirror(object())
@@ -0,0 +1,150 @@
+"""
+Tests for morph parsing and the sparse morph engine.
+"""
+
+import struct
+
+import pytest
+
+import pypmxvmd
+from pypmxvmd.common import math3d
+from pypmxvmd.common.models.pmx import (
+    MorphType, PmxModel, PmxMorph, PmxMorphItemBone, PmxMorphItemFlip, PmxMorphItemGroup,
+    PmxMorphItemImpulse, PmxMorphItemMaterial, PmxMorphItemUV, PmxMorphItemVertex, PmxVertex
+)
+from pypmxvmd.common.parsers.pmx_parser_nuthouse import PmxParserNuthouse
+from pypmxvmd.common.parsers.pmx_sections import PmxSectionReader
+from pypmxvmd.common.processing import MorphEngine
+from tests import synthetic_data
+
+
+def _model():
+    model = PmxModel()
+    model.vertices = [PmxVertex(position=[float(i), 0.0, 0.0], uv=[0.5, 0.5]) for i in range(4)]
+    model.morphs = [
+        PmxMorph("a", morph_type=MorphType.VERTEX,
+                 items=[PmxMorphItemVertex(1, [0.0, 1.0, 0.0]), PmxMorphItemVertex(2, [0.0, 0.0, 2.0])]),
+        PmxMorph("b", morph_type=MorphType.VERTEX, items=[PmxMorphItemVertex(1, [1.0, 0.0, 0.0])]),
+        PmxMorph("uv", morph_type=MorphType.UV, items=[PmxMorphItemUV(3, [0.25, -0.5, 0.0, 0.0])]),
+        PmxMorph("group", morph_type=MorphType.GROUP,
+                 items=[PmxMorphItemGroup(0, 0.5), PmxMorphItemGroup(1, 2.0)]),
+        PmxMorph("nested", morph_type=MorphType.GROUP, items=[PmxMorphItemGroup(3, 0.5)]),
+        PmxMorph("bone", morph_type=MorphType.BONE,
+                 items=[PmxMorphItemBone(7, [0.0, 2.0, 0.0], [0.0, 90.0, 0.0])]),
+        PmxMorph("flip", morph_type=MorphType.FLIP,
+                 items=[PmxMorphItemFlip(0, 1.0), PmxMorphItemFlip(1, 1.0)]),
+    ]
+    return model
+
+
+class TestMorphEngine:
+    """Compilation, group flattening and evaluation."""
+
+    def test_vertex_and_uv(self):
+        result = pypmxvmd.apply_morphs(_model(), {"a": 0.5, "uv": 1.0})
+        assert result.position(0) == [0.0, 0.0, 0.0]
+        assert result.position(1) == [1.0, 0.5, 0.0]
+        assert result.position(2) == [2.0, 0.0, 1.0]
+        assert result.uv(3) == [0.75, 0.0]
+        assert result.uv(0) == [0.5, 0.5]
+
+    def test_groups_are_flattened(self):
+        model = _model()
+        assert pypmxvmd.apply_morphs(model, {"nested": 1.0}).weights == {0: 0.25, 1: 1.0}
+        by_index = pypmxvmd.apply_morphs(model, [0.0, 0.0, 0.0, 1.0])
+        assert by_index.position(1) == [3.0, 0.5, 0.0]
+
+    def test_bone_and_flip(self):
+        model = _model()
+        result = pypmxvmd.apply_morphs(model, {"bone": 0.5})
+        translation, rotation = result.bone_offsets[7]
+        assert translation == [0.0, 1.0, 0.0]
+        expected = math3d.euler_to_quaternion([0.0, 45.0, 0.0])
+        assert list(rotation) == pytest.approx(list(expected), abs=1e-9)
+        assert pypmxvmd.apply_morphs(model, {"flip": 0.2}).weights == {0: 1.0}
+        assert pypmxvmd.apply_morphs(model, {"flip": 0.8}).weights == {1: 1.0}
+
+    def test_engine_is_cached(self):
+        model = _model()
+        engine = MorphEngine.of(model)
+        assert MorphEngine.of(model) is engine
+        model.morphs = model.morphs[:2]
+        assert MorphEngine.of(model) is not engine
+
+    def test_errors(self):
+        model = _model()
+        with pytest.raises(ValueError):
+            pypmxvmd.apply_morphs(model, {"missing": 1.0})
+        model.morphs[3].items.append(PmxMorphItemGroup(4, 1.0))
+        with pytest.raises(ValueError, match="循环"):
+            MorphEngine(model)
+        model = _model()
+        model.morphs[0].items.append(PmxMorphItemVertex(99, [1.0, 0.0, 0.0]))
+        with pytest.raises(ValueError):
+            MorphEngine(model)
+
+
+class TestMorphParsing:
+    """Morph section parsing shared by the fast and Cython parsers."""
+
+    def test_load_pmx_reads_morphs(self, tmp_path):
+        path = synthetic_data.write_pmx(tmp_path / "a.pmx", vertex_count=60, face_count=20,
+                                        morph_count=3, morph_item_count=10)
+        model = pypmxvmd.load_pmx(path)
+        assert [m.name_jp for m in model.morphs] == ["まばたき", "笑い", "ウィンク"]
+        assert all(len(m.items) == 10 for m in model.morphs)
+        result = pypmxvmd.apply_morphs(model, {"笑い": 1.0})
+        item = model.morphs[1].items[0]
+        moved = [c for c in model.vertices[item.vertex_index].position]
+        for other in model.morphs[1].items:
+            if other.vertex_index == item.vertex_index:
+                moved = [p + d for p, d in zip(moved, other.offset)]
+        assert result.position(item.vertex_index) == pytest.approx(moved, abs=1e-5)
+
+    def test_all_item_types(self):
+        def text(value):
+            raw = value.encode("utf-16le")
+            return struct.pack("<I", len(raw)) + raw
+
+        data = struct.pack("<i", 0) + struct.pack("<i", 5)
+        data += text("uv") + text("") + struct.pack("<bbi", 4, 5, 1) + struct.pack("<H4f", 300, 1, 2, 3, 4)
+        data += text("mat") + text("") + struct.pack("<bbi", 4, 8, 1) + struct.pack("<bB28f", -1, 1, *range(28))
+        data += text("flip") + text("") + struct.pack("<bbi", 4, 9, 1) + struct.pack("<bf", 0, 0.5)
+        data += text("impulse") + text("") + struct.pack("<bbi", 4, 10, 1) + struct.pack("<bB6f", 2, 1, *range(6))
+        data += text("bone") + text("") + struct.pack("<bbi", 4, 2, 1) + struct.pack("<b7f", 3, 1, 2, 3, 0, 0, 0, 1)
+        reader = PmxSectionReader(data, 0, "utf-16le", (2, 1, 1, 1, 1, 1))
+        assert reader.skip_bones() == 0
+        morphs = reader.read_morphs()
+        assert reader.pos == len(data)
+
+        assert morphs[0].morph_type == MorphType.EXTENDED_UV2
+        assert isinstance(morphs[0].items[0], PmxMorphItemUV)
+        assert morphs[0].items[0].to_list() == [300, [1.0, 2.0, 3.0, 4.0]]
+        material = morphs[1].items[0]
+        assert isinstance(material, PmxMorphItemMaterial)
+        assert (material.material_index, material.operation, material.toon_color) == (-1, 1, [24, 25, 26, 27])
+        assert isinstance(morphs[2].items[0], PmxMorphItemFlip)
+        impulse = morphs[3].items[0]
+        assert isinstance(impulse, PmxMorphItemImpulse) and impulse.is_local and impulse.torque == [3, 4, 5]
+        bone = morphs[4].items[0]
+        assert bone.translation == [1.0, 2.0, 3.0] and bone.rotation == pytest.approx([0.0, 0.0, 0.0])
+        for morph in morphs:
+            morph.validate()
+
+    def test_nuthouse_small_indices(self):
+        def text(value):
+            raw = value.encode("utf-16le")
+            return struct.pack("<I", len(raw)) + raw
+
+        data = struct.pack("<i", 3)
+        data += text("group") + text("") + struct.pack("<bbi", 4, 0, 2) + struct.pack("<bfbf", 1, 0.5, 2, 0.25)
+        data += text("flip") + text("") + struct.pack("<bbi", 4, 9, 2) + struct.pack("<bfbf", 0, 0.75, 2, 1.0)
+        data += text("vertex") + text("") + struct.pack("<bbi", 4, 1, 1) + struct.pack("<B3f", 7, 1, 2, 3)
+        parser = PmxParserNuthouse()
+        parser.idx_vert, parser.idx_bone, parser.idx_morph = "B", "b", "b"
+        buffer = bytearray(data)
+        morphs = parser._parse_pmx_morphs(buffer, False)
+        assert not buffer
+        assert [item.to_list() for item in morphs[0].items] == [[1, 0.5], [2, 0.25]]
+        assert [item.to_list() for item in morphs[1].items] == [[0, 0.75], [2, 1.0]]
+        assert morphs[2].items[0].to_list() == [7, [1.0, 2.0, 3.0]]
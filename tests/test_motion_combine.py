@@ -0,0 +1,90 @@
+"""
+Tests for merging and concatenating VMD motions.
+"""
+
+import pytest
+
+import pypmxvmd
+from pypmxvmd.common.models.vmd import (
+    VmdBoneFrame, VmdCameraFrame, VmdIkBone, VmdIkFrame, VmdMorphFrame, VmdMotion
+)
+
+
+def _clip(bone, frames, model_name="m", morph=None):
+    motion = VmdMotion()
+    motion.header.model_name = model_name
+    motion.bone_frames = [VmdBoneFrame(bone, f, [float(f), 0, 0], [0, 0, 0]) for f in frames]
+    if morph:
+        motion.morph_frames = [VmdMorphFrame(morph, f, 0.5) for f in frames]
+    return motion
+
+
+class TestMergeMotions:
+    """Merging clips that share one timeline."""
+
+    def test_union_of_bones(self):
+        merged = pypmxvmd.merge_motions([_clip("a", [10, 0]), _clip("b", [5], "other")])
+        assert [(f.bone_name, f.frame_number) for f in merged.bone_frames] == [
+            ("a", 0), ("a", 10), ("b", 5)]
+        assert merged.header.model_name == "m"
+        merged.validate()
+
+    def test_later_motion_wins(self):
+        first, second = _clip("a", [0]), _clip("a", [0])
+        second.bone_frames[0].position = [9.0, 9.0, 9.0]
+        merged = pypmxvmd.merge_motions([first, second])
+        assert len(merged.bone_frames) == 1
+        assert merged.bone_frames[0].position == [9.0, 9.0, 9.0]
+
+    def test_frames_are_new_objects(self):
+        clip = _clip("a", [0, 1])
+        merged = pypmxvmd.merge_motions([clip])
+        merged.bone_frames[0].position[0] = 100.0
+        merged.bone_frames[0].interpolation[0] = 0
+        assert clip.bone_frames[0].position[0] == 0.0
+        assert clip.bone_frames[0].interpolation[0] == 20
+
+    def test_without_normalize_keeps_input_order(self):
+        merged = pypmxvmd.merge_motions([_clip("a", [10, 0]), _clip("a", [10])], normalize=False)
+        assert [f.frame_number for f in merged.bone_frames] == [10, 0, 10]
+
+    def test_empty(self):
+        assert pypmxvmd.merge_motions([]).bone_frames == []
+
+
+class TestConcatMotions:
+    """Concatenating consecutive clips with frame offsets."""
+
+    def test_automatic_offsets_share_boundary_frame(self):
+        first = _clip("a", [0, 30], morph="x")
+        second = _clip("a", [0, 20], morph="x")
+        second.bone_frames[0].position = [7.0, 0, 0]
+        result = pypmxvmd.concat_motions([first, second])
+        assert [f.frame_number for f in result.bone_frames] == [0, 30, 50]
+        assert result.bone_frames[1].position[0] == 7.0
+        assert [m.frame_number for m in result.morph_frames] == [0, 30, 50]
+
+    def test_gap_and_explicit_offsets(self):
+        clips = [_clip("a", [0, 10]), _clip("a", [0, 10])]
+        assert [f.frame_number for f in pypmxvmd.concat_motions(clips, gap=5).bone_frames] == [
+            0, 10, 15, 25]
+        assert [f.frame_number for f in pypmxvmd.concat_motions(clips, offsets=[100, 0]).bone_frames] == [
+            0, 10, 100, 110]
+
+    def test_other_frame_types_are_offset(self):
+        first = _clip("a", [0, 10])
+        second = VmdMotion()
+        second.camera_frames = [VmdCameraFrame(2, distance=3.0)]
+        second.ik_frames = [VmdIkFrame(4, True, [VmdIkBone("左足ＩＫ", False)])]
+        result = pypmxvmd.concat_motions([first, second])
+        assert result.camera_frames[0].frame_number == 12
+        assert result.ik_frames[0].frame_number == 14
+        assert result.ik_frames[0].ik_bones[0] is not second.ik_frames[0].ik_bones[0]
+        assert second.camera_frames[0].frame_number == 2
+
+    def test_invalid_offsets(self):
+        clips = [_clip("a", [0]), _clip("a", [0])]
+        with pytest.raises(ValueError):
+            pypmxvmd.concat_motions(clips, offsets=[0])
+        with pytest.raises(ValueError):
+            pypmxvmd.concat_motions(clips, offsets=[0, -5])
@@ -0,0 +1,140 @@
+"""
+Tests for normal and tangent recomputation.
+"""
+
+import math
+import random
+
+import pytest
+
+import pypmxvmd
+from pypmxvmd.common.models.pmx import PmxMaterial, PmxModel, PmxVertex
+from pypmxvmd.common.processing import compute_normals, compute_tangents
+from pypmxvmd.common.processing import normals as normals_module
+
+
+@pytest.fixture(params=["python", "cython"])
+def backend(request, monkeypatch):
+    """Run a test against the pure-Python loops and, when compiled, the Cython kernel."""
+    if request.param == "cython":
+        if not normals_module._CYTHON_AVAILABLE:
+            pytest.skip("Cython normals kernel not compiled")
+    else:
+        monkeypatch.setattr(normals_module, "_CYTHON_AVAILABLE", False)
+    return request.param
+
+
+def _fold():
+    """Two triangles folded 90 degrees along the z axis, with the fold vertices split."""
+    model = PmxModel()
+    model.vertices = [
+        PmxVertex(position=[0.0, 0.0, 0.0], uv=[0.0, 1.0]), PmxVertex(position=[0.0, 0.0, 1.0], uv=[0.0, 0.0]),
+        PmxVertex(position=[1.0, 0.0, 0.0], uv=[1.0, 1.0]),
+        PmxVertex(position=[0.0, 0.0, 0.0]), PmxVertex(position=[0.0, 0.0, 1.0]),
+        PmxVertex(position=[0.0, 1.0, 0.0]),
+    ]
+    model.faces = [[0, 1, 2], [3, 5, 4]]
+    model.materials = [PmxMaterial(name_jp="a", face_count=6)]
+    return model
+
+
+def _vector(values, index, size=3):
+    return list(values[index * size:index * size + size])
+
+
+@pytest.mark.usefixtures("backend")
+class TestNormals:
+    """Weighted smoothing, seams and hard edges."""
+
+    def test_face_normals(self):
+        normals = compute_normals(_fold())
+        assert _vector(normals, 0) == pytest.approx([0.0, 1.0, 0.0])
+        assert _vector(normals, 3) == pytest.approx([1.0, 0.0, 0.0])
+
+    def test_weighting(self):
+        model = _fold()
+        model.faces = [[0, 1, 2], [0, 5, 1]]
+        model.vertices[5].position = [0.0, 3.0, 0.0]
+        half = math.sqrt(0.5)
+        assert _vector(compute_normals(model), 0) == pytest.approx([half, half, 0.0])
+        area = _vector(compute_normals(model, weighting="area"), 0)
+        assert area[0] > area[1]
+        with pytest.raises(ValueError):
+            compute_normals(model, weighting="uniform")
+
+    def test_seams_and_creases(self):
+        model = _fold()
+        half = math.sqrt(0.5)
+        merged = compute_normals(model, merge_seams=True)
+        assert _vector(merged, 0) == pytest.approx([half, half, 0.0])
+        assert _vector(merged, 3) == pytest.approx([half, half, 0.0])
+        assert _vector(merged, 2) == pytest.approx([0.0, 1.0, 0.0])
+        hard = compute_normals(model, merge_seams=True, crease_angle=60.0)
+        assert _vector(hard, 0) == pytest.approx([0.0, 1.0, 0.0])
+        model.materials = [PmxMaterial(name_jp="a", face_count=3), PmxMaterial(name_jp="b", face_count=3)]
+        assert _vector(compute_normals(model, merge_seams=True), 0) == pytest.approx([0.0, 1.0, 0.0])
+
+    def test_recompute_in_place_and_morphed_positions(self):
+        model = _fold()
+        model.vertices[0].normal = [0.0, 0.0, 1.0]
+        pypmxvmd.recompute_normals(model)
+        assert model.vertices[0].normal == pytest.approx([0.0, 1.0, 0.0])
+        positions = [c for vertex in model.vertices for c in vertex.position]
+        positions[7] = -1.0
+        half = math.sqrt(0.5)
+        assert _vector(compute_normals(model, positions=positions), 0) == pytest.approx([half, half, 0.0])
+        with pytest.raises(ValueError):
+            compute_normals(model, positions=positions[:-3])
+
+
+@pytest.mark.usefixtures("backend")
+class TestTangents:
+    """Tangent direction, orthogonality and handedness."""
+
+    def test_tangent_follows_u(self):
+        model = _fold()
+        pypmxvmd.recompute_normals(model)
+        tangents = compute_tangents(model)
+        assert _vector(tangents, 0, 4) == pytest.approx([1.0, 0.0, 0.0, tangents[3]])
+        assert tangents[3] in (1.0, -1.0)
+        model.vertices[2].uv = [-1.0, 1.0]
+        assert compute_tangents(model)[3] == -tangents[3]
+
+    def test_vertices_without_uv_get_perpendicular_tangent(self):
+        model = _fold()
+        normals = compute_normals(model)
+        tangents = compute_tangents(model, normals=normals)
+        tangent = _vector(tangents, 3, 4)[:3]
+        assert sum(t * n for t, n in zip(tangent, _vector(normals, 3))) == pytest.approx(0.0)
+        assert math.sqrt(sum(t * t for t in tangent)) == pytest.approx(1.0)
+
+
+class TestBackends:
+    """The Cython kernel matches the pure-Python loops."""
+
+    def test_random_mesh(self, monkeypatch):
+        if not normals_module._CYTHON_AVAILABLE:
+            pytest.skip("Cython normals kernel not compiled")
+        rng = random.Random(3)
+        model = PmxModel()
+        model.vertices = [PmxVertex(position=[rng.uniform(-1, 1) for _ in range(3)],
+                                    uv=[rng.random(), rng.random()]) for _ in range(60)]
+        model.faces = [[rng.randrange(60) for _ in range(3)] for _ in range(100)]
+        model.materials = [PmxMaterial(name_jp="a", face_count=150), PmxMaterial(name_jp="b", face_count=150)]
+        results = []
+        for available in (True, False):
+            monkeypatch.setattr(normals_module, "_CYTHON_AVAILABLE", available)
+            normals = compute_normals(model, merge_seams=True)
+            results.append((list(normals), list(compute_normals(model, weighting="area")),
+                            list(compute_tangents(model, normals=normals))))
+        for cython_values, python_values in zip(*results):
+            assert cython_values == pytest.approx(python_values)
+
+    def test_index_out_of_range(self):
+        model = _fold()
+        model.faces = [[0, 1, 6]]
+        model.materials = [PmxMaterial(name_jp="a", face_count=3)]
+        with pytest.raises(IndexError):
+            compute_normals(model)
+        with pytest.raises(IndexError):
+            compute_tangents(model)
@@ -0,0 +1,132 @@
+"""
+Tests for vertex-cache triangle reordering and vertex fetch reordering.
+"""
+
+import random
+
+import pytest
+
+import pypmxvmd
+from pypmxvmd.common.models.pmx import (
+    MorphType, PmxMaterial, PmxMeshIndex, PmxModel, PmxMorph, PmxMorphItemUV, PmxMorphItemVertex, PmxVertex
+)
+from pypmxvmd.common.processing import optimize as optimize_module
+from pypmxvmd.common.processing.optimize import average_cache_miss_ratio
+
+
+@pytest.fixture(params=["python", "cython"])
+def backend(request, monkeypatch):
+    """Run a test against the pure-Python Tipsify and, when compiled, the Cython kernel."""
+    if request.param == "cython":
+        if not optimize_module._CYTHON_AVAILABLE:
+            pytest.skip("Cython optimize kernel not compiled")
+    else:
+        monkeypatch.setattr(optimize_module, "_CYTHON_AVAILABLE", False)
+    return request.param
+
+
+def _grid(size=12, seed=3):
+    model = PmxModel()
+    model.vertices = [PmxVertex(position=[float(x), float(y), 0.0]) for y in range(size) for x in range(size)]
+    faces = []
+    for y in range(size - 1):
+        for x in range(size - 1):
+            a = y * size + x
+            faces += [[a, a + 1, a + size], [a + 1, a + size + 1, a + size]]
+    random.Random(seed).shuffle(faces)
+    half = len(faces) // 2
+    model.faces = faces
+    model.materials = [PmxMaterial(name_jp="a", face_count=half * 3),
+                       PmxMaterial(name_jp="b", face_count=(len(faces) - half) * 3)]
+    model.morphs = [
+        PmxMorph("v", morph_type=MorphType.VERTEX, items=[PmxMorphItemVertex(5, [0.0, 0.0, 1.0])]),
+        PmxMorph("uv", morph_type=MorphType.UV, items=[PmxMorphItemUV(7, [0.5, 0.0, 0.0, 0.0])]),
+    ]
+    return model
+
+
+def _triangles(model, faces):
+    return sorted(tuple(sorted(tuple(model.vertices[i].position) for i in face)) for face in faces)
+
+
+@pytest.mark.usefixtures("backend")
+class TestOptimizeMesh:
+    """Cache reordering keeps geometry, material ranges and morph targets intact."""
+
+    def test_improves_cache_and_keeps_geometry(self):
+        model = _grid()
+        ranges = PmxMeshIndex.of(model).ranges
+        per_material = [_triangles(model, model.faces[offset:offset + count]) for offset, count in ranges]
+        report = pypmxvmd.optimize_mesh(model, cache_size=8)
+        assert report.acmr_after < report.acmr_before
+        assert report.acmr_after == pytest.approx(
+            average_cache_miss_ratio([i for face in model.faces for i in face], 8))
+        assert PmxMeshIndex.of(model).ranges == ranges
+        for (offset, count), expected in zip(ranges, per_material):
+            assert _triangles(model, model.faces[offset:offset + count]) == expected
+
+    def test_vertices_in_first_use_order(self):
+        model = _grid()
+        moved = model.vertices[5]
+        textured = model.vertices[7]
+        report = pypmxvmd.optimize_mesh(model)
+        seen = []
+        for face in model.faces:
+            for index in face:
+                if index not in seen:
+                    seen.append(index)
+        assert seen == list(range(len(model.vertices)))
+        assert model.vertices[report.vertex_remap[5]] is moved
+        assert model.morphs[0].items[0].vertex_index == report.vertex_remap[5]
+        assert model.vertices[model.morphs[1].items[0].vertex_index] is textured
+        result = pypmxvmd.apply_morphs(model, {"v": 1.0})
+        assert result.position(report.vertex_remap[5]) == [moved.position[0], moved.position[1], 1.0]
+
+    def test_options(self):
+        model = _grid()
+        original = [list(face) for face in model.faces]
+        report = pypmxvmd.optimize_mesh(model, reorder_vertices=False, materials=[1])
+        assert report.vertex_remap is None
+        half = model.materials[0].face_count // 3
+        assert model.faces[:half] == original[:half]
+        assert _triangles(model, model.faces[half:]) == _triangles(model, original[half:])
+        overdraw = _grid()
+        pypmxvmd.optimize_mesh(overdraw, overdraw=True)
+        assert _triangles(overdraw, overdraw.faces) == _triangles(_grid(), original)
+
+    def test_invalid_morph_index(self):
+        model = _grid()
+        model.morphs[0].items[0].vertex_index = 999
+        faces = model.faces
+        with pytest.raises(ValueError):
+            pypmxvmd.optimize_mesh(model)
+        assert model.faces is faces
+
+
+class TestBackends:
+    """The Cython kernel produces the same ordering as the pure-Python implementation."""
+
+    @pytest.mark.parametrize("overdraw", [False, True])
+    def test_same_result(self, monkeypatch, overdraw):
+        if not optimize_module._CYTHON_AVAILABLE:
+            pytest.skip("Cython optimize kernel not compiled")
+        results = []
+        for available in (True, False):
+            monkeypatch.setattr(optimize_module, "_CYTHON_AVAILABLE", available)
+            model = _grid(24, seed=11)
+            for vertex in model.vertices:
+                vertex.position[2] = (vertex.position[0] * 7 + vertex.position[1] * 3) % 5 * 0.1
+            report = pypmxvmd.optimize_mesh(model, cache_size=12, overdraw=overdraw)
+            results.append((model.faces, list(report.vertex_remap), report.acmr_before, report.acmr_after))
+        assert results[0] == results[1]
+
+    def test_cache_miss_ratio(self, monkeypatch):
+        if not optimize_module._CYTHON_AVAILABLE:
+            pytest.skip("Cython optimize kernel not compiled")
+        rng = random.Random(2)
+        indices = [rng.randrange(40) for _ in range(300)]
+        for cache_size in (0, 1, 8, 32):
+            fast = average_cache_miss_ratio(indices, cache_size)
+            monkeypatch.setattr(optimize_module, "_CYTHON_AVAILABLE", False)
+            assert fast == average_cache_miss_ratio(indices, cache_size)
+            monkeypatch.setattr(optimize_module, "_CYTHON_AVAILABLE", True)
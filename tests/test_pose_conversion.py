@@ -0,0 +1,155 @@
+"""
+Tests for columnar VPD/VMD pose conversion.
+"""
+
+import math
+
+import pytest
+
+import pypmxvmd
+from pypmxvmd.common.math3d import (
+    bezier_progress, euler_to_quaternion, quaternion_to_euler, slerp
+)
+from pypmxvmd.common.models.vmd import (
+    VmdBoneColumns, VmdBoneFrame, VmdMorphColumns, VmdMorphFrame, VmdMotion
+)
+from pypmxvmd.common.models.vpd import VpdPose, VpdBonePose, VpdMorphPose, VpdPoseTable
+from pypmxvmd.common.processing.convert import poses_to_columns
+
+IDENTITY = [0.0, 0.0, 0.0, 1.0]
+
+
+def _quat_xyzw(euler):
+    w, x, y, z = euler_to_quaternion(euler)
+    return [x, y, z, w]
+
+
+def _poses():
+    return [
+        VpdPose("m", [VpdBonePose("a", [0, 0, 0], IDENTITY),
+                      VpdBonePose("b", [1, 2, 3], _quat_xyzw([30, 0, 0]))],
+                [VpdMorphPose("x", 1.0)]),
+        VpdPose("m", [VpdBonePose("a", [10, 0, 0], _quat_xyzw([0, 60, 0]))], []),
+    ]
+
+
+class TestMath3d:
+    """Quaternion helpers and MMD Bezier curves."""
+
+    def test_euler_roundtrip(self):
+        euler = [12.0, -34.0, 56.0]
+        assert quaternion_to_euler(*euler_to_quaternion(euler)) == pytest.approx(euler)
+
+    def test_slerp_midpoint_and_shortest_path(self):
+        q0 = (0.0, 0.0, 0.0, 1.0)
+        q1 = (0.0, math.sin(math.pi / 4), 0.0, math.cos(math.pi / 4))
+        mid = slerp(q0, q1, 0.5)
+        assert mid == pytest.approx((0.0, math.sin(math.pi / 8), 0.0, math.cos(math.pi / 8)))
+        assert slerp(q0, tuple(-c for c in q1), 0.5) == pytest.approx(mid)
+
+    def test_bezier_progress(self):
+        assert bezier_progress((20, 20, 107, 107), 0.3) == 0.3
+        ease = (127, 0, 0, 127)
+        assert bezier_progress(ease, 0.5) == pytest.approx(0.5, abs=1e-6)
+        assert bezier_progress(ease, 0.2) < 0.2
+        assert bezier_progress(ease, 0.0) == 0.0 and bezier_progress(ease, 1.0) == 1.0
+
+
+class TestKeyframeColumns:
+    """Columnar keyframe tracks round-trip through frame objects."""
+
+    def test_bone_columns_group_and_sort(self):
+        frames = [VmdBoneFrame("b", 10, [1, 2, 3], [10, 20, 30]),
+                  VmdBoneFrame("a", 5),
+                  VmdBoneFrame("b", 0, [0, 0, 0], [0, 0, 0], physics_disabled=True)]
+        columns = VmdBoneColumns.from_frames(frames)
+        assert columns.bone_names == ["b", "a"]
+        assert list(columns.track_offsets) == [0, 2, 3]
+        assert list(columns.frame_numbers) == [0, 10, 5]
+        assert columns.track_index("a") == 1 and columns.track_index("zz") == -1
+
+        restored = columns.to_frames()
+        assert [(f.bone_name, f.frame_number) for f in restored] == [("b", 0), ("b", 10), ("a", 5)]
+        assert restored[0].physics_disabled is True
+        assert restored[1].rotation == pytest.approx([10, 20, 30], abs=1e-4)
+        for frame in restored:
+            frame.validate()
+
+    def test_morph_columns_roundtrip(self):
+        frames = [VmdMorphFrame("x", 3, 0.5), VmdMorphFrame("x", 1, 0.25)]
+        columns = VmdMorphColumns.from_frames(frames)
+        assert list(columns.frame_numbers) == [1, 3]
+        assert [f.weight for f in columns.to_frames()] == [0.25, 0.5]
+
+    def test_append_track_validates_lengths(self):
+        columns = VmdBoneColumns()
+        with pytest.raises(ValueError):
+            columns.append_track("a", [0, 1], [0] * 6, [0] * 4)
+
+
+class TestPosesToMotion:
+    """Packing poses into one motion, one pose per keyframe time."""
+
+    def test_fill_missing(self):
+        motion = pypmxvmd.poses_to_motion(_poses(), frame_step=5)
+        keys = {(f.bone_name, f.frame_number): f for f in motion.bone_frames}
+        assert sorted(keys) == [("a", 0), ("a", 5), ("b", 0), ("b", 5)]
+        assert keys[("b", 5)].position == [0, 0, 0]
+        assert keys[("b", 5)].rotation == pytest.approx([0, 0, 0], abs=1e-6)
+        assert keys[("a", 5)].rotation == pytest.approx([0, 60, 0], abs=1e-4)
+        assert [(m.frame_number, m.weight) for m in motion.morph_frames] == [(0, 1.0), (5, 0.0)]
+        assert motion.header.model_name == "m"
+        motion.validate()
+
+    def test_sparse(self):
+        bones, morphs = poses_to_columns(VpdPoseTable.from_dense(0, [], [], []), [])
+        assert len(bones) == 0 and len(morphs) == 0
+        motion = pypmxvmd.poses_to_motion(_poses(), frame_numbers=[3, 7], fill_missing=False)
+        assert sorted((f.bone_name, f.frame_number) for f in motion.bone_frames) == [
+            ("a", 3), ("a", 7), ("b", 3)]
+        assert [m.frame_number for m in motion.morph_frames] == [3]
+
+    def test_invalid_frames(self):
+        with pytest.raises(ValueError):
+            pypmxvmd.poses_to_motion(_poses(), frame_numbers=[5, 5])
+        with pytest.raises(ValueError):
+            pypmxvmd.poses_to_motion(_poses(), frame_numbers=[1])
+
+
+class TestMotionToPoses:
+    """Sampling poses from a motion with Bezier interpolation."""
+
+    def test_roundtrip_at_keyframes(self):
+        motion = pypmxvmd.poses_to_motion(_poses(), frame_step=10)
+        table = pypmxvmd.motion_to_pose_table(motion, [10, 0])
+        assert len(table) == 2
+        first = table.get_pose(1)
+        bone_b = next(b for b in first.bone_poses if b.bone_name == "b")
+        assert bone_b.position == pytest.approx([1, 2, 3])
+        assert bone_b.rotation == pytest.approx(_quat_xyzw([30, 0, 0]), abs=1e-5)
+        assert table.get_pose(0).morph_poses[0].weight == 0.0
+
+    def test_interpolation_and_clamping(self):
+        motion = VmdMotion()
+        curve = [127, 0, 0, 127] * 4
+        motion.bone_frames = [
+            VmdBoneFrame("a", 0, [0, 0, 0], [0, 0, 0]),
+            VmdBoneFrame("a", 10, [10, 0, 0], [0, 90, 0]),
+            VmdBoneFrame("a", 20, [20, 0, 0], [0, 90, 0], interpolation=curve),
+        ]
+        motion.morph_frames = [VmdMorphFrame("x", 0, 0.0), VmdMorphFrame("x", 10, 1.0)]
+        poses = pypmxvmd.motion_to_poses(motion, [-5, 5, 12.5, 15, 40])
+        xs = [p.bone_poses[0].position[0] for p in poses]
+        assert xs[0] == 0 and xs[4] == 20
+        assert xs[1] == pytest.approx(5)
+        assert xs[2] < 12.5
+        assert xs[3] == pytest.approx(15, abs=1e-4)
+        rotation = poses[1].bone_poses[0].rotation
+        assert rotation == pytest.approx(_quat_xyzw([0, 45, 0]), abs=1e-5)
+        assert [p.morph_poses[0].weight for p in poses] == pytest.approx([0, 0.5, 1, 1, 1])
+
+    def test_from_dense_validates(self):
+        with pytest.raises(ValueError):
+            VpdPoseTable.from_dense(2, ["a"], [0.0] * 3, [0.0] * 8)
+        with pytest.raises(ValueError):
+            VpdPoseTable.from_dense(1, ["a", "a"], [0.0] * 6, [0.0] * 8)
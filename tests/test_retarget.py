@@ -0,0 +1,117 @@
+"""
+Tests for bone/morph name retargeting.
+"""
+
+import re
+
+import pytest
+
+import pypmxvmd
+from pypmxvmd.common import math3d
+from pypmxvmd.common.models.vmd import (
+    VmdBoneColumns, VmdBoneFrame, VmdIkBone, VmdIkFrame, VmdMorphColumns, VmdMorphFrame, VmdMotion
+)
+from pypmxvmd.common.models.vpd import VpdBonePose, VpdMorphPose, VpdPose
+from pypmxvmd.common.processing import NameMap, RetargetMap
+
+
+class TestNameMap:
+    """Exact names, wildcard and regex rules."""
+
+    def test_precedence_and_rules(self):
+        names = NameMap({"Hips": "センター", "LeftEye": None},
+                        rules=[("Left*", r"左\1"), (re.compile(r"Right(\w+)"), r"右\1")])
+        assert names.get("Hips") == "センター"
+        assert names.get("LeftEye") is None
+        assert names.get("LeftArm") == "左Arm"
+        assert names.get("RightArm") == "右Arm"
+        assert names.get("Head") == "Head"
+        assert NameMap(keep_unmapped=False).get("Head") is None
+
+    def test_question_mark_matches_single_character(self):
+        names = NameMap(rules=[("Finger?_?", r"指\1\2")])
+        assert names.get("Finger1_2") == "指12"
+        assert names.get("Finger10_2") == "Finger10_2"
+
+
+class TestRetargetMotion:
+    """VMD motions."""
+
+    def _motion(self):
+        motion = VmdMotion()
+        motion.bone_frames = [VmdBoneFrame("Hips", 0, [1.0, 2.0, 3.0], [0.0, 0.0, 0.0]),
+                              VmdBoneFrame("LeftArm", 0, [0.0, 0.0, 0.0], [10.0, 20.0, 30.0]),
+                              VmdBoneFrame("Tail", 5)]
+        motion.morph_frames = [VmdMorphFrame("Blink", 0, 0.5)]
+        motion.ik_frames = [VmdIkFrame(0, True, [VmdIkBone("LeftFootIK", True), VmdIkBone("Tail", False)])]
+        return motion
+
+    def test_rename_scale_and_offset(self):
+        mapping = RetargetMap(bones=NameMap({"Hips": "センター", "Tail": None}, rules=[("Left*", r"左\1")]),
+                              morphs={"Blink": "まばたき"},
+                              rotation_offsets={"左Arm": [0.0, 0.0, 35.0]},
+                              translation_scale={"センター": 0.5})
+        result = pypmxvmd.retarget(self._motion(), mapping)
+        assert [f.bone_name for f in result.bone_frames] == ["センター", "左Arm"]
+        assert result.bone_frames[0].position == [0.5, 1.0, 1.5]
+        assert result.morph_frames[0].morph_name == "まばたき"
+        assert [b.bone_name for b in result.ik_frames[0].ik_bones] == ["左FootIK"]
+
+        expected = math3d.quaternion_multiply(math3d.euler_to_quaternion([10.0, 20.0, 30.0]),
+                                              math3d.euler_to_quaternion([0.0, 0.0, 35.0]))
+        actual = math3d.euler_to_quaternion(result.bone_frames[1].rotation)
+        sign = 1 if actual[0] * expected[0] >= 0 else -1
+        assert [sign * v for v in actual] == pytest.approx(list(expected), abs=1e-9)
+
+    def test_plain_dict_and_source_untouched(self):
+        motion = self._motion()
+        result = pypmxvmd.retarget(motion, {"Hips": "センター"})
+        assert [f.bone_name for f in result.bone_frames] == ["センター", "LeftArm", "Tail"]
+        assert result.bone_frames[1].rotation == [10.0, 20.0, 30.0]
+        assert motion.bone_frames[0].bone_name == "Hips"
+
+    def test_collision_raises(self):
+        with pytest.raises(ValueError):
+            pypmxvmd.retarget(self._motion(), {"Hips": "Tail"})
+
+    def test_unsupported_type(self):
+        with pytest.raises(ValueError):
+            pypmxvmd.retarget(object(), {})
+
+
+class TestRetargetPoseAndColumns:
+    """VPD poses and columnar keyframes."""
+
+    def test_pose(self):
+        pose = VpdPose("model", [VpdBonePose("Hips", [2.0, 4.0, 6.0], [0.0, 0.0, 0.0, 1.0])],
+                       [VpdMorphPose("Blink", 1.0)])
+        offset = [0.0, 90.0, 0.0]
+        mapping = RetargetMap({"Hips": "センター"}, {"Blink": "まばたき"},
+                              rotation_offsets={"センター": offset}, translation_scale=0.5)
+        result = pypmxvmd.retarget(pose, mapping)
+        bone = result.bone_poses[0]
+        assert (bone.bone_name, bone.position) == ("センター", [1.0, 2.0, 3.0])
+        w, x, y, z = math3d.euler_to_quaternion(offset)
+        assert bone.rotation == pytest.approx([x, y, z, w])
+        assert result.morph_poses[0].morph_name == "まばたき"
+
+    def test_bone_columns_match_frame_path(self):
+        motion = VmdMotion()
+        motion.bone_frames = [VmdBoneFrame(name, i, [1.0, 2.0, 3.0], [5.0 * i, 10.0, 0.0])
+                              for name in ("Hips", "LeftArm", "Tail") for i in range(4)]
+        mapping = RetargetMap(NameMap({"Tail": None}, rules=[("Left*", r"左\1")]),
+                              rotation_offsets={"左Arm": [0.0, 0.0, 35.0]}, translation_scale=2.0)
+        columns = pypmxvmd.retarget(VmdBoneColumns.from_frames(motion.bone_frames), mapping)
+        assert columns.bone_names == ["Hips", "左Arm"]
+        expected = pypmxvmd.retarget(motion, mapping).bone_frames
+        for got, want in zip(columns.to_frames(), expected):
+            assert (got.bone_name, got.frame_number) == (want.bone_name, want.frame_number)
+            assert got.position == pytest.approx(want.position, abs=1e-5)
+            assert got.rotation == pytest.approx(want.rotation, abs=1e-3)
+
+    def test_morph_columns(self):
+        frames = [VmdMorphFrame("Blink", i, 0.1 * i) for i in range(3)]
+        columns = pypmxvmd.retarget(VmdMorphColumns.from_frames(frames),
+                                    RetargetMap(morphs={"Blink": "まばたき"}))
+        assert columns.morph_names == ["まばたき"]
+        assert list(columns.frame_numbers) == [0, 1, 2]
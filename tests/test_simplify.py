@@ -0,0 +1,125 @@
+"""
+Tests for quadric-error mesh simplification.
+"""
+
+import random
+
+import pytest
+
+import pypmxvmd
+from pypmxvmd.common.models.pmx import (
+    MorphType, PmxMaterial, PmxMeshIndex, PmxModel, PmxMorph, PmxMorphItemVertex, PmxVertex, WeightMode
+)
+from pypmxvmd.common.processing import simplify as simplify_module
+
+
+@pytest.fixture(params=["python", "cython"])
+def backend(request, monkeypatch):
+    """Run a test against the heapq implementation and, when compiled, the Cython collapse loop."""
+    if request.param == "cython":
+        if not simplify_module._CYTHON_AVAILABLE:
+            pytest.skip("Cython simplify kernel not compiled")
+    else:
+        monkeypatch.setattr(simplify_module, "_CYTHON_AVAILABLE", False)
+    return request.param
+
+
+def _plane(size=9, materials=1):
+    """A flat grid; with two materials the left and right halves are separate submeshes."""
+    model = PmxModel()
+    model.vertices = [PmxVertex(position=[float(x), float(y), 0.0], uv=[x / size, y / size],
+                                weight_mode=WeightMode.BDEF1, weight=[[x % 3, 1.0]])
+                      for y in range(size) for x in range(size)]
+    halves = [[], []]
+    for y in range(size - 1):
+        for x in range(size - 1):
+            a = y * size + x
+            half = 0 if materials == 1 or x < (size - 1) // 2 else 1
+            halves[half] += [[a, a + size, a + 1], [a + 1, a + size, a + size + 1]]
+    model.faces = halves[0] + halves[1]
+    model.materials = [PmxMaterial(name_jp=f"m{i}", face_count=len(faces) * 3)
+                       for i, faces in enumerate(halves[:materials])]
+    return model
+
+
+def _boundary(size):
+    return {(float(x), float(y)) for y in range(size) for x in range(size)
+            if x in (0, size - 1) or y in (0, size - 1)}
+
+
+@pytest.mark.usefixtures("backend")
+class TestSimplifyMesh:
+    """Edge collapses reduce faces while locked features survive."""
+
+    def test_flat_plane_reaches_target(self):
+        model = _plane()
+        lod = pypmxvmd.simplify_mesh(model, 0.5)
+        assert len(lod.faces) <= 64
+        assert lod.materials[0].face_count == len(lod.faces) * 3
+        assert len(model.faces) == 128 and len(model.vertices) == 81
+        positions = {tuple(vertex.position[:2]) for vertex in lod.vertices}
+        assert _boundary(9) <= positions
+        for face in lod.faces:
+            a, b, c = (lod.vertices[v].position for v in face)
+            normal_z = (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+            assert normal_z < 0
+        assert all(vertex.weight == [[int(vertex.position[0]) % 3, 1.0]] for vertex in lod.vertices)
+
+    def test_material_ranges_and_shared_vertices(self):
+        model = _plane(materials=2)
+        lod = pypmxvmd.simplify_mesh(model, 0.3)
+        ranges = PmxMeshIndex.of(lod).ranges
+        assert sum(count for _offset, count in ranges) == len(lod.faces)
+        left = {v for face in lod.faces[:ranges[0][1]] for v in face}
+        right = {v for face in lod.faces[ranges[1][0]:] for v in face}
+        assert {lod.vertices[v].position[0] for v in left & right} == {4.0}
+        assert len({v for v in left & right}) == 9
+
+    def test_morph_vertices_kept(self):
+        model = _plane()
+        model.morphs = [PmxMorph("m", morph_type=MorphType.VERTEX,
+                                 items=[PmxMorphItemVertex(40, [0.0, 0.0, 1.0])])]
+        lod = pypmxvmd.simplify_mesh(model, 0.1)
+        [item] = lod.morphs[0].items
+        assert lod.vertices[item.vertex_index].position == [4.0, 4.0, 0.0]
+        assert model.morphs[0].items[0].vertex_index == 40
+        assert lod.bones is model.bones
+
+    def test_max_error_and_ratio_one(self):
+        model = _plane()
+        model.vertices[40].position[2] = 2.0
+        lod = pypmxvmd.simplify_mesh(model, 0.1, max_error=1e-9)
+        assert [4.0, 4.0, 2.0] in [vertex.position for vertex in lod.vertices]
+        assert len(pypmxvmd.simplify_mesh(model, 1.0).faces) == 128
+
+    def test_generate_lods(self):
+        lods = pypmxvmd.generate_lods(_plane(), (0.5, 0.25))
+        assert [len(lod.faces) for lod in lods] == sorted((len(lod.faces) for lod in lods), reverse=True)
+        assert len(lods[1].faces) < len(lods[0].faces) < 128
+        with pytest.raises(ValueError):
+            pypmxvmd.generate_lods(_plane(), (0.25, 0.5))
+        with pytest.raises(ValueError):
+            pypmxvmd.simplify_mesh(_plane(), 1.5)
+
+
+class TestBackends:
+    """The Cython collapse loop makes the same collapses as the heapq implementation."""
+
+    def test_same_lods(self, monkeypatch):
+        if not simplify_module._CYTHON_AVAILABLE:
+            pytest.skip("Cython simplify kernel not compiled")
+        rng = random.Random(5)
+        model = _plane(17, materials=2)
+        for vertex in model.vertices:
+            vertex.position[2] = rng.uniform(-0.2, 0.2)
+        model.morphs = [PmxMorph(name_jp="m", morph_type=MorphType.VERTEX,
+                                 items=[PmxMorphItemVertex(vertex_index=v, offset=[0.0, 0.0, 1.0])
+                                        for v in range(40, 60)])]
+        results = []
+        for available in (True, False):
+            monkeypatch.setattr(simplify_module, "_CYTHON_AVAILABLE", available)
+            lods = pypmxvmd.generate_lods(model, (0.5, 0.2, 0.05))
+            results.append([(lod.faces, [vertex.position for vertex in lod.vertices],
+                             [item.vertex_index for item in lod.morphs[0].items]) for lod in lods])
+        assert results[0] == results[1]
+        assert len(results[0][-1][0]) < len(model.faces) // 4
@@ -0,0 +1,82 @@
+"""
+Tests for the vertex spatial index.
+"""
+
+import math
+import random
+
+import pytest
+
+import pypmxvmd
+from pypmxvmd.common.models.pmx import PmxModel, PmxVertex
+from pypmxvmd.common.processing import VertexSpatialIndex
+
+
+def _points(count, seed=7):
+    rng = random.Random(seed)
+    return [rng.uniform(-5.0, 5.0) for _ in range(count * 3)]
+
+
+def _model(points):
+    model = PmxModel()
+    model.vertices = [PmxVertex(position=points[i:i + 3]) for i in range(0, len(points), 3)]
+    return model
+
+
+def _brute_nearest(points, query):
+    return min(range(len(points) // 3), key=lambda i: math.dist(points[i * 3:i * 3 + 3], query))
+
+
+class TestVertexSpatialIndex:
+    """Queries agree with brute force."""
+
+    def test_nearest_matches_brute_force(self):
+        points = _points(500)
+        queries = _points(60, seed=8) + [40.0, -40.0, 3.0]
+        index = VertexSpatialIndex(points)
+        found, distances = index.nearest(queries)
+        for k in range(len(queries) // 3):
+            query = queries[k * 3:k * 3 + 3]
+            expected = _brute_nearest(points, query)
+            assert found[k] == expected
+            assert distances[k] == pytest.approx(math.dist(points[expected * 3:expected * 3 + 3], query))
+
+    def test_max_distance_and_empty(self):
+        index = VertexSpatialIndex([0.0, 0.0, 0.0])
+        found, distances = index.nearest([3.0, 0.0, 0.0], max_distance=1.0)
+        assert list(found) == [-1] and distances[0] == math.inf
+        assert list(VertexSpatialIndex([]).nearest([1.0, 2.0, 3.0])[0]) == [-1]
+
+    def test_radius_and_boxes(self):
+        points = _points(400)
+        index = VertexSpatialIndex(points, cell_size=0.7)
+        vertices = range(len(points) // 3)
+        [within] = index.within_radius([1.0, 1.0, 1.0], 2.0)
+        assert sorted(within) == [i for i in vertices if math.dist(points[i * 3:i * 3 + 3], (1, 1, 1)) <= 2.0]
+        boxes = index.in_boxes([-1.0, -2.0, -3.0, 1.0, 2.0, 3.0, 10.0, 10.0, 10.0, 11.0, 11.0, 11.0])
+        expected = [i for i in vertices
+                    if all(-b <= points[i * 3 + a] <= b for a, b in enumerate((1.0, 2.0, 3.0)))]
+        assert sorted(boxes[0]) == expected
+        assert len(boxes[1]) == 0
+
+    def test_planar_model(self):
+        points = [c for x in range(20) for z in range(20) for c in (x * 0.1, 0.0, z * 0.1)]
+        found, _distances = VertexSpatialIndex(points).nearest([0.52, 0.3, 1.01])
+        assert found[0] == 5 * 20 + 10
+
+    def test_cached_on_model(self):
+        points = _points(50)
+        model = _model(points)
+        index = VertexSpatialIndex.of(model)
+        assert VertexSpatialIndex.of(model) is index
+        model.vertices = model.vertices[:10]
+        assert VertexSpatialIndex.of(model) is not index
+        source = _model(points[:30])
+        found, distances = pypmxvmd.nearest_vertices(source, _model(points))
+        assert list(found) == list(range(10)) and max(distances) == 0.0
+
+    def test_errors(self):
+        with pytest.raises(ValueError):
+            VertexSpatialIndex([0.0, 1.0])
+        with pytest.raises(ValueError):
+            VertexSpatialIndex([0.0, 1.0, 2.0], cell_size=0.0)
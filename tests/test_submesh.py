@@ -0,0 +1,72 @@
+"""
+Tests for per-material face ranges and submesh extraction.
+"""
+
+import pytest
+
+import pypmxvmd
+from pypmxvmd.common.models.pmx import PmxMaterial, PmxMeshIndex, PmxModel, PmxVertex
+from tests import synthetic_data
+
+
+def _model():
+    model = PmxModel()
+    model.vertices = [PmxVertex(position=[float(i), 0.0, 0.0]) for i in range(6)]
+    model.faces = [[0, 1, 2], [2, 1, 3], [4, 5, 0], [5, 4, 3]]
+    model.materials = [PmxMaterial(name_jp="a", face_count=6), PmxMaterial(name_jp="b", face_count=6)]
+    return model
+
+
+class TestMeshIndex:
+    """Index buffer and material ranges."""
+
+    def test_parse_time_index_matches_faces(self, tmp_path):
+        path = synthetic_data.write_pmx(tmp_path / "a.pmx", vertex_count=300, face_count=90,
+                                        material_count=4)
+        model = pypmxvmd.load_pmx(path)
+        assert model._mesh_index is not None
+        mesh_index = PmxMeshIndex.of(model)
+        assert mesh_index is model._mesh_index
+        assert mesh_index.ranges == [(0, 22), (22, 22), (44, 22), (66, 24)]
+        assert mesh_index.indices.tolist() == [i for face in model.faces for i in face]
+
+    def test_material_faces_is_a_view(self):
+        model = _model()
+        mesh_index = PmxMeshIndex.of(model)
+        view = mesh_index.material_faces(1)
+        assert view.tolist() == [4, 5, 0, 5, 4, 3]
+        mesh_index.indices[6] = 9
+        assert view[0] == 9
+
+    def test_rebuilt_when_materials_change(self):
+        model = _model()
+        first = PmxMeshIndex.of(model)
+        model.materials[0].face_count = 3
+        assert PmxMeshIndex.of(model) is not first
+        assert PmxMeshIndex.of(model).ranges == [(0, 1), (1, 2)]
+
+    def test_face_count_overflow(self):
+        model = _model()
+        model.materials[1].face_count = 30
+        with pytest.raises(ValueError):
+            PmxMeshIndex.of(model)
+
+
+class TestExtractSubmeshes:
+    """Views and compaction."""
+
+    def test_views(self):
+        submeshes = pypmxvmd.extract_submeshes(_model())
+        assert [(s.face_offset, s.face_count) for s in submeshes] == [(0, 2), (2, 2)]
+        assert isinstance(submeshes[0].indices, memoryview)
+        assert submeshes[0].vertex_indices is None
+
+    def test_compact(self):
+        model = _model()
+        first, second = pypmxvmd.extract_submeshes(model, compact=True)
+        assert first.vertex_indices.tolist() == [0, 1, 2, 3]
+        assert second.vertex_indices.tolist() == [4, 5, 0, 3]
+        assert second.indices.tolist() == [0, 1, 2, 1, 0, 3]
+        positions = pypmxvmd.apply_morphs(model, {}).positions
+        assert second.gather(positions, 3).tolist() == [4.0, 0.0, 0.0, 5.0, 0.0, 0.0,
+                                                        0.0, 0.0, 0.0, 3.0, 0.0, 0.0]
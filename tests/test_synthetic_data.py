@@ -0,0 +1,67 @@
+"""
+Tests for the synthetic data generators and the benchmark suite helpers.
+"""
+
+import pytest
+
+import pypmxvmd
+from tests import synthetic_data
+from tests.benchmark_suite import compare_results, run_suite
+
+
+class TestSyntheticGenerators:
+    """Generated files must be deterministic and parseable."""
+
+    def test_vmd_deterministic(self):
+        a = synthetic_data.make_vmd_bytes(bone_frames=50, morph_frames=10, seed=3)
+        b = synthetic_data.make_vmd_bytes(bone_frames=50, morph_frames=10, seed=3)
+        c = synthetic_data.make_vmd_bytes(bone_frames=50, morph_frames=10, seed=4)
+        assert a == b
+        assert a != c
+
+    def test_vmd_parse_counts(self, tmp_path):
+        path = synthetic_data.write_vmd(tmp_path / "a.vmd", bone_frames=120,
+                                        morph_frames=30, camera_frames=7)
+        motion = pypmxvmd.load_vmd(path)
+        assert len(motion.bone_frames) == 120
+        assert len(motion.morph_frames) == 30
+        assert len(motion.camera_frames) == 7
+        motion.validate()
+
+    @pytest.mark.parametrize("vertex_index_size", [None, 2, 4])
+    def test_pmx_parse_counts(self, tmp_path, vertex_index_size):
+        path = synthetic_data.write_pmx(tmp_path / "a.pmx", vertex_count=200, face_count=150,
+                                        material_count=3, additional_uvs=1,
+                                        vertex_index_size=vertex_index_size)
+        model = pypmxvmd.load_pmx(path)
+        assert len(model.vertices) == 200
+        assert len(model.faces) == 150
+        assert sum(m.face_count for m in model.materials) == 150 * 3
+
+    def test_vpd_parse_counts(self, tmp_path):
+        path = synthetic_data.write_vpd(tmp_path / "a.vpd", bone_count=12, morph_count=4)
+        pose = pypmxvmd.load_vpd(path)
+        assert len(pose.bone_poses) == 12
+        assert len(pose.morph_poses) == 4
+
+
+class TestBenchmarkSuite:
+    """Benchmark suite produces comparable JSON-style reports."""
+
+    def test_run_suite_tiny(self):
+        report = run_suite(preset="tiny", formats=["vpd"], repeat=1, memory=False)
+        ops = {e["operation"] for e in report["results"]}
+        assert {"parse", "write", "text_roundtrip", "validate", "copy"} <= ops
+        assert all("seconds" in e for e in report["results"])
+
+    def test_compare_flags_regression(self):
+        baseline = {"results": [{"format": "vmd", "backend": "fast", "operation": "parse", "seconds": 1.0}]}
+        current = {"results": [{"format": "vmd", "backend": "fast", "operation": "parse", "seconds": 1.5}]}
+        items = compare_results(current, baseline, threshold=0.2)
+        assert len(items) == 1
+        assert items[0]["regression"] is True
+        assert compare_results(current, baseline, threshold=0.6)[0]["regression"] is False
+
+    def test_unknown_preset(self):
+        with pytest.raises(ValueError):
+            run_suite(preset="huge")
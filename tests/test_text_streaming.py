@@ -0,0 +1,255 @@
+"""
+Tests for streaming text-format reading and writing.
+"""
+
+import io
+import math
+import random
+import struct
+
+import pytest
+
+import pypmxvmd
+from pypmxvmd.common.io import text_io
+from pypmxvmd.common.io.text_io import (
+    TextRowReader, TextChunkWriter, RowFormatter, format_float_shortest, parse_floats,
+    format_float_column, parse_float_rows, parse_int_rows
+)
+from tests import synthetic_data
+
+EDGE_FLOATS = [0.0, -0.0, 1.0, -3.75, 0.1, 1e-30, 1e-45, 5e-324, 3.4e38, 3.5e38, 1e300,
+               -1.2345678e300, float("inf"), -float("inf"), float("nan"), 16777217.0, 2, True]
+
+
+@pytest.fixture(params=["python", "cython"])
+def backend(request, monkeypatch):
+    """Run a test against the pure-Python fallback and, when compiled, the Cython codec."""
+    if request.param == "cython":
+        if not text_io._CYTHON_AVAILABLE:
+            pytest.skip("Cython text codec not compiled")
+    else:
+        monkeypatch.setattr(text_io, "_CYTHON_AVAILABLE", False)
+    return request.param
+
+
+def _random_float32(count, seed=7):
+    rng = random.Random(seed)
+    return [struct.unpack("<f", struct.pack("<I", rng.getrandbits(32)))[0] for _ in range(count)]
+
+
+class TestTextRowReader:
+    """Row reader splits lines lazily and tracks line numbers."""
+
+    def test_skips_blank_lines_and_splits(self):
+        reader = TextRowReader(io.StringIO("a:\t1\n\n  \nx\ty\tz\nsingle\n"))
+        assert reader.peek() == ["a:", "1"]
+        assert reader.read_field("a:", "missing") == "1"
+        assert reader.line_number == 1
+        assert reader.read_row() == ["x", "y", "z"]
+        assert reader.line_number == 4
+        assert list(reader) == [["single"]]
+        assert reader.read_row() is None
+
+    def test_convert_blocks_locates_bad_row(self):
+        reader = TextRowReader(io.StringIO("1\n2\n\n3\nx\n5\n"))
+        blocks = list(reader.convert_blocks(reader.read_rows(3), lambda rows: parse_int_rows(rows, 0, 1),
+                                            block_rows=2))
+        assert blocks == [[1, 2], [3]]
+        with pytest.raises(ValueError):
+            list(reader.convert_blocks(reader.read_rows(2), lambda rows: parse_int_rows(rows, 0, 1)))
+        assert reader.line_number == 5
+
+    def test_read_field_errors(self):
+        reader = TextRowReader(io.StringIO("b:\t1\n"))
+        with pytest.raises(ValueError, match="missing"):
+            reader.read_field("a:", "missing")
+        with pytest.raises(ValueError, match="eof"):
+            reader.read_field("a:", "eof")
+
+
+class TestRowFormatter:
+    """Template-based row formatting and shortest round-trip floats."""
+
+    def test_fixed_precision_matches_fstrings(self):
+        values = ("name", 12, 1.5, -0.25, 1e-7, True)
+        expected = "\t".join(["name", "12", f"{1.5:.6f}", f"{-0.25:.6f}", f"{1e-7:.6f}", "1"])
+        assert RowFormatter("sdfffd").format(values) == expected
+
+    def test_custom_precision(self):
+        assert RowFormatter("ff", 2).format((1.0, 2.345)) == "1.00\t2.35"
+
+    def test_shortest_mode(self):
+        value = struct.unpack("<f", struct.pack("<f", 0.1))[0]
+        assert RowFormatter("sf", None).format(("a", value)) == "a\t0.1"
+
+    @pytest.mark.parametrize("value", [0.0, 1.0, -3.75, 0.1, 123456.789, 1e-30, 3.4e38])
+    def test_shortest_roundtrips_float32(self, value):
+        packed = struct.pack("<f", value)
+        stored = struct.unpack("<f", packed)[0]
+        assert struct.pack("<f", float(format_float_shortest(stored))) == packed
+
+    def test_unknown_code(self):
+        with pytest.raises(ValueError):
+            RowFormatter("x")
+
+    def test_parse_floats(self):
+        assert parse_floats(["1", "-2.5", "1e3"]) == [1.0, -2.5, 1000.0]
+
+    @pytest.mark.parametrize("precision", [None, 6, 2])
+    def test_format_rows_matches_format(self, backend, precision):
+        values = _random_float32(40)
+        rows = [("bone%d" % i, i, values[i], values[i + 1], -values[i], bool(i % 2)) for i in range(30)]
+        formatter = RowFormatter("sdfffd", precision)
+        expected = [formatter.format(row) for row in rows]
+        assert list(formatter.format_rows(iter(rows), block_rows=7)) == expected
+        floats_only = RowFormatter("fff", precision)
+        assert list(floats_only.format_rows(row[2:5] for row in rows)) == \
+            [floats_only.format(row[2:5]) for row in rows]
+        assert list(RowFormatter("ddd").format_rows([[1, 2, 3], [4, 5, 6]])) == ["1\t2\t3", "4\t5\t6"]
+
+
+class TestColumnCodec:
+    """Column formatting and row-block parsing match the per-value functions exactly."""
+
+    def test_shortest_matches_per_value(self, backend):
+        values = EDGE_FLOATS + _random_float32(5000)
+        assert format_float_column(values, None) == [format_float_shortest(v) for v in values]
+
+    def test_fixed_precision(self, backend):
+        values = EDGE_FLOATS + _random_float32(500)
+        assert format_float_column(iter(values), 6) == ["%.6f" % v for v in values]
+        assert format_float_column(values, 0) == ["%.0f" % v for v in values]
+        assert format_float_column([], None) == []
+        with pytest.raises(ValueError):
+            format_float_column([1.0], -1)
+
+    def test_parse_float_rows(self, backend):
+        rows = [["a", "1", "-2.5", "1e3"], ["b", " 3 ", "1_0", ".5", "extra"],
+                ["c", "inf", "-Infinity", "1e999"], ["d", "+7", "\u0661\u0662", "1e-400"]]
+        expected = [float(field) for row in rows for field in row[1:4]]
+        assert parse_float_rows(rows, 1, 4) == expected
+        assert math.isnan(parse_float_rows([["nan"]], 0, 1)[0])
+        assert parse_float_rows([], 0, 3) == []
+
+    def test_parse_int_rows(self, backend):
+        rows = [["1", "-2", " 3 "], ["1_0", "+7", "007"],
+                ["123456789012345678901234567890", "-9223372036854775808", "9223372036854775807"]]
+        expected = [int(field) for row in rows for field in row]
+        assert parse_int_rows(rows, 0, 3) == expected
+        assert parse_int_rows(rows, 1, 2) == [-2, 7, -9223372036854775808]
+
+    @pytest.mark.parametrize("field", ["x", "", "0x10", "1.5"])
+    def test_parse_errors_match_builtins(self, backend, field):
+        for parse, convert in ((parse_float_rows, float), (parse_int_rows, int)):
+            try:
+                convert(field)
+            except ValueError as error:
+                with pytest.raises(ValueError) as raised:
+                    parse([[field]], 0, 1)
+                assert str(raised.value) == str(error)
+            else:
+                assert parse([[field]], 0, 1) == [convert(field)]
+
+    def test_short_row(self, backend):
+        with pytest.raises(ValueError, match="字段数不足"):
+            parse_float_rows([["1", "2"], ["1"]], 0, 2)
+        with pytest.raises(ValueError, match="字段范围"):
+            parse_int_rows([["1"]], 1, 0)
+
+
+class TestTextChunkWriter:
+    """Chunked output matches a single newline join."""
+
+    @pytest.mark.parametrize("chunk_lines", [1, 3, 4096])
+    def test_output_matches_join(self, chunk_lines):
+        lines = [f"line{i}" for i in range(10)]
+        buffer = io.StringIO()
+        with TextChunkWriter(buffer, chunk_lines=chunk_lines) as writer:
+            writer.write_line(lines[0])
+            writer.write_lines(line for line in lines[1:])
+        assert buffer.getvalue() == "\n".join(lines)
+        assert writer.line_count == 10
+
+    def test_empty_output(self):
+        buffer = io.StringIO()
+        with TextChunkWriter(buffer):
+            pass
+        assert buffer.getvalue() == ""
+
+
+class TestStreamingRoundTrip:
+    """Text round trips through the streaming parsers."""
+
+    def test_vmd_text_roundtrip(self, tmp_path):
+        path = synthetic_data.write_vmd(tmp_path / "a.vmd", bone_frames=30,
+                                        morph_frames=6, camera_frames=2)
+        motion = pypmxvmd.load_vmd(path)
+        pypmxvmd.save_vmd_text(motion, tmp_path / "a.txt")
+        loaded = pypmxvmd.load_vmd_text(tmp_path / "a.txt")
+        assert isinstance(loaded.header.version, int)
+        loaded.validate()
+        assert len(loaded.bone_frames) == 30
+        assert len(loaded.morph_frames) == 6
+        assert len(loaded.camera_frames) == 2
+        assert loaded.bone_frames[5].bone_name == motion.bone_frames[5].bone_name
+
+    def test_pmx_text_roundtrip(self, tmp_path):
+        path = synthetic_data.write_pmx(tmp_path / "a.pmx", vertex_count=40,
+                                        face_count=25, material_count=2)
+        model = pypmxvmd.load_pmx(path)
+        pypmxvmd.save_pmx_text(model, tmp_path / "a.txt")
+        loaded = pypmxvmd.load_pmx_text(tmp_path / "a.txt")
+        assert len(loaded.vertices) == 40
+        assert len(loaded.faces) == 25
+        assert loaded.faces == model.faces
+
+    def test_vpd_text_roundtrip(self, tmp_path):
+        path = synthetic_data.write_vpd(tmp_path / "a.vpd", bone_count=6, morph_count=3)
+        pose = pypmxvmd.load_vpd(path)
+        pypmxvmd.save_vpd_text(pose, tmp_path / "a.txt")
+        loaded = pypmxvmd.load_vpd_text(tmp_path / "a.txt")
+        assert [b.bone_name for b in loaded.bone_poses] == [b.bone_name for b in pose.bone_poses]
+        assert len(loaded.morph_poses) == 3
+
+    def test_shortest_precision_is_lossless(self, tmp_path):
+        path = synthetic_data.write_pmx(tmp_path / "a.pmx", vertex_count=20, face_count=10)
+        model = pypmxvmd.load_pmx(path)
+        pypmxvmd.save_pmx_text(model, tmp_path / "a.txt", float_precision=None)
+        loaded = pypmxvmd.load_pmx_text(tmp_path / "a.txt")
+
+        def packed(vertices):
+            return [struct.pack("<3f2f", *v.position, *v.uv) for v in vertices]
+
+        assert packed(loaded.vertices) == packed(model.vertices)
+
+    @pytest.mark.parametrize("precision", [None, 6])
+    def test_backends_write_identical_text(self, tmp_path, monkeypatch, precision):
+        if not text_io._CYTHON_AVAILABLE:
+            pytest.skip("Cython text codec not compiled")
+        path = synthetic_data.write_vmd(tmp_path / "a.vmd", bone_frames=50, morph_frames=10,
+                                        camera_frames=3)
+        motion = pypmxvmd.load_vmd(path)
+        pypmxvmd.save_vmd_text(motion, tmp_path / "c.txt", float_precision=precision)
+        monkeypatch.setattr(text_io, "_CYTHON_AVAILABLE", False)
+        pypmxvmd.save_vmd_text(motion, tmp_path / "p.txt", float_precision=precision)
+        assert (tmp_path / "c.txt").read_bytes() == (tmp_path / "p.txt").read_bytes()
+
+    def test_bad_row_reports_its_line(self, tmp_path):
+        path = synthetic_data.write_vmd(tmp_path / "a.vmd", bone_frames=30, morph_frames=0)
+        pypmxvmd.save_vmd_text(pypmxvmd.load_vmd(path), tmp_path / "a.txt")
+        lines = (tmp_path / "a.txt").read_text(encoding="utf-8").split("\n")
+        row = next(i for i, line in enumerate(lines) if line.startswith("boneframe_ct")) + 12
+        fields = lines[row].split("\t")
+        fields[3] = "bad"
+        lines[row] = "\t".join(fields)
+        (tmp_path / "b.txt").write_text("\n".join(lines), encoding="utf-8")
+        with pytest.raises(ValueError, match=f"第{row + 1}行"):
+            pypmxvmd.load_vmd_text(tmp_path / "b.txt")
+
+    def test_truncated_text_reports_line(self, tmp_path):
+        path = synthetic_data.write_vmd(tmp_path / "a.vmd", bone_frames=10, morph_frames=0)
+        pypmxvmd.save_vmd_text(pypmxvmd.load_vmd(path), tmp_path / "a.txt")
+        lines = (tmp_path / "a.txt").read_text(encoding="utf-8").split("\n")
+        (tmp_path / "b.txt").write_text("\n".join(lines[:8]), encoding="utf-8")
+        with pytest.raises(ValueError, match="行"):
+            pypmxvmd.load_vmd_text(tmp_path / "b.txt")
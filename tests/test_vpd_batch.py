@@ -0,0 +1,147 @@
+"""
+Tests for the single-pass VPD tokenizer and batch pose loading.
+"""
+
+import pytest
+
+import pypmxvmd
+from pypmxvmd.common.models.vpd import VpdPose, VpdBonePose, VpdMorphPose, VpdPoseTable
+from pypmxvmd.common.parsers import vpd_parser
+from pypmxvmd.common.parsers.vpd_parser import VpdParser, _tokenize_vpd_text, _tokenize_vpd_bytes
+from tests import synthetic_data
+
+MMD_STYLE = (
+    "Vocaloid Pose Data file\r\n\r\n"
+    "miku.osm;\t\t// 親ファイル名\r\n"
+    "2;\t\t\t\t// 総ポーズボーン数\r\n\r\n"
+    "Bone0{センター\r\n"
+    "  0.000000,1.500000,-0.250000;\t\t\t\t// trans x,y,z\r\n"
+    "  0.000000,0.000000,0.000000,1.000000;\t\t// Quaternion x,y,z,w\r\n"
+    "}\r\n\r\n"
+    "Bone1{左足ＩＫ  // comment\r\n"
+    "  1,2,3;\r\n"
+    "  0.1,0.2,0.3,0.927;\r\n"
+    "}\r\n\r\n"
+    "Morph0{あ\r\n"
+    "  0.5;\r\n"
+    "}\r\n"
+)
+
+
+class TestVpdTokenizer:
+    """Regex-free tokenizer handles MMD output and reports line numbers."""
+
+    def test_mmd_comments_and_crlf(self):
+        model_name, bones, morphs = _tokenize_vpd_text(MMD_STYLE)
+        assert model_name == "miku"
+        assert bones[0] == ("センター", [0.0, 1.5, -0.25], [0.0, 0.0, 0.0, 1.0])
+        assert bones[1][0] == "左足ＩＫ"
+        assert morphs == [("あ", 0.5)]
+
+    @pytest.mark.parametrize("text, message", [
+        ("nope\n", "文件头"),
+        ("Vocaloid Pose Data file\n\nm.osm;\n1;\nBone0{a\n 1,2;\n", "第6行: 找不到骨骼位置"),
+        ("Vocaloid Pose Data file\nm.osm;\n2;\nBone0{a\n1,2,3;\n1,2,3,4;\n}\n", "第7行: 文件意外结束"),
+        ("Vocaloid Pose Data file\nm.osm;\n0;\nMorphX{x\n0.5;\n}\n", "第4行: 找不到变形名称"),
+        ("Vocaloid Pose Data file\nm.osm;\n1;\nBone0{a\n1,2,3;\n1,2,3,4;\n]\n", "第7行: 骨骼项未正确关闭"),
+    ])
+    def test_errors(self, text, message):
+        with pytest.raises(ValueError, match=message):
+            _tokenize_vpd_text(text)
+
+    def test_encoding_sniffing(self):
+        text = synthetic_data.make_vpd_text(bone_count=3, morph_count=1)
+        assert _tokenize_vpd_bytes(text.encode("shift_jis"))[1] == "shift_jis"
+        assert _tokenize_vpd_bytes(text.encode("utf-8"))[1] == "utf-8"
+        tokens, encoding = _tokenize_vpd_bytes(b"\xef\xbb\xbf" + text.encode("utf-8"))
+        assert encoding == "utf-8"
+        assert tokens == _tokenize_vpd_text(text)
+
+    def test_utf8_file_parses(self, tmp_path):
+        path = tmp_path / "a.vpd"
+        path.write_bytes(MMD_STYLE.encode("utf-8"))
+        pose = pypmxvmd.load_vpd(path)
+        assert [b.bone_name for b in pose.bone_poses] == ["センター", "左足ＩＫ"]
+        assert pose.bone_poses[1].rotation == [0.1, 0.2, 0.3, 0.927]
+
+
+class TestVpdPoseTable:
+    """Columnar pose table storage and accessors."""
+
+    def _table(self):
+        table = VpdPoseTable()
+        table.add_pose("m", [("a", [1, 2, 3], [0, 0, 0, 1]), ("b", [0, 0, 0], [0, 1, 0, 0])],
+                       [("x", 0.5)], "p0")
+        table.add_vpd_pose(VpdPose("n", [VpdBonePose("b", [4, 5, 6], [1, 0, 0, 0])],
+                                   [VpdMorphPose("y", 1.0)]), "p1")
+        return table
+
+    def test_interning_and_offsets(self):
+        table = self._table()
+        assert len(table) == 2
+        assert table.bone_names == ["a", "b"]
+        assert list(table.bone_offsets) == [0, 2, 3]
+        assert list(table.bone_indices) == [0, 1, 1]
+        assert table.bone_index("b") == 1 and table.bone_index("zz") == -1
+        assert table.morph_names == ["x", "y"]
+
+    def test_get_pose(self):
+        pose = self._table().get_pose(1)
+        assert pose.model_name == "n"
+        assert pose.bone_poses[0].bone_name == "b"
+        assert pose.bone_poses[0].position == [4.0, 5.0, 6.0]
+        assert pose.morph_poses[0].weight == 1.0
+        with pytest.raises(IndexError):
+            self._table().get_pose(2)
+
+    def test_bone_column(self):
+        pose_indices, positions, rotations = self._table().bone_column("b")
+        assert list(pose_indices) == [0, 1]
+        assert list(positions) == [0, 0, 0, 4, 5, 6]
+        assert list(rotations) == [0, 1, 0, 0, 1, 0, 0, 0]
+
+    def test_to_dense(self):
+        positions, rotations, mask = self._table().to_dense(["a", "missing"])
+        assert list(mask) == [1, 0, 0, 0]
+        assert list(positions[:3]) == [1, 2, 3]
+        assert list(rotations[4:8]) == [0, 0, 0, 1]
+
+
+class TestLoadVpdMany:
+    """Parallel batch loading preserves order and handles failures."""
+
+    def _write_library(self, tmp_path, count):
+        return [synthetic_data.write_vpd(tmp_path / f"{i}.vpd", bone_count=5 + i % 3,
+                                         morph_count=i % 2, seed=i)
+                for i in range(count)]
+
+    @pytest.mark.parametrize("use_processes", [False, True])
+    def test_matches_single_file_parse(self, tmp_path, monkeypatch, use_processes):
+        monkeypatch.setattr(vpd_parser, "_BATCH_CHUNK_SIZE", 3)
+        paths = self._write_library(tmp_path, 10)
+        table = pypmxvmd.load_vpd_many(paths, max_workers=2, use_processes=use_processes)
+        assert table.file_paths == [str(p) for p in paths]
+        for i, path in enumerate(paths):
+            expected = pypmxvmd.load_vpd(path)
+            actual = table.get_pose(i)
+            assert [b.bone_name for b in actual.bone_poses] == [b.bone_name for b in expected.bone_poses]
+            assert actual.bone_poses[-1].rotation == pytest.approx(expected.bone_poses[-1].rotation, abs=1e-6)
+            assert len(actual.morph_poses) == len(expected.morph_poses)
+
+    def test_errors(self, tmp_path):
+        paths = self._write_library(tmp_path, 2)
+        broken = tmp_path / "broken.vpd"
+        broken.write_text("not a pose", encoding="utf-8")
+        with pytest.raises(ValueError, match="broken.vpd"):
+            VpdParser().parse_many(paths + [broken], max_workers=1)
+        table = VpdParser().parse_many(paths + [broken, tmp_path / "missing.vpd"],
+                                       max_workers=1, skip_errors=True)
+        assert len(table) == 2
+        assert set(table.errors) == {str(broken), str(tmp_path / "missing.vpd")}
+
+    def test_progress_callback(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(vpd_parser, "_BATCH_CHUNK_SIZE", 2)
+        progress = []
+        VpdParser(progress_callback=progress.append).parse_many(self._write_library(tmp_path, 5),
+                                                                max_workers=1)
+        assert progress == pytest.approx([1 / 3, 2 / 3, 1.0])
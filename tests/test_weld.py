@@ -0,0 +1,85 @@
+"""
+Tests for vertex welding.
+"""
+
+import pytest
+
+import pypmxvmd
+from pypmxvmd.common.models.pmx import (
+    MorphType, PmxMaterial, PmxMeshIndex, PmxModel, PmxMorph, PmxMorphItemUV, PmxMorphItemVertex, PmxVertex,
+    WeightMode
+)
+
+
+def _vertex(x, y, u=0.0, bone=0):
+    return PmxVertex(position=[x, y, 0.0], normal=[0.0, 0.0, 1.0], uv=[u, 0.0],
+                     weight_mode=WeightMode.BDEF1, weight=[[bone, 1.0]])
+
+
+def _model():
+    """Two quads that share an edge, stored with the edge vertices duplicated."""
+    model = PmxModel()
+    model.vertices = [
+        _vertex(0.0, 0.0), _vertex(1.0, 0.0), _vertex(0.0, 1.0), _vertex(1.0, 1.0),
+        _vertex(1.0, 0.0), _vertex(1.0, 1.0), _vertex(2.0, 0.0), _vertex(2.0, 1.0),
+    ]
+    model.faces = [[0, 1, 2], [1, 3, 2], [4, 6, 5], [6, 7, 5]]
+    model.materials = [PmxMaterial(name_jp="a", face_count=6), PmxMaterial(name_jp="b", face_count=6)]
+    model.morphs = [
+        PmxMorph("v", morph_type=MorphType.VERTEX,
+                 items=[PmxMorphItemVertex(3, [0.0, 0.0, 1.0]), PmxMorphItemVertex(5, [0.0, 0.0, 1.0])]),
+        PmxMorph("uv", morph_type=MorphType.UV, items=[PmxMorphItemUV(7, [0.5, 0.0, 0.0, 0.0])]),
+    ]
+    return model
+
+
+class TestWeldVertices:
+    """Exact and tolerance welding, with faces and morphs rewritten."""
+
+    def test_exact(self):
+        model = _model()
+        report = pypmxvmd.weld_vertices(model)
+        assert (report.vertex_count_before, report.vertex_count_after, report.removed_faces) == (8, 6, 0)
+        assert list(report.vertex_remap) == [0, 1, 2, 3, 1, 3, 4, 5]
+        assert model.faces == [[0, 1, 2], [1, 3, 2], [1, 4, 3], [4, 5, 3]]
+        assert [item.vertex_index for item in model.morphs[0].items] == [3]
+        assert model.morphs[1].items[0].vertex_index == 5
+        assert pypmxvmd.apply_morphs(model, {"v": 1.0}).position(3) == [1.0, 1.0, 1.0]
+        assert PmxMeshIndex.of(model).ranges == [(0, 2), (2, 2)]
+
+    def test_attributes_and_morphs_block_merging(self):
+        model = _model()
+        model.vertices[4].uv = [0.5, 0.0]
+        model.morphs[0].items.pop()
+        report = pypmxvmd.weld_vertices(model)
+        assert report.vertex_count_after == 8
+        model = _model()
+        model.vertices[4].weight = [[1, 1.0]]
+        assert pypmxvmd.weld_vertices(model).vertex_count_after == 7
+
+    def test_epsilon(self):
+        exact, model = _model(), _model()
+        for target in (exact, model):
+            target.vertices[4].position = [1.0 + 1e-5, -1e-5, 0.0]
+        assert pypmxvmd.weld_vertices(exact).vertex_count_after == 7
+        report = pypmxvmd.weld_vertices(model, epsilon=1e-4)
+        assert report.vertex_count_after == 6
+        assert model.vertices[1].position == [1.0, 0.0, 0.0]
+
+    def test_degenerate_faces_removed(self):
+        model = _model()
+        model.vertices[6].position = [1.0, 0.0, 0.0]
+        model.morphs = []
+        report = pypmxvmd.weld_vertices(model)
+        assert report.removed_faces == 1
+        assert [material.face_count for material in model.materials] == [6, 3]
+        assert len(model.faces) == 3
+
+    def test_errors(self):
+        with pytest.raises(ValueError):
+            pypmxvmd.weld_vertices(_model(), epsilon=-1.0)
+        model = _model()
+        model.morphs[0].items[0].vertex_index = 99
+        with pytest.raises(ValueError):
+            pypmxvmd.weld_vertices(model)
+